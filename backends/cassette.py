@@ -0,0 +1,264 @@
+"""
+Record/replay cassette for LLM, embedding and Neo4j calls.
+
+In record mode every call made through `llm`, `agent_llm`, `embeddings` and
+`graph.query` is forwarded to the real backend and the request/response pair
+is appended to a JSON-lines file (gzip-compressed when the path ends in .gz).
+In replay mode the same calls are answered from that file, so a recorded
+session of the golden questions can be re-run with no network access to
+measure our own Python-side overhead.
+
+Environment variables:
+    IFX_CASSETTE_MODE     "off" (default), "record" or "replay"
+    IFX_CASSETTE_PATH     cassette file (default benchmarks/cassettes/golden.jsonl.gz)
+    IFX_CASSETTE_LATENCY  "original" (sleep as long as the recorded call took) or "zero"
+
+Entries are keyed by a hash of the call kind, channel and normalized request
+(whitespace-collapsed prompt text, or Cypher plus sorted params). When the
+same request was recorded several times the responses are replayed in order,
+repeating the last one once they run out.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from backends.graph_proxy import GraphProxy
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CASSETTE_PATH = os.path.join(PROJECT_DIR, "benchmarks", "cassettes", "golden.jsonl.gz")
+
+CASSETTE_MODES = ("off", "record", "replay")
+LATENCY_MODES = ("original", "zero")
+
+
+class CassetteMissError(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def normalize_text(text):
+    """Collapse whitespace so formatting-only prompt changes still hit the cassette."""
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def request_key(kind, channel, payload):
+    """Stable hash for a normalized request payload."""
+    raw = json.dumps([kind, channel, payload], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """On-disk store of recorded calls shared by all the cassette wrappers."""
+
+    def __init__(self, path, mode="replay", latency="original"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use 'record' or 'replay'.")
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown cassette latency '{latency}'. Use 'original' or 'zero'.")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._cursor = {}
+
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Start a fresh recording; appends below keep it valid if the run is interrupted
+            with _open(path, "w"):
+                pass
+            print(f"[CASSETTE] Recording to {path}")
+        else:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Cassette not found: {path}. Record one with IFX_CASSETTE_MODE=record.")
+            with _open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], []).append(entry)
+            count = sum(len(entries) for entries in self._entries.values())
+            print(f"[CASSETTE] Replaying {count} recorded calls from {path} (latency={latency})")
+
+    def record(self, kind, channel, payload, response, elapsed):
+        entry = {
+            "key": request_key(kind, channel, payload),
+            "kind": kind,
+            "channel": channel,
+            "elapsed": round(elapsed, 4),
+            "response": response,
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with _open(self.path, "a") as f:
+                f.write(line + "\n")
+
+    def replay(self, kind, channel, payload):
+        key = request_key(kind, channel, payload)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMissError(f"No recorded {kind} call on '{channel}' for key {key}")
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+            entry = entries[min(index, len(entries) - 1)]
+        if self.latency == "original" and entry["elapsed"]:
+            time.sleep(entry["elapsed"])
+        return entry["response"]
+
+    def call(self, kind, channel, payload, fn, encode=lambda value: value):
+        """Replay the call, or run fn() and record its encoded result."""
+        if self.mode == "replay":
+            return self.replay(kind, channel, payload)
+        start = time.perf_counter()
+        result = fn()
+        encoded = encode(result)
+        self.record(kind, channel, payload, encoded, time.perf_counter() - start)
+        return encoded
+
+
+class CassetteChatModel(BaseChatModel):
+    """Chat model that records or replays the generations of an inner chat model."""
+
+    cassette: Any
+    channel: str = "llm"
+    inner: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", "cassette")
+
+    def _generate(self, messages: List[Any], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        payload = {
+            "messages": [[message.type, normalize_text(message.content)] for message in messages],
+            "stop": stop or [],
+        }
+
+        def encode(result):
+            return {
+                "generations": [
+                    {"message": message_to_dict(generation.message), "generation_info": generation.generation_info}
+                    for generation in result.generations
+                ],
+                "llm_output": result.llm_output,
+            }
+
+        recorded = self.cassette.call(
+            "chat", self.channel, payload,
+            lambda: self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            encode,
+        )
+        generations = [
+            ChatGeneration(
+                message=messages_from_dict([generation["message"]])[0],
+                generation_info=generation.get("generation_info"),
+            )
+            for generation in recorded["generations"]
+        ]
+        return ChatResult(generations=generations, llm_output=recorded.get("llm_output"))
+
+
+class CassetteEmbeddings(Embeddings):
+    """Embeddings wrapper that records or replays an inner embedding model."""
+
+    def __init__(self, cassette, inner=None, channel="embeddings"):
+        self.cassette = cassette
+        self.inner = inner
+        self.channel = channel
+
+    def embed_documents(self, texts):
+        payload = [normalize_text(text) for text in texts]
+        return self.cassette.call("embed_documents", self.channel, payload,
+                                  lambda: self.inner.embed_documents(texts))
+
+    def embed_query(self, text):
+        return self.cassette.call("embed_query", self.channel, normalize_text(text),
+                                  lambda: self.inner.embed_query(text))
+
+
+class CassetteGraph(GraphProxy):
+    """GraphStore that records or replays query() results and the schema."""
+
+    def __init__(self, cassette, inner=None, channel="graph"):
+        super().__init__(inner)
+        self.cassette = cassette
+        self.channel = channel
+        # The chains read the schema at construction, so it is part of the recording
+        recorded = self.cassette.call(
+            "schema", channel, None,
+            lambda: {"schema": inner.get_schema, "structured_schema": inner.get_structured_schema,
+                     "enhanced_schema": getattr(inner, "_enhanced_schema", False)},
+        )
+        self._schema = recorded["schema"]
+        self._structured_schema = recorded["structured_schema"]
+        # GraphCypherQAChain.from_llm reads it; cassettes recorded before it was added default to False
+        self._enhanced_schema = recorded.get("enhanced_schema", False)
+
+    @property
+    def get_schema(self):
+        return self._schema
+
+    @property
+    def get_structured_schema(self):
+        return self._structured_schema
+
+    def refresh_schema(self):
+        if self.inner is not None:
+            self.inner.refresh_schema()
+            self._schema = self.inner.get_schema
+            self._structured_schema = self.inner.get_structured_schema
+
+    def query(self, query, params={}, session_params={}):
+        payload = {"query": normalize_text(query), "params": params or {}}
+        return self.cassette.call("query", self.channel, payload,
+                                  lambda: super(CassetteGraph, self).query(query, params, session_params))
+
+    def explain(self, query, params=None):
+        payload = {"query": normalize_text(query), "params": params or {}}
+        return self.cassette.call("explain", self.channel, payload,
+                                  lambda: super(CassetteGraph, self).explain(query, params))
+
+    def __getattr__(self, name):
+        if name == "inner" or self.__dict__.get("inner") is None:
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+
+CASSETTE_MODE = os.environ.get("IFX_CASSETTE_MODE", "off").strip().lower()
+_cassette = None
+
+
+def get_cassette():
+    """Shared Cassette for the current process, or None when IFX_CASSETTE_MODE is off."""
+    global _cassette
+    if CASSETTE_MODE not in CASSETTE_MODES:
+        raise ValueError(f"Unknown IFX_CASSETTE_MODE '{CASSETTE_MODE}'. Use 'off', 'record' or 'replay'.")
+    if CASSETTE_MODE == "off":
+        return None
+    if _cassette is None:
+        _cassette = Cassette(
+            os.environ.get("IFX_CASSETTE_PATH", DEFAULT_CASSETTE_PATH),
+            mode=CASSETTE_MODE,
+            latency=os.environ.get("IFX_CASSETTE_LATENCY", "original").strip().lower(),
+        )
+    return _cassette
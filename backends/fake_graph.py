@@ -0,0 +1,936 @@
+"""
+In-memory stand-in for the Neo4j graph, loaded from the CSVs in data/.
+
+FakeGraph answers the read-only query shapes our tools emit (single MATCH
+patterns with optional relationship hops, WHERE filters, RETURN projections
+with count() aggregation, ORDER BY and LIMIT). It exists so the agent can be
+benchmarked and exercised offline. Anything outside that subset raises a
+ValueError, the same way a Cypher syntax error would surface from Neo4j.
+"""
+
+import csv
+import os
+import re
+from datetime import date, datetime, timezone
+
+from langchain_neo4j.graphs.graph_store import GraphStore
+
+from gradio_stats import (
+    STATS_CSV, match_games, match_players, played_stats, season_totals, stats_game_season, top_performers,
+)
+from gradio_teams import team_records
+from gradio_utils import parse_published_at, search_keys_for, typed_game_fields
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
+MEDIA_DIR = os.path.join(DATA_DIR, "april_11_multimedia_data_collect")
+APRIL_11_DIR = os.path.join(MEDIA_DIR, "new_final_april 11")
+
+ROSTER_CSV = os.path.join(APRIL_11_DIR, "roster_april_11.csv")
+SCHEDULE_CSV = os.path.join(APRIL_11_DIR, "schedule_with_result_april_11.csv")
+COMMUNITIES_CSV = os.path.join(DATA_DIR, "niners_output", "fan_communities.csv")
+FANS_CSV = os.path.join(DATA_DIR, "niners_output", "fans.csv")
+FAN_PLAYER_RELS_CSV = os.path.join(DATA_DIR, "relationship_csvs", "fan_player_rels.csv")
+FAN_COMMUNITY_RELS_CSV = os.path.join(DATA_DIR, "relationship_csvs", "fan_community_rels.csv")
+TEAM_NEWS_CSV = os.path.join(MEDIA_DIR, "team_news_articles.csv")
+
+TEAM_NAME = "San Francisco 49ers"
+
+
+# ------------------------------------------------------------------------------
+# Tokenizer
+# ------------------------------------------------------------------------------
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<number>\d+\.\d+|\d+)
+  | (?P<param>\$[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*|`[^`]+`)
+  | (?P<op><-\[|->|=~|<>|<=|>=|[-=<>(){}\[\]:;,.*+|])
+""", re.VERBOSE)
+
+KEYWORDS = {
+    "MATCH", "OPTIONAL", "WHERE", "RETURN", "DISTINCT", "ORDER", "BY", "ASC",
+    "DESC", "ASCENDING", "DESCENDING", "SKIP", "LIMIT", "AND", "OR", "NOT",
+    "XOR", "AS", "IS", "NULL", "CONTAINS", "STARTS", "ENDS", "WITH", "IN",
+    "TRUE", "FALSE", "EXPLAIN", "PROFILE",
+}
+
+
+def _tokenize(text):
+    """Split a Cypher statement into (kind, value) tokens."""
+    # Drop // line comments first, they are common in LLM output
+    text = re.sub(r"//[^\n]*", "", text)
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match:
+            raise ValueError(f"FakeGraph could not tokenize query near: {text[pos:pos + 20]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "ws":
+            continue
+        if kind == "string":
+            value = re.sub(r"\\(.)", lambda m: {"n": "\n", "t": "\t"}.get(m.group(1), m.group(1)), value[1:-1])
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        elif kind == "param":
+            value = value[1:]
+        elif kind == "ident":
+            if value.startswith("`"):
+                value = value[1:-1]
+            elif value.upper() in KEYWORDS:
+                kind, value = "kw", value.upper()
+        elif kind == "op" and value == "<-[":
+            # Keep the bracket as its own token so relationship parsing stays uniform
+            tokens.append(("op", "<-"))
+            value = "["
+        tokens.append((kind, value))
+    tokens.append(("eof", None))
+    return tokens
+
+
+# ------------------------------------------------------------------------------
+# Parser
+# ------------------------------------------------------------------------------
+AGGREGATES = {"count", "collect", "sum", "avg", "min", "max"}
+
+
+class _Parser:
+    """Recursive-descent parser for the read-only Cypher subset."""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    # -- token helpers -------------------------------------------------------
+    def peek(self, offset=0):
+        return self.tokens[self.pos + offset]
+
+    def next(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def at(self, kind, value=None, offset=0):
+        tok_kind, tok_value = self.peek(offset)
+        return tok_kind == kind and (value is None or tok_value == value)
+
+    def accept(self, kind, value=None):
+        if self.at(kind, value):
+            return self.next()
+        return None
+
+    def expect(self, kind, value=None):
+        token = self.accept(kind, value)
+        if token is None:
+            raise ValueError(f"FakeGraph expected {value or kind} but found {self.peek()[1]!r}")
+        return token
+
+    # -- statement -----------------------------------------------------------
+    def parse(self):
+        statement = {"matches": [], "return": None, "order": [], "skip": None, "limit": None, "explain": False}
+        if self.accept("kw", "EXPLAIN") or self.accept("kw", "PROFILE"):
+            statement["explain"] = True
+        while self.at("kw", "MATCH") or self.at("kw", "OPTIONAL"):
+            optional = bool(self.accept("kw", "OPTIONAL"))
+            self.expect("kw", "MATCH")
+            patterns = [self.parse_pattern()]
+            while self.accept("op", ","):
+                patterns.append(self.parse_pattern())
+            where = self.parse_expr() if self.accept("kw", "WHERE") else None
+            statement["matches"].append({"patterns": patterns, "where": where, "optional": optional})
+        if not statement["matches"]:
+            raise ValueError("FakeGraph only supports queries starting with MATCH")
+        self.expect("kw", "RETURN")
+        statement["return"] = self.parse_return()
+        if self.accept("kw", "ORDER"):
+            self.expect("kw", "BY")
+            statement["order"] = self.parse_order()
+        if self.accept("kw", "SKIP"):
+            statement["skip"] = self.parse_atom()
+        if self.accept("kw", "LIMIT"):
+            statement["limit"] = self.parse_atom()
+        self.accept("op", ";")
+        if not self.at("eof"):
+            raise ValueError(f"FakeGraph does not support clause starting at {self.peek()[1]!r}")
+        return statement
+
+    def parse_return(self):
+        distinct = bool(self.accept("kw", "DISTINCT"))
+        items = []
+        while True:
+            start = self.pos
+            expr = self.parse_expr()
+            name = self._source(start, self.pos)
+            if self.accept("kw", "AS"):
+                name = self.expect("ident")[1]
+            items.append((name, expr))
+            if not self.accept("op", ","):
+                break
+        return {"distinct": distinct, "items": items}
+
+    def parse_order(self):
+        keys = []
+        while True:
+            start = self.pos
+            expr = self.parse_expr()
+            text = self._source(start, self.pos)
+            descending = False
+            if self.accept("kw", "DESC") or self.accept("kw", "DESCENDING"):
+                descending = True
+            else:
+                self.accept("kw", "ASC") or self.accept("kw", "ASCENDING")
+            keys.append((text, expr, descending))
+            if not self.accept("op", ","):
+                break
+        return keys
+
+    def _source(self, start, end):
+        """Rebuild the column name Neo4j would report for an un-aliased item."""
+        parts = []
+        for kind, value in self.tokens[start:end]:
+            if kind == "string":
+                parts.append(f'"{value}"')
+            elif kind == "param":
+                parts.append(f"${value}")
+            elif kind == "kw" and value in ("NULL", "TRUE", "FALSE"):
+                parts.append(value.lower())
+            else:
+                parts.append(str(value))
+        text = "".join(
+            part if part in ".()[]" or (i and parts[i - 1] in ".([") else (" " + part if i else part)
+            for i, part in enumerate(parts)
+        )
+        return re.sub(r"\s*,\s*", ", ", text).strip()
+
+    # -- patterns ------------------------------------------------------------
+    def parse_pattern(self):
+        elements = [self.parse_node()]
+        while self.at("op", "-") or self.at("op", "<-"):
+            incoming = bool(self.accept("op", "<-"))
+            if not incoming:
+                self.expect("op", "-")
+            rel_var, rel_types = None, []
+            if self.accept("op", "["):
+                if self.at("ident"):
+                    rel_var = self.next()[1]
+                if self.accept("op", ":"):
+                    rel_types.append(self.expect("ident")[1])
+                    # [:HOME_IN|AWAY_IN] (and the older [:HOME_IN|:AWAY_IN])
+                    while self.accept("op", "|"):
+                        self.accept("op", ":")
+                        rel_types.append(self.expect("ident")[1])
+                self.expect("op", "]")
+            if incoming:
+                self.expect("op", "-")
+                direction = "in"
+            elif self.accept("op", "->"):
+                direction = "out"
+            else:
+                self.expect("op", "-")
+                direction = "both"
+            elements.append({"var": rel_var, "types": rel_types, "direction": direction})
+            elements.append(self.parse_node())
+        return elements
+
+    def parse_node(self):
+        self.expect("op", "(")
+        var = self.next()[1] if self.at("ident") else None
+        labels = []
+        while self.accept("op", ":"):
+            labels.append(self.expect("ident")[1])
+        props = {}
+        if self.accept("op", "{"):
+            while not self.accept("op", "}"):
+                key = self.expect("ident")[1]
+                self.expect("op", ":")
+                props[key] = self.parse_expr()
+                self.accept("op", ",")
+        self.expect("op", ")")
+        return {"var": var, "labels": labels, "props": props}
+
+    # -- expressions ---------------------------------------------------------
+    def parse_expr(self):
+        left = self.parse_and()
+        while self.accept("kw", "OR") or self.accept("kw", "XOR"):
+            left = ("or", left, self.parse_and())
+        return left
+
+    def parse_and(self):
+        left = self.parse_not()
+        while self.accept("kw", "AND"):
+            left = ("and", left, self.parse_not())
+        return left
+
+    def parse_not(self):
+        if self.accept("kw", "NOT"):
+            return ("not", self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_additive()
+        while True:
+            if self.at("op") and self.peek()[1] in ("=", "<>", "<", ">", "<=", ">=", "=~"):
+                left = ("cmp", self.next()[1], left, self.parse_additive())
+            elif self.accept("kw", "CONTAINS"):
+                left = ("cmp", "CONTAINS", left, self.parse_additive())
+            elif self.at("kw", "STARTS") or self.at("kw", "ENDS"):
+                op = self.next()[1]
+                self.expect("kw", "WITH")
+                left = ("cmp", op, left, self.parse_additive())
+            elif self.accept("kw", "IN"):
+                left = ("cmp", "IN", left, self.parse_additive())
+            elif self.accept("kw", "IS"):
+                negate = bool(self.accept("kw", "NOT"))
+                self.expect("kw", "NULL")
+                left = ("isnull", left, negate)
+            else:
+                return left
+
+    def parse_additive(self):
+        left = self.parse_atom()
+        while self.accept("op", "+"):
+            left = ("add", left, self.parse_atom())
+        return left
+
+    def parse_atom(self):
+        kind, value = self.peek()
+        if kind in ("string", "number"):
+            self.next()
+            return ("lit", value)
+        if kind == "op" and value == "-" and self.at("number", offset=1):
+            self.next()
+            return ("lit", -self.next()[1])
+        if kind == "param":
+            self.next()
+            return ("param", value)
+        if kind == "kw" and value in ("NULL", "TRUE", "FALSE"):
+            self.next()
+            return ("lit", {"NULL": None, "TRUE": True, "FALSE": False}[value])
+        if kind == "op" and value == "[":
+            self.next()
+            items = []
+            while not self.accept("op", "]"):
+                items.append(self.parse_expr())
+                self.accept("op", ",")
+            return ("list", items)
+        if kind == "op" and value == "(":
+            # Either a parenthesised expression or a pattern predicate like (f)-[:REL]->(:X)
+            if self._looks_like_pattern():
+                return ("exists", self.parse_pattern())
+            self.next()
+            inner = self.parse_expr()
+            self.expect("op", ")")
+            return inner
+        if kind == "ident":
+            self.next()
+            if self.accept("op", "("):
+                name = value.lower()
+                distinct = bool(self.accept("kw", "DISTINCT"))
+                args = []
+                if self.accept("op", "*"):
+                    args.append(("star",))
+                while not self.accept("op", ")"):
+                    args.append(self.parse_expr())
+                    self.accept("op", ",")
+                if name in AGGREGATES:
+                    return ("agg", name, args[0] if args else ("star",), distinct)
+                return ("func", name, args)
+            expr = ("var", value)
+            while self.accept("op", "."):
+                expr = ("prop", expr, self.expect("ident")[1])
+            return expr
+        raise ValueError(f"FakeGraph could not parse expression at {value!r}")
+
+    def _looks_like_pattern(self):
+        # "(" [ident] [":" Label] ")" followed by a relationship arrow
+        offset = 1
+        if self.at("ident", offset=offset):
+            offset += 1
+        if self.at("op", ":", offset=offset):
+            offset += 2
+        return self.at("op", ")", offset=offset) and (
+            self.at("op", "-", offset=offset + 1) or self.at("op", "<-", offset=offset + 1)
+        )
+
+
+# ------------------------------------------------------------------------------
+# Evaluation helpers
+# ------------------------------------------------------------------------------
+def _contains_aggregate(expr):
+    if not isinstance(expr, tuple):
+        return False
+    if expr[0] == "agg":
+        return True
+    return any(_contains_aggregate(part) for part in expr[1:] if isinstance(part, (tuple, list)))
+
+
+def _sort_key(value):
+    """Order values the way Neo4j does: numbers, then strings, then temporals, nulls last."""
+    if value is None:
+        return (3, 0)
+    if isinstance(value, bool):
+        return (0, int(value))
+    if isinstance(value, (int, float)):
+        return (0, value)
+    if isinstance(value, date):
+        # ISO strings order correctly within each temporal type
+        return (2, value.isoformat())
+    return (1, str(value))
+
+
+def _type_name(value):
+    """Neo4j schema type name for a stored property value."""
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "FLOAT"
+    if isinstance(value, datetime):
+        return "DATE_TIME"
+    if isinstance(value, date):
+        return "DATE"
+    if isinstance(value, list):
+        return "LIST"
+    return "STRING"
+
+
+def _temporal(name, args):
+    """date() / datetime() from an ISO string; no argument means now (UTC)."""
+    if not args:
+        now = datetime.now(timezone.utc)
+        return now.date() if name == "date" else now
+    value = args[0]
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date() if name == "date" else value
+    if isinstance(value, date):
+        return value if name == "date" else datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"FakeGraph cannot parse {name}({value!r})")
+    if name == "date":
+        return parsed.date()
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for k, v in value.items()))
+    return value
+
+
+def _clean(value):
+    """Normalise a CSV cell: empty strings and spreadsheet #N/A become None."""
+    if value is None:
+        return None
+    value = value.strip()
+    return None if value in ("", "#N/A", "nan") else value
+
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class FakeGraph(GraphStore):
+    """
+    Read-only, in-memory graph with the same surface the tools use from
+    Neo4jGraph: query(), schema / get_schema, structured_schema and
+    refresh_schema().
+    """
+
+    def __init__(self):
+        self._nodes = {}
+        self._by_label = {}
+        self._out = {}
+        self._in = {}
+        self._rel_types = set()
+        self._rel_props = {}
+        self._parse_cache = {}
+        self.schema = ""
+        self.structured_schema = {}
+
+    # -- loading -------------------------------------------------------------
+    def add_node(self, label, props):
+        node_id = len(self._nodes)
+        # Same normalized *_key search properties the ingestion scripts store
+        props = {**props, **search_keys_for(label, props)}
+        node = {"id": node_id, "labels": [label], "props": props}
+        self._nodes[node_id] = node
+        self._by_label.setdefault(label, []).append(node_id)
+        return node_id
+
+    def add_relationship(self, start_id, rel_type, end_id, props=None):
+        if props:
+            self._rel_props[(start_id, rel_type, end_id)] = props
+        self._out.setdefault((start_id, rel_type), []).append(end_id)
+        self._in.setdefault((end_id, rel_type), []).append(start_id)
+        self._rel_types.add((self._nodes[start_id]["labels"][0], rel_type, self._nodes[end_id]["labels"][0]))
+
+    @classmethod
+    def from_csvs(cls):
+        """Build the graph from the same CSVs the ingestion scripts load into Neo4j."""
+        graph = cls()
+        players = {}
+        for row in _read_csv(ROSTER_CSV):
+            players[row["player_id"]] = graph.add_node("Player", {
+                "player_id": row["player_id"],
+                "name": _clean(row.get("Player")),
+                "position": _clean(row.get("Pos")),
+                "jersey_number": _to_int(row.get("Number")),
+                "height": _clean(row.get("HT")),
+                "weight": _clean(row.get("WT")),
+                "college": _clean(row.get("College")),
+                "years_in_nfl": _to_int(row.get("Exp")),
+                "headshot_url": _clean(row.get("headshot_url")),
+                "instagram_url": _clean(row.get("instagram_url")),
+                "highlight_video_url": _clean(row.get("highlight_video_url")),
+            })
+
+        # Every club gets a :Team node, like data/ingest_teams.py
+        teams = {team["name"]: graph.add_node("Team", team) for team in team_records()}
+        # Extra properties the article uploader sets on the 49ers node
+        graph._nodes[teams[TEAM_NAME]]["props"]["season_record_2024"] = "6-11"
+
+        for row in _read_csv(SCHEDULE_CSV):
+            # Same native date/datetime and integer fields the ingestion scripts store
+            typed = typed_game_fields(_clean(row.get("Date")), _clean(row.get("Result")), _clean(row.get("Round Number")),
+                                      _clean(row.get("Home Team")), _clean(row.get("Away Team")))
+            game_id = graph.add_node("Game", {
+                "game_id": row["game_id"],
+                "date": _clean(row.get("Date")),
+                "location": _clean(row.get("Location")),
+                "home_team": _clean(row.get("Home Team")),
+                "away_team": _clean(row.get("Away Team")),
+                "result": _clean(row.get("Result")),
+                "summary": _clean(row.get("Summary")),
+                "home_team_logo_url": _clean(row.get("home_team_logo_url")),
+                "away_team_logo_url": _clean(row.get("away_team_logo_url")),
+                "highlight_video_url": _clean(row.get("highlight_video_url")),
+                **typed,
+            })
+            for rel_type, column in (("HOME_IN", "Home Team"), ("AWAY_IN", "Away Team")):
+                if _clean(row.get(column)) in teams:
+                    graph.add_relationship(teams[_clean(row.get(column))], rel_type, game_id)
+
+        graph._load_player_stats(players)
+
+        communities = {}
+        for row in _read_csv(COMMUNITIES_CSV):
+            name = _clean(row.get("Fan Chapter Name")) or ""
+            if name in communities:
+                continue  # Ingestion keeps the first occurrence of each chapter name
+            node_id = graph.add_node("Community", {
+                "fan_chapter_name": name,
+                "city": _clean(row.get("Meeting Location Address (City)")) or "",
+                "state": _clean(row.get("Meeting Location Address (State)")) or "",
+                "email_contact": _clean(row.get("Email Address")) or "",
+                "meetup_info": f"{row.get('Venue', '')} - {row.get('Venue Location', '')}",
+            })
+            communities[name] = node_id
+            if row.get("community_id"):
+                communities[row["community_id"]] = node_id
+
+        fans = {}
+        for row in _read_csv(FANS_CSV):
+            fans[row["fan_id"]] = graph.add_node("Fan", {
+                "fan_id": row["fan_id"],
+                "first_name": _clean(row.get("first_name")),
+                "last_name": _clean(row.get("last_name")),
+                "email": _clean(row.get("email")),
+            })
+
+        for row in _read_csv(FAN_PLAYER_RELS_CSV):
+            if row["start_id"] in fans and row["end_id"] in players:
+                graph.add_relationship(fans[row["start_id"]], "FAVORITE_PLAYER", players[row["end_id"]])
+        for row in _read_csv(FAN_COMMUNITY_RELS_CSV):
+            if row["start_id"] in fans and row["end_id"] in communities:
+                graph.add_relationship(fans[row["start_id"]], "MEMBER_OF", communities[row["end_id"]])
+
+        team_id = teams[TEAM_NAME]
+        for row in _read_csv(TEAM_NEWS_CSV):
+            if not row.get("link_to_article"):
+                continue
+            story_id = graph.add_node("Team_Story", {
+                "link_to_article": row["link_to_article"],
+                "teamName": row.get("Team_name") or TEAM_NAME,
+                "season": _to_int(row.get("season")),
+                "summary": row.get("summary", ""),
+                "topic": row.get("topic", ""),
+                "city": row.get("city", "San Francisco"),
+                "conference": row.get("conference", "NFC"),
+                "division": row.get("division", "West"),
+                "published_at": parse_published_at(row.get("published_at"), row["link_to_article"]),
+            })
+            graph.add_relationship(story_id, "STORY_ABOUT", team_id)
+
+        graph.refresh_schema()
+        print(f"[FAKE GRAPH] Loaded {len(graph._nodes)} nodes from CSVs")
+        return graph
+
+    def _load_player_stats(self, players):
+        """PLAYED relationships, season totals and top performers, as data/ingest_player_stats.py builds them."""
+        rows = _read_csv(STATS_CSV)
+        games = [self._nodes[node_id]["props"] for node_id in self._by_label.get("Game", [])]
+        game_nodes = {game["game_id"]: node_id for game, node_id in zip(games, self._by_label.get("Game", []))}
+        roster = [self._nodes[node_id]["props"] for node_id in players.values()]
+        game_map = match_games({row["game_id"] for row in rows}, games)
+        player_map = match_players({row["player_id"]: row["player_name"] for row in rows}, roster)
+
+        # Season totals cover the latest season in the stats, like the ingest
+        season = max((stats_game_season(game_id) for game_id in game_map), default=None)
+        played, by_game = {}, {}
+        for row in rows:
+            if row["game_id"] not in game_map:
+                continue
+            stats = played_stats(row)
+            game_id = game_nodes[game_map[row["game_id"]]]
+            player_id = players.get(player_map.get(row["player_id"]))
+            name = row["player_name"]
+            if player_id is not None:
+                self.add_relationship(player_id, "PLAYED", game_id, stats)
+                if stats_game_season(row["game_id"]) == season:
+                    played.setdefault(player_id, []).append(stats)
+                name = self._nodes[player_id]["props"]["name"]
+            by_game.setdefault(game_id, []).append((name, stats))
+        for player_id, stats in played.items():
+            self._nodes[player_id]["props"].update(season_totals(stats, season))
+        for game_id, game_players in by_game.items():
+            self._nodes[game_id]["props"]["top_performers"] = top_performers(game_players)
+
+    # -- GraphStore interface ------------------------------------------------
+    # GraphCypherQAChain.from_llm reads this; the fake schema has no sampled values
+    _enhanced_schema = False
+
+    @property
+    def get_schema(self):
+        return self.schema
+
+    @property
+    def get_structured_schema(self):
+        return self.structured_schema
+
+    def refresh_schema(self):
+        """Derive the schema text and dict in the same format Neo4jGraph produces."""
+        node_props = {}
+        for label, node_ids in self._by_label.items():
+            types = {}
+            for node_id in node_ids:
+                for key, value in self._nodes[node_id]["props"].items():
+                    if value is not None and key not in types:
+                        types[key] = _type_name(value)
+            node_props[label] = [{"property": key, "type": value} for key, value in types.items()]
+        relationships = [{"start": start, "type": rel_type, "end": end} for start, rel_type, end in sorted(self._rel_types)]
+        rel_types = {}
+        for (_, rel_type, _), props in self._rel_props.items():
+            types = rel_types.setdefault(rel_type, {})
+            for key, value in props.items():
+                if value is not None and key not in types:
+                    types[key] = _type_name(value)
+        rel_props = {rel_type: [{"property": key, "type": value} for key, value in types.items()]
+                     for rel_type, types in rel_types.items()}
+        self.structured_schema = {
+            "node_props": node_props,
+            "rel_props": rel_props,
+            "relationships": relationships,
+            "metadata": {"constraint": [], "index": []},
+        }
+        node_lines = []
+        for label, props in node_props.items():
+            prop_text = ", ".join(f"{p['property']}: {p['type']}" for p in props)
+            node_lines.append(f"{label} {{{prop_text}}}")
+        rel_prop_lines = []
+        for rel_type, props in rel_props.items():
+            prop_text = ", ".join(f"{p['property']}: {p['type']}" for p in props)
+            rel_prop_lines.append(f"{rel_type} {{{prop_text}}}")
+        rel_lines = [f"(:{r['start']})-[:{r['type']}]->(:{r['end']})" for r in relationships]
+        self.schema = "\n".join([
+            "Node properties:", *node_lines,
+            "Relationship properties:", *(rel_prop_lines or [""]),
+            "The relationships:", *rel_lines,
+        ])
+
+    def add_graph_documents(self, graph_documents, include_source=False):
+        raise NotImplementedError("FakeGraph is read-only")
+
+    def query(self, query, params={}, session_params={}):
+        statement = self._parse_cache.get(query)
+        if statement is None:
+            statement = _Parser(query).parse()
+            self._parse_cache[query] = statement
+        if statement["explain"]:
+            return []
+        return self._execute(statement, params or {})
+
+    # -- execution -----------------------------------------------------------
+    def _execute(self, statement, params):
+        bindings = [{}]
+        for match in statement["matches"]:
+            matched = []
+            for binding in bindings:
+                candidates = [binding]
+                for pattern in match["patterns"]:
+                    candidates = [b for c in candidates for b in self._match_pattern(pattern, c, params)]
+                if match["where"] is not None:
+                    candidates = [c for c in candidates if self._eval(match["where"], c, params) is True]
+                if not candidates and match["optional"]:
+                    candidates = [binding]
+                matched.extend(candidates)
+            bindings = matched
+
+        items = statement["return"]["items"]
+        aggregated = any(_contains_aggregate(expr) for _, expr in items)
+        if aggregated:
+            groups = {}
+            for binding in bindings:
+                key = tuple(
+                    _hashable(self._eval(expr, binding, params))
+                    for _, expr in items if not _contains_aggregate(expr)
+                )
+                groups.setdefault(key, []).append(binding)
+            if not groups and not any(not _contains_aggregate(expr) for _, expr in items):
+                groups[()] = []
+            rows = []
+            for group in groups.values():
+                row = {name: self._eval(expr, group[0] if group else {}, params, group) for name, expr in items}
+                rows.append((row, group[0] if group else {}))
+        else:
+            rows = [({name: self._eval(expr, binding, params) for name, expr in items}, binding) for binding in bindings]
+
+        if statement["return"]["distinct"]:
+            seen, unique = set(), []
+            for row, binding in rows:
+                key = _hashable(row)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append((row, binding))
+            rows = unique
+
+        for text, expr, descending in reversed(statement["order"]):
+            def key(entry, text=text, expr=expr):
+                row, binding = entry
+                if text in row:
+                    return _sort_key(row[text])
+                if expr[0] == "var" and expr[1] in row:
+                    return _sort_key(row[expr[1]])
+                return _sort_key(self._eval(expr, binding, params))
+            rows.sort(key=key, reverse=descending)
+
+        result = [row for row, _ in rows]
+        if statement["skip"] is not None:
+            result = result[int(self._eval(statement["skip"], {}, params)):]
+        if statement["limit"] is not None:
+            result = result[:int(self._eval(statement["limit"], {}, params))]
+        return result
+
+    def _node_matches(self, node_id, spec, binding, params):
+        node = self._nodes[node_id]
+        if any(label not in node["labels"] for label in spec["labels"]):
+            return False
+        for key, expr in spec["props"].items():
+            if node["props"].get(key) != self._eval(expr, binding, params):
+                return False
+        return True
+
+    def _match_pattern(self, pattern, binding, params):
+        first = pattern[0]
+        if first["var"] and first["var"] in binding:
+            starts = [binding[first["var"]]["id"]]
+        elif first["labels"]:
+            starts = self._by_label.get(first["labels"][0], [])
+        else:
+            starts = list(self._nodes)
+        results = []
+        for node_id in starts:
+            if not self._node_matches(node_id, first, binding, params):
+                continue
+            current = dict(binding)
+            if first["var"]:
+                current[first["var"]] = self._nodes[node_id]
+            results.extend(self._extend(pattern, 1, node_id, current, params))
+        return results
+
+    def _extend(self, pattern, index, node_id, binding, params, used=()):
+        if index >= len(pattern):
+            return [binding]
+        rel, spec = pattern[index], pattern[index + 1]
+        rel_types = rel["types"] or sorted({t for _, t, _ in self._rel_types})
+        neighbours = []
+        for rel_type in rel_types:
+            if rel["direction"] in ("out", "both"):
+                neighbours.extend((n, rel_type, (node_id, rel_type, n)) for n in self._out.get((node_id, rel_type), []))
+            if rel["direction"] in ("in", "both"):
+                neighbours.extend((n, rel_type, (n, rel_type, node_id)) for n in self._in.get((node_id, rel_type), []))
+        results = []
+        for neighbour, rel_type, rel_key in neighbours:
+            # Like Neo4j, a pattern never traverses the same relationship twice
+            if rel_key in used:
+                continue
+            if spec["var"] and spec["var"] in binding and binding[spec["var"]]["id"] != neighbour:
+                continue
+            if not self._node_matches(neighbour, spec, binding, params):
+                continue
+            current = dict(binding)
+            if rel["var"]:
+                current[rel["var"]] = {"rel_type": rel_type, "props": self._rel_props.get(rel_key, {})}
+            if spec["var"]:
+                current[spec["var"]] = self._nodes[neighbour]
+            results.extend(self._extend(pattern, index + 2, neighbour, current, params, used + (rel_key,)))
+        return results
+
+    def _eval(self, expr, binding, params, group=None):
+        kind = expr[0]
+        if kind == "lit":
+            return expr[1]
+        if kind == "param":
+            if expr[1] not in params:
+                raise ValueError(f"Expected parameter(s): {expr[1]}")
+            return params[expr[1]]
+        if kind == "var":
+            if expr[1] not in binding:
+                raise ValueError(f"Variable `{expr[1]}` not defined")
+            node = binding[expr[1]]
+            return dict(node["props"]) if isinstance(node, dict) and "props" in node else node
+        if kind == "prop":
+            owner = self._eval(expr[1], binding, params)
+            return owner.get(expr[2]) if isinstance(owner, dict) else None
+        if kind == "list":
+            return [self._eval(item, binding, params, group) for item in expr[1]]
+        if kind == "and":
+            left, right = self._eval(expr[1], binding, params), self._eval(expr[2], binding, params)
+            if left is False or right is False:
+                return False
+            return None if left is None or right is None else True
+        if kind == "or":
+            left, right = self._eval(expr[1], binding, params), self._eval(expr[2], binding, params)
+            if left is True or right is True:
+                return True
+            return None if left is None or right is None else False
+        if kind == "not":
+            value = self._eval(expr[1], binding, params)
+            return None if value is None else not value
+        if kind == "isnull":
+            value = self._eval(expr[1], binding, params)
+            return (value is not None) if expr[2] else (value is None)
+        if kind == "exists":
+            return bool(self._match_pattern(expr[1], binding, params))
+        if kind == "add":
+            left, right = self._eval(expr[1], binding, params), self._eval(expr[2], binding, params)
+            if left is None or right is None:
+                return None
+            if isinstance(left, str) or isinstance(right, str):
+                return f"{left}{right}"
+            return left + right
+        if kind == "cmp":
+            return self._compare(expr[1], self._eval(expr[2], binding, params), self._eval(expr[3], binding, params))
+        if kind == "func":
+            return self._call(expr[1], [self._eval(arg, binding, params) for arg in expr[2]], binding, expr[2])
+        if kind == "agg":
+            return self._aggregate(expr, group if group is not None else [binding], params)
+        raise ValueError(f"FakeGraph cannot evaluate {kind}")
+
+    def _compare(self, op, left, right):
+        if op == "IN":
+            return None if left is None or right is None else left in right
+        if left is None or right is None:
+            return None
+        try:
+            if op == "=":
+                return left == right
+            if op == "<>":
+                return left != right
+            if op == "<":
+                return left < right
+            if op == ">":
+                return left > right
+            if op == "<=":
+                return left <= right
+            if op == ">=":
+                return left >= right
+        except TypeError:
+            return None
+        if not isinstance(left, str) or not isinstance(right, str):
+            return None
+        if op == "CONTAINS":
+            return right in left
+        if op == "STARTS":
+            return left.startswith(right)
+        if op == "ENDS":
+            return left.endswith(right)
+        if op == "=~":
+            return re.fullmatch(right, left, re.DOTALL) is not None
+        raise ValueError(f"FakeGraph does not support operator {op}")
+
+    def _call(self, name, args, binding, raw_args):
+        value = args[0] if args else None
+        if name == "tolower":
+            return value.lower() if isinstance(value, str) else None
+        if name == "toupper":
+            return value.upper() if isinstance(value, str) else None
+        if name == "trim":
+            return value.strip() if isinstance(value, str) else None
+        if name == "tointeger":
+            return _to_int(value)
+        if name == "tostring":
+            return None if value is None else str(value)
+        if name == "coalesce":
+            return next((arg for arg in args if arg is not None), None)
+        if name == "size":
+            return None if value is None else len(value)
+        if name in ("date", "datetime"):
+            return _temporal(name, args)
+        if name == "labels":
+            node = binding.get(raw_args[0][1]) if raw_args and raw_args[0][0] == "var" else None
+            return list(node["labels"]) if node else None
+        if name == "type":
+            rel = binding.get(raw_args[0][1]) if raw_args and raw_args[0][0] == "var" else None
+            return rel.get("rel_type") if rel else None
+        raise ValueError(f"FakeGraph does not support function {name}()")
+
+    def _aggregate(self, expr, group, params):
+        _, name, arg, distinct = expr
+        if arg == ("star",):
+            values = [1 for _ in group]
+        else:
+            values = [self._eval(arg, binding, params) for binding in group]
+            values = [v for v in values if v is not None]
+        if distinct:
+            seen, unique = set(), []
+            for value in values:
+                if _hashable(value) not in seen:
+                    seen.add(_hashable(value))
+                    unique.append(value)
+            values = unique
+        if name == "count":
+            return len(values)
+        if name == "collect":
+            return values
+        if not values:
+            return None
+        if name == "sum":
+            return sum(values)
+        if name == "avg":
+            return sum(values) / len(values)
+        if name == "min":
+            return min(values, key=_sort_key)
+        return max(values, key=_sort_key)
+
+
+def _read_csv(path):
+    if not os.path.exists(path):
+        print(f"[FAKE GRAPH] WARNING: {path} not found, skipping")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
@@ -0,0 +1,334 @@
+"""
+Scripted fake chat model for offline benchmarking.
+
+ScriptedChatModel recognises the prompts this app sends (the ReAct agent
+prompt, the Cypher generation templates in tools/, and the summary/recap
+prompts) and answers them with canned ReAct steps, Cypher and text. Latency
+is drawn from a configurable, seeded distribution so agent-overhead runs are
+reproducible without network access.
+
+Latency specs (FAKE_LLM_LATENCY), all values in seconds:
+    "0" or "fixed:0.4"       constant delay
+    "uniform:0.2,0.8"        uniform between low and high
+    "normal:0.5,0.1"         gaussian with mean and stddev (clamped at 0)
+    "lognormal:-0.7,0.4"     log-normal with mu and sigma of the underlying normal
+"""
+
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+from gradio_utils import search_key
+
+# Nicknames used to pull an opponent out of a question
+NFL_NICKNAMES = [
+    "Cardinals", "Falcons", "Ravens", "Bills", "Panthers", "Bears", "Bengals", "Browns",
+    "Cowboys", "Broncos", "Lions", "Packers", "Texans", "Colts", "Jaguars", "Chiefs",
+    "Raiders", "Chargers", "Rams", "Dolphins", "Vikings", "Patriots", "Saints", "Giants",
+    "Jets", "Eagles", "Steelers", "Seahawks", "Buccaneers", "Titans", "Commanders",
+]
+
+POSITION_KEYWORDS = {
+    "quarterback": "QB", "qb": "QB", "running back": "RB", "rb": "RB",
+    "wide receiver": "WR", "receiver": "WR", "tight end": "TE", "linebacker": "LB",
+    "defensive line": "DL", "defensive back": "DB", "cornerback": "CB", "safety": "S",
+    "kicker": "K", "punter": "P", "offensive line": "OL",
+}
+
+# Stat words -> Player Stats tool stat names
+STAT_KEYWORDS = {
+    "sack": "sacks", "qb hit": "qb_hits", "tackle": "tackles", "interception": "interceptions",
+    "rusher": "rush_attempts", "carries": "rush_attempts", "target": "targets",
+    "yac": "rec_avg_yac", "epa": "qb_epa", "completion": "complete_passes",
+}
+
+PLAYER_RETURN = (
+    "RETURN p.player_id, p.name, p.position, p.jersey_number, p.college, p.height, "
+    "p.weight, p.years_in_nfl, p.headshot_url, p.instagram_url, p.highlight_video_url"
+)
+GAME_RETURN = (
+    "RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, "
+    "g.home_score, g.away_score, g.winner, g.week, g.top_performers, g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url"
+)
+
+
+def parse_latency_spec(spec):
+    """Turn a latency spec string into a (kind, args) tuple."""
+    spec = (spec or "0").strip().lower()
+    kind, _, raw_args = spec.partition(":")
+    if not raw_args:
+        kind, raw_args = "fixed", kind
+    try:
+        args = [float(value) for value in raw_args.split(",") if value.strip()]
+    except ValueError:
+        raise ValueError(f"Invalid FAKE_LLM_LATENCY spec: {spec!r}")
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+    if kind not in expected or len(args) != expected[kind]:
+        raise ValueError(f"Invalid FAKE_LLM_LATENCY spec: {spec!r}")
+    return kind, args
+
+
+def sample_latency(rng, kind, args):
+    """Draw one delay in seconds from the parsed distribution."""
+    if kind == "fixed":
+        return max(0.0, args[0])
+    if kind == "uniform":
+        return rng.uniform(args[0], args[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(args[0], args[1]))
+    return rng.lognormvariate(args[0], args[1])
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for fake usage metadata."""
+    return max(1, len(text) // 4)
+
+
+# ------------------------------------------------------------------------------
+# Canned responses
+# ------------------------------------------------------------------------------
+def _extract_question(prompt):
+    for marker in ("New input:", "Question:", "The question is:"):
+        if marker in prompt:
+            tail = prompt.rsplit(marker, 1)[1].strip()
+            question = tail.splitlines()[0] if tail else ""
+            # Strip the persona prefix generate_response adds
+            return re.sub(r"^\[RESPOND AS [^\]]+\]:\s*", "", question).strip()
+    return prompt.strip().splitlines()[-1] if prompt.strip() else ""
+
+
+def _find_opponent(question):
+    lowered = question.lower()
+    return next((name for name in NFL_NICKNAMES if name.lower() in lowered), None)
+
+
+def _find_player_name(question):
+    """Best-effort player name: the last run of capitalised words in the question."""
+    stop_words = {"Tell", "Who", "Show", "What", "Get", "Does", "Is", "The", "Me", "About", "Info", "Card", "I"}
+    runs = re.findall(r"(?:[A-Z][a-zA-Z'\.-]+\s?)+", question)
+    for run in reversed(runs):
+        words = [w for w in run.split() if w not in stop_words and w not in NFL_NICKNAMES and w != "49ers"]
+        if words:
+            return re.sub(r"'s$", "", " ".join(words[-2:]).rstrip("?"))
+    return question.split()[-1].strip("?") if question.split() else ""
+
+
+def choose_tool(question):
+    """Keyword routing that mirrors the tool selection guidelines in prompts.py."""
+    lowered = question.lower()
+    if any(word in lowered for word in ("news", "article", "latest", "rumor")):
+        return "Team News Search"
+    if any(word in lowered for word in ("recap", "highlights from", "game against", " vs", "last game", "happened in")):
+        return "Game Recap"
+    if re.search(r"how does|rules of|what is a", lowered) and "49ers" not in lowered:
+        return "General Football Chat"
+    if re.search(r"tell me about|who is|number \d+|info card|instagram|headshot", lowered):
+        return "Player Information Search"
+    if _find_stat(question) and re.search(r"top \d+|most|led |leader|by game|how many", lowered):
+        return "Player Stats"
+    return "49ers Graph Search"
+
+
+def _find_stat(question):
+    lowered = question.lower()
+    return next((stat for word, stat in STAT_KEYWORDS.items() if word in lowered), None)
+
+
+def stats_arguments(question):
+    """Player Stats tool arguments for a stat question, as the agent would write them."""
+    lowered = question.lower()
+    arguments = {"stat": _find_stat(question), "group_by": "player", "limit": 5}
+    filters = {}
+    top = re.search(r"top (\d+)", lowered)
+    if top:
+        arguments["limit"] = int(top.group(1))
+    week = re.search(r"week (\d+)", lowered)
+    if week:
+        filters["week"] = int(week.group(1))
+    position = next((pos for word, pos in POSITION_KEYWORDS.items() if re.search(rf"\b{word}", lowered)), None)
+    if position:
+        filters["position"] = position
+    if "by game" in lowered:
+        possessive = re.search(r"([A-Z][a-zA-Z'-]+)'s\b", question)
+        filters["player"] = possessive.group(1) if possessive else _find_player_name(question)
+        arguments.update(group_by="week", sort="week", limit=20)
+    if filters:
+        arguments["filters"] = filters
+    return json.dumps(arguments)
+
+
+def react_step(prompt):
+    """Return the next ReAct step: one tool call, then a final answer."""
+    question = _extract_question(prompt)
+    scratchpad = prompt.rsplit("New input:", 1)[1] if "New input:" in prompt else ""
+    if "Observation:" in scratchpad:
+        observation = scratchpad.rsplit("Observation:", 1)[1].strip()
+        observation = re.sub(r"\s+", " ", observation)[:400]
+        return f"Thought: Do I need to use a tool? No\nFinal Answer: {observation}"
+    tool = choose_tool(question)
+    tool_input = stats_arguments(question) if tool == "Player Stats" else question
+    return f"Thought: Do I need to use a tool? Yes\nAction: {tool}\nAction Input: {tool_input}"
+
+
+def player_cypher(question):
+    number = re.search(r"number\s+(\d+)", question.lower())
+    if number:
+        where = f"WHERE p.jersey_number = {int(number.group(1))}"
+    else:
+        name = search_key(_find_player_name(question))
+        if " " in name:
+            where = f'WHERE p.name_key = "{name}"'
+        else:
+            where = f'WHERE p.last_name_key = "{name}" OR p.name_key STARTS WITH "{name}" OR "{name}" IN p.alias_keys'
+    return f"MATCH (p:Player)\n{where}\n{PLAYER_RETURN}\nLIMIT 1"
+
+
+def game_cypher(question):
+    opponent = _find_opponent(question)
+    if opponent:
+        return (
+            f'MATCH (:Team {{nickname_key: "{search_key(opponent)}"}})-[:HOME_IN|AWAY_IN]->(g:Game)\n'
+            f"{GAME_RETURN}\nLIMIT 1"
+        )
+    return f"MATCH (g:Game)\nWHERE g.home_score IS NOT NULL\n{GAME_RETURN}\nORDER BY g.kickoff DESC\nLIMIT 1"
+
+
+def team_story_cypher(question):
+    words = [w for w in re.findall(r"[a-z]{4,}", question.lower())
+             if w not in {"what", "latest", "news", "about", "team", "there", "recent", "articles", "summarize", "niners"}]
+    topic = words[0] if words else "49ers"
+    # The prompt asks for newest-first ordering on "latest"/"recent" questions
+    order = "ORDER BY s.published_at DESC\n" if re.search(r"latest|recent|newest", question.lower()) else ""
+    return (
+        "MATCH (s:Team_Story)-[:STORY_ABOUT]->(t:Team {nickname_key: '49ers'})\n"
+        f"WHERE s.topic_key CONTAINS '{topic}' OR toLower(s.summary) CONTAINS toLower('{topic}')\n"
+        f"RETURN s.summary, s.link_to_article, s.topic\n{order}LIMIT 10"
+    )
+
+
+def graph_search_cypher(question):
+    lowered = question.lower()
+    if "favorite" in lowered or "favorited" in lowered:
+        return ("MATCH (f:Fan)-[:FAVORITE_PLAYER]->(p:Player)\n"
+                "RETURN p.name AS playerName, count(f) AS fanCount\nORDER BY fanCount DESC\nLIMIT 5")
+    if "member" in lowered or "biggest" in lowered:
+        return ("MATCH (f:Fan)-[:MEMBER_OF]->(c:Community)\n"
+                "RETURN c.fan_chapter_name AS chapterName, count(f) AS fanCount\nORDER BY fanCount DESC\nLIMIT 5")
+    if "chapter" in lowered or "communit" in lowered:
+        state = re.search(r"\bin ([A-Z][a-zA-Z ]+?)\??$", question)
+        where = f'WHERE c.state_key = "{search_key(state.group(1))}"\n' if state else ""
+        return f"MATCH (c:Community)\n{where}RETURN c.fan_chapter_name, c.city, c.state\nORDER BY c.fan_chapter_name\nLIMIT 20"
+    if any(word in lowered for word in ("schedule", "playing", "games", "home game")):
+        return ("MATCH (g:Game)\nRETURN g.date AS date, g.home_team AS home, g.away_team AS away, g.result AS finalScore\n"
+                "ORDER BY g.kickoff")
+    for keyword, position in POSITION_KEYWORDS.items():
+        if re.search(rf"\b{keyword}", lowered):
+            return (f'MATCH (p:Player)\nWHERE toLower(p.position) = toLower("{position}")\n'
+                    "RETURN p.name AS playerName, p.position AS position, p.jersey_number AS jerseyNumber\n"
+                    "ORDER BY p.jersey_number")
+    return ("MATCH (p:Player)\nRETURN p.name AS playerName, p.position AS position, p.jersey_number AS jerseyNumber\n"
+            "ORDER BY p.jersey_number\nLIMIT 10")
+
+
+def repair_cypher(prompt):
+    """Fix unknown property names by case-insensitive match against the known ones in the error."""
+    query = prompt.split("Query:", 1)[1].split("Error:", 1)[0].strip()
+    error = prompt.split("Error:", 1)[1]
+    for variable, prop, known in re.findall(r"Property (\w+)\.(\w+) does not exist on :\w+\. Known properties: ([^\n]+)", error):
+        match = next((name for name in known.split(", ") if name.lower() == prop.lower()), None)
+        if match:
+            query = re.sub(rf"\b{variable}\.{prop}\b", f"{variable}.{match}", query)
+    return query
+
+
+def text_answer(prompt):
+    """Canned prose for QA, summary, recap and general chat prompts."""
+    if "Information:" in prompt:
+        info = prompt.split("Information:", 1)[1].split("Question:", 1)[0].strip()
+        info = re.sub(r"\s+", " ", info)
+        return f"Here is what I found: {info[:300]}"
+    name = re.search(r"- Name: (.+)", prompt)
+    if name:
+        position = re.search(r"- Position: (.+)", prompt)
+        return f"{name.group(1).strip()} plays {position.group(1).strip() if position else 'for the 49ers'} for the San Francisco 49ers."
+    home = re.search(r"- Home Team: (.+)", prompt)
+    away = re.search(r"- Away Team: (.+)", prompt)
+    score = re.search(r"- Final Score: (.+)", prompt)
+    if home and away:
+        return (f"The {home.group(1).strip()} hosted the {away.group(1).strip()}, "
+                f"with a final score of {score.group(1).strip() if score else 'N/A'}.")
+    return f"That's a great football question! {_extract_question(prompt)[:200]}"
+
+
+def scripted_response(prompt):
+    """Pick the canned response for whichever prompt template this is."""
+    if "Action Input:" in prompt and "New input:" in prompt:
+        return react_step(prompt)
+    if "failed validation" in prompt and "Query:" in prompt:
+        return repair_cypher(prompt)
+    question = _extract_question(prompt)
+    if "NFL players into Cypher" in prompt:
+        return player_cypher(question)
+    if "NFL games into Cypher" in prompt:
+        return game_cypher(question)
+    if "team news stories" in prompt and "Cypher" in prompt:
+        return team_story_cypher(question)
+    if "Schema:" in prompt and "Cypher" in prompt:
+        return graph_search_cypher(question)
+    return text_answer(prompt)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model that returns canned ReAct steps, Cypher and text."""
+
+    latency: str = "0"
+    seed: int = 42
+    model_name: str = "scripted-fake"
+
+    _rng: Any = PrivateAttr(default=None)
+    _latency: Any = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._latency = parse_latency_spec(self.latency)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _generate(self, messages: List[Any], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        text = scripted_response(prompt)
+        if stop:
+            for token in stop:
+                if token in text:
+                    text = text.split(token, 1)[0]
+        delay = sample_latency(self._rng, *self._latency)
+        if delay:
+            time.sleep(delay)
+        usage = {
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": estimate_tokens(text),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": usage["prompt_tokens"],
+                "output_tokens": usage["completion_tokens"],
+                "total_tokens": usage["total_tokens"],
+            },
+        )
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": usage, "model_name": self.model_name},
+        )
@@ -0,0 +1,56 @@
+"""
+Local stand-in for the OpenAI client the article summarizer uses.
+
+FakeSummaryClient answers await client.chat.completions.create(...) like
+openai.AsyncOpenAI, with the first sentences of the article in the prompt
+as the "summary". Latency follows FAKE_LLM_LATENCY (see fake_llm.py), and the
+client counts calls and concurrent requests so LLM spend and parallelism can
+be checked offline. article_summaries.py selects it with IFX_LLM_BACKEND=fake.
+"""
+
+import asyncio
+import os
+import random
+import re
+from types import SimpleNamespace
+
+from backends.fake_llm import estimate_tokens, parse_latency_spec, sample_latency
+
+SUMMARY_SENTENCES = 3
+
+
+def summarize_prompt(prompt):
+    """First sentences of the text between the prompt's --- markers."""
+    parts = prompt.split("---")
+    article = parts[1] if len(parts) >= 3 else prompt
+    sentences = re.split(r"(?<=[.!?])\s+", " ".join(article.split()))
+    return " ".join(sentences[:SUMMARY_SENTENCES]).strip()
+
+
+class FakeSummaryClient:
+    """Async chat-completions stub with seeded latency and call counters."""
+
+    def __init__(self, latency=None, seed=None):
+        self.latency = parse_latency_spec(latency if latency is not None else os.environ.get("FAKE_LLM_LATENCY", "0"))
+        self.rng = random.Random(int(seed if seed is not None else os.environ.get("FAKE_LLM_SEED", "42")))
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        self.calls += 1
+        self.prompt_tokens += sum(estimate_tokens(message["content"]) for message in messages)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(sample_latency(self.rng, *self.latency))
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content=summarize_prompt(prompt))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], model=model)
+
+    async def close(self):
+        pass
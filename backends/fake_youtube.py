@@ -0,0 +1,82 @@
+"""
+Local stand-in for the YouTube Data API playlist endpoint.
+
+FakeYouTube answers the one call the playlist sync makes,
+youtube.playlistItems().list(part, playlistId, maxResults, pageToken).execute(),
+from a list of video rows, newest first like the highlights playlist. It
+counts the pages it serves so quota use can be checked, and add_videos()
+puts newly "uploaded" videos at the top of the playlist. This lets
+get_youtube_playlist_videos.py run and be exercised offline.
+
+Rows default to youtube_highlights.csv; FAKE_YOUTUBE_CSV serves another file.
+"""
+
+import csv
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HIGHLIGHTS_CSV = os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect", "youtube_highlights.csv")
+
+# The API caps a playlistItems page at 50 items
+MAX_RESULTS = 50
+
+
+def load_videos(csv_path):
+    with open(csv_path, "r", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class FakeYouTube:
+    """Serves playlist pages from video rows (video_id, title, description, published_at)."""
+
+    def __init__(self, videos=None, csv_path=None):
+        if videos is None:
+            videos = load_videos(csv_path or os.environ.get("FAKE_YOUTUBE_CSV") or HIGHLIGHTS_CSV)
+        self.videos = list(videos)
+        self.pages_served = 0
+
+    def add_videos(self, videos):
+        """New uploads, newest first, go to the top of the playlist."""
+        self.videos[:0] = list(videos)
+
+    def playlistItems(self):
+        return _PlaylistItems(self)
+
+
+class _PlaylistItems:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part, playlistId, maxResults=5, pageToken=None):
+        return _ListRequest(self.service, min(maxResults, MAX_RESULTS), pageToken)
+
+
+class _ListRequest:
+    def __init__(self, service, max_results, page_token):
+        self.service = service
+        self.max_results = max_results
+        self.page_token = page_token
+
+    def execute(self):
+        # Page tokens are opaque to callers; here they are just offsets
+        start = int(self.page_token or 0)
+        videos = self.service.videos
+        self.service.pages_served += 1
+        response = {
+            "items": [
+                {
+                    "snippet": {
+                        "title": video["title"],
+                        "description": video["description"],
+                        "publishedAt": video["published_at"],
+                        "position": position,
+                        "resourceId": {"kind": "youtube#video", "videoId": video["video_id"]},
+                    }
+                }
+                for position, video in enumerate(videos[start:start + self.max_results], start)
+            ],
+            "pageInfo": {"totalResults": len(videos), "resultsPerPage": self.max_results},
+        }
+        if start + self.max_results < len(videos):
+            response["nextPageToken"] = str(start + self.max_results)
+        return response
@@ -0,0 +1,62 @@
+"""
+Delegating GraphStore base class.
+
+GraphCypherQAChain only accepts a GraphStore, and runs its generated Cypher
+through graph.query() internally. Layers that need to observe or rewrite
+those calls (recording, caching, tracing, ...) subclass GraphProxy and
+override query(); everything else is forwarded to the wrapped graph.
+
+explain() compiles a query without running it and returns its EXPLAIN plan.
+It is forwarded down the chain like query(); a graph without explain() of
+its own (FakeGraph, a bare Neo4jGraph) gets a plain "EXPLAIN ..." query,
+which still surfaces syntax errors, and the plan is None.
+"""
+
+from langchain_neo4j.graphs.graph_store import GraphStore
+
+
+class GraphProxy(GraphStore):
+    """Forward the GraphStore interface, and any other attribute, to an inner graph."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    @property
+    def schema(self):
+        return self.get_schema
+
+    @property
+    def structured_schema(self):
+        return self.get_structured_schema
+
+    @property
+    def get_schema(self):
+        return self.inner.get_schema
+
+    @property
+    def get_structured_schema(self):
+        return self.inner.get_structured_schema
+
+    def refresh_schema(self):
+        return self.inner.refresh_schema()
+
+    def add_graph_documents(self, graph_documents, include_source=False):
+        return self.inner.add_graph_documents(graph_documents, include_source)
+
+    def explain(self, query, params=None):
+        explain = getattr(self.inner, "explain", None)
+        if explain is not None:
+            return explain(query, params)
+        self.inner.query(f"EXPLAIN {query}", params or {})
+        return None
+
+    def query(self, query, params={}, session_params={}):
+        if session_params:
+            return self.inner.query(query, params, session_params=session_params)
+        return self.inner.query(query, params)
+
+    def __getattr__(self, name):
+        # Only reached for attributes not defined on the proxy (e.g. _driver, _database)
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
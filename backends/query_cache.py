@@ -0,0 +1,133 @@
+"""
+Versioned LRU cache for graph.query() results.
+
+The roster, schedule, communities and stories change at most a few times a
+day, so read queries are served from memory between data refreshes. Entries
+are keyed on normalized Cypher plus params, and the whole cache is dropped
+whenever the graph's data version changes. The ingestion and upload scripts
+bump that version through gradio_neo4j.bump_data_version(), which updates a
+single (:DataVersion {id: "graph"}) node; the cache polls it at most once
+every `version_ttl` seconds.
+
+Environment variables:
+    IFX_QUERY_CACHE_SIZE         max cached queries, 0 disables the cache (default 256)
+    IFX_QUERY_CACHE_VERSION_TTL  seconds between DataVersion polls (default 30)
+"""
+
+import copy
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from backends.graph_proxy import GraphProxy
+
+DATA_VERSION_QUERY = "MATCH (v:DataVersion {id: 'graph'}) RETURN v.version AS version"
+
+# Split Cypher into string literals (kept verbatim) and everything else
+_STRING_RE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")")
+_WRITE_RE = re.compile(r"\b(CREATE|MERGE|SET|DELETE|DETACH|REMOVE|DROP|LOAD\s+CSV|FOREACH)\b", re.IGNORECASE)
+
+
+def normalize_cypher(query):
+    """Collapse whitespace and drop a trailing semicolon, leaving string literals untouched."""
+    parts = _STRING_RE.split(query.strip().rstrip(";").strip())
+    for index in range(0, len(parts), 2):
+        parts[index] = re.sub(r"\s+", " ", parts[index])
+    return "".join(parts).strip()
+
+
+def is_read_only(query):
+    """True when the query (outside string literals) has no write clauses."""
+    code = "".join(_STRING_RE.split(query)[0::2])
+    return not _WRITE_RE.search(code)
+
+
+class QueryCacheGraph(GraphProxy):
+    """GraphStore wrapper that caches read-only query results until the data version changes."""
+
+    def __init__(self, inner, max_size=256, version_ttl=30.0, on_lookup=None):
+        super().__init__(inner)
+        self.max_size = max_size
+        self.version_ttl = version_ttl
+        # Called with True/False on every cacheable lookup (used for trace/metrics attributes)
+        self.on_lookup = on_lookup
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        return len(self._entries)
+
+    @property
+    def data_version(self):
+        return self._version
+
+    def current_data_version(self):
+        """The graph's DataVersion, re-read at most every version_ttl seconds; a change drops the cache."""
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_ttl:
+            return self._version
+        try:
+            rows = self.inner.query(DATA_VERSION_QUERY)
+            version = rows[0]["version"] if rows else None
+        except Exception as e:
+            # Keep serving the last known version rather than failing the tool call
+            print(f"[QUERY CACHE] Could not read DataVersion: {e}")
+            version = self._version
+        with self._lock:
+            self._version_checked_at = now
+            if version != self._version:
+                if self._entries:
+                    print(f"[QUERY CACHE] Data version changed {self._version} -> {version}, "
+                          f"dropping {len(self._entries)} cached queries")
+                self._entries.clear()
+                self._version = version
+        return version
+
+    def invalidate(self):
+        """Drop every cached result and force a version re-check on the next query."""
+        with self._lock:
+            self._entries.clear()
+            self._version_checked_at = 0.0
+
+    def query(self, query, params={}, session_params={}):
+        # EXPLAIN/PROFILE describe how a query runs now, not data to keep
+        if (self.max_size <= 0 or session_params or not is_read_only(query)
+                or query.lstrip().upper().startswith(("EXPLAIN", "PROFILE"))):
+            return super().query(query, params, session_params)
+
+        version = self.current_data_version()
+        key = (normalize_cypher(query), json.dumps(params or {}, sort_keys=True, default=str))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                result = entry[1]
+            else:
+                result = None
+        # Callers get deep copies, so editing nested lists or dicts in a row
+        # can't change the cached result
+        if result is not None:
+            self._report(True)
+            return copy.deepcopy(result)
+
+        self._report(False)
+        result = super().query(query, params, session_params)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(result)
+
+    def _report(self, hit):
+        if self.on_lookup is not None:
+            self.on_lookup(hit)
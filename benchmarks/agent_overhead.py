@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Agent-overhead benchmark.
+
+Runs a fixed set of golden fan questions through gradio_agent.generate_response
+and reports latency percentiles. By default it uses the scripted fake LLM and
+the in-memory fake graph, so results are reproducible on a laptop with no
+network. Override IFX_LLM_BACKEND / IFX_GRAPH_BACKEND to benchmark real services,
+or set IFX_CASSETTE_MODE=replay to re-run a recorded session.
+
+Usage:
+    python benchmarks/agent_overhead.py --runs 5
+    FAKE_LLM_LATENCY=lognormal:-0.7,0.4 python benchmarks/agent_overhead.py
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+# Default to the offline backends before anything imports gradio_llm/gradio_graph
+os.environ.setdefault("IFX_LLM_BACKEND", "fake")
+os.environ.setdefault("IFX_GRAPH_BACKEND", "fake")
+
+GOLDEN_QUESTIONS = [
+    "Tell me about Nick Bosa",
+    "Who is player number 13?",
+    "List all the quarterbacks",
+    "Which players are the most favorited by fans?",
+    "Which fan communities have the most members?",
+    "Show me the recap of the 49ers vs Jets game",
+    "What happened in the last game?",
+    "What's the latest news about the draft?",
+    "Who had the most sacks?",
+    "How does the NFL draft work?",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, good enough for small benchmark samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_benchmark(questions, runs, warmup):
+    from gradio_agent import generate_response
+
+    for question in questions[:warmup]:
+        generate_response(question, session_id="benchmark")
+
+    timings = {question: [] for question in questions}
+    for _ in range(runs):
+        for question in questions:
+            start = time.perf_counter()
+            generate_response(question, session_id="benchmark")
+            timings[question].append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    all_timings = [t for values in timings.values() for t in values]
+    per_question = {
+        question: {
+            "mean_ms": round(statistics.mean(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p90_ms": round(percentile(values, 90) * 1000, 2),
+        }
+        for question, values in timings.items()
+    }
+    return {
+        "llm_backend": os.environ.get("IFX_LLM_BACKEND"),
+        "graph_backend": os.environ.get("IFX_GRAPH_BACKEND"),
+        "cassette_mode": os.environ.get("IFX_CASSETTE_MODE", "off"),
+        "requests": len(all_timings),
+        "mean_ms": round(statistics.mean(all_timings) * 1000, 2),
+        "p50_ms": round(percentile(all_timings, 50) * 1000, 2),
+        "p90_ms": round(percentile(all_timings, 90) * 1000, 2),
+        "per_question": per_question,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent overhead on golden questions")
+    parser.add_argument("--runs", type=int, default=3, help="Timed passes over the golden questions")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed questions to run first")
+    parser.add_argument("--output", help="Optional path to write the JSON summary")
+    args = parser.parse_args()
+
+    timings = run_benchmark(GOLDEN_QUESTIONS, args.runs, args.warmup)
+    summary = summarize(timings)
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"[BENCHMARK] Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark for the news summarization stage in article_summaries.py.
+
+Builds a corpus from the summaries in team_news_articles.csv (each padded
+to article length) plus syndicated and lightly edited copies, and
+summarizes it with the fake OpenAI client (backends/fake_summarizer.py):
+    - sequential: one request at a time, no cache, no duplicate detection,
+      like the previous generate_summary loop
+    - first run: concurrent, empty summary cache
+    - refresh: the same corpus plus a few new articles, against the cache the
+      first run filled
+Reports wall time and LLM calls for each.
+
+Usage:
+    python benchmarks/article_summaries.py
+    python benchmarks/article_summaries.py --latency lognormal:0.3,0.4 --copies 0.3 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEDIA_DIR = os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect")
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, MEDIA_DIR)
+
+import article_summaries
+from backends.fake_summarizer import FakeSummaryClient
+
+SYNDICATION_NOTE = "This story first appeared on a partner site and is republished with permission."
+
+
+def load_articles(paragraphs=5, paragraph_words=100):
+    """
+    Article-length texts: each CSV summary followed by paragraphs of words
+    drawn from all the summaries, seeded by the article URL.
+    """
+    with open(os.path.join(MEDIA_DIR, "team_news_articles.csv"), "r", encoding="utf-8") as f:
+        rows = [row for row in csv.DictReader(f) if row["summary"]]
+    vocabulary = sorted({word for row in rows for word in row["summary"].split()})
+    articles = []
+    for row in rows:
+        rng = random.Random(row["link_to_article"])
+        body = [" ".join(rng.choice(vocabulary) for _ in range(paragraph_words)) + "." for _ in range(paragraphs)]
+        articles.append({"content": "\n\n".join([row["summary"]] + body), "link_to_article": row["link_to_article"]})
+    return articles
+
+
+def variants(articles, share, rng):
+    """Syndicated copies (extra paragraph) and updates (one sentence edited) of a share of the articles."""
+    copies = []
+    for i, article in enumerate(rng.sample(articles, int(len(articles) * share))):
+        if i % 2:
+            content = article["content"] + "\n\n" + SYNDICATION_NOTE
+        else:
+            content = article["content"].replace(". ", ". Update: the team confirmed the report. ", 1)
+        copies.append({"content": content, "link_to_article": article["link_to_article"] + f"?copy={i}"})
+    return copies
+
+
+def run(articles, cache_path, concurrency, latency, dedupe=True):
+    client = FakeSummaryClient(latency=latency, seed=7)
+    start = time.perf_counter()
+    if dedupe:
+        article_summaries.summarize_articles(articles, article_summaries.SummaryCache(cache_path),
+                                             concurrency=concurrency, client=client)
+    else:
+        texts = [article_summaries.clean_text(article["content"]) for article in articles]
+        asyncio.run(article_summaries.request_summaries(texts, 1, client))
+    return {
+        "articles": len(articles),
+        "seconds": round(time.perf_counter() - start, 2),
+        "llm_calls": client.calls,
+        "prompt_tokens": client.prompt_tokens,
+        "max_in_flight": client.max_in_flight,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cached, concurrent article summarization")
+    parser.add_argument("--latency", default="uniform:0.2,0.6", help="Fake LLM latency spec (see backends/fake_llm.py)")
+    parser.add_argument("--concurrency", type=int, default=article_summaries.SUMMARY_CONCURRENCY)
+    parser.add_argument("--copies", type=float, default=0.25, help="Share of articles with a near-duplicate copy")
+    parser.add_argument("--new", type=int, default=5, help="New articles in the refresh run")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    articles = load_articles()
+    held_out, articles = articles[:args.new], articles[args.new:]
+    corpus = articles + variants(articles, args.copies, rng)
+    rng.shuffle(corpus)
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "summaries.json")
+    report = {
+        "latency": args.latency,
+        "concurrency": args.concurrency,
+        "sequential": run(corpus, cache_path, 1, args.latency, dedupe=False),
+        "first_run": run(corpus, cache_path, args.concurrency, args.latency),
+        "refresh": run(corpus + held_out, cache_path, args.concurrency, args.latency),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
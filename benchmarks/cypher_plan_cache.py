@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+Plan-cache benchmark for generated Cypher.
+
+Generates the Cypher our tools emit for a spread of fan questions (via the
+scripted fake LLM's templates), once as-is and once through
+tools/cypher_params.parameterize_cypher(), and reports for each mode:
+    - distinct statements and the resulting plan-cache hit rate
+    - planning time: EXPLAIN's result_available_after on Neo4j, which is
+      time to plan (or fetch a cached plan) since EXPLAIN executes nothing
+
+Planning time needs a real database (IFX_GRAPH_BACKEND=neo4j and the usual
+Neo4j credentials); with the default fake backend only hit rates are reported.
+
+Usage:
+    python benchmarks/cypher_plan_cache.py
+    IFX_GRAPH_BACKEND=neo4j python benchmarks/cypher_plan_cache.py --rounds 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+os.environ.setdefault("IFX_GRAPH_BACKEND", "fake")
+
+from backends import fake_llm
+from benchmarks.agent_overhead import percentile
+from tools.cypher_params import parameterize_cypher
+
+PLAYER_QUESTIONS = [f"Tell me about {name}" for name in (
+    "Nick Bosa", "Brock Purdy", "Christian McCaffrey", "George Kittle", "Fred Warner",
+    "Deebo Samuel", "Brandon Aiyuk", "Trent Williams", "Talanoa Hufanga", "Jake Moody",
+)] + [f"Who is player number {number}?" for number in (13, 97, 85, 54, 19)]
+GAME_QUESTIONS = [f"Show me the recap of the 49ers vs {team} game" for team in (
+    "Jets", "Rams", "Seahawks", "Cardinals", "Chiefs", "Bears", "Packers", "Bills",
+)]
+STORY_QUESTIONS = [f"What's the latest news about the {topic}?" for topic in (
+    "draft", "injuries", "contract", "training camp", "playoffs",
+)]
+
+
+def generated_queries():
+    queries = [fake_llm.player_cypher(q) for q in PLAYER_QUESTIONS]
+    queries += [fake_llm.game_cypher(q) for q in GAME_QUESTIONS]
+    queries += [fake_llm.team_story_cypher(q) for q in STORY_QUESTIONS]
+    return queries
+
+
+def reuse_stats(statements):
+    distinct = len(set(statements))
+    return {
+        "statements": len(statements),
+        "distinct": distinct,
+        "plan_cache_hit_rate": round(1 - distinct / len(statements), 3) if statements else 0.0,
+    }
+
+
+def planning_times(pairs, rounds):
+    """EXPLAIN each (statement, params) and collect result_available_after in ms."""
+    from gradio_neo4j import close_driver, get_session
+
+    timings = []
+    try:
+        with get_session(read=True) as session:
+            for _ in range(rounds):
+                for statement, params in pairs:
+                    summary = session.run(f"EXPLAIN {statement}", params).consume()
+                    timings.append(summary.result_available_after)
+    finally:
+        close_driver()
+    return {
+        "mean_ms": round(statistics.mean(timings), 2),
+        "p50_ms": percentile(timings, 50),
+        "p90_ms": percentile(timings, 90),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plan reuse for inline vs parameterized Cypher")
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the generated queries")
+    parser.add_argument("--output", help="Optional path to write the JSON summary")
+    args = parser.parse_args()
+
+    raw = generated_queries()
+    modes = {
+        "inline": [(query, {}) for query in raw],
+        "parameterized": [parameterize_cypher(query) for query in raw],
+    }
+    summary = {"graph_backend": os.environ.get("IFX_GRAPH_BACKEND"), "rounds": args.rounds}
+    for mode, pairs in modes.items():
+        summary[mode] = reuse_stats([statement for statement, _ in pairs] * args.rounds)
+        if summary["graph_backend"] != "fake":
+            summary[mode]["planning"] = planning_times(pairs, args.rounds)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"[BENCHMARK] Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+"""
+Benchmark for the vectorized stats stages in game_stats.py.
+
+Runs the previous implementation (a per-defender iterrows loop that
+re-filters the game's plays for every role column, and lambda counters for
+pass/run locations) and the vectorized one (melted role table plus one
+groupby, one-hot category counts) on a full season of play-by-play, checks
+that the outputs are identical, and reports the timings.
+
+Loading the season needs nfl_data_py and network access; --pbp reads a saved
+play-by-play file (.parquet or .csv) instead.
+
+Usage:
+    python benchmarks/game_stats_vectorized.py
+    python benchmarks/game_stats_vectorized.py --season 2023 --team KC --rounds 3
+    python benchmarks/game_stats_vectorized.py --pbp pbp_2024.parquet
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect"))
+
+import game_stats
+
+
+# ------------------------------------------------------------------------------
+# Previous implementation, kept as the reference output
+# ------------------------------------------------------------------------------
+def legacy_defensive_player_stats(sf_games):
+    # Create a list of all defensive player IDs from various defensive play columns
+    defensive_player_ids = []
+    defensive_player_names = []
+
+    # Solo tackles
+    solo_tackle_players = sf_games[sf_games['solo_tackle_1_player_id'].notna()][['game_id', 'solo_tackle_1_player_id', 'solo_tackle_1_player_name', 'defteam']]
+    solo_tackle_players = solo_tackle_players.rename(columns={'solo_tackle_1_player_id': 'player_id', 'solo_tackle_1_player_name': 'player_name'})
+    defensive_player_ids.append(solo_tackle_players)
+
+    # Assisted tackles
+    assist_tackle_players = sf_games[sf_games['assist_tackle_1_player_id'].notna()][['game_id', 'assist_tackle_1_player_id', 'assist_tackle_1_player_name', 'defteam']]
+    assist_tackle_players = assist_tackle_players.rename(columns={'assist_tackle_1_player_id': 'player_id', 'assist_tackle_1_player_name': 'player_name'})
+    defensive_player_ids.append(assist_tackle_players)
+
+    # Sacks
+    sack_players = sf_games[sf_games['sack_player_id'].notna()][['game_id', 'sack_player_id', 'sack_player_name', 'defteam']]
+    sack_players = sack_players.rename(columns={'sack_player_id': 'player_id', 'sack_player_name': 'player_name'})
+    defensive_player_ids.append(sack_players)
+
+    # Interceptions
+    int_players = sf_games[sf_games['interception_player_id'].notna()][['game_id', 'interception_player_id', 'interception_player_name', 'defteam']]
+    int_players = int_players.rename(columns={'interception_player_id': 'player_id', 'interception_player_name': 'player_name'})
+    defensive_player_ids.append(int_players)
+
+    # Forced fumbles
+    ff_players = sf_games[sf_games['forced_fumble_player_1_player_id'].notna()][['game_id', 'forced_fumble_player_1_player_id', 'forced_fumble_player_1_player_name', 'forced_fumble_player_1_team']]
+    ff_players = ff_players.rename(columns={'forced_fumble_player_1_player_id': 'player_id', 'forced_fumble_player_1_player_name': 'player_name', 'forced_fumble_player_1_team': 'defteam'})
+    defensive_player_ids.append(ff_players)
+
+    # Fumble recoveries
+    fr_players = sf_games[sf_games['fumble_recovery_1_player_id'].notna()][['game_id', 'fumble_recovery_1_player_id', 'fumble_recovery_1_player_name', 'fumble_recovery_1_team']]
+    fr_players = fr_players.rename(columns={'fumble_recovery_1_player_id': 'player_id', 'fumble_recovery_1_player_name': 'player_name', 'fumble_recovery_1_team': 'defteam'})
+    defensive_player_ids.append(fr_players)
+
+    # Pass defenses
+    pd_players = sf_games[sf_games['pass_defense_1_player_id'].notna()][['game_id', 'pass_defense_1_player_id', 'pass_defense_1_player_name', 'defteam']]
+    pd_players = pd_players.rename(columns={'pass_defense_1_player_id': 'player_id', 'pass_defense_1_player_name': 'player_name'})
+    defensive_player_ids.append(pd_players)
+
+    # Combine all defensive player dataframes
+    defensive_players = pd.concat(defensive_player_ids, ignore_index=True)
+    defensive_players = defensive_players.drop_duplicates()
+
+    # Create a function to calculate individual defensive player stats
+    def calculate_defensive_player_stats(player_id, player_name, game_id, team):
+        player_games = sf_games[sf_games['game_id'] == game_id]
+
+        # Solo tackles
+        solo_tackles = player_games[player_games['solo_tackle_1_player_id'] == player_id].shape[0]
+        solo_tackles += player_games[player_games['solo_tackle_2_player_id'] == player_id].shape[0]
+
+        # Assisted tackles
+        assist_tackles = player_games[player_games['assist_tackle_1_player_id'] == player_id].shape[0]
+        assist_tackles += player_games[player_games['assist_tackle_2_player_id'] == player_id].shape[0]
+        assist_tackles += player_games[player_games['assist_tackle_3_player_id'] == player_id].shape[0]
+        assist_tackles += player_games[player_games['assist_tackle_4_player_id'] == player_id].shape[0]
+
+        # Sacks
+        sacks = player_games[player_games['sack_player_id'] == player_id].shape[0]
+        sacks += player_games[player_games['half_sack_1_player_id'] == player_id].shape[0] * 0.5
+        sacks += player_games[player_games['half_sack_2_player_id'] == player_id].shape[0] * 0.5
+
+        # Interceptions
+        interceptions = player_games[player_games['interception_player_id'] == player_id].shape[0]
+
+        # Forced fumbles
+        forced_fumbles = player_games[player_games['forced_fumble_player_1_player_id'] == player_id].shape[0]
+        forced_fumbles += player_games[player_games['forced_fumble_player_2_player_id'] == player_id].shape[0]
+
+        # Fumble recoveries
+        fumble_recoveries = player_games[player_games['fumble_recovery_1_player_id'] == player_id].shape[0]
+        fumble_recoveries += player_games[player_games['fumble_recovery_2_player_id'] == player_id].shape[0]
+
+        # Pass defenses
+        pass_defenses = player_games[player_games['pass_defense_1_player_id'] == player_id].shape[0]
+        pass_defenses += player_games[player_games['pass_defense_2_player_id'] == player_id].shape[0]
+
+        # Tackles for loss
+        tackles_for_loss = player_games[player_games['tackle_for_loss_1_player_id'] == player_id].shape[0]
+        tackles_for_loss += player_games[player_games['tackle_for_loss_2_player_id'] == player_id].shape[0]
+
+        # QB hits
+        qb_hits = player_games[player_games['qb_hit_1_player_id'] == player_id].shape[0]
+        qb_hits += player_games[player_games['qb_hit_2_player_id'] == player_id].shape[0]
+
+        return pd.Series({
+            'solo_tackles': solo_tackles,
+            'assisted_tackles': assist_tackles,
+            'tackles_for_loss': tackles_for_loss,
+            'qb_hits': qb_hits,
+            'sacks': sacks,
+            'interceptions': interceptions,
+            'forced_fumbles': forced_fumbles,
+            'fumble_recoveries': fumble_recoveries,
+            'pass_defenses': pass_defenses
+        })
+
+    # Apply the function to each defensive player
+    defensive_player_stats = []
+    for _, row in defensive_players.iterrows():
+        stats = calculate_defensive_player_stats(row['player_id'], row['player_name'], row['game_id'], row['defteam'])
+        stats['game_id'] = row['game_id']
+        stats['player_id'] = row['player_id']
+        stats['player_name'] = row['player_name']
+        stats['posteam'] = row['defteam']  # Use defteam as posteam for consistency
+        defensive_player_stats.append(stats)
+
+    # Convert to DataFrame
+    defensive_player_stats_df = pd.DataFrame(defensive_player_stats)
+    return defensive_player_stats_df
+
+
+def legacy_advanced_passing_stats(sf_games):
+    return sf_games[sf_games['passer_player_id'].notna()].groupby(['game_id', 'passer_player_id', 'passer_player_name', 'posteam']).agg(
+        air_yards=('air_yards', 'sum'),
+        yards_after_catch=('yards_after_catch', 'sum'),
+        cpoe=('cpoe', 'mean'),
+        qb_epa=('qb_epa', 'sum'),
+        pass_attempts=('pass_attempt', 'sum'),
+        complete_passes=('complete_pass', 'sum'),
+        avg_air_yards=('air_yards', 'mean'),
+        avg_yac=('yards_after_catch', 'mean'),
+        pass_location_left=('pass_location', lambda x: (x == 'left').sum()),
+        pass_location_middle=('pass_location', lambda x: (x == 'middle').sum()),
+        pass_location_right=('pass_location', lambda x: (x == 'right').sum()),
+        pass_length_short=('pass_length', lambda x: (x == 'short').sum()),
+        pass_length_medium=('pass_length', lambda x: (x == 'medium').sum()),
+        pass_length_deep=('pass_length', lambda x: (x == 'deep').sum())
+    ).reset_index().rename(columns={'passer_player_id': 'player_id', 'passer_player_name': 'player_name'})
+
+
+def legacy_advanced_rushing_stats(sf_games):
+    return sf_games[sf_games['rusher_player_id'].notna()].groupby(['game_id', 'rusher_player_id', 'rusher_player_name', 'posteam']).agg(
+        rush_attempts=('rush_attempt', 'sum'),
+        first_downs_rush=('first_down_rush', 'sum'),
+        xyac_mean=('xyac_mean_yardage', 'mean'),
+        xyac_median=('xyac_median_yardage', 'mean'),
+        xyac_success_rate=('xyac_success', 'mean'),
+        rush_epa=('epa', 'sum'),
+        run_location_left=('run_location', lambda x: (x == 'left').sum()),
+        run_location_middle=('run_location', lambda x: (x == 'middle').sum()),
+        run_location_right=('run_location', lambda x: (x == 'right').sum()),
+        run_gap_guard=('run_gap', lambda x: (x == 'guard').sum()),
+        run_gap_tackle=('run_gap', lambda x: (x == 'tackle').sum()),
+        run_gap_end=('run_gap', lambda x: (x == 'end').sum())
+    ).reset_index().rename(columns={'rusher_player_id': 'player_id', 'rusher_player_name': 'player_name'})
+
+
+STAGES = {
+    "defense": (legacy_defensive_player_stats, game_stats.defensive_player_stats),
+    "passing": (legacy_advanced_passing_stats, game_stats.advanced_passing_stats),
+    "rushing": (legacy_advanced_rushing_stats, game_stats.advanced_rushing_stats),
+}
+
+
+def best_time(func, sf_games, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func(sf_games)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def load_pbp(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, low_memory=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized game_stats.py stages against the previous code")
+    parser.add_argument("--season", type=int, default=game_stats.SEASON)
+    parser.add_argument("--team", default=game_stats.TEAM_ABBR)
+    parser.add_argument("--pbp", help="Saved play-by-play file to use instead of downloading the season")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs per implementation (best is reported)")
+    args = parser.parse_args()
+
+    if args.pbp:
+        pbp = load_pbp(args.pbp)
+        sf_games = pbp[(pbp['home_team'] == args.team) | (pbp['away_team'] == args.team)].copy()
+    else:
+        sf_games = game_stats.load_team_games(args.season, args.team)
+
+    report = {"team": args.team, "plays": len(sf_games), "games": int(sf_games['game_id'].nunique()), "stages": {}}
+    for name, (legacy, vectorized) in STAGES.items():
+        expected, legacy_s = best_time(legacy, sf_games, args.rounds)
+        actual, vectorized_s = best_time(vectorized, sf_games, args.rounds)
+        # The legacy rows hold Python objects; compare values, not storage dtypes
+        pd.testing.assert_frame_equal(actual.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+        report["stages"][name] = {
+            "rows": len(actual),
+            "legacy_ms": round(legacy_s * 1000, 1),
+            "vectorized_ms": round(vectorized_s * 1000, 1),
+            "speedup": round(legacy_s / vectorized_s, 1) if vectorized_s else None,
+            "identical": True,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
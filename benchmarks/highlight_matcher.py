@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Benchmark for the highlight matcher in match_highlights.py.
+
+Runs the previous matcher (every player and game rescans the remaining
+highlight titles with per-entity regexes, first match wins) and the alias
+table one (each highlight tokenized and scanned once, best score wins) on
+the channel's highlights, repeated up to league-sized corpora, and reports
+timings and how many players and games got a video. The two are not
+expected to agree: the old matcher takes the first mention, the new one the
+best scoring.
+
+Usage:
+    python benchmarks/highlight_matcher.py
+    python benchmarks/highlight_matcher.py --sizes 3000,30000,120000 --legacy-max 30000
+"""
+
+import argparse
+import copy
+import json
+import os
+import re
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEDIA_DIR = os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect")
+sys.path.insert(0, MEDIA_DIR)
+
+import match_highlights
+
+
+# ------------------------------------------------------------------------------
+# Previous implementation (title checks only; description was read but unused)
+# ------------------------------------------------------------------------------
+def legacy_match_highlights_to_players_and_games(highlights, players, games):
+    assigned_video_ids = set()
+    for player in players:
+        player_name = player['name']
+        last_name = player_name.split()[-1]
+        full_name_pattern = re.compile(r'\b' + re.escape(player_name) + r'\b', re.IGNORECASE)
+        last_name_pattern = re.compile(r'\b' + re.escape(last_name) + r'\b', re.IGNORECASE)
+        for highlight in highlights:
+            if highlight['video_id'] in assigned_video_ids:
+                continue
+            title = highlight['title']
+            if full_name_pattern.search(title) or last_name_pattern.search(title):
+                player['highlight_video_url'] = highlight['video_url']
+                assigned_video_ids.add(highlight['video_id'])
+                break
+
+    for game in games:
+        week_pattern = re.compile(r'\bWeek\s+' + re.escape(game['round_number']) + r'\b', re.IGNORECASE)
+        opponent_pattern = re.compile(r'\b' + re.escape(game['opponent']) + r'\b', re.IGNORECASE)
+        for highlight in highlights:
+            if highlight['video_id'] in assigned_video_ids:
+                continue
+            title = highlight['title']
+            if (week_pattern.search(title) and opponent_pattern.search(title)) or opponent_pattern.search(title):
+                game['highlight_video_url'] = highlight['video_url']
+                assigned_video_ids.add(highlight['video_id'])
+                break
+
+    return [highlight for highlight in highlights if highlight['video_id'] not in assigned_video_ids]
+
+
+def corpus(highlights, size):
+    """The channel's highlights repeated with fresh video ids up to `size`."""
+    videos = []
+    while len(videos) < size:
+        for highlight in highlights[:size - len(videos)]:
+            video = dict(highlight, video_id=f"{highlight['video_id']}-{len(videos)}")
+            videos.append(video)
+    return videos
+
+
+def run(matcher, highlights, players, games):
+    players, games = copy.deepcopy(players), copy.deepcopy(games)
+    start = time.perf_counter()
+    team_videos = matcher(highlights, players, games)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "players_matched": sum(1 for player in players if player['highlight_video_url']),
+        "games_matched": sum(1 for game in games if game['highlight_video_url']),
+        "team_videos": len(team_videos),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the highlight matcher against the previous per-entity scan")
+    parser.add_argument("--sizes", default="3000,30000,120000", help="Comma-separated corpus sizes")
+    parser.add_argument("--legacy-max", type=int, default=30000, help="Skip the previous matcher above this size")
+    args = parser.parse_args()
+
+    # The loaders read relative paths
+    os.chdir(MEDIA_DIR)
+    highlights = match_highlights.load_youtube_highlights()
+    players = match_highlights.load_players()
+    games = match_highlights.load_games()
+
+    report = {"players": len(players), "games": len(games), "runs": []}
+    for size in (int(value) for value in args.sizes.split(",")):
+        videos = corpus(highlights, size)
+        entry = {"videos": size, "indexed": run(match_highlights.match_highlights_to_players_and_games, videos, players, games)}
+        if size <= args.legacy_max:
+            entry["legacy"] = run(legacy_match_highlights_to_players_and_games, videos, players, games)
+        report["runs"].append(entry)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
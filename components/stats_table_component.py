@@ -0,0 +1,51 @@
+"""
+Gradio component for displaying Player Stats tool results as a compact table.
+"""
+
+import html
+
+import gradio as gr
+
+
+def create_stats_table_component(stats_data):
+    """
+    Creates a Gradio HTML component with the stats table.
+
+    Args:
+        stats_data (dict): Table from tools.player_stats with 'title',
+                           'columns', 'rows' and optionally 'total_rows' keys.
+
+    Returns:
+        gr.HTML: A Gradio HTML component containing the table.
+                 Returns None if the input data is empty or invalid.
+    """
+    if not stats_data or not isinstance(stats_data, dict) or not stats_data.get("rows"):
+        return None
+
+    columns = stats_data.get("columns", [])
+    header = "".join(
+        f"<th style='text-align: left; padding: 4px 8px; border-bottom: 2px solid #AA0000;'>"
+        f"{html.escape(str(column).replace('_', ' ').title())}</th>"
+        for column in columns
+    )
+    body = ""
+    for row in stats_data["rows"]:
+        cells = "".join(
+            f"<td style='padding: 4px 8px; border-bottom: 1px solid #eee;'>{html.escape('' if value is None else str(value))}</td>"
+            for value in row
+        )
+        body += f"<tr>{cells}</tr>"
+    footer = ""
+    if stats_data.get("total_rows", 0) > len(stats_data["rows"]):
+        footer = (f"<p style='margin: 6px 0 0; font-size: 0.8em; color: #666;'>"
+                  f"Showing {len(stats_data['rows'])} of {stats_data['total_rows']} rows</p>")
+
+    html_content = f"""<div style='padding: 15px; border: 1px solid #e0e0e0; border-radius: 5px; margin-top: 10px;'>
+                         <h3 style='margin-top: 0; margin-bottom: 10px;'>{html.escape(stats_data.get('title', 'Player Stats'))}</h3>
+                         <table style='border-collapse: collapse; width: 100%; font-size: 0.9em;'>
+                             <thead><tr>{header}</tr></thead>
+                             <tbody>{body}</tbody>
+                         </table>
+                         {footer}
+                      </div>"""
+    return gr.HTML(html_content)
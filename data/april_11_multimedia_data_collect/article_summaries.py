@@ -0,0 +1,286 @@
+"""
+Article summarization for the news scraper, with a summary cache and
+near-duplicate reuse.
+
+summarize_articles() takes the parsed articles of a run and returns one
+summary per article:
+    - the article text is cleaned and hashed; a summary cached under the
+      same content hash (summary_cache/summaries.json) is reused as is
+    - otherwise a 64-bit SimHash over word shingles is looked up in the
+      cache and in the rest of the batch. Syndicated or lightly updated
+      copies land within SIMHASH_MAX_DISTANCE bits and share one summary
+    - the remaining articles are summarized concurrently through
+      openai.AsyncOpenAI, at most SUMMARY_CONCURRENCY requests at a time
+
+Set IFX_LLM_BACKEND=fake to summarize with backends/fake_summarizer.py
+instead of the OpenAI API.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from dotenv import load_dotenv
+
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
+# "openai" (default) or "fake" for the local client in backends/fake_summarizer.py
+LLM_BACKEND = os.environ.get("IFX_LLM_BACKEND", "openai").strip().lower()
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_cache", "summaries.json")
+SUMMARY_CONCURRENCY = 4
+MAX_RETRIES = 3
+# Articles longer than this are cut at a paragraph boundary before summarizing
+MAX_CONTENT_CHARS = 14000
+
+SHINGLE_SIZE = 4
+SIMHASH_BITS = 64
+# Unrelated articles sit around 32 bits apart; a one-sentence edit moves a few bits
+SIMHASH_MAX_DISTANCE = 6
+# 8 bands of 8 bits: fingerprints fewer than 8 bits apart agree on at least one band
+SIMHASH_BANDS = 8
+# Too few shingles make SimHash unreliable; short texts only match exactly
+MIN_SHINGLES = 20
+
+SYSTEM_PROMPT = "You are an AI assistant tasked with summarizing news articles concisely."
+PROMPT_TEMPLATE = """Please provide a concise 3-4 sentence summary of the following article content.
+Focus on the key information and main points. Do not include any information not present in the text. :
+
+---
+{content}
+---
+
+Summary:"""
+
+
+def clean_text(content):
+    """Unicode-normalized article text with whitespace collapsed per paragraph."""
+    if not content:
+        return ""
+    text = unicodedata.normalize("NFKC", content)
+    paragraphs = (" ".join(paragraph.split()) for paragraph in re.split(r"\n\s*\n", text))
+    return "\n\n".join(paragraph for paragraph in paragraphs if paragraph)
+
+
+def words(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def content_hash(text):
+    """Hash of the words of the cleaned text, so case and punctuation edits still hit."""
+    return hashlib.sha256(" ".join(words(text)).encode("utf-8")).hexdigest()
+
+
+def simhash(text):
+    """64-bit SimHash over word shingles, or None when the text is too short."""
+    tokens = words(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    counts = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, count in enumerate(counts) if count > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Banded lookup of fingerprints within SIMHASH_MAX_DISTANCE bits."""
+
+    def __init__(self):
+        self.bands = {}
+
+    @staticmethod
+    def band_keys(fingerprint):
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        mask = (1 << width) - 1
+        return [(band, fingerprint >> (band * width) & mask) for band in range(SIMHASH_BANDS)]
+
+    def add(self, fingerprint, key):
+        for band_key in self.band_keys(fingerprint):
+            self.bands.setdefault(band_key, []).append((fingerprint, key))
+
+    def find(self, fingerprint):
+        best = None
+        for band_key in self.band_keys(fingerprint):
+            for candidate, key in self.bands.get(band_key, ()):
+                distance = hamming_distance(fingerprint, candidate)
+                if distance <= SIMHASH_MAX_DISTANCE and (best is None or distance < best[0]):
+                    best = (distance, key)
+        return best[1] if best else None
+
+
+class SummaryCache:
+    """Summaries on disk, keyed by content hash, with a SimHash index over them."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        self.index = SimHashIndex()
+        for key, entry in self.entries.items():
+            if entry.get("simhash"):
+                self.index.add(int(entry["simhash"], 16), key)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def find_near(self, fingerprint):
+        return self.index.find(fingerprint) if fingerprint is not None else None
+
+    def put(self, key, fingerprint, summary, url=None, duplicate_of=None):
+        self.entries[key] = {
+            "summary": summary,
+            "simhash": f"{fingerprint:016x}" if fingerprint is not None else None,
+            "url": url,
+            "model": OPENAI_MODEL,
+            "duplicate_of": duplicate_of,
+            "created_at": time.time(),
+        }
+        self.dirty = True
+        if fingerprint is not None:
+            self.index.add(fingerprint, key)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(self.path + ".tmp", self.path)
+        self.dirty = False
+
+
+def truncate(text, limit=MAX_CONTENT_CHARS):
+    """Text cut to `limit` characters at the last paragraph break before it."""
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n\n", 0, limit)
+    print(f"[SUMMARY] Content too long ({len(text)} chars), summarizing the first {cut if cut > 0 else limit}")
+    return text[:cut if cut > 0 else limit]
+
+
+def get_client():
+    if LLM_BACKEND == "fake":
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        from backends.fake_summarizer import FakeSummaryClient
+        return FakeSummaryClient()
+    if LLM_BACKEND != "openai":
+        raise ValueError(f"Unknown IFX_LLM_BACKEND '{LLM_BACKEND}'. Use 'openai' or 'fake'.")
+    import openai
+    return openai.AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=MAX_RETRIES)
+
+
+async def request_summary(client, semaphore, text):
+    async with semaphore:
+        try:
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": PROMPT_TEMPLATE.format(content=truncate(text))},
+                ],
+                temperature=0.5,
+                max_tokens=150,
+            )
+            return response.choices[0].message.content.strip()
+        except Exception as e:
+            # Failed summaries are not cached, so the next run retries them
+            print(f"[SUMMARY] Summarization failed: {type(e).__name__}: {e}")
+            return ""
+
+
+async def request_summaries(texts, concurrency, client=None):
+    own_client = client is None
+    client = client or get_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    try:
+        return await asyncio.gather(*(request_summary(client, semaphore, text) for text in texts))
+    finally:
+        if own_client:
+            await client.close()
+
+
+def summarize_articles(articles, cache=None, concurrency=SUMMARY_CONCURRENCY, use_llm=True, client=None):
+    """
+    One summary per article dict ('content', optionally 'link_to_article'),
+    in order; "" when an article has no content or its summary failed.
+    Cached and near-duplicate articles cost no LLM call. With use_llm=False
+    only cached summaries are returned.
+    """
+    cache = cache or SummaryCache()
+    summaries = [""] * len(articles)
+    stats = {"cached": 0, "duplicates": 0, "llm_calls": 0, "empty": 0}
+    # content hash -> (article indexes, text, fingerprint, url) for the articles that need a summary
+    pending = {}
+    batch_index = SimHashIndex()
+    # (index, key, fingerprint, url, representative key) of near-duplicates within this batch
+    followers = []
+
+    for i, article in enumerate(articles):
+        text = clean_text(article.get("content"))
+        if not text:
+            stats["empty"] += 1
+            continue
+        key = content_hash(text)
+        url = article.get("link_to_article")
+        entry = cache.get(key)
+        if entry:
+            summaries[i] = entry["summary"]
+            stats["cached"] += 1
+            continue
+        if key in pending:
+            pending[key][0].append(i)
+            stats["duplicates"] += 1
+            continue
+
+        fingerprint = simhash(text)
+        near_key = cache.find_near(fingerprint)
+        if near_key:
+            summaries[i] = cache.get(near_key)["summary"]
+            cache.put(key, fingerprint, summaries[i], url, duplicate_of=near_key)
+            stats["duplicates"] += 1
+            continue
+        near_key = batch_index.find(fingerprint) if fingerprint is not None else None
+        if near_key:
+            followers.append((i, key, fingerprint, url, near_key))
+            stats["duplicates"] += 1
+            continue
+
+        pending[key] = ([i], text, fingerprint, url)
+        if fingerprint is not None:
+            batch_index.add(fingerprint, key)
+
+    if pending and use_llm:
+        keys = list(pending)
+        stats["llm_calls"] = len(keys)
+        results = asyncio.run(request_summaries([pending[key][1] for key in keys], concurrency, client))
+        for key, summary in zip(keys, results):
+            indexes, _, fingerprint, url = pending[key]
+            for i in indexes:
+                summaries[i] = summary
+            if summary:
+                cache.put(key, fingerprint, summary, url)
+        for i, key, fingerprint, url, near_key in followers:
+            summaries[i] = summaries[pending[near_key][0][0]]
+            if summaries[i]:
+                cache.put(key, fingerprint, summaries[i], url, duplicate_of=near_key)
+    cache.save()
+
+    print(f"[SUMMARY] {len(articles)} articles: {stats['cached']} cached, {stats['duplicates']} duplicates, "
+          f"{stats['llm_calls']} LLM calls, {stats['empty']} without content")
+    return summaries
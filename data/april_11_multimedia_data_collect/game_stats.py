@@ -1,309 +1,300 @@
+"""
+Per-game player stats from nflverse play-by-play.
+
+    python game_stats.py                                  # 49ers 2024 CSVs used by the app
+    python game_stats.py --seasons 2020-2024 --teams all  # every team, one process per core
+
+The multi-team run fills the play-by-play cache (pbp_cache.py) and loads
+rosters once per season in the parent process. It then fans the
+(season, team) partitions out to a process pool. Workers only read the cache
+and each writes its own directory:
+
+    stats_output/season=2024/team=SF/{player_box_scores,enhanced_stats}.csv
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import nfl_data_py as nfl
 import warnings
 warnings.filterwarnings("ignore")
 
-# =============================================
-# SECTION 1: BASIC STATS (ORIGINAL CODE)
-# =============================================
-
 # 1. Setup
-season = 2024
-team_abbr = "SF"
-
-# 2. Load play-by-play data for the 2024 season
-print("Loading play-by-play data...")
-pbp_df = nfl.import_pbp_data(years=[season], downcast=True)
-
-# 3. Filter for games involving the San Francisco 49ers
-sf_games = pbp_df[(pbp_df['home_team'] == team_abbr) | (pbp_df['away_team'] == team_abbr)]
-
-# 4. Get unique game IDs
-game_ids = sf_games['game_id'].unique()
-
-# 5. Create separate dataframes for passing, rushing, and receiving stats
-# Passing stats
-passing_stats = sf_games[sf_games['passer_player_id'].notna()].groupby(['game_id', 'passer_player_id', 'passer_player_name', 'posteam']).agg(
-    passing_yards=('passing_yards', 'sum'),
-    passing_tds=('pass_touchdown', 'sum'),
-    interceptions=('interception', 'sum')
-).reset_index()
-
-# Rushing stats
-rushing_stats = sf_games[sf_games['rusher_player_id'].notna()].groupby(['game_id', 'rusher_player_id', 'rusher_player_name', 'posteam']).agg(
-    rushing_yards=('rushing_yards', 'sum'),
-    rushing_tds=('rush_touchdown', 'sum')
-).reset_index()
-
-# Receiving stats - we need to identify receiving touchdowns from the touchdown column
-# First, create a flag for receiving touchdowns
-sf_games['receiving_td'] = (sf_games['touchdown'] == 1) & (sf_games['play_type'] == 'pass') & (sf_games['receiver_player_id'].notna())
-
-# Then group by receiver
-receiving_stats = sf_games[sf_games['receiver_player_id'].notna()].groupby(['game_id', 'receiver_player_id', 'receiver_player_name', 'posteam']).agg(
-    receiving_yards=('receiving_yards', 'sum'),
-    receiving_tds=('receiving_td', 'sum')
-).reset_index()
-
-# 6. Rename columns for consistency
-passing_stats = passing_stats.rename(columns={'passer_player_id': 'player_id', 'passer_player_name': 'player_name'})
-rushing_stats = rushing_stats.rename(columns={'rusher_player_id': 'player_id', 'rusher_player_name': 'player_name'})
-receiving_stats = receiving_stats.rename(columns={'receiver_player_id': 'player_id', 'receiver_player_name': 'player_name'})
-
-# 7. Merge all stats together
-player_stats = pd.merge(passing_stats, rushing_stats, on=['game_id', 'player_id', 'player_name', 'posteam'], how='outer')
-player_stats = pd.merge(player_stats, receiving_stats, on=['game_id', 'player_id', 'player_name', 'posteam'], how='outer')
-
-# 8. Fill NaN values with 0
-player_stats = player_stats.fillna(0)
-
-# 9. Filter to only San Francisco 49ers players (on offense)
-player_stats = player_stats[player_stats['posteam'] == team_abbr]
-
-# 10. Load roster info to enrich with player position
-roster_df = nfl.import_seasonal_rosters(years=[season])
-player_stats = player_stats.merge(
-    roster_df[['player_id', 'position', 'team']],
-    on='player_id',
-    how='left'
+SEASON = 2024
+TEAM_ABBR = "SF"
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stats_output")
+
+# Categorical play columns counted per player: column -> values (one count column per value)
+PASS_CATEGORIES = {
+    'pass_location': ['left', 'middle', 'right'],
+    'pass_length': ['short', 'medium', 'deep'],
+}
+RUN_CATEGORIES = {
+    'run_location': ['left', 'middle', 'right'],
+    'run_gap': ['guard', 'tackle', 'end'],
+}
+
+# Every *_player_id column that credits a defender: (role column, stat, credit per play)
+DEFENSIVE_ROLES = [
+    ('solo_tackle_1_player_id', 'solo_tackles', 1.0),
+    ('solo_tackle_2_player_id', 'solo_tackles', 1.0),
+    ('assist_tackle_1_player_id', 'assisted_tackles', 1.0),
+    ('assist_tackle_2_player_id', 'assisted_tackles', 1.0),
+    ('assist_tackle_3_player_id', 'assisted_tackles', 1.0),
+    ('assist_tackle_4_player_id', 'assisted_tackles', 1.0),
+    ('sack_player_id', 'sacks', 1.0),
+    ('half_sack_1_player_id', 'sacks', 0.5),
+    ('half_sack_2_player_id', 'sacks', 0.5),
+    ('interception_player_id', 'interceptions', 1.0),
+    ('forced_fumble_player_1_player_id', 'forced_fumbles', 1.0),
+    ('forced_fumble_player_2_player_id', 'forced_fumbles', 1.0),
+    ('fumble_recovery_1_player_id', 'fumble_recoveries', 1.0),
+    ('fumble_recovery_2_player_id', 'fumble_recoveries', 1.0),
+    ('pass_defense_1_player_id', 'pass_defenses', 1.0),
+    ('pass_defense_2_player_id', 'pass_defenses', 1.0),
+    ('tackle_for_loss_1_player_id', 'tackles_for_loss', 1.0),
+    ('tackle_for_loss_2_player_id', 'tackles_for_loss', 1.0),
+    ('qb_hit_1_player_id', 'qb_hits', 1.0),
+    ('qb_hit_2_player_id', 'qb_hits', 1.0),
+]
+DEFENSIVE_STATS = [
+    'solo_tackles', 'assisted_tackles', 'tackles_for_loss', 'qb_hits', 'sacks',
+    'interceptions', 'forced_fumbles', 'fumble_recoveries', 'pass_defenses',
+]
+
+# Columns that list the defenders who get a row: (player id, player name, team column)
+DEFENSIVE_APPEARANCES = [
+    ('solo_tackle_1_player_id', 'solo_tackle_1_player_name', 'defteam'),
+    ('assist_tackle_1_player_id', 'assist_tackle_1_player_name', 'defteam'),
+    ('sack_player_id', 'sack_player_name', 'defteam'),
+    ('interception_player_id', 'interception_player_name', 'defteam'),
+    ('forced_fumble_player_1_player_id', 'forced_fumble_player_1_player_name', 'forced_fumble_player_1_team'),
+    ('fumble_recovery_1_player_id', 'fumble_recovery_1_player_name', 'fumble_recovery_1_team'),
+    ('pass_defense_1_player_id', 'pass_defense_1_player_name', 'defteam'),
+]
+
+KEYS = ['game_id', 'player_id', 'player_name', 'posteam']
+
+# Play-by-play columns the stats stages read; the cache loads only these
+PBP_COLUMNS = sorted(
+    {
+        'game_id', 'play_id', 'home_team', 'away_team', 'posteam', 'defteam', 'play_type', 'epa',
+        'passer_player_id', 'passer_player_name', 'passing_yards', 'pass_touchdown', 'interception',
+        'air_yards', 'yards_after_catch', 'cpoe', 'qb_epa', 'pass_attempt', 'complete_pass',
+        'rusher_player_id', 'rusher_player_name', 'rushing_yards', 'rush_touchdown', 'rush_attempt',
+        'first_down_rush', 'xyac_mean_yardage', 'xyac_median_yardage', 'xyac_success',
+        'receiver_player_id', 'receiver_player_name', 'receiving_yards', 'touchdown', 'first_down_pass',
+        'down', 'third_down_converted', 'fourth_down_converted', 'yardline_100',
+    }
+    | set(PASS_CATEGORIES) | set(RUN_CATEGORIES)
+    | {column for column, _, _ in DEFENSIVE_ROLES}
+    | {column for appearance in DEFENSIVE_APPEARANCES for column in appearance}
 )
 
-# 11. Export to CSV
-output_path = "49ers_2024_player_box_scores.csv"
-player_stats.to_csv(output_path, index=False)
-print(f"Saved basic player box scores to {output_path}")
 
-# 12. Preview results
-print("\nBasic Stats Preview:")
-print(player_stats.head())
+def load_team_games(season=SEASON, team_abbr=TEAM_ABBR, refresh=False, cache_dir=None):
+    """
+    Play-by-play rows for every game the team played in the season, read from
+    the local Parquet cache (pbp_cache.py) with only PBP_COLUMNS.
+    """
+    # Imported here so the stat functions work without pyarrow (e.g. on a saved play-by-play file)
+    import pbp_cache
+
+    print(f"Loading {season} {team_abbr} play-by-play data...")
+    return pbp_cache.load_team_pbp(season, team_abbr, PBP_COLUMNS, refresh=refresh,
+                                   cache_dir=cache_dir or pbp_cache.CACHE_DIR)
+
+
+def category_counts(plays, keys, categories):
+    """
+    Per-group counts of each categorical value, e.g. pass_location_left, from
+    one-hot columns summed in a single groupby.
+    """
+    dummies = [
+        pd.get_dummies(plays[column]).reindex(columns=values, fill_value=0)
+        .astype('int64').add_prefix(f'{column}_')
+        for column, values in categories.items()
+    ]
+    return pd.concat(dummies, axis=1).groupby([plays[key] for key in keys]).sum()
+
 
 # =============================================
-# SECTION 2: ENHANCED STATS
+# SECTION 1: BASIC STATS (ORIGINAL CODE)
 # =============================================
 
-print("\nGenerating enhanced statistics...")
-
-# 1. Advanced Passing Stats
-advanced_passing = sf_games[sf_games['passer_player_id'].notna()].groupby(['game_id', 'passer_player_id', 'passer_player_name', 'posteam']).agg(
-    air_yards=('air_yards', 'sum'),
-    yards_after_catch=('yards_after_catch', 'sum'),
-    cpoe=('cpoe', 'mean'),  # Completion Percentage Over Expected
-    qb_epa=('qb_epa', 'sum'),  # QB-specific EPA
-    pass_attempts=('pass_attempt', 'sum'),
-    complete_passes=('complete_pass', 'sum'),
-    avg_air_yards=('air_yards', 'mean'),
-    avg_yac=('yards_after_catch', 'mean'),
-    pass_location_left=('pass_location', lambda x: (x == 'left').sum()),
-    pass_location_middle=('pass_location', lambda x: (x == 'middle').sum()),
-    pass_location_right=('pass_location', lambda x: (x == 'right').sum()),
-    pass_length_short=('pass_length', lambda x: (x == 'short').sum()),
-    pass_length_medium=('pass_length', lambda x: (x == 'medium').sum()),
-    pass_length_deep=('pass_length', lambda x: (x == 'deep').sum())
-).reset_index()
-
-# 2. Advanced Rushing/Receiving Stats
-advanced_rushing = sf_games[sf_games['rusher_player_id'].notna()].groupby(['game_id', 'rusher_player_id', 'rusher_player_name', 'posteam']).agg(
-    rush_attempts=('rush_attempt', 'sum'),
-    first_downs_rush=('first_down_rush', 'sum'),
-    xyac_mean=('xyac_mean_yardage', 'mean'),
-    xyac_median=('xyac_median_yardage', 'mean'),
-    xyac_success_rate=('xyac_success', 'mean'),
-    rush_epa=('epa', 'sum'),
-    run_location_left=('run_location', lambda x: (x == 'left').sum()),
-    run_location_middle=('run_location', lambda x: (x == 'middle').sum()),
-    run_location_right=('run_location', lambda x: (x == 'right').sum()),
-    run_gap_guard=('run_gap', lambda x: (x == 'guard').sum()),
-    run_gap_tackle=('run_gap', lambda x: (x == 'tackle').sum()),
-    run_gap_end=('run_gap', lambda x: (x == 'end').sum())
-).reset_index()
-
-advanced_receiving = sf_games[sf_games['receiver_player_id'].notna()].groupby(['game_id', 'receiver_player_id', 'receiver_player_name', 'posteam']).agg(
-    receiving_attempts=('pass_attempt', 'sum'),
-    first_downs_receiving=('first_down_pass', 'sum'),
-    receiving_epa=('epa', 'sum'),
-    avg_yac=('yards_after_catch', 'mean'),
-    avg_air_yards=('air_yards', 'mean')
-).reset_index()
-
-# 3. Defensive Player Stats
-# Create a list of all defensive player IDs from various defensive play columns
-defensive_player_ids = []
-defensive_player_names = []
-
-# Solo tackles
-solo_tackle_players = sf_games[sf_games['solo_tackle_1_player_id'].notna()][['game_id', 'solo_tackle_1_player_id', 'solo_tackle_1_player_name', 'defteam']]
-solo_tackle_players = solo_tackle_players.rename(columns={'solo_tackle_1_player_id': 'player_id', 'solo_tackle_1_player_name': 'player_name'})
-defensive_player_ids.append(solo_tackle_players)
-
-# Assisted tackles
-assist_tackle_players = sf_games[sf_games['assist_tackle_1_player_id'].notna()][['game_id', 'assist_tackle_1_player_id', 'assist_tackle_1_player_name', 'defteam']]
-assist_tackle_players = assist_tackle_players.rename(columns={'assist_tackle_1_player_id': 'player_id', 'assist_tackle_1_player_name': 'player_name'})
-defensive_player_ids.append(assist_tackle_players)
-
-# Sacks
-sack_players = sf_games[sf_games['sack_player_id'].notna()][['game_id', 'sack_player_id', 'sack_player_name', 'defteam']]
-sack_players = sack_players.rename(columns={'sack_player_id': 'player_id', 'sack_player_name': 'player_name'})
-defensive_player_ids.append(sack_players)
-
-# Interceptions
-int_players = sf_games[sf_games['interception_player_id'].notna()][['game_id', 'interception_player_id', 'interception_player_name', 'defteam']]
-int_players = int_players.rename(columns={'interception_player_id': 'player_id', 'interception_player_name': 'player_name'})
-defensive_player_ids.append(int_players)
-
-# Forced fumbles
-ff_players = sf_games[sf_games['forced_fumble_player_1_player_id'].notna()][['game_id', 'forced_fumble_player_1_player_id', 'forced_fumble_player_1_player_name', 'forced_fumble_player_1_team']]
-ff_players = ff_players.rename(columns={'forced_fumble_player_1_player_id': 'player_id', 'forced_fumble_player_1_player_name': 'player_name', 'forced_fumble_player_1_team': 'defteam'})
-defensive_player_ids.append(ff_players)
-
-# Fumble recoveries
-fr_players = sf_games[sf_games['fumble_recovery_1_player_id'].notna()][['game_id', 'fumble_recovery_1_player_id', 'fumble_recovery_1_player_name', 'fumble_recovery_1_team']]
-fr_players = fr_players.rename(columns={'fumble_recovery_1_player_id': 'player_id', 'fumble_recovery_1_player_name': 'player_name', 'fumble_recovery_1_team': 'defteam'})
-defensive_player_ids.append(fr_players)
-
-# Pass defenses
-pd_players = sf_games[sf_games['pass_defense_1_player_id'].notna()][['game_id', 'pass_defense_1_player_id', 'pass_defense_1_player_name', 'defteam']]
-pd_players = pd_players.rename(columns={'pass_defense_1_player_id': 'player_id', 'pass_defense_1_player_name': 'player_name'})
-defensive_player_ids.append(pd_players)
-
-# Combine all defensive player dataframes
-defensive_players = pd.concat(defensive_player_ids, ignore_index=True)
-defensive_players = defensive_players.drop_duplicates()
-
-# Now calculate defensive stats for each player
-defensive_stats = sf_games.groupby(['game_id', 'defteam']).agg(
-    solo_tackles=('solo_tackle', 'sum'),
-    assisted_tackles=('assist_tackle', 'sum'),
-    tackles_for_loss=('tackled_for_loss', 'sum'),
-    qb_hits=('qb_hit', 'sum'),
-    sacks=('sack', 'sum'),
-    interceptions=('interception', 'sum'),
-    forced_fumbles=('fumble_forced', 'sum'),
-    fumble_recoveries=('fumble_recovery_1_yards', lambda x: (x > 0).sum()),
-    pass_defenses=('pass_defense_1_player_id', lambda x: x.notna().sum())
-).reset_index()
-
-# Create a function to calculate individual defensive player stats
-def calculate_defensive_player_stats(player_id, player_name, game_id, team):
-    player_games = sf_games[sf_games['game_id'] == game_id]
-    
-    # Solo tackles
-    solo_tackles = player_games[player_games['solo_tackle_1_player_id'] == player_id].shape[0]
-    solo_tackles += player_games[player_games['solo_tackle_2_player_id'] == player_id].shape[0]
-    
-    # Assisted tackles
-    assist_tackles = player_games[player_games['assist_tackle_1_player_id'] == player_id].shape[0]
-    assist_tackles += player_games[player_games['assist_tackle_2_player_id'] == player_id].shape[0]
-    assist_tackles += player_games[player_games['assist_tackle_3_player_id'] == player_id].shape[0]
-    assist_tackles += player_games[player_games['assist_tackle_4_player_id'] == player_id].shape[0]
-    
-    # Sacks
-    sacks = player_games[player_games['sack_player_id'] == player_id].shape[0]
-    sacks += player_games[player_games['half_sack_1_player_id'] == player_id].shape[0] * 0.5
-    sacks += player_games[player_games['half_sack_2_player_id'] == player_id].shape[0] * 0.5
-    
-    # Interceptions
-    interceptions = player_games[player_games['interception_player_id'] == player_id].shape[0]
-    
-    # Forced fumbles
-    forced_fumbles = player_games[player_games['forced_fumble_player_1_player_id'] == player_id].shape[0]
-    forced_fumbles += player_games[player_games['forced_fumble_player_2_player_id'] == player_id].shape[0]
-    
-    # Fumble recoveries
-    fumble_recoveries = player_games[player_games['fumble_recovery_1_player_id'] == player_id].shape[0]
-    fumble_recoveries += player_games[player_games['fumble_recovery_2_player_id'] == player_id].shape[0]
-    
-    # Pass defenses
-    pass_defenses = player_games[player_games['pass_defense_1_player_id'] == player_id].shape[0]
-    pass_defenses += player_games[player_games['pass_defense_2_player_id'] == player_id].shape[0]
-    
-    # Tackles for loss
-    tackles_for_loss = player_games[player_games['tackle_for_loss_1_player_id'] == player_id].shape[0]
-    tackles_for_loss += player_games[player_games['tackle_for_loss_2_player_id'] == player_id].shape[0]
-    
-    # QB hits
-    qb_hits = player_games[player_games['qb_hit_1_player_id'] == player_id].shape[0]
-    qb_hits += player_games[player_games['qb_hit_2_player_id'] == player_id].shape[0]
-    
-    return pd.Series({
-        'solo_tackles': solo_tackles,
-        'assisted_tackles': assist_tackles,
-        'tackles_for_loss': tackles_for_loss,
-        'qb_hits': qb_hits,
-        'sacks': sacks,
-        'interceptions': interceptions,
-        'forced_fumbles': forced_fumbles,
-        'fumble_recoveries': fumble_recoveries,
-        'pass_defenses': pass_defenses
-    })
+def basic_player_stats(sf_games, roster_df, team_abbr=TEAM_ABBR):
+    # Passing stats
+    passing_stats = sf_games[sf_games['passer_player_id'].notna()].groupby(['game_id', 'passer_player_id', 'passer_player_name', 'posteam']).agg(
+        passing_yards=('passing_yards', 'sum'),
+        passing_tds=('pass_touchdown', 'sum'),
+        interceptions=('interception', 'sum')
+    ).reset_index()
 
-# Apply the function to each defensive player
-defensive_player_stats = []
-for _, row in defensive_players.iterrows():
-    stats = calculate_defensive_player_stats(row['player_id'], row['player_name'], row['game_id'], row['defteam'])
-    stats['game_id'] = row['game_id']
-    stats['player_id'] = row['player_id']
-    stats['player_name'] = row['player_name']
-    stats['posteam'] = row['defteam']  # Use defteam as posteam for consistency
-    defensive_player_stats.append(stats)
-
-# Convert to DataFrame
-defensive_player_stats_df = pd.DataFrame(defensive_player_stats)
-
-# 4. Additional Context Stats
-context_stats = sf_games.groupby(['game_id', 'posteam']).agg(
-    total_plays=('play_id', 'count'),
-    third_down_attempts=('down', lambda x: (x == 3).sum()),
-    third_down_conversions=('third_down_converted', 'sum'),
-    fourth_down_attempts=('down', lambda x: (x == 4).sum()),
-    fourth_down_conversions=('fourth_down_converted', 'sum'),
-    red_zone_attempts=('yardline_100', lambda x: (x <= 20).sum()),
-    red_zone_touchdowns=('touchdown', lambda x: ((x == 1) & (sf_games['yardline_100'] <= 20)).sum()),
-    avg_field_position=('yardline_100', 'mean'),
-    total_epa=('epa', 'sum')
-).reset_index()
-
-# Rename columns for consistency
-advanced_passing = advanced_passing.rename(columns={'passer_player_id': 'player_id', 'passer_player_name': 'player_name'})
-advanced_rushing = advanced_rushing.rename(columns={'rusher_player_id': 'player_id', 'rusher_player_name': 'player_name'})
-advanced_receiving = advanced_receiving.rename(columns={'receiver_player_id': 'player_id', 'receiver_player_name': 'player_name'})
-
-# Merge all enhanced stats
-enhanced_stats = pd.merge(advanced_passing, advanced_rushing, on=['game_id', 'player_id', 'player_name', 'posteam'], how='outer')
-enhanced_stats = pd.merge(enhanced_stats, advanced_receiving, on=['game_id', 'player_id', 'player_name', 'posteam'], how='outer')
-
-# Add defensive player stats
-enhanced_stats = pd.merge(enhanced_stats, defensive_player_stats_df, on=['game_id', 'player_id', 'player_name', 'posteam'], how='outer')
-
-# Add roster information
-enhanced_stats = enhanced_stats.merge(
-    roster_df[['player_id', 'position', 'team']],
-    on='player_id',
-    how='left'
-)
+    # Rushing stats
+    rushing_stats = sf_games[sf_games['rusher_player_id'].notna()].groupby(['game_id', 'rusher_player_id', 'rusher_player_name', 'posteam']).agg(
+        rushing_yards=('rushing_yards', 'sum'),
+        rushing_tds=('rush_touchdown', 'sum')
+    ).reset_index()
 
-# Fill NaN values with 0
-enhanced_stats = enhanced_stats.fillna(0)
+    # Receiving stats - we need to identify receiving touchdowns from the touchdown column
+    # First, create a flag for receiving touchdowns
+    sf_games['receiving_td'] = (sf_games['touchdown'] == 1) & (sf_games['play_type'] == 'pass') & (sf_games['receiver_player_id'].notna())
 
-# Filter to only San Francisco 49ers players
-enhanced_stats = enhanced_stats[enhanced_stats['posteam'] == team_abbr]
+    # Then group by receiver
+    receiving_stats = sf_games[sf_games['receiver_player_id'].notna()].groupby(['game_id', 'receiver_player_id', 'receiver_player_name', 'posteam']).agg(
+        receiving_yards=('receiving_yards', 'sum'),
+        receiving_tds=('receiving_td', 'sum')
+    ).reset_index()
 
-# Export enhanced stats
-enhanced_output_path = "49ers_2024_enhanced_stats.csv"
-enhanced_stats.to_csv(enhanced_output_path, index=False)
-print(f"Saved enhanced player statistics to {enhanced_output_path}")
+    # Rename columns for consistency
+    passing_stats = passing_stats.rename(columns={'passer_player_id': 'player_id', 'passer_player_name': 'player_name'})
+    rushing_stats = rushing_stats.rename(columns={'rusher_player_id': 'player_id', 'rusher_player_name': 'player_name'})
+    receiving_stats = receiving_stats.rename(columns={'receiver_player_id': 'player_id', 'receiver_player_name': 'player_name'})
+
+    # Merge all stats together
+    player_stats = pd.merge(passing_stats, rushing_stats, on=KEYS, how='outer')
+    player_stats = pd.merge(player_stats, receiving_stats, on=KEYS, how='outer')
+
+    # Fill NaN values with 0
+    player_stats = player_stats.fillna(0)
+
+    # Filter to only San Francisco 49ers players (on offense)
+    player_stats = player_stats[player_stats['posteam'] == team_abbr]
+
+    # Enrich with player position
+    return player_stats.merge(roster_df[['player_id', 'position', 'team']], on='player_id', how='left')
 
-# Preview enhanced stats
-print("\nEnhanced Stats Preview:")
-print(enhanced_stats.head())
 
 # =============================================
-# SECTION 3: COLUMN DEFINITIONS
+# SECTION 2: ENHANCED STATS
 # =============================================
 
-print("\nGenerating column definitions...")
+def advanced_passing_stats(sf_games):
+    keys = ['game_id', 'passer_player_id', 'passer_player_name', 'posteam']
+    passes = sf_games[sf_games['passer_player_id'].notna()]
+    advanced_passing = passes.groupby(keys).agg(
+        air_yards=('air_yards', 'sum'),
+        yards_after_catch=('yards_after_catch', 'sum'),
+        cpoe=('cpoe', 'mean'),  # Completion Percentage Over Expected
+        qb_epa=('qb_epa', 'sum'),  # QB-specific EPA
+        pass_attempts=('pass_attempt', 'sum'),
+        complete_passes=('complete_pass', 'sum'),
+        avg_air_yards=('air_yards', 'mean'),
+        avg_yac=('yards_after_catch', 'mean'),
+    ).join(category_counts(passes, keys, PASS_CATEGORIES)).reset_index()
+    return advanced_passing.rename(columns={'passer_player_id': 'player_id', 'passer_player_name': 'player_name'})
+
+
+def advanced_rushing_stats(sf_games):
+    keys = ['game_id', 'rusher_player_id', 'rusher_player_name', 'posteam']
+    rushes = sf_games[sf_games['rusher_player_id'].notna()]
+    advanced_rushing = rushes.groupby(keys).agg(
+        rush_attempts=('rush_attempt', 'sum'),
+        first_downs_rush=('first_down_rush', 'sum'),
+        xyac_mean=('xyac_mean_yardage', 'mean'),
+        xyac_median=('xyac_median_yardage', 'mean'),
+        xyac_success_rate=('xyac_success', 'mean'),
+        rush_epa=('epa', 'sum'),
+    ).join(category_counts(rushes, keys, RUN_CATEGORIES)).reset_index()
+    return advanced_rushing.rename(columns={'rusher_player_id': 'player_id', 'rusher_player_name': 'player_name'})
+
+
+def advanced_receiving_stats(sf_games):
+    advanced_receiving = sf_games[sf_games['receiver_player_id'].notna()].groupby(['game_id', 'receiver_player_id', 'receiver_player_name', 'posteam']).agg(
+        receiving_attempts=('pass_attempt', 'sum'),
+        first_downs_receiving=('first_down_pass', 'sum'),
+        receiving_epa=('epa', 'sum'),
+        avg_yac=('yards_after_catch', 'mean'),
+        avg_air_yards=('air_yards', 'mean')
+    ).reset_index()
+    return advanced_receiving.rename(columns={'receiver_player_id': 'player_id', 'receiver_player_name': 'player_name'})
+
+
+def defensive_players(sf_games):
+    """One row per (game, defender, name, team) credited in a play's first tackle/sack/INT/fumble/pass defense column."""
+    appearances = []
+    for id_column, name_column, team_column in DEFENSIVE_APPEARANCES:
+        rows = sf_games.loc[sf_games[id_column].notna(), ['game_id', id_column, name_column, team_column]]
+        appearances.append(rows.set_axis(['game_id', 'player_id', 'player_name', 'defteam'], axis=1))
+    return pd.concat(appearances, ignore_index=True).drop_duplicates()
+
+
+def defensive_role_table(sf_games):
+    """All defensive *_player_id role columns melted into long (game_id, player_id, stat, credit) rows."""
+    roles = sf_games.melt(
+        id_vars='game_id',
+        value_vars=[column for column, _, _ in DEFENSIVE_ROLES],
+        var_name='role',
+        value_name='player_id',
+    ).dropna(subset=['player_id'])
+    roles['stat'] = roles['role'].map({column: stat for column, stat, _ in DEFENSIVE_ROLES})
+    roles['credit'] = roles['role'].map({column: credit for column, _, credit in DEFENSIVE_ROLES})
+    return roles
+
+
+def defensive_player_stats(sf_games):
+    """Defensive stats for every defender row in one groupby over the melted role table."""
+    totals = (
+        defensive_role_table(sf_games)
+        .groupby(['game_id', 'player_id', 'stat'])['credit'].sum()
+        .unstack('stat', fill_value=0.0)
+        .reindex(columns=DEFENSIVE_STATS, fill_value=0.0)
+        .reset_index()
+    )
+    stats = defensive_players(sf_games).merge(totals, on=['game_id', 'player_id'], how='left')
+    stats[DEFENSIVE_STATS] = stats[DEFENSIVE_STATS].fillna(0.0).astype('float64')
+    stats = stats.rename(columns={'defteam': 'posteam'})  # Use defteam as posteam for consistency
+    return stats[DEFENSIVE_STATS + ['game_id', 'player_id', 'player_name', 'posteam']]
+
+
+def context_stats(sf_games):
+    """Team-level situational totals per game (flag columns summed instead of lambda counters)."""
+    flags = sf_games.assign(
+        third_down=sf_games['down'] == 3,
+        fourth_down=sf_games['down'] == 4,
+        red_zone=sf_games['yardline_100'] <= 20,
+        red_zone_td=(sf_games['touchdown'] == 1) & (sf_games['yardline_100'] <= 20),
+    )
+    return flags.groupby(['game_id', 'posteam']).agg(
+        total_plays=('play_id', 'count'),
+        third_down_attempts=('third_down', 'sum'),
+        third_down_conversions=('third_down_converted', 'sum'),
+        fourth_down_attempts=('fourth_down', 'sum'),
+        fourth_down_conversions=('fourth_down_converted', 'sum'),
+        red_zone_attempts=('red_zone', 'sum'),
+        red_zone_touchdowns=('red_zone_td', 'sum'),
+        avg_field_position=('yardline_100', 'mean'),
+        total_epa=('epa', 'sum')
+    ).reset_index()
+
+
+def enhanced_player_stats(sf_games, roster_df, team_abbr=TEAM_ABBR):
+    # Merge all enhanced stats
+    enhanced_stats = pd.merge(advanced_passing_stats(sf_games), advanced_rushing_stats(sf_games), on=KEYS, how='outer')
+    enhanced_stats = pd.merge(enhanced_stats, advanced_receiving_stats(sf_games), on=KEYS, how='outer')
+
+    # Add defensive player stats
+    enhanced_stats = pd.merge(enhanced_stats, defensive_player_stats(sf_games), on=KEYS, how='outer')
+
+    # Add roster information
+    enhanced_stats = enhanced_stats.merge(roster_df[['player_id', 'position', 'team']], on='player_id', how='left')
+
+    # Fill NaN values with 0
+    enhanced_stats = enhanced_stats.fillna(0)
+
+    # Filter to only San Francisco 49ers players
+    return enhanced_stats[enhanced_stats['posteam'] == team_abbr]
+
+
+# =============================================
+# SECTION 3: COLUMN DEFINITIONS
+# =============================================
 
 # Create a dictionary of column definitions
-column_definitions = {
+COLUMN_DEFINITIONS = {
     # Basic identifiers
     'game_id': 'Unique identifier for each game (format: YYYY_WK_HOME_AWAY)',
     'player_id': 'Unique identifier for each player',
@@ -311,7 +302,7 @@ column_definitions = {
     'posteam': 'Team the player was on for this play',
     'position': 'Player position (QB, RB, WR, TE, OL, DL, LB, DB, etc.)',
     'team': 'Team the player was on for the season',
-    
+
     # Passing stats
     'passing_yards': 'Total passing yards',
     'passing_tds': 'Total passing touchdowns',
@@ -329,7 +320,7 @@ column_definitions = {
     'pass_length_short': 'Number of short passes (0-9 yards)',
     'pass_length_medium': 'Number of medium passes (10-19 yards)',
     'pass_length_deep': 'Number of deep passes (20+ yards)',
-    
+
     # Rushing stats
     'rushing_yards': 'Total rushing yards',
     'rushing_tds': 'Total rushing touchdowns',
@@ -345,7 +336,7 @@ column_definitions = {
     'run_gap_guard': 'Number of rushes through the guard gap',
     'run_gap_tackle': 'Number of rushes through the tackle gap',
     'run_gap_end': 'Number of rushes through the end gap',
-    
+
     # Receiving stats
     'receiving_yards': 'Total receiving yards',
     'receiving_tds': 'Total receiving touchdowns',
@@ -354,7 +345,7 @@ column_definitions = {
     'receiving_epa': 'Expected Points Added by receiving plays',
     'avg_yac_y': 'Average yards after catch per reception',
     'avg_air_yards_y': 'Average air yards per target',
-    
+
     # Defensive stats
     'solo_tackles': 'Number of solo tackles',
     'assisted_tackles': 'Number of assisted tackles',
@@ -365,7 +356,7 @@ column_definitions = {
     'forced_fumbles': 'Number of forced fumbles',
     'fumble_recoveries': 'Number of fumble recoveries',
     'pass_defenses': 'Number of pass defenses (passes defended)',
-    
+
     # Context stats
     'total_plays': 'Total number of plays',
     'third_down_attempts': 'Number of third down attempts',
@@ -378,15 +369,152 @@ column_definitions = {
     'total_epa': 'Total Expected Points Added'
 }
 
-# Create a DataFrame from the dictionary
-column_definitions_df = pd.DataFrame({
-    'column_name': list(column_definitions.keys()),
-    'definition': list(column_definitions.values())
-})
 
-# Export column definitions
-column_definitions_path = "49ers_2024_column_definitions.csv"
-column_definitions_df.to_csv(column_definitions_path, index=False)
-print(f"Saved column definitions to {column_definitions_path}")
+def main(season=SEASON, team_abbr=TEAM_ABBR, refresh=False):
+    # Load play-by-play data for the games involving the San Francisco 49ers
+    sf_games = load_team_games(season, team_abbr, refresh)
+    roster_df = nfl.import_seasonal_rosters(years=[season])
+
+    player_stats = basic_player_stats(sf_games, roster_df, team_abbr)
+    output_path = "49ers_2024_player_box_scores.csv"
+    player_stats.to_csv(output_path, index=False)
+    print(f"Saved basic player box scores to {output_path}")
+    print("\nBasic Stats Preview:")
+    print(player_stats.head())
+
+    print("\nGenerating enhanced statistics...")
+    enhanced_stats = enhanced_player_stats(sf_games, roster_df, team_abbr)
+    enhanced_output_path = "49ers_2024_enhanced_stats.csv"
+    enhanced_stats.to_csv(enhanced_output_path, index=False)
+    print(f"Saved enhanced player statistics to {enhanced_output_path}")
+    print("\nEnhanced Stats Preview:")
+    print(enhanced_stats.head())
+
+    print("\nGenerating column definitions...")
+    column_definitions_df = pd.DataFrame({
+        'column_name': list(COLUMN_DEFINITIONS.keys()),
+        'definition': list(COLUMN_DEFINITIONS.values())
+    })
+    column_definitions_path = "49ers_2024_column_definitions.csv"
+    column_definitions_df.to_csv(column_definitions_path, index=False)
+    print(f"Saved column definitions to {column_definitions_path}")
+
+    print("\nScript completed successfully!")
+
+
+# =============================================
+# SECTION 4: MULTI-TEAM PIPELINE
+# =============================================
 
-print("\nScript completed successfully!")
+# Per-season rosters, set once per worker process by init_worker
+_ROSTERS = {}
+
+
+def init_worker(rosters):
+    global _ROSTERS
+    _ROSTERS = rosters
+    try:
+        # One pool process per core; keep Arrow's reader from adding threads on top
+        import pyarrow as pa
+        pa.set_cpu_count(1)
+        pa.set_io_thread_count(1)
+    except ImportError:
+        pass
+
+
+def build_partition(season, team_abbr, output_dir=OUTPUT_DIR, cache_dir=None):
+    """
+    Stats for one (season, team) partition, written to
+    output_dir/season=YYYY/team=XX/. Reads the cache only, never refreshes it.
+    """
+    started = time.perf_counter()
+    team_games = load_team_games(season, team_abbr, cache_dir=cache_dir)
+    roster_df = _ROSTERS[season]
+
+    path = os.path.join(output_dir, f"season={season}", f"team={team_abbr}")
+    os.makedirs(path, exist_ok=True)
+    basic_player_stats(team_games, roster_df, team_abbr).to_csv(os.path.join(path, "player_box_scores.csv"), index=False)
+    enhanced_stats = enhanced_player_stats(team_games, roster_df, team_abbr)
+    enhanced_stats.to_csv(os.path.join(path, "enhanced_stats.csv"), index=False)
+    return {
+        'season': season,
+        'team': team_abbr,
+        'games': team_games['game_id'].nunique(),
+        'rows': len(enhanced_stats),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def run_pipeline(seasons, teams=None, workers=None, output_dir=OUTPUT_DIR, refresh=False, cache_dir=None):
+    """
+    Build every (season, team) partition across a process pool. The cache and
+    the rosters are prepared here first, so workers share read-only inputs and
+    write disjoint outputs. `teams=None` means every team in the season.
+    """
+    import pbp_cache
+
+    started = time.perf_counter()
+    cache_dir = cache_dir or pbp_cache.CACHE_DIR
+    rosters = {}
+    tasks = []
+    for season in seasons:
+        if refresh or not pbp_cache.is_cached(season, PBP_COLUMNS, cache_dir):
+            pbp_cache.refresh_season(season, PBP_COLUMNS, cache_dir)
+        rosters[season] = nfl.import_seasonal_rosters(years=[season])[['player_id', 'position', 'team']]
+        tasks.extend((season, team) for team in (teams or pbp_cache.cached_teams(season, cache_dir)))
+
+    os.makedirs(output_dir, exist_ok=True)
+    pd.DataFrame({
+        'column_name': list(COLUMN_DEFINITIONS.keys()),
+        'definition': list(COLUMN_DEFINITIONS.values())
+    }).to_csv(os.path.join(output_dir, "column_definitions.csv"), index=False)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    print(f"[PIPELINE] {len(tasks)} partitions on {workers} worker(s)")
+    results = []
+    if workers == 1:
+        init_worker(rosters)
+        for season, team in tasks:
+            results.append(build_partition(season, team, output_dir, cache_dir))
+            print(f"[PIPELINE] {season} {team}: {results[-1]['rows']} rows in {results[-1]['seconds']}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(rosters,)) as pool:
+            futures = {pool.submit(build_partition, season, team, output_dir, cache_dir): (season, team) for season, team in tasks}
+            for future in as_completed(futures):
+                season, team = futures[future]
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"[PIPELINE] {season} {team} failed: {e}")
+                    continue
+                print(f"[PIPELINE] {season} {team}: {results[-1]['rows']} rows in {results[-1]['seconds']}s")
+
+    summary = pd.DataFrame(results, columns=['season', 'team', 'games', 'rows', 'seconds'])
+    summary.sort_values(['season', 'team']).to_csv(os.path.join(output_dir, "_summary.csv"), index=False)
+    print(f"[PIPELINE] Built {len(results)} of {len(tasks)} partitions in {time.perf_counter() - started:.1f}s")
+    return summary
+
+
+def parse_seasons(value):
+    """'2024', '2020-2024' or '2022,2024' -> list of seasons."""
+    seasons = []
+    for part in value.split(','):
+        first, _, last = part.strip().partition('-')
+        seasons.extend(range(int(first), int(last or first) + 1))
+    return seasons
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build per-game player stats CSVs from nflverse play-by-play")
+    parser.add_argument("--refresh", action="store_true", help="Re-download the season and update changed weeks in the cache")
+    parser.add_argument("--seasons", type=parse_seasons, help="Multi-team run: seasons such as 2024, 2020-2024 or 2022,2024")
+    parser.add_argument("--teams", help="Multi-team run: comma-separated abbreviations, or 'all' (default)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    if args.seasons or args.teams:
+        teams = None if args.teams in (None, 'all') else [team.strip().upper() for team in args.teams.split(',')]
+        run_pipeline(args.seasons or [SEASON], teams, args.workers, args.output_dir, args.refresh)
+    else:
+        main(refresh=args.refresh)
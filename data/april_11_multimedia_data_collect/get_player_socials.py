@@ -1,11 +1,11 @@
-import requests
 import csv
 import os
-import time
 import sys
 from dotenv import load_dotenv
 from pathlib import Path
 
+from http_fetch import FetchSession, fetch
+
 # Load environment variables from .env file (for API key)
 load_dotenv()
 
@@ -13,8 +13,51 @@ load_dotenv()
 SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
 
 SERP_API_KEY = os.getenv("SERP_API_KEY")  # Or just hardcode for testing, not recommended
+SERP_API_URL = "https://serpapi.com/search"
+# Each search costs API credits and the answer rarely changes, so cached results are reused for a month
+SERP_CACHE_MAX_AGE = 30 * 24 * 3600
+# Players looked up concurrently before progress is saved
+SERP_BATCH_SIZE = 10
+
+def serp_params(query):
+    return {
+        "engine": "google",
+        "q": query,
+        "api_key": SERP_API_KEY,
+    }
+
+def instagram_link(page, query):
+    """Best guess at the Instagram page URL in a SerpAPI response, else empty string."""
+    if not page.ok:
+        print(f"[ERROR] Request failed for {query}: {page.error}")
+        return ""
+    try:
+        data = page.json()
+    except ValueError as e:
+        print(f"[ERROR] Unexpected response for {query}: {str(e)}")
+        return ""
 
-def get_instagram_handle(query, timeout=10, retries=3, delay_between_retries=2):
+    # Check if we have organic results
+    if "organic_results" not in data:
+        print(f"[WARNING] No organic_results found in API response for {query}")
+        print(f"[DEBUG] Response keys: {list(data.keys())}")
+        return ""
+
+    # Typical structure: data['organic_results'] - parse each for relevant domain
+    results = data.get("organic_results", [])
+    print(f"[DEBUG] Found {len(results)} organic results")
+
+    for r in results:
+        link = r.get("link", "")
+        # If it has 'instagram.com', let's assume it's correct
+        if "instagram.com" in link.lower():
+            print(f"[DEBUG] Found Instagram link: {link}")
+            return link
+
+    print(f"[WARNING] No Instagram links found for {query}")
+    return ""
+
+def get_instagram_handle(query, timeout=10, retries=3):
     """
     Uses SerpAPI to search for query: e.g. 'Brock Purdy Instagram'
     Returns the best guess at Instagram handle/page URL if found, else empty string.
@@ -22,67 +65,21 @@ def get_instagram_handle(query, timeout=10, retries=3, delay_between_retries=2):
     Args:
         query: Search query string
         timeout: Request timeout in seconds
-        retries: Number of retries if request fails
-        delay_between_retries: Seconds to wait between retries
+        retries: Number of attempts; http_fetch backs off between them
     """
     if not SERP_API_KEY:
         raise ValueError("SERP_API_KEY environment variable not set or provided!")
-    
-    url = "https://serpapi.com/search"
-    params = {
-        "engine": "google",
-        "q": query,
-        "api_key": SERP_API_KEY,
-    }
-    
-    for attempt in range(retries):
-        try:
-            print(f"[DEBUG] Sending API request for: {query}")
-            response = requests.get(url, params=params, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Check if we have organic results
-            if "organic_results" not in data:
-                print(f"[WARNING] No organic_results found in API response for {query}")
-                print(f"[DEBUG] Response keys: {list(data.keys())}")
-                return ""
-            
-            # Typical structure: data['organic_results'] - parse each for relevant domain
-            results = data.get("organic_results", [])
-            print(f"[DEBUG] Found {len(results)} organic results")
-            
-            for r in results:
-                link = r.get("link", "")
-                # If it has 'instagram.com', let's assume it's correct
-                if "instagram.com" in link.lower():
-                    print(f"[DEBUG] Found Instagram link: {link}")
-                    return link
-            
-            print(f"[WARNING] No Instagram links found for {query}")
-            return ""
-            
-        except requests.exceptions.Timeout:
-            print(f"[ERROR] Request timed out for {query} (attempt {attempt+1}/{retries})")
-            if attempt < retries - 1:
-                print(f"[INFO] Retrying in {delay_between_retries} seconds...")
-                time.sleep(delay_between_retries)
-            else:
-                print(f"[ERROR] All retries failed for {query}")
-                return ""
-                
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Request failed for {query}: {str(e)} (attempt {attempt+1}/{retries})")
-            if attempt < retries - 1:
-                print(f"[INFO] Retrying in {delay_between_retries} seconds...")
-                time.sleep(delay_between_retries)
-            else:
-                print(f"[ERROR] All retries failed for {query}")
-                return ""
-                
-        except Exception as e:
-            print(f"[ERROR] Unexpected error for {query}: {str(e)}")
-            return ""
+
+    print(f"[DEBUG] Sending API request for: {query}")
+    page = fetch(SERP_API_URL, serp_params(query), max_age=SERP_CACHE_MAX_AGE,
+                 fetcher_options={"timeout": timeout, "max_retries": retries - 1})
+    return instagram_link(page, query)
+
+def save_progress(output_csv, input_fieldnames, rows):
+    with open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
+        writer = csv.DictWriter(f_out, fieldnames=input_fieldnames + ['instagram_url'])
+        writer.writeheader()
+        writer.writerows(rows)
 
 def enrich_niners_socials(input_csv='niners_players_headshots.csv',
                           output_csv='niners_players_headshots_with_socials.csv',
@@ -142,56 +139,51 @@ def enrich_niners_socials(input_csv='niners_players_headshots.csv',
         with open(input_csv, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             input_fieldnames = reader.fieldnames
-            
-            # Skip to the start player
-            for _ in range(start_index):
-                next(reader)
-            
-            # Process remaining players
-            for i, row in enumerate(reader, start_index + 1):
-                if i > end_index:
-                    print(f"[INFO] Reached maximum number of players. Stopping.")
-                    break
-                    
-                player_name = row['name']
-                print(f"[INFO] Processing player {i}/{end_index}: {player_name}")
-                
-                # Skip if already processed
-                if any(existing_row['name'] == player_name for existing_row in existing_data):
-                    print(f"[INFO] {player_name} already processed. Skipping.")
-                    continue
-                
-                # Construct a query like 'PLAYER NAME instagram'
-                query = f"{player_name} NFL 49ers instagram"
-                
-                try:
-                    insta_url = get_instagram_handle(query)
-                    row['instagram_url'] = insta_url
-                    
-                    # Print result
-                    if insta_url:
-                        print(f"[SUCCESS] Found Instagram for {player_name}: {insta_url}")
-                    else:
-                        print(f"[WARNING] No Instagram found for {player_name}")
-                    
-                    # Append new data
-                    existing_data.append(row)
-                    
-                    # Save progress after each player
-                    with open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
-                        output_fieldnames = input_fieldnames + ['instagram_url']
-                        writer = csv.DictWriter(f_out, fieldnames=output_fieldnames)
-                        writer.writeheader()
-                        writer.writerows(existing_data)
-                    
-                    # Add delay between requests to avoid rate limiting
-                    if i < end_index:
-                        print(f"[INFO] Waiting {delay_between_requests} seconds before next request...")
-                        time.sleep(delay_between_requests)
-                        
-                except KeyboardInterrupt:
-                    print("\n[INFO] Process interrupted by user. Saving progress...")
-                    break
+            rows = list(reader)[start_index:end_index]
+
+        # Skip players that were already processed
+        existing_names = {existing_row['name'] for existing_row in existing_data}
+        pending = []
+        for i, row in enumerate(rows, start_index + 1):
+            if row['name'] in existing_names:
+                print(f"[INFO] {row['name']} already processed. Skipping.")
+            else:
+                pending.append((i, row))
+
+        # The delay between requests becomes SerpAPI's rate limit; lookups in a batch overlap.
+        # One FetchSession serves every batch, so connections and the rate limit carry over.
+        rates = {"serpapi.com": (1.0 / delay_between_requests, 1)} if delay_between_requests > 0 else None
+        try:
+            with FetchSession(rates=rates) as fetch_session:
+                for batch_start in range(0, len(pending), SERP_BATCH_SIZE):
+                    batch = pending[batch_start:batch_start + SERP_BATCH_SIZE]
+                    # Construct a query like 'PLAYER NAME instagram'
+                    queries = [f"{row['name']} NFL 49ers instagram" for _, row in batch]
+                    pages = fetch_session.fetch_many(
+                        [(SERP_API_URL, serp_params(query)) for query in queries],
+                        max_age=SERP_CACHE_MAX_AGE,
+                    )
+
+                    for (i, row), query, page in zip(batch, queries, pages):
+                        player_name = row['name']
+                        print(f"[INFO] Processing player {i}/{end_index}: {player_name}")
+                        insta_url = instagram_link(page, query)
+                        row['instagram_url'] = insta_url
+
+                        # Print result
+                        if insta_url:
+                            print(f"[SUCCESS] Found Instagram for {player_name}: {insta_url}")
+                        else:
+                            print(f"[WARNING] No Instagram found for {player_name}")
+
+                        # Append new data
+                        existing_data.append(row)
+
+                    # Save progress after each batch
+                    save_progress(output_csv, input_fieldnames, existing_data)
+        except KeyboardInterrupt:
+            print("\n[INFO] Process interrupted by user. Saving progress...")
+            save_progress(output_csv, input_fieldnames, existing_data)
         
         print(f"[INFO] Social data saved to {output_csv}")
         print(f"[INFO] Processed {len(existing_data)}/{total_players} players")
@@ -201,11 +193,7 @@ def enrich_niners_socials(input_csv='niners_players_headshots.csv',
         # Try to save any data collected so far
         if existing_data:
             try:
-                with open(output_csv, 'w', newline='', encoding='utf-8') as f_out:
-                    output_fieldnames = input_fieldnames + ['instagram_url']
-                    writer = csv.DictWriter(f_out, fieldnames=output_fieldnames)
-                    writer.writeheader()
-                    writer.writerows(existing_data)
+                save_progress(output_csv, input_fieldnames, existing_data)
                 print(f"[INFO] Partial data saved to {output_csv}")
             except Exception:
                 print("[ERROR] Failed to save partial data")
@@ -1,6 +1,32 @@
+"""
+Sync the 49ers highlights playlist into youtube_highlights.csv.
+
+By default the sync is incremental. youtube_sync_state.json keeps the known
+video IDs. Paging collects every unknown video and stops after the first
+page made up entirely of known videos. New rows are appended to the CSV,
+and match_highlights matches only those videos. The first run, or --full,
+pages through the whole playlist and rewrites the CSV.
+
+Required playlist order: new videos must be added near the top, ahead of
+the first full page (50 items) of already synced videos. This is YouTube's
+"add new videos to top of playlist" setting. The rest of the playlist need
+not be in date order, and the highlights playlist is not. A video inserted
+further down is only picked up by --full.
+
+Set IFX_YOUTUBE_BACKEND=fake to serve the playlist from backends/fake_youtube.py
+instead of the YouTube Data API.
+
+Usage:
+    python get_youtube_playlist_videos.py           # incremental sync
+    python get_youtube_playlist_videos.py --full    # re-download everything
+"""
+
+import argparse
 import os
 import csv
-from googleapiclient.discovery import build
+import json
+import sys
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 from pathlib import Path
 
@@ -10,56 +36,157 @@ load_dotenv()
 API_KEY = os.getenv("YOUTUBE_API_KEY")  # Or replace with your key in code
 # Example 49ers highlights playlist:
 PLAYLIST_ID = "PLBB205pkCsyvZ6tjCh_m5s21D0eeYJ8Ly"
+OUTPUT_CSV = "youtube_highlights.csv"
+STATE_PATH = "youtube_sync_state.json"
+FIELDNAMES = ["video_id", "title", "description", "published_at", "video_url"]
 
-def get_youtube_videos(playlist_id=PLAYLIST_ID, output_csv='youtube_highlights.csv'):
-    """
-    Fetches videos from a YouTube playlist (title, video ID, published date, etc.)
-    Writes output to CSV.
-    """
+# "api" (default) or "fake" for the local responder in backends/fake_youtube.py
+YOUTUBE_BACKEND = os.environ.get("IFX_YOUTUBE_BACKEND", "api").strip().lower()
+
+
+def get_youtube_client():
+    if YOUTUBE_BACKEND == "fake":
+        sys.path.append(str(Path(__file__).resolve().parents[2]))
+        from backends.fake_youtube import FakeYouTube
+        return FakeYouTube()
+    if YOUTUBE_BACKEND != "api":
+        raise ValueError(f"Unknown IFX_YOUTUBE_BACKEND '{YOUTUBE_BACKEND}'. Use 'api' or 'fake'.")
     if not API_KEY:
         raise ValueError("YOUTUBE_API_KEY environment variable not set or provided!")
-    
-    youtube = build('youtube', 'v3', developerKey=API_KEY)
-    
+    from googleapiclient.discovery import build
+    return build('youtube', 'v3', developerKey=API_KEY)
+
+
+def video_row(item):
+    snippet = item['snippet']
+    video_id = snippet['resourceId']['videoId']
+    return {
+        "video_id": video_id,
+        "title": snippet['title'],
+        "description": snippet['description'],
+        "published_at": snippet['publishedAt'],
+        "video_url": f"https://www.youtube.com/watch?v={video_id}"
+    }
+
+
+def fetch_playlist(youtube, playlist_id, known_ids=None):
+    """
+    Playlist rows in playlist order. With `known_ids`, only unknown videos are
+    returned and paging stops after the first page whose videos are all
+    known (see the module docstring for the order this relies on).
+    Returns (rows, pages fetched).
+    """
     video_data = []
     page_token = None
+    pages = 0
 
     while True:
-        playlist_req = youtube.playlistItems().list(
+        playlist_res = youtube.playlistItems().list(
             part="snippet",
             playlistId=playlist_id,
             maxResults=50,
             pageToken=page_token
-        )
-        playlist_res = playlist_req.execute()
-        
-        for item in playlist_res['items']:
-            snippet = item['snippet']
-            title = snippet['title']
-            description = snippet['description']
-            video_id = snippet['resourceId']['videoId']
-            published_at = snippet['publishedAt']
-            
-            video_data.append({
-                "video_id": video_id,
-                "title": title,
-                "description": description,
-                "published_at": published_at,
-                "video_url": f"https://www.youtube.com/watch?v={video_id}"
-            })
-        
+        ).execute()
+        pages += 1
+
+        page_rows = [video_row(item) for item in playlist_res['items']]
+        new_rows = [row for row in page_rows if known_ids is None or row['video_id'] not in known_ids]
+        video_data.extend(new_rows)
+        if known_ids is not None and page_rows and not new_rows:
+            return video_data, pages
+
         page_token = playlist_res.get('nextPageToken')
         if not page_token:
-            break
-    
+            return video_data, pages
+
+
+def load_state(state_path=STATE_PATH, output_csv=OUTPUT_CSV):
+    """
+    Sync state, or one rebuilt from an existing CSV (e.g. written before the
+    state file existed). None when there is nothing to sync against.
+    """
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    if not os.path.exists(output_csv):
+        return None
+    with open(output_csv, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return {
+        "playlist_id": PLAYLIST_ID,
+        "video_ids": [row['video_id'] for row in rows],
+    }
+
+
+def save_state(video_rows, playlist_id, state_path=STATE_PATH, state=None):
+    state = dict(state or {"video_ids": []})
+    state["playlist_id"] = playlist_id
+    state["video_ids"] = list(dict.fromkeys(state["video_ids"] + [row['video_id'] for row in video_rows]))
+    # Written by earlier versions; the stop rule only needs the known IDs
+    state.pop("newest_published_at", None)
+    state["synced_at"] = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    return state
+
+
+def get_youtube_videos(playlist_id=PLAYLIST_ID, output_csv=OUTPUT_CSV, youtube=None, state_path=STATE_PATH):
+    """
+    Fetches videos from a YouTube playlist (title, video ID, published date, etc.)
+    Writes output to CSV.
+    """
+    youtube = youtube or get_youtube_client()
+    video_data, pages = fetch_playlist(youtube, playlist_id)
+
     # Write to CSV
     with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-        fieldnames = ["video_id", "title", "description", "published_at", "video_url"]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
         writer.writeheader()
         writer.writerows(video_data)
-    
-    print(f"[INFO] YouTube playlist data saved to {output_csv}")
+    save_state(video_data, playlist_id, state_path)
+
+    print(f"[INFO] YouTube playlist data saved to {output_csv} ({len(video_data)} videos, {pages} pages)")
+    return video_data
+
+
+def sync_youtube_videos(playlist_id=PLAYLIST_ID, output_csv=OUTPUT_CSV, youtube=None, state_path=STATE_PATH, match=True):
+    """
+    Incremental sync: fetch only the videos added since the last run, append
+    them to the CSV and match them to players and games. Returns the new rows.
+    """
+    state = load_state(state_path, output_csv)
+    if state is None or state.get("playlist_id") != playlist_id or not os.path.exists(output_csv):
+        print("[INFO] No previous sync for this playlist, fetching all of it")
+        video_data = get_youtube_videos(playlist_id, output_csv, youtube, state_path)
+        if match:
+            import match_highlights
+            match_highlights.main()
+        return video_data
+
+    youtube = youtube or get_youtube_client()
+    new_rows, pages = fetch_playlist(youtube, playlist_id, set(state["video_ids"]))
+    if new_rows:
+        with open(output_csv, 'a', newline='', encoding='utf-8') as f:
+            csv.DictWriter(f, fieldnames=FIELDNAMES).writerows(new_rows)
+    save_state(new_rows, playlist_id, state_path, state)
+    print(f"[INFO] {len(new_rows)} new videos in {pages} page(s); appended to {output_csv}")
+
+    if new_rows and match:
+        import match_highlights
+        match_highlights.match_new_highlights(new_rows)
+    return new_rows
+
 
 if __name__ == "__main__":
-    get_youtube_videos()
+    parser = argparse.ArgumentParser(description="Sync the highlights playlist into youtube_highlights.csv")
+    parser.add_argument("--full", action="store_true", help="Fetch the whole playlist and rewrite the CSV")
+    parser.add_argument("--no-match", action="store_true", help="Skip matching videos to players and games")
+    args = parser.parse_args()
+
+    if args.full:
+        get_youtube_videos()
+        if not args.no_match:
+            import match_highlights
+            match_highlights.main()
+    else:
+        sync_youtube_videos(match=not args.no_match)
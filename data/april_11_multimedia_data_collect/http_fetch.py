@@ -0,0 +1,336 @@
+"""
+Shared HTTP fetch layer for the scrapers in this folder.
+
+One httpx.AsyncClient per run, with keep-alive connection pooling. Every
+request goes through:
+    - a per-host token bucket (HOST_RATES), so a parallel refresh stays
+      within the same politeness limits the old time.sleep() delays gave
+    - retries with jittered exponential backoff on timeouts, connection
+      errors, 429 and 5xx (Retry-After is honoured)
+    - an on-disk cache (http_cache/). Cached pages are revalidated with
+      If-None-Match / If-Modified-Since, so an unchanged page costs a 304.
+      A `max_age` serves the cache without asking at all, for paid APIs
+      whose answers rarely change.
+
+The scrapers are plain scripts, so fetch() and fetch_many() wrap the async
+Fetcher in a blocking call:
+
+    page = fetch(TARGET_URL)
+    if page.ok:
+        soup = BeautifulSoup(page.text, 'html.parser')
+
+    for page in fetch_many(article_urls):
+        ...
+
+Each of those calls opens its own client. A script that fetches in several
+steps keeps one FetchSession open instead, so the connection pool and the
+token buckets carry over from one step to the next:
+
+    with FetchSession() as session:
+        listing = session.fetch(TARGET_URL)
+        pages = session.fetch_many(article_urls)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+# host -> (requests per second, burst)
+HOST_RATES = {
+    "www.ninersnation.com": (1.0, 2),
+    "www.nfl.com": (2.0, 4),
+    "www.49ers.com": (1.0, 2),
+    "serpapi.com": (1.0, 1),
+}
+DEFAULT_RATE = (2.0, 4)
+
+MAX_CONNECTIONS = 10
+TIMEOUT = 15.0
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Query parameters kept out of the cache metadata files
+SECRET_PARAMS = {"api_key", "key", "token"}
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = None
+    content: bytes = b""
+    headers: dict = None
+    from_cache: bool = False     # served from disk, with or without a 304
+    not_modified: bool = False   # the server answered 304
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.status is not None and 200 <= self.status < 300
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def encoding(self):
+        content_type = (self.headers or {}).get("content-type", "")
+        for part in content_type.split(";"):
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, `burst` back to back."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HttpCache:
+    """Response bodies and validators on disk, keyed by URL and query."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(url, params=None):
+        query = urlencode(sorted((params or {}).items()), doseq=True)
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".json", base + ".body"
+
+    def get(self, key):
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, key, url, params, headers, content):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        public_params = {name: value for name, value in (params or {}).items() if name not in SECRET_PARAMS}
+        meta = {
+            "url": url,
+            "params": public_params,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "fetched_at": time.time(),
+        }
+        # Body first, so a crash never leaves metadata pointing at a missing body
+        with open(body_path + ".tmp", "wb") as f:
+            f.write(content)
+        os.replace(body_path + ".tmp", body_path)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def touch(self, key, meta):
+        meta_path, _ = self._paths(key)
+        meta = dict(meta, fetched_at=time.time())
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+def retry_delay(attempt, response=None):
+    """Retry-After when the server sends seconds or a date, else full-jitter backoff."""
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(BACKOFF_CAP, max(0.0, float(retry_after)))
+        except ValueError:
+            try:
+                return min(BACKOFF_CAP, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class Fetcher:
+    """
+    Async GETs with pooling, per-host rate limits, retries and the disk cache.
+
+        async with Fetcher() as fetcher:
+            pages = await fetcher.get_many(urls)
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, rates=None, max_connections=MAX_CONNECTIONS,
+                 timeout=TIMEOUT, max_retries=MAX_RETRIES, use_cache=True, transport=None):
+        self.cache = HttpCache(cache_dir) if use_cache else None
+        self.rates = dict(HOST_RATES, **(rates or {}))
+        self.max_retries = max_retries
+        self.buckets = {}
+        self.stats = {"requests": 0, "not_modified": 0, "cache_hits": 0, "retries": 0, "errors": 0}
+        self.client = httpx.AsyncClient(
+            headers={"User-Agent": USER_AGENT},
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    def bucket(self, url):
+        host = urlsplit(url).hostname or ""
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(*self.rates.get(host, DEFAULT_RATE))
+        return self.buckets[host]
+
+    async def get(self, url, params=None, headers=None, max_age=None, use_cache=True):
+        """
+        GET with the cache: fresh within `max_age` seconds -> no request,
+        otherwise a conditional request when validators are stored.
+        """
+        cache = self.cache if use_cache else None
+        key = HttpCache.key(url, params) if cache else None
+        meta, cached_body = cache.get(key) if cache else (None, None)
+        if meta is not None and max_age is not None and time.time() - meta["fetched_at"] < max_age:
+            self.stats["cache_hits"] += 1
+            return FetchResult(url, 200, cached_body, {"content-type": meta.get("content_type") or ""}, from_cache=True)
+
+        request_headers = dict(headers or {})
+        if meta is not None:
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        for attempt in range(self.max_retries + 1):
+            await self.bucket(url).acquire()
+            self.stats["requests"] += 1
+            response = None
+            try:
+                response = await self.client.get(url, params=params, headers=request_headers)
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code == 304 and meta is not None:
+                    self.stats["not_modified"] += 1
+                    cache.touch(key, meta)
+                    return FetchResult(url, 200, cached_body, {"content-type": meta.get("content_type") or ""},
+                                       from_cache=True, not_modified=True)
+                if response.status_code not in RETRY_STATUSES:
+                    result = FetchResult(url, response.status_code, response.content, dict(response.headers))
+                    if response.is_success and cache:
+                        cache.put(key, url, params, response.headers, response.content)
+                    elif not response.is_success:
+                        result.error = f"HTTP {response.status_code}"
+                        self.stats["errors"] += 1
+                    return result
+                error = f"HTTP {response.status_code}"
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                delay = retry_delay(attempt, response)
+                print(f"[FETCH] {error} for {url}; retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        self.stats["errors"] += 1
+        print(f"[FETCH] Giving up on {url}: {error}")
+        return FetchResult(url, response.status_code if response is not None else None, error=error)
+
+    async def get_many(self, requests, **kwargs):
+        """
+        GETs for URLs or (url, params) pairs, run concurrently; the rate limits
+        bound the parallelism per host. Results come back in request order.
+        """
+        return await asyncio.gather(*(
+            self.get(request, **kwargs) if isinstance(request, str) else self.get(*request, **kwargs)
+            for request in requests
+        ))
+
+
+class FetchSession:
+    """
+    Blocking front end to one Fetcher, driven on a private event loop. Use it
+    as a context manager; closing it closes the client and logs the totals.
+    """
+
+    def __init__(self, **fetcher_options):
+        self.loop = asyncio.new_event_loop()
+        self.fetcher = Fetcher(**fetcher_options)
+        self.urls = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def fetch(self, url, params=None, **kwargs):
+        """Blocking single GET."""
+        return self.fetch_many([(url, params)], **kwargs)[0]
+
+    def fetch_many(self, requests, **kwargs):
+        """Blocking parallel GETs (URLs or (url, params) pairs); FetchResults in request order."""
+        results = self.loop.run_until_complete(self.fetcher.get_many(requests, **kwargs))
+        self.urls += len(results)
+        return results
+
+    def close(self):
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.run_until_complete(self.fetcher.client.aclose())
+        finally:
+            self.loop.close()
+        stats = self.fetcher.stats
+        print(f"[FETCH] {self.urls} URLs: {stats['requests']} requests, {stats['not_modified']} not modified, "
+              f"{stats['cache_hits']} cache hits, {stats['retries']} retries, {stats['errors']} errors")
+
+
+def fetch(url, params=None, **kwargs):
+    """Blocking single GET through a short-lived Fetcher."""
+    return fetch_many([(url, params)], **kwargs)[0]
+
+
+def fetch_many(requests, fetcher_options=None, **kwargs):
+    """Blocking parallel GETs (URLs or (url, params) pairs); FetchResults in request order."""
+    with FetchSession(**(fetcher_options or {})) as session:
+        return session.fetch_many(requests, **kwargs)
@@ -3,6 +3,7 @@ import re
 import os
 from pathlib import Path
 from collections import defaultdict
+from datetime import datetime, timedelta
 
 
 # Define file paths
@@ -65,77 +66,262 @@ def load_games():
             })
     return games
 
-def match_highlights_to_players_and_games(highlights, players, games):
-    """Match YouTube highlights to players and games."""
-    # Create a copy of highlights to track which ones are assigned
-    unassigned_highlights = highlights.copy()
-    
-    # Track assigned videos
-    assigned_video_ids = set()
-    
-    # Match players first
+# Title matches, by alias type. A candidate needs at least one of these in the
+# title; an entity's title score is its best alias there.
+PLAYER_FULL_NAME_SCORE = 10
+PLAYER_LAST_NAME_SCORE = 4     # only for last names unique on the roster
+GAME_OPPONENT_SCORE = 5        # "Detroit Lions"
+GAME_NICKNAME_SCORE = 4        # "Lions"
+ALIAS_SCORES = {
+    'full': PLAYER_FULL_NAME_SCORE,
+    'last': PLAYER_LAST_NAME_SCORE,
+    'opponent': GAME_OPPONENT_SCORE,
+    'nickname': GAME_NICKNAME_SCORE,
+}
+# Added on top of a title match
+GAME_WEEK_SCORE = 7            # "Week 17" for this game; another week rules the game out
+GAME_DATE_SCORE = 3            # published within GAME_DATE_DAYS after kickoff
+GAME_DATE_DAYS = 4
+DESCRIPTION_SCORE = 1          # the entity's name words also appear in the description
+CROWDED_TITLE_PENALTY = 2      # per other player or opponent named in the same title
+
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+WORD_PATTERN = re.compile(r"[^\W_]+")
+POSSESSIVE_PATTERN = re.compile(r"['\u2019]s\b", re.IGNORECASE)
+# Between a first name and a last name: "Joe Williams", "D.J. Jones"
+NAME_GAP_PATTERN = re.compile(r"\.?[ \t]+")
+YEAR_PATTERN = re.compile(r"(19|20)\d\d")
+
+
+def tokenize(text):
+    """Lowercase word tokens with possessives dropped: "Kittle's" -> "kittle"."""
+    return WORD_PATTERN.findall(POSSESSIVE_PATTERN.sub('', text or '').lower())
+
+
+def follows_capitalized_word(text, position):
+    """Whether token `position` of `text` directly follows a capitalized word."""
+    text = POSSESSIVE_PATTERN.sub('', text or '')
+    words = list(WORD_PATTERN.finditer(text))
+    if not 0 < position < len(words):
+        return False
+    previous, word = words[position - 1], words[position]
+    return previous.group()[0].isupper() and NAME_GAP_PATTERN.fullmatch(text[previous.end():word.start()]) is not None
+
+
+def name_tokens(name):
+    return [token for token in tokenize(name) if token not in NAME_SUFFIXES]
+
+
+def parse_datetime(value, formats=('%Y-%m-%dT%H:%M:%SZ', '%d/%m/%Y %H:%M')):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def build_alias_table(players, games):
+    """
+    Token phrase -> [(kind, entity index, alias type)] for every player and
+    opponent name variant, plus the longest phrase length.
+    """
+    table = defaultdict(list)
+    last_names = defaultdict(int)
     for player in players:
-        player_name = player['name']
-        first_name = player_name.split()[0]
-        last_name = player_name.split()[-1]
-        
-        # Create patterns to match player names
-        full_name_pattern = re.compile(r'\b' + re.escape(player_name) + r'\b', re.IGNORECASE)
-        last_name_pattern = re.compile(r'\b' + re.escape(last_name) + r'\b', re.IGNORECASE)
-        
-        # Try to find a match in the unassigned highlights
-        for highlight in unassigned_highlights:
-            if highlight['video_id'] in assigned_video_ids:
-                continue
-                
-            title = highlight['title']
-            description = highlight['description']
-            
-            # Check for full name match in title first (most specific)
-            if full_name_pattern.search(title):
-                player['highlight_video_url'] = highlight['video_url']
-                assigned_video_ids.add(highlight['video_id'])
-                break
-            
-            # Then check for last name match in title
-            elif last_name_pattern.search(title):
-                player['highlight_video_url'] = highlight['video_url']
-                assigned_video_ids.add(highlight['video_id'])
-                break
-    
-    # Match games next
-    for game in games:
-        opponent = game['opponent']
-        week_pattern = re.compile(r'\bWeek\s+' + re.escape(game['round_number']) + r'\b', re.IGNORECASE)
-        opponent_pattern = re.compile(r'\b' + re.escape(opponent) + r'\b', re.IGNORECASE)
-        
-        # Try to find a match in the unassigned highlights
-        for highlight in unassigned_highlights:
-            if highlight['video_id'] in assigned_video_ids:
+        tokens = name_tokens(player['name'])
+        if tokens:
+            last_names[tokens[-1]] += 1
+
+    for index, player in enumerate(players):
+        tokens = name_tokens(player['name'])
+        if not tokens:
+            continue
+        table[tuple(tokens)].append(('player', index, 'full'))
+        # Hashtags run the name together: #DeommodoreLenoir
+        table[(''.join(tokens),)].append(('player', index, 'full'))
+        if len(tokens) > 1 and last_names[tokens[-1]] == 1:
+            table[(tokens[-1],)].append(('player', index, 'last'))
+
+    for index, game in enumerate(games):
+        tokens = name_tokens(game['opponent'])
+        if not tokens:
+            continue
+        table[tuple(tokens)].append(('game', index, 'opponent'))
+        table[(tokens[-1],)].append(('game', index, 'nickname'))
+
+    return table, max((len(phrase) for phrase in table), default=1)
+
+
+def find_aliases(tokens, table, max_length, starts):
+    """
+    (alias, token position) pairs in a token list, leftmost-longest, so
+    "Green Bay Packers" is an opponent and not a player called Green. `starts`
+    holds the first token of every alias; other tokens are skipped at once.
+    """
+    found = []
+    start = 0
+    while start < len(tokens):
+        if tokens[start] in starts:
+            for length in range(min(max_length, len(tokens) - start), 0, -1):
+                entries = table.get(tuple(tokens[start:start + length]))
+                if entries:
+                    found.extend((entry, start) for entry in entries)
+                    start += length - 1
+                    break
+        start += 1
+    return found
+
+
+def title_weeks_and_years(tokens):
+    weeks = {tokens[i + 1] for i in range(len(tokens) - 1) if tokens[i] == 'week' and tokens[i + 1].isdigit()}
+    years = {int(token) for token in tokens if YEAR_PATTERN.fullmatch(token)}
+    return weeks, years
+
+
+def season_of(kickoff):
+    """NFL season year of a kickoff; January and February games belong to the previous one."""
+    return kickoff.year if kickoff.month > 2 else kickoff.year - 1
+
+
+def score_candidates(highlights, players, games):
+    """
+    Scored (score, kind, entity index, highlight index) candidates. Each
+    title is tokenized once and scanned against the alias table, so the cost
+    grows with the corpus, not with corpus x roster.
+    """
+    table, max_length = build_alias_table(players, games)
+    starts = {phrase[0] for phrase in table}
+    phrases = defaultdict(list)
+    for phrase, entries in table.items():
+        for kind, index, _ in entries:
+            phrases[(kind, index)].append(phrase)
+    kickoffs = [parse_datetime(game['date']) for game in games]
+
+    candidates = []
+    for video_index, highlight in enumerate(highlights):
+        tokens = tokenize(highlight['title'])
+        found = find_aliases(tokens, table, max_length, starts)
+        if not found:
+            continue
+        weeks, years = title_weeks_and_years(tokens)
+        published = parse_datetime(highlight['published_at'])
+
+        scores = {}
+        for (kind, index, alias_type), position in found:
+            # A last name alone after another capitalized word is someone else: "Joe Williams", "Two Weeks"
+            if alias_type == 'last' and follows_capitalized_word(highlight['title'], position):
                 continue
-                
-            title = highlight['title']
-            description = highlight['description']
-            
-            # Check for both week and opponent match in title (most specific)
-            if week_pattern.search(title) and opponent_pattern.search(title):
-                game['highlight_video_url'] = highlight['video_url']
-                assigned_video_ids.add(highlight['video_id'])
-                break
-            
-            # Then check for opponent match in title
-            elif opponent_pattern.search(title):
-                game['highlight_video_url'] = highlight['video_url']
-                assigned_video_ids.add(highlight['video_id'])
-                break
-    
+            if kind == 'game':
+                game, kickoff = games[index], kickoffs[index]
+                # Not about this game: another week or season, or posted before kickoff
+                if weeks and str(game['round_number']).strip() not in weeks:
+                    continue
+                if years and kickoff and season_of(kickoff) not in years:
+                    continue
+                if published and kickoff and published < kickoff:
+                    continue
+            scores[(kind, index)] = max(scores.get((kind, index), 0), ALIAS_SCORES[alias_type])
+        if not scores:
+            continue
+
+        described = set(tokenize(highlight['description']))
+        # Players and opponents named in the title; both Rams games are one opponent
+        named = len({index for kind, index in scores if kind == 'player'}) + len(
+            {games[index]['opponent'] for kind, index in scores if kind == 'game'}
+        )
+        for (kind, index), score in scores.items():
+            score -= CROWDED_TITLE_PENALTY * (named - 1)
+            if any(described.issuperset(phrase) for phrase in phrases[(kind, index)]):
+                score += DESCRIPTION_SCORE
+            if kind == 'game':
+                if weeks:
+                    score += GAME_WEEK_SCORE
+                if published and kickoffs[index] and timedelta(0) <= published - kickoffs[index] <= timedelta(days=GAME_DATE_DAYS):
+                    score += GAME_DATE_SCORE
+            candidates.append((score, kind, index, video_index))
+    return candidates
+
+
+def match_highlights_to_players_and_games(highlights, players, games):
+    """
+    Match YouTube highlights to players and games.
+
+    Candidates are assigned best score first, so each player and game gets its
+    strongest video rather than the first one that mentions it. Each video is
+    used at most once; ties go to players, then to the newer video.
+    Unassigned highlights are returned as team videos.
+    """
+    candidates = score_candidates(highlights, players, games)
+    # Stable sorts: newest video first within equal scores
+    candidates.sort(key=lambda candidate: highlights[candidate[3]]['published_at'], reverse=True)
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1] != 'player'))
+
+    entities = {'player': players, 'game': games}
+    assigned_entities = set()
+    assigned_video_ids = set()
+    for score, kind, index, video_index in candidates:
+        highlight = highlights[video_index]
+        if (kind, index) in assigned_entities or highlight['video_id'] in assigned_video_ids:
+            continue
+        entities[kind][index]['highlight_video_url'] = highlight['video_url']
+        assigned_entities.add((kind, index))
+        assigned_video_ids.add(highlight['video_id'])
+
     # Collect team videos (unassigned highlights)
-    team_videos = []
-    for highlight in highlights:
-        if highlight['video_id'] not in assigned_video_ids:
-            team_videos.append(highlight)
-    
-    return team_videos
+    return [highlight for highlight in highlights if highlight['video_id'] not in assigned_video_ids]
+
+def load_output_rows(path):
+    with open(path, 'r', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def match_new_highlights(new_highlights):
+    """
+    Incremental match after a playlist sync. Only the new videos are scored,
+    together with the videos players and games already hold, so a better new
+    video can take a slot and the one it replaces becomes a team video.
+    Everything else keeps its previous assignment. Without previous outputs
+    this is a full run.
+    """
+    outputs = (OUTPUT_PLAYERS_PATH, OUTPUT_GAMES_PATH, OUTPUT_TEAM_VIDEOS_PATH)
+    if not all(os.path.exists(path) for path in outputs):
+        main()
+        return
+
+    # Fresh roster and schedule, previous assignments carried over
+    players = load_players()
+    games = load_games()
+    held_by_player = {row['name']: row['highlight_video_url'] for row in load_output_rows(OUTPUT_PLAYERS_PATH)}
+    held_by_game = {row['match_number']: row['highlight_video_url'] for row in load_output_rows(OUTPUT_GAMES_PATH)}
+    held_urls = set(held_by_player.values()) | set(held_by_game.values())
+    held_urls.discard('')
+
+    new_ids = {highlight['video_id'] for highlight in new_highlights}
+    held = [
+        highlight for highlight in load_youtube_highlights()
+        if highlight['video_url'] in held_urls and highlight['video_id'] not in new_ids
+    ]
+    pool = held + list(new_highlights)
+    pool_ids = {highlight['video_id'] for highlight in pool}
+    leftovers = match_highlights_to_players_and_games(pool, players, games)
+
+    team_videos = leftovers + [video for video in load_output_rows(OUTPUT_TEAM_VIDEOS_PATH) if video['video_id'] not in pool_ids]
+    team_videos.sort(key=lambda video: video['published_at'], reverse=True)
+
+    save_players_with_highlights(players)
+    save_games_with_highlights(games)
+    save_team_videos(team_videos)
+
+    changed = sum(
+        1 for player in players if player['highlight_video_url'] != held_by_player.get(player['name'], '')
+    ) + sum(
+        1 for game in games if game['highlight_video_url'] != held_by_game.get(game['match_number'], '')
+    )
+    print(f"New YouTube highlights: {len(new_highlights)} (rescored with {len(held)} assigned videos)")
+    print(f"Players and games with a new highlight video: {changed}")
+    print(f"Team videos (unassigned): {len(team_videos)}")
+
 
 def save_players_with_highlights(players):
     """Save players with highlight videos to CSV file."""
@@ -1,6 +1,11 @@
 #!/usr/bin/env python
 """
 Script to upload structured and summarized team news articles from a CSV file to Neo4j.
+
+Articles are upserted in UNWIND batches of BATCH_SIZE, one transaction per
+batch and team. Each :Team_Story gets a native `published_at` datetime (from
+the CSV, or the date in the article URL for older rows) behind a range index,
+so "latest news" is an index-ordered top-k.
 """
 
 import os
@@ -9,26 +14,102 @@ import csv
 from datetime import datetime
 from dotenv import load_dotenv
 
-# Adjust path to import graph object from the parent directory
-parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Adjust path to import the shared Neo4j connection manager from the project root
+parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
 try:
-    from gradio_graph import graph # Import the configured graph instance
+    from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_session
+    from gradio_utils import parse_published_at, search_keys_for
 except ImportError as e:
-    print(f"Error importing gradio_graph: {e}")
-    print("Please ensure gradio_graph.py exists and is configured correctly.")
+    print(f"Error importing gradio_neo4j: {e}")
+    print("Please ensure gradio_neo4j.py exists and is configured correctly.")
     sys.exit(1)
 
-# Load environment variables (though graph should already be configured)
+# Load environment variables (credentials are read by gradio_neo4j)
 load_dotenv()
 
 # Configuration
 # Update path to reflect moved CSV file location
 # CSV_FILEPATH = os.path.join(os.path.dirname(__file__), "team_news_articles.csv") # Old path
-CSV_FILEPATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "april_11_multimedia_data_collect", "team_news_articles.csv") # New path
+CSV_FILEPATH = os.path.join(parent_dir, "data", "april_11_multimedia_data_collect", "team_news_articles.csv") # New path
 TEAM_NAME = "San Francisco 49ers"
+BATCH_SIZE = 500
+
+TEAM_MERGE_QUERY = """
+MERGE (t:Team {name: $team_name})
+SET t.season_record_2024 = $record, 
+    t.city = $city, 
+    t.conference = $conference, 
+    t.division = $division,
+    t += $keys
+RETURN t.name
+"""
+
+# One transaction per batch of a team's articles; the team is matched once per batch
+STORY_BATCH_UPSERT_QUERY = """
+MATCH (t:Team {name: $team_name})
+UNWIND $rows AS row
+MERGE (s:Team_Story {link_to_article: row.link_to_article})
+SET s.teamName = $team_name,
+    s.season = toInteger(row.season),
+    s.summary = row.summary,
+    s.topic = row.topic,
+    s.city = row.city,
+    s.conference = row.conference,
+    s.division = row.division,
+    s.published_at = row.published_at,
+    s += row.keys
+MERGE (s)-[:STORY_ABOUT]->(t)
+RETURN count(s) AS upserted
+"""
+
+def run_write_query(query, params):
+    """Run a write query on the shared driver and return the records as dicts."""
+    with get_session() as session:
+        return [record.data() for record in session.run(query, params)]
+
+def ensure_team_node():
+    """MERGE the :Team node the stories attach to."""
+    team_params = {
+        "team_name": TEAM_NAME,
+        "record": "6-11", # As specified in instructions
+        "city": "San Francisco",
+        "conference": "NFC",
+        "division": "West",
+        "keys": search_keys_for("Team", {"name": TEAM_NAME}),
+    }
+    return run_write_query(TEAM_MERGE_QUERY, team_params)
+
+def article_params(row):
+    """Query parameters for one article row (CSV row or scraper output), with defaults."""
+    params = {
+        "link_to_article": row.get("link_to_article", ""),
+        "Team_name": row.get("Team_name", TEAM_NAME), # Use team name from row or default
+        "season": row.get("season", datetime.now().year), # Default season if missing
+        "summary": row.get("summary", ""),
+        "topic": row.get("topic", ""),
+        "city": row.get("city", "San Francisco"), # Use city from row or default
+        "conference": row.get("conference", "NFC"),
+        "division": row.get("division", "West"),
+        # Native UTC datetime; older rows fall back to the date in the article URL
+        "published_at": parse_published_at(row.get("published_at"), row.get("link_to_article")),
+    }
+    params["keys"] = search_keys_for("Team_Story", params)
+    return params
+
+def upsert_team_stories(session, rows):
+    """Upsert article rows with one UNWIND query per team; returns the number upserted."""
+    by_team = {}
+    for row in rows:
+        params = article_params(row)
+        if params["link_to_article"] and params["Team_name"]:
+            by_team.setdefault(params["Team_name"], []).append(params)
+    return sum(
+        session.run(STORY_BATCH_UPSERT_QUERY, {"team_name": team_name, "rows": team_rows}).single()["upserted"]
+        for team_name, team_rows in by_team.items()
+    )
 
 def upload_articles_to_neo4j(csv_filepath):
     """Reads the CSV and uploads article data to Neo4j."""
@@ -40,23 +121,8 @@ def upload_articles_to_neo4j(csv_filepath):
 
     # 1. Ensure the :Team node exists with correct properties
     print(f"Ensuring :Team node exists for '{TEAM_NAME}'...")
-    team_merge_query = """
-    MERGE (t:Team {name: $team_name})
-    SET t.season_record_2024 = $record, 
-        t.city = $city, 
-        t.conference = $conference, 
-        t.division = $division
-    RETURN t.name
-    """
-    team_params = {
-        "team_name": TEAM_NAME,
-        "record": "6-11", # As specified in instructions
-        "city": "San Francisco",
-        "conference": "NFC",
-        "division": "West"
-    }
     try:
-        result = graph.query(team_merge_query, params=team_params)
+        result = ensure_team_node()
         if result and result[0]['t.name'] == TEAM_NAME:
             print(f":Team node '{TEAM_NAME}' ensured/updated successfully.")
         else:
@@ -67,67 +133,36 @@ def upload_articles_to_neo4j(csv_filepath):
         print(f"Error executing team merge query: {e}")
         return # Stop if we can't ensure the team node
 
-    # 2. Read CSV and upload articles
+    # 2. Read CSV and upload articles in UNWIND batches
     print("Reading CSV and uploading :Team_Story nodes...")
-    article_merge_query = """
-    MERGE (s:Team_Story {link_to_article: $link_to_article}) 
-    SET s.teamName = $Team_name, 
-        s.season = toInteger($season), // Ensure season is integer
-        s.summary = $summary, 
-        s.topic = $topic,
-        s.city = $city, 
-        s.conference = $conference,
-        s.division = $division
-        // Add other properties from CSV if needed, like raw_title, raw_date?
-    WITH s
-    MATCH (t:Team {name: $Team_name})
-    MERGE (s)-[:STORY_ABOUT]->(t)
-    RETURN s.link_to_article AS article_link, t.name AS team_name 
-    """
-
     upload_count = 0
     error_count = 0
     try:
         with open(csv_filepath, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                try:
-                    # Prepare parameters for the query
-                    # Ensure all expected keys from the query are present in the row or provide defaults
-                    params = {
-                        "link_to_article": row.get("link_to_article", ""),
-                        "Team_name": row.get("Team_name", TEAM_NAME), # Use team name from row or default
-                        "season": row.get("season", datetime.now().year), # Default season if missing
-                        "summary": row.get("summary", ""),
-                        "topic": row.get("topic", ""),
-                        "city": row.get("city", "San Francisco"), # Use city from row or default
-                        "conference": row.get("conference", "NFC"),
-                        "division": row.get("division", "West"),
-                    }
-                    
-                    # Basic validation before sending to Neo4j
-                    if not params["link_to_article"]:
-                        print(f"Skipping row due to missing link_to_article: {row}")
-                        error_count += 1
-                        continue
-                    if not params["Team_name"]:
-                         print(f"Skipping row due to missing Team_name: {row}")
-                         error_count += 1
-                         continue
-
-                    # Execute the query for the current article
-                    graph.query(article_merge_query, params=params)
-                    upload_count += 1
-                    if upload_count % 20 == 0: # Print progress every 20 articles
-                         print(f"Uploaded {upload_count} articles...")
+            rows = []
+            for row in csv.DictReader(csvfile):
+                # Basic validation before sending to Neo4j
+                if not row.get("link_to_article"):
+                    print(f"Skipping row due to missing link_to_article: {row}")
+                    error_count += 1
+                    continue
+                rows.append(row)
 
+        with get_session() as session:
+            # Range index on Team_Story.published_at (and the search keys) for "latest news"
+            ensure_indexes(session)
+            for start in range(0, len(rows), BATCH_SIZE):
+                batch = rows[start:start + BATCH_SIZE]
+                try:
+                    upserted = upsert_team_stories(session, batch)
                 except Exception as e:
-                    print(f"Error processing/uploading row: {row}")
-                    print(f"Error details: {e}")
-                    error_count += 1
-                    # Continue to next row even if one fails?
-                    # Or break? For now, let's continue.
-                    
+                    print(f"Error uploading rows {start}-{start + len(batch) - 1}: {e}")
+                    error_count += len(batch)
+                    continue
+                upload_count += upserted
+                error_count += len(batch) - upserted
+                print(f"Uploaded {upload_count} articles...")
+
     except FileNotFoundError:
         print(f"Error: CSV file not found at {csv_filepath}")
         return
@@ -135,6 +170,10 @@ def upload_articles_to_neo4j(csv_filepath):
         print(f"An unexpected error occurred while reading CSV or uploading: {e}")
         return
 
+    if upload_count > 0:
+        # Tell running apps to drop cached query results
+        bump_data_version()
+
     print(f"\nNeo4j upload process finished.")
     print(f"Successfully uploaded/merged: {upload_count} articles.")
     print(f"Rows skipped due to errors/missing data: {error_count}.")
@@ -143,4 +182,5 @@ def upload_articles_to_neo4j(csv_filepath):
 if __name__ == "__main__":
     print("Running Neo4j Article Uploader script...")
     upload_articles_to_neo4j(CSV_FILEPATH)
+    close_driver()
     print("Script execution complete.") 
\ No newline at end of file
@@ -8,6 +8,8 @@ existing Game nodes in Neo4j with the following attributes:
 - away_team_logo_url
 - game_id
 - highlight_video_url
+- kickoff, game_date, week, home_score, away_score, winner, margin
+  (native date/datetime and integer copies of the Date and Result strings)
 
 The script uses game_id as the primary key for matching and updating nodes.
 """
@@ -15,34 +17,28 @@ The script uses game_id as the primary key for matching and updating nodes.
 import os
 import sys
 import pandas as pd
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
-# Add parent directory to path to access neo4j_ingestion.py
-parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../.."))
-sys.path.append(parent_dir)
-
-# Set up paths
+# Set up paths (the project root, ifx-sandbox, is four levels up)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROJECT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, "../../../../.."))
-DATA_DIR = os.path.join(PROJECT_DIR, "ifx-sandbox/data")
+PROJECT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, "../../../.."))
+DATA_DIR = os.path.join(PROJECT_DIR, "data")
 SCHEDULE_DIR = os.path.join(DATA_DIR, "april_11_multimedia_data_collect", "new_final_april 11")
 SCHEDULE_FILE = os.path.join(SCHEDULE_DIR, "schedule_with_result_april_11.csv")
 
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(PROJECT_DIR)
+
 # Load environment variables from ifx-sandbox/.env
-ENV_FILE = os.path.join(PROJECT_DIR, "ifx-sandbox/.env")
+ENV_FILE = os.path.join(PROJECT_DIR, ".env")
 load_dotenv(ENV_FILE)
 print(f"Loading environment variables from: {ENV_FILE}")
 
-# Neo4j connection credentials
-NEO4J_URI = os.getenv('AURA_CONNECTION_URI')
-NEO4J_USER = os.getenv('AURA_USERNAME')
-NEO4J_PASS = os.getenv('AURA_PASSWORD')
+from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_connection_settings, get_session
+from gradio_utils import typed_game_fields
 
-if not all([NEO4J_URI, NEO4J_USER, NEO4J_PASS]):
-    print(f"Error: Missing required Neo4j credentials in {ENV_FILE}")
-    print(f"Required variables: AURA_CONNECTION_URI, AURA_USERNAME, AURA_PASSWORD")
-    raise ValueError("Missing required Neo4j credentials in .env file")
+# Neo4j connection credentials (AURA_* or NEO4J_*); raises if missing
+NEO4J_URI, _, _ = get_connection_settings()
 
 def clean_row_dict(row):
     """Convert pandas row to dict and replace NaN with None"""
@@ -69,7 +65,8 @@ def update_game_nodes():
         return False
     
     # Verify required columns exist
-    required_columns = ['game_id', 'home_team_logo_url', 'away_team_logo_url', 'highlight_video_url']
+    required_columns = ['game_id', 'Date', 'Result', 'Round Number', 'Home Team', 'Away Team',
+                        'home_team_logo_url', 'away_team_logo_url', 'highlight_video_url']
     missing_columns = [col for col in required_columns if col not in schedule_df.columns]
     
     if missing_columns:
@@ -78,24 +75,26 @@ def update_game_nodes():
     
     # Connect to Neo4j
     print(f"Connecting to Neo4j at {NEO4J_URI}")
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
     
     # Check connection
     try:
-        with driver.session() as session:
+        with get_session(read=True) as session:
             result = session.run("MATCH (g:Game) RETURN count(g) as count")
             game_count = result.single()["count"]
             print(f"Found {game_count} Game nodes in Neo4j")
     except Exception as e:
         print(f"Error connecting to Neo4j: {str(e)}")
-        driver.close()
+        close_driver()
         return False
     
     # Update game nodes
     success_count = 0
     error_count = 0
     
-    with driver.session() as session:
+    with get_session() as session:
+        # Range indexes for the typed fields set below
+        ensure_indexes(session)
+
         for _, row in schedule_df.iterrows():
             params = clean_row_dict(row)
             
@@ -104,13 +103,17 @@ def update_game_nodes():
                 error_count += 1
                 print(f"Skipping row {_ + 1}: Missing game_id")
                 continue
+
+            params['typed'] = typed_game_fields(params.get('Date'), params.get('Result'), params.get('Round Number'),
+                                                params.get('Home Team'), params.get('Away Team'))
             
             # Update query
             query = """
             MATCH (g:Game {game_id: $game_id})
             SET g.home_team_logo_url = $home_team_logo_url,
                 g.away_team_logo_url = $away_team_logo_url,
-                g.highlight_video_url = $highlight_video_url
+                g.highlight_video_url = $highlight_video_url,
+                g += $typed
             RETURN g.game_id as game_id
             """
             
@@ -129,9 +132,10 @@ def update_game_nodes():
                 error_count += 1
                 print(f"Error updating game {params.get('game_id')}: {str(e)}")
     
-    # Close the driver
-    driver.close()
-    
+    if success_count > 0:
+        # Tell running apps to drop cached query results
+        bump_data_version()
+
     # Print summary
     print("\nUpdate Summary:")
     print(f"Total games in CSV: {len(schedule_df)}")
@@ -147,9 +151,7 @@ def update_game_nodes():
 
 def verify_updates():
     """Verify that game nodes were updated with the new attributes"""
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
-    
-    with driver.session() as session:
+    with get_session(read=True) as session:
         # Check for games with logo URLs
         logo_query = """
         MATCH (g:Game)
@@ -170,10 +172,21 @@ def verify_updates():
         highlight_result = session.run(highlight_query)
         highlight_count = highlight_result.single()["count"]
         
+        # Check for games with typed dates and scores
+        typed_query = """
+        MATCH (g:Game)
+        WHERE g.game_date IS NOT NULL AND g.home_score IS NOT NULL
+        RETURN count(g) as count
+        """
+        
+        typed_result = session.run(typed_query)
+        typed_count = typed_result.single()["count"]
+        
         print(f"Games with logo URLs: {logo_count}")
         print(f"Games with highlight URLs: {highlight_count}")
+        print(f"Games with typed dates/scores: {typed_count}")
     
-    driver.close()
+    close_driver()
 
 def main():
     print("=== Game Node Update Tool ===")
@@ -14,18 +14,15 @@ The script uses Player_id as the primary key for matching and updating nodes.
 import os
 import sys
 import pandas as pd
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
 # Define base project directory relative to script location
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-# Construct absolute path to project root (ifx-sandbox) based on known workspace structure
-# This assumes the script is always located at the same relative depth
-WORKSPACE_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, "../../../../..")) # Goes up 5 levels to workspace root
-PROJECT_DIR = os.path.join(WORKSPACE_ROOT, "ifx-sandbox") # Specify ifx-sandbox within workspace
+# The project root (ifx-sandbox) is four levels up from this script
+PROJECT_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, "../../../.."))
 
-# Add parent directory (ifx-sandbox) to path if needed for imports, though unlikely needed here
-# sys.path.append(PROJECT_DIR)
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(PROJECT_DIR)
 
 # Set up paths using PROJECT_DIR
 DATA_DIR = os.path.join(PROJECT_DIR, "data")
@@ -34,28 +31,15 @@ ROSTER_FILE = os.path.join(ROSTER_DATA_DIR, "roster_april_11.csv")
 
 # Load environment variables from ifx-sandbox/.env
 ENV_FILE = os.path.join(PROJECT_DIR, ".env")
-
-if not os.path.exists(ENV_FILE):
-    print(f"Error: .env file not found at {ENV_FILE}")
-    # Attempt fallback if PROJECT_DIR might be wrong
-    alt_project_dir = os.path.join(os.path.abspath(os.path.join(SCRIPT_DIR, "../../../../../")), "ifx-sandbox") # Go up 6 and specify
-    alt_env_file = os.path.join(alt_project_dir, ".env")
-    if os.path.exists(alt_env_file):
-        print("Fallback: Found .env using alternative path calculation.")
-        ENV_FILE = alt_env_file
-    else:
-        sys.exit(1)
-
-# Explicitly pass the path to load_dotenv
 load_dotenv(dotenv_path=ENV_FILE)
 print(f"Loading environment variables from: {ENV_FILE}")
 
-# Neo4j connection credentials
-NEO4J_URI = os.getenv('AURA_CONNECTION_URI')
-NEO4J_USER = os.getenv('AURA_USERNAME')
-NEO4J_PASS = os.getenv('AURA_PASSWORD')
+from gradio_neo4j import bump_data_version, close_driver, get_connection_settings, get_driver, get_session
 
-if not all([NEO4J_URI, NEO4J_USER, NEO4J_PASS]):
+# Neo4j connection credentials (AURA_* or NEO4J_*), checked up front
+try:
+    NEO4J_URI, _, _ = get_connection_settings()
+except ValueError:
     print(f"Error: Missing required Neo4j credentials in {ENV_FILE}")
     print(f"Required variables: AURA_CONNECTION_URI, AURA_USERNAME, AURA_PASSWORD")
     sys.exit(1)
@@ -94,26 +78,23 @@ def update_player_nodes():
 
     # Connect to Neo4j
     print(f"Connecting to Neo4j at {NEO4J_URI}")
-    driver = None # Initialize driver to None
     try:
-        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
-        driver.verify_connectivity()
+        get_driver()  # verifies connectivity
         print("Neo4j connection successful.")
-        with driver.session() as session:
+        with get_session(read=True) as session:
             result = session.run("MATCH (p:Player) RETURN count(p) as count")
             player_count = result.single()["count"]
             print(f"Found {player_count} Player nodes in Neo4j")
     except Exception as e:
         print(f"Error connecting to or querying Neo4j: {str(e)}")
-        if driver:
-            driver.close()
+        close_driver()
         return False
 
     # Update player nodes
     success_count = 0
     error_count = 0
 
-    with driver.session() as session:
+    with get_session() as session:
         for index, row in roster_df.iterrows():
             # Use player_id (lowercase) which is the correct column name
             player_id_val = row.get('player_id')
@@ -151,8 +132,9 @@ def update_player_nodes():
                 error_count += 1
                 print(f"Error updating player {player_id_val}: {str(e)}")
 
-    # Close the driver
-    driver.close()
+    if success_count > 0:
+        # Tell running apps to drop cached query results
+        bump_data_version()
 
     # Print summary
     print("\nUpdate Summary:")
@@ -169,11 +151,8 @@ def update_player_nodes():
 
 def verify_updates():
     """Verify that Player nodes were updated with the new attributes"""
-    driver = None
     try:
-        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
-        driver.verify_connectivity()
-        with driver.session() as session:
+        with get_session(read=True) as session:
             # Check for players with headshot & instagram URLs
             query1 = """
             MATCH (p:Player)
@@ -197,8 +176,7 @@ def verify_updates():
     except Exception as e:
         print(f"Error during verification: {str(e)}")
     finally:
-        if driver:
-            driver.close()
+        close_driver()
 
 def main():
     print("=== Player Node Update Tool ===")
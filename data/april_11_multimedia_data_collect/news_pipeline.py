@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Streaming news pipeline: Niners Nation articles straight into Neo4j.
+
+Articles flow through generator stages in micro-batches of BATCH_SIZE:
+    listing pages -> fetch (http_fetch) -> parse -> summarize
+    (article_summaries) -> upsert (one UNWIND transaction per batch)
+The listing walk and all the batches share one http_fetch.FetchSession,
+so connections and per-host rate limits carry over between batches.
+Only one batch of pages and summaries is held at a time, so memory does not
+grow with the size of the crawl. Each upserted batch is also appended to
+team_news_articles.csv, which the fake graph backend serves.
+
+Articles without a summary (the request failed, or summarization is off)
+are left out of the graph, the CSV and the checkpoint, so a later run picks
+them up again. Articles that fail to fetch or parse are retried too, until
+they have failed team_news_scraper.MAX_FETCH_ATTEMPTS completed runs; then
+they are marked seen.
+
+After every batch, its URLs are added to news_pipeline_checkpoint.json. A
+run that stops part way resumes from there: the listing walk still stops at
+the articles finished by earlier runs (team_news_seen_urls.json) and skips
+the ones the checkpoint holds. A completed run folds the checkpoint into the
+seen-URL file and removes it.
+
+Usage:
+    python news_pipeline.py
+    python news_pipeline.py --batch-size 16 --seed-from-graph
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import islice
+
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_session
+
+import team_news_scraper as scraper
+from article_summaries import SummaryCache, summarize_articles
+from http_fetch import FetchSession
+from neo4j_article_uploader import ensure_team_node, upsert_team_stories
+
+CHECKPOINT_FILE = "news_pipeline_checkpoint.json"
+BATCH_SIZE = 8
+
+
+def load_checkpoint(path=CHECKPOINT_FILE):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {"started_at": datetime.now(timezone.utc).isoformat(), "done": [], "upserted": 0}
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_FILE):
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def batched(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def new_article_urls(seen_urls, done_urls, fetch_session):
+    """Article URLs not finished by an earlier run or by the interrupted one."""
+    yielded = set()
+    for url, _ in scraper.iter_articles(seen_urls, fetch_session=fetch_session):
+        if url not in done_urls and url not in yielded:
+            yielded.add(url)
+            yield url
+
+
+def fetched(url_batches, fetch_session):
+    for urls in url_batches:
+        yield list(zip(urls, fetch_session.fetch_many(urls)))
+
+
+def parsed(page_batches, fetch_failures):
+    for pages in page_batches:
+        articles = []
+        for url, page in pages:
+            details = scraper.parse_article_details(page.text, url) if page.ok else None
+            if details:
+                articles.append(details)
+                continue
+            # Not checkpointed, so the next run tries it again (up to MAX_FETCH_ATTEMPTS runs)
+            print(f"[PIPELINE] Failed to fetch or parse article page: {url} ({page.error or 'no details'})")
+            fetch_failures[url] = fetch_failures.get(url, 0) + 1
+        yield articles
+
+
+def summarized(article_batches, cache):
+    for articles in article_batches:
+        summaries = summarize_articles(articles, cache, use_llm=scraper.ENABLE_SUMMARIZATION)
+        rows = []
+        for details, summary in zip(articles, summaries):
+            if not summary:
+                # Failed or disabled summary: not upserted or checkpointed, so the next run retries it
+                print(f"[PIPELINE] No summary for {details['link_to_article']}; leaving it for the next run")
+                continue
+            details['summary'] = summary
+            rows.append(scraper.structure_data_for_csv_row(details))
+        yield rows
+
+
+def run_pipeline(session, seen_urls, batch_size=BATCH_SIZE, checkpoint_path=CHECKPOINT_FILE,
+                 csv_path=scraper.OUTPUT_CSV_FILE):
+    """Stream new articles into the graph batch by batch; returns the number upserted."""
+    checkpoint = load_checkpoint(checkpoint_path)
+    fetch_failures = scraper.load_fetch_failures()
+    done_urls = set(checkpoint["done"])
+    if done_urls:
+        print(f"[PIPELINE] Resuming the run started {checkpoint['started_at']}: {len(done_urls)} articles already upserted")
+
+    # One HTTP client and one set of rate limits for the listing walk and every batch
+    with FetchSession() as fetch_session:
+        urls = new_article_urls(seen_urls, done_urls, fetch_session)
+        for rows in summarized(parsed(fetched(batched(urls, batch_size), fetch_session), fetch_failures),
+                               SummaryCache()):
+            if not rows:
+                continue
+            upsert_team_stories(session, rows)
+            scraper.append_to_csv(rows, csv_path)
+            checkpoint["done"].extend(row["link_to_article"] for row in rows)
+            checkpoint["upserted"] += len(rows)
+            save_checkpoint(checkpoint, checkpoint_path)
+            print(f"[PIPELINE] Upserted a batch of {len(rows)} articles ({checkpoint['upserted']} this run)")
+
+    scraper.save_seen_urls(seen_urls | set(checkpoint["done"]), fetch_failures)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    print(f"[PIPELINE] Run complete: {checkpoint['upserted']} articles upserted")
+    return checkpoint["upserted"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream new Niners Nation articles into Neo4j")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Articles per fetch/summarize/upsert batch")
+    parser.add_argument("--seed-from-graph", action="store_true",
+                        help="Also treat Team_Story articles already in Neo4j as processed")
+    args = parser.parse_args()
+
+    seen_urls = scraper.load_seen_urls(args.seed_from_graph)
+    ensure_team_node()
+    with get_session() as session:
+        ensure_indexes(session)
+        if run_pipeline(session, seen_urls, args.batch_size):
+            # Tell running apps to drop cached query results
+            bump_data_version(session)
+    close_driver()
@@ -0,0 +1,158 @@
+"""
+Local Parquet cache for nflverse play-by-play.
+
+game_stats.py used to download and materialise the whole league's season
+(~370 columns) on every run, then keep only one team's games. This cache
+stores each season once as hive-partitioned Parquet:
+
+    pbp_cache/season=2024/team=SF/week=1/part-0.parquet
+
+Every game is written under both of its teams, so a team's games are one
+directory. Reads prune to the requested columns and push the season/team
+filter down to the partition paths, so nothing else is opened.
+
+Refreshing downloads the season (only the cached columns) and rewrites just
+the (team, week) partitions whose content fingerprint changed; the
+fingerprints live in pbp_cache/season=YYYY/_manifest.json (pyarrow skips
+"_" files when it scans the dataset). Needs pyarrow.
+
+Usage:
+    python pbp_cache.py --season 2024            # refresh changed weeks
+    python pbp_cache.py --season 2024 --team SF  # show what is cached for a team
+"""
+
+import argparse
+import json
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import nfl_data_py as nfl
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pbp_cache")
+
+# Stored as partition directories, not file columns
+PARTITION_COLUMNS = ["season", "team", "week"]
+# Always cached: needed to partition and to filter a team's games
+KEY_COLUMNS = ["game_id", "play_id", "home_team", "away_team", "week"]
+
+
+def season_dir(season, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"season={season}")
+
+
+def load_manifest(season, cache_dir=CACHE_DIR):
+    path = os.path.join(season_dir(season, cache_dir), "_manifest.json")
+    if not os.path.exists(path):
+        return {"columns": [], "partitions": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(season, manifest, cache_dir=CACHE_DIR):
+    path = os.path.join(season_dir(season, cache_dir), "_manifest.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def fingerprint(plays):
+    """Content hash of one partition's plays (row order included)."""
+    return f"{len(plays)}:{int(pd.util.hash_pandas_object(plays, index=False).sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def refresh_season(season, columns, cache_dir=CACHE_DIR):
+    """
+    Download a season's play-by-play (only `columns`) and rewrite the
+    (team, week) partitions that changed. Returns the rewritten partition keys.
+    """
+    manifest = load_manifest(season, cache_dir)
+    columns = sorted(set(columns) | set(KEY_COLUMNS) | set(manifest["columns"]))
+    if set(columns) != set(manifest["columns"]):
+        # New columns: every partition's content changes
+        manifest = {"columns": [], "partitions": {}}
+
+    print(f"[PBP CACHE] Downloading {season} play-by-play ({len(columns)} columns)...")
+    pbp = nfl.import_pbp_data(years=[season], columns=columns, include_participation=False, downcast=True)
+    pbp = pbp.drop(columns=["season"], errors="ignore")
+    # One schema for every file: a column that is all-null in one week would
+    # otherwise be typed null there and clash with the other partitions
+    schema = pa.Schema.from_pandas(pbp.drop(columns=["week"]), preserve_index=False)
+
+    rewritten = []
+    partitions = {}
+    for team in sorted(set(pbp["home_team"].dropna()) | set(pbp["away_team"].dropna())):
+        team_plays = pbp[(pbp["home_team"] == team) | (pbp["away_team"] == team)]
+        for week, plays in team_plays.groupby("week", sort=True):
+            key = f"{team}/{int(week)}"
+            plays = plays.drop(columns=["week"]).reset_index(drop=True)
+            partitions[key] = fingerprint(plays)
+            path = os.path.join(season_dir(season, cache_dir), f"team={team}", f"week={int(week)}")
+            if manifest["partitions"].get(key) == partitions[key] and os.path.isdir(path):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+            plays.to_parquet(os.path.join(path, "part-0.parquet"), index=False, engine="pyarrow", schema=schema)
+            rewritten.append(key)
+
+    save_manifest(season, {"columns": columns, "partitions": partitions}, cache_dir)
+    print(f"[PBP CACHE] {season}: rewrote {len(rewritten)} of {len(partitions)} team-week partitions")
+    return rewritten
+
+
+def is_cached(season, columns=(), cache_dir=CACHE_DIR):
+    """True if the season is cached with at least these columns."""
+    manifest = load_manifest(season, cache_dir)
+    return bool(manifest["partitions"]) and set(columns) <= set(manifest["columns"]) | set(PARTITION_COLUMNS)
+
+
+def cached_teams(season, cache_dir=CACHE_DIR):
+    """Team abbreviations with cached games in the season."""
+    return sorted({key.split("/")[0] for key in load_manifest(season, cache_dir)["partitions"]})
+
+
+def load_team_pbp(season, team, columns=None, refresh=False, cache_dir=CACHE_DIR):
+    """
+    One team's plays for a season, reading only `columns` (plus the partition
+    keys) from the cache. The cache is filled on first use, or when `refresh`
+    is set or `columns` asks for something it doesn't hold.
+    """
+    columns = list(dict.fromkeys(columns or []))
+    if refresh or not is_cached(season, columns, cache_dir):
+        refresh_season(season, [c for c in columns if c not in PARTITION_COLUMNS], cache_dir)
+
+    read_columns = [c for c in columns if c not in PARTITION_COLUMNS] or None
+    plays = pd.read_parquet(
+        cache_dir,
+        engine="pyarrow",
+        columns=read_columns + PARTITION_COLUMNS if read_columns else None,
+        filters=[("season", "=", season), ("team", "=", team)],
+    )
+    # Partition values come back as categoricals
+    plays["season"] = plays["season"].astype("int64")
+    plays["week"] = plays["week"].astype("int64")
+    plays["team"] = plays["team"].astype(str)
+    # Same play order as the nflverse season file
+    return plays.sort_values(["game_id", "play_id"], kind="stable").reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh or inspect the local play-by-play Parquet cache")
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--team", help="Show the cached games for this team instead of refreshing")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    args = parser.parse_args()
+
+    if args.team:
+        plays = load_team_pbp(args.season, args.team, ["game_id"], cache_dir=args.cache_dir)
+        print(plays.groupby("week")["game_id"].agg(["first", "count"]).to_string())
+        return
+    columns = load_manifest(args.season, args.cache_dir)["columns"]
+    if not columns:
+        raise SystemExit(f"Nothing cached for {args.season} yet; run game_stats.py once to fill the cache.")
+    refresh_season(args.season, columns, args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
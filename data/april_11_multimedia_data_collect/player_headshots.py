@@ -1,7 +1,8 @@
-import requests
 from bs4 import BeautifulSoup
 import csv
 
+from http_fetch import fetch
+
 ROSTER_URL = "https://www.49ers.com/team/players-roster/"
 
 def scrape_49ers_roster(output_csv='niners_players_headshots.csv'):
@@ -11,9 +12,11 @@ def scrape_49ers_roster(output_csv='niners_players_headshots.csv'):
         - Name
         - Headshot Image URL
     """
-    response = requests.get(ROSTER_URL)
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, 'html.parser')
+    # An unchanged roster page is revalidated with a 304 instead of re-downloaded
+    page = fetch(ROSTER_URL)
+    if not page.ok:
+        raise RuntimeError(f"Failed to fetch {ROSTER_URL}: {page.error}")
+    soup = BeautifulSoup(page.text, 'html.parser')
 
     player_rows = soup.select('div.d3-o-table--horizontal-scroll tbody tr')
     if not player_rows:
@@ -1,12 +1,12 @@
-import requests
 from bs4 import BeautifulSoup
 import csv
 import os
-import time
 import re
 import json
 import logging
 
+from http_fetch import FetchSession
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -23,43 +23,32 @@ def ensure_output_dir(dir_path):
         os.makedirs(dir_path)
         logger.info(f"Created directory: {dir_path}")
 
-def download_image(url, file_path):
-    """Download image from URL and save to file_path"""
+def save_image(page, file_path):
+    """Save a fetched image to file_path"""
+    if not page.ok:
+        logger.error(f"Failed to download image from {page.url}: {page.error}")
+        return False
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        }
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-        
         with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
+            f.write(page.content)
         return True
-    except Exception as e:
-        logger.error(f"Failed to download image from {url}: {e}")
+    except OSError as e:
+        logger.error(f"Failed to save image to {file_path}: {e}")
         return False
 
-def get_team_logo_urls():
+def get_team_logo_urls(fetch_session):
     """
-    Get team logo URLs directly from team pages.
+    Get team logo URLs directly from team pages, through the run's FetchSession.
     Returns a dictionary mapping team names to their logo URLs.
     """
     logger.info(f"Fetching team information from {NFL_TEAMS_URL}")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    }
-    
-    try:
-        response = requests.get(NFL_TEAMS_URL, headers=headers)
-        response.raise_for_status()
-    except Exception as e:
-        logger.error(f"Failed to fetch NFL teams page: {e}")
+    page = fetch_session.fetch(NFL_TEAMS_URL)
+    if not page.ok:
+        logger.error(f"Failed to fetch NFL teams page: {page.error}")
         return {}
     
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(page.text, 'html.parser')
     
     # Find all team links
     team_links = []
@@ -81,15 +70,15 @@ def get_team_logo_urls():
     
     logger.info(f"Found {len(team_urls)} unique team URLs")
     
-    # Visit each team page to get the official logo
+    # Visit each team page to get the official logo (fetched in parallel, rate limited per host)
     team_logos = {}
-    for slug, url in team_urls.items():
+    team_pages = fetch_session.fetch_many(list(team_urls.values()))
+    for (slug, url), team_page in zip(team_urls.items(), team_pages):
         try:
-            logger.info(f"Visiting team page: {url}")
-            team_response = requests.get(url, headers=headers)
-            team_response.raise_for_status()
+            if not team_page.ok:
+                raise RuntimeError(team_page.error)
             
-            team_soup = BeautifulSoup(team_response.text, 'html.parser')
+            team_soup = BeautifulSoup(team_page.text, 'html.parser')
             
             # Get team name from title
             title_tag = team_soup.find('title')
@@ -150,24 +139,28 @@ def get_team_logo_urls():
             else:
                 logger.warning(f"Could not find logo URL for {team_name}")
             
-            # Be polite with rate limiting
-            time.sleep(1)
-            
         except Exception as e:
             logger.error(f"Error processing team page {url}: {e}")
     
     logger.info(f"Found logos for {len(team_logos)} teams")
     return team_logos
 
-def download_team_logos():
-    """Download NFL team logos and save to CSV"""
+def download_team_logos(fetch_session=None):
+    """
+    Download NFL team logos and save to CSV. Every request in the run goes
+    through one FetchSession, opened here unless the caller passes one.
+    """
+    if fetch_session is None:
+        with FetchSession() as fetch_session:
+            return download_team_logos(fetch_session)
+
     logger.info("Starting NFL team logo download")
     
     # Ensure output directory exists
     ensure_output_dir(OUTPUT_DIR)
     
     # Get team logo URLs from team pages
-    team_logos = get_team_logo_urls()
+    team_logos = get_team_logo_urls(fetch_session)
     
     # Use a backup approach for any missing teams
     if len(team_logos) < EXPECTED_TEAM_COUNT:
@@ -175,10 +168,11 @@ def download_team_logos():
         # We'll use ESPN's API to get team data including logos
         try:
             espn_url = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams"
-            response = requests.get(espn_url)
-            response.raise_for_status()
+            espn_page = fetch_session.fetch(espn_url)
+            if not espn_page.ok:
+                raise RuntimeError(espn_page.error)
             
-            espn_data = response.json()
+            espn_data = espn_page.json()
             if 'sports' in espn_data and len(espn_data['sports']) > 0:
                 if 'leagues' in espn_data['sports'][0] and len(espn_data['sports'][0]['leagues']) > 0:
                     if 'teams' in espn_data['sports'][0]['leagues'][0]:
@@ -251,18 +245,18 @@ def download_team_logos():
                 team_logos[team_name] = manual_logos[team_name]
                 logger.info(f"Added {team_name} logo from manual dictionary")
     
-    # Process and download team logos
+    # Process and download team logos; unchanged images are revalidated with a 304
     results = []
-    for team_name, logo_url in team_logos.items():
+    logger.info(f"Downloading {len(team_logos)} logos")
+    logo_pages = fetch_session.fetch_many(list(team_logos.values()))
+    for (team_name, logo_url), logo_page in zip(team_logos.items(), logo_pages):
         # Create safe filename
         safe_name = team_name.replace(' ', '_').lower()
         file_extension = '.png'  # Default to PNG
         filename = f"{safe_name}{file_extension}"
         local_path = os.path.join(OUTPUT_DIR, filename)
         
-        # Download the logo
-        logger.info(f"Downloading logo for {team_name} from {logo_url}")
-        download_success = download_image(logo_url, local_path)
+        download_success = save_image(logo_page, local_path)
         
         if download_success:
             results.append({
@@ -273,9 +267,6 @@ def download_team_logos():
             logger.info(f"Successfully downloaded logo for {team_name}")
         else:
             logger.error(f"Failed to download logo for {team_name}")
-        
-        # Add a small delay
-        time.sleep(0.5)
     
     # Save to CSV
     with open(CSV_OUTPUT, 'w', newline='', encoding='utf-8') as f:
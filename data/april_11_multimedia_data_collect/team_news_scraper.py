@@ -1,39 +1,49 @@
 import os
+import sys
 import csv
-import time
+import json
+import argparse
 from datetime import datetime, timedelta, timezone
-import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-import openai # Added for LLM Summarization
+from article_summaries import LLM_BACKEND, summarize_articles
+from http_fetch import FetchSession, fetch
 
 # Load environment variables (for API keys)
 load_dotenv() 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o") # Default to gpt-4o if not set
 
-if not OPENAI_API_KEY:
+if not OPENAI_API_KEY and LLM_BACKEND != "fake":
     print("Warning: OPENAI_API_KEY not found in environment variables. Summarization will be skipped.")
     # Or raise an error if summarization is critical:
     # raise ValueError("OPENAI_API_KEY environment variable is required for summarization.")
 
 TARGET_URL = "https://www.ninersnation.com/san-francisco-49ers-news"
 OUTPUT_CSV_FILE = "team_news_articles.csv"
+SEEN_URLS_FILE = "team_news_seen_urls.json" # Articles already processed, for incremental crawls
 DAYS_TO_SCRAPE = 60 # Scrape articles from the past 60 days
-REQUEST_DELAY = 1 # Delay in seconds between requests to be polite
+MAX_LISTING_PAGES = 10 # Listing pages walked at most per run (newest first)
+MAX_FETCH_ATTEMPTS = 3 # Runs an article may fail to fetch or parse before it is marked seen
+# Politeness: requests to ninersnation.com are rate limited in http_fetch.HOST_RATES
 
 # Add a flag to enable/disable summarization easily
-ENABLE_SUMMARIZATION = True if OPENAI_API_KEY else False 
-
-def fetch_html(url):
-    """Fetches HTML content from a URL with error handling."""
-    try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}) # Basic user-agent
-        response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-        return response.text
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching {url}: {e}")
+ENABLE_SUMMARIZATION = True if OPENAI_API_KEY or LLM_BACKEND == "fake" else False 
+
+def fetch_html(url, fetch_session=None):
+    """
+    Fetches HTML content from a URL (cached, rate limited and retried by
+    http_fetch), through `fetch_session` when the caller keeps one open.
+    """
+    page = fetch_session.fetch(url) if fetch_session else fetch(url)
+    if not page.ok:
+        print(f"Error fetching {url}: {page.error}")
         return None
+    return page.text
+
+def listing_page_url(page):
+    """Listing page URL; page 1 is the news front page, older pages live under /archives/N."""
+    return TARGET_URL if page == 1 else f"{TARGET_URL}/archives/{page}"
 
 def parse_article_list(html_content):
     """Parses the main news page to find article links and dates."""
@@ -188,112 +198,100 @@ def is_within_timeframe(date_str, days):
         return False
 
 def generate_summary(article_content):
-    """Generates a 3-4 sentence summary using OpenAI API."""
-    if not ENABLE_SUMMARIZATION or not article_content:
-        print("Skipping summary generation (disabled or no content).")
-        return "" # Return empty string if summarization skipped or no content
-        
-    print("Generating summary...")
-    try:
-        client = openai.OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Simple prompt for summarization
-        prompt = f"""Please provide a concise 3-4 sentence summary of the following article content. 
-Focus on the key information and main points. Do not include any information not present in the text. :
-
----
-{article_content}
----
-
-Summary:"""
-        
-        # Limit content length to avoid excessive token usage (adjust limit as needed)
-        max_content_length = 15000 # Approx limit, GPT-4o context window is large but be mindful of cost/speed
-        if len(prompt) > max_content_length:
-             print(f"Warning: Content too long ({len(article_content)} chars), truncating for summarization.")
-             # Truncate content intelligently if needed, here just slicing prompt
-             prompt = prompt[:max_content_length] 
-
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": "You are an AI assistant tasked with summarizing news articles concisely."}, 
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5, # Adjust for desired creativity vs factuality
-            max_tokens=150 # Limit summary length
-        )
-        
-        summary = response.choices[0].message.content.strip()
-        print("Summary generated successfully.")
-        return summary
-        
-    except openai.APIError as e:
-        print(f"OpenAI API returned an API Error: {e}")
-    except openai.APIConnectionError as e:
-        print(f"Failed to connect to OpenAI API: {e}")
-    except openai.RateLimitError as e:
-        print(f"OpenAI API request exceeded rate limit: {e}")
-    except Exception as e:
-        print(f"An unexpected error occurred during summarization: {e}")
-        
-    return "" # Return empty string on failure
-
-def scrape_and_summarize_niners_nation():
-    """Main function to scrape, parse, summarize, and return structured data."""
+    """Generates a 3-4 sentence summary (cached; see article_summaries.py)."""
+    if not article_content:
+        return ""
+    return summarize_articles([{"content": article_content}], use_llm=ENABLE_SUMMARIZATION)[0]
+
+def iter_articles(seen_urls=None, max_pages=MAX_LISTING_PAGES, fetch_session=None):
+    """
+    Yields (url, date) for the articles in the DAYS_TO_SCRAPE window, newest
+    first, walking the listing pages lazily until they leave the window.
+
+    With `seen_urls` (incremental crawl) known articles are dropped, and
+    paging stops at the first page that reaches one: everything after it is
+    older and was handled by an earlier run. The same article can show up on
+    two pages when new posts shift the listing; callers dedupe.
+    """
+    for page in range(1, max_pages + 1):
+        listing_html = fetch_html(listing_page_url(page), fetch_session)
+        if not listing_html:
+            if page == 1:
+                print("Failed to fetch the main news page.")
+            return
+        on_page = parse_article_list(listing_html)
+        if not on_page:
+            return
+
+        in_window = [(url, date_str) for url, date_str in on_page if is_within_timeframe(date_str, DAYS_TO_SCRAPE)]
+        reached_seen = seen_urls is not None and any(url in seen_urls for url, _ in on_page)
+        for url, date_str in in_window:
+            if not seen_urls or url not in seen_urls:
+                yield url, date_str
+        if reached_seen:
+            print(f"Listing page {page} reaches already processed articles; stopping.")
+            return
+        if len(in_window) < len(on_page):
+            return
+
+def list_articles(seen_urls=None, max_pages=MAX_LISTING_PAGES, fetch_session=None):
+    """All of iter_articles() as a deduplicated list."""
+    return list(dict.fromkeys(iter_articles(seen_urls, max_pages, fetch_session)))
+
+def scrape_and_summarize_niners_nation(seen_urls=None, fetch_failures=None):
+    """
+    Main function to scrape, parse, summarize, and return structured data.
+    Pass `seen_urls` for an incremental crawl: articles in it are never
+    fetched or summarized again. Articles that fail to fetch or parse are
+    counted in `fetch_failures` (url -> failed runs, see save_seen_urls).
+    """
     print("Starting Niners Nation scraping and summarization process...")
-    main_page_html = fetch_html(TARGET_URL)
-    if not main_page_html:
-        print("Failed to fetch the main news page. Exiting.")
-        return []
-
-    articles_on_page = parse_article_list(main_page_html)
-    
     scraped_and_summarized_data = []
     now_utc = datetime.now(timezone.utc)
     cutoff_datetime = now_utc - timedelta(days=DAYS_TO_SCRAPE)
     print(f"Filtering articles published since {cutoff_datetime.strftime('%Y-%m-%d %H:%M:%S %Z')}")
 
-    processed_urls = set() 
+    # One client for the listing pages and the articles
+    with FetchSession() as fetch_session:
+        articles_on_page = list_articles(seen_urls, fetch_session=fetch_session)
+        if seen_urls is not None:
+            print(f"Incremental crawl: {len(articles_on_page)} new articles ({len(seen_urls)} already processed)")
 
-    for url, date_str in articles_on_page:
-        if url in processed_urls:
-            continue 
-            
-        if not is_within_timeframe(date_str, DAYS_TO_SCRAPE):
-            continue
+        # Fetch every new article in parallel; unchanged pages come back as 304s
+        article_urls = list(dict.fromkeys(url for url, _ in articles_on_page))
+        print(f"Fetching {len(article_urls)} articles...")
+        pages = fetch_session.fetch_many(article_urls)
 
-        print(f"Fetching article: {url}")
-        article_html = fetch_html(url)
+    parsed_articles = []
+    for url, page in zip(article_urls, pages):
+        article_html = page.text if page.ok else None
         if article_html:
             details = parse_article_details(article_html, url)
             if details: 
-                # Generate summary if content exists and summarization enabled
-                article_summary = "" # Initialize summary
-                if details.get('content'):
-                    article_summary = generate_summary(details['content'])
-                else:
-                    print(f"Skipping summary for {url} due to missing content.")
-                    
-                # Add the summary to the details dictionary
-                details['summary'] = article_summary 
-                
-                # Proceed to structure data (now including the summary)
-                structured_row = structure_data_for_csv_row(details) # Use a helper for single row
-                if structured_row:
-                     scraped_and_summarized_data.append(structured_row)
-                     processed_urls.add(url)
-                     print(f"Successfully scraped and summarized: {details['title']}")
-                else:
-                    print(f"Failed to structure data for {url}")
-
-            else:
-                 print(f"Failed to parse essential details for article: {url}")
+                parsed_articles.append(details)
+                continue
+            print(f"Failed to parse essential details for article: {url}")
+        else:
+            print(f"Failed to fetch article page: {url} ({page.error})")
+        if fetch_failures is not None:
+            fetch_failures[url] = fetch_failures.get(url, 0) + 1
+
+    # Summarize the whole batch at once: cached and near-duplicate articles are
+    # reused, the rest run concurrently
+    summaries = summarize_articles(parsed_articles, use_llm=ENABLE_SUMMARIZATION)
+    for details, article_summary in zip(parsed_articles, summaries):
+        if not details.get('content'):
+            print(f"Skipping summary for {details['link_to_article']} due to missing content.")
+        # Add the summary to the details dictionary
+        details['summary'] = article_summary 
+        
+        # Proceed to structure data (now including the summary)
+        structured_row = structure_data_for_csv_row(details) # Use a helper for single row
+        if structured_row:
+             scraped_and_summarized_data.append(structured_row)
+             print(f"Successfully scraped and summarized: {details['title']}")
         else:
-            print(f"Failed to fetch article page: {url}")
-            
-        print(f"Waiting for {REQUEST_DELAY} second(s)...")
-        time.sleep(REQUEST_DELAY)
+            print(f"Failed to structure data for {details['link_to_article']}")
         
     print(f"Scraping & Summarization finished. Collected {len(scraped_and_summarized_data)} articles.")
     return scraped_and_summarized_data
@@ -327,19 +325,83 @@ def structure_data_for_csv_row(article_details):
         "summary": article_details.get("summary", ""), # Get the generated summary
         "topic": topic,
         "link_to_article": article_details.get("link_to_article", ""),
+        "published_at": pub_date_str or "",
     }
     return structured_row
     
+CSV_FIELDNAMES = [
+    "Team_name", "season", "city", "conference", "division", 
+    "logo_url", "summary", "topic", "link_to_article", "published_at"
+]
+
+def load_seen_urls(seed_from_graph=False):
+    """
+    URLs of articles already processed: the seen-URL file, or on the first
+    incremental run the articles in the existing CSV. With `seed_from_graph`
+    the Team_Story nodes already in Neo4j are added too.
+    """
+    seen_urls = set()
+    if os.path.exists(SEEN_URLS_FILE):
+        with open(SEEN_URLS_FILE, 'r', encoding='utf-8') as f:
+            seen_urls.update(json.load(f).get("urls", []))
+    elif os.path.exists(OUTPUT_CSV_FILE):
+        with open(OUTPUT_CSV_FILE, 'r', encoding='utf-8') as f:
+            seen_urls.update(row["link_to_article"] for row in csv.DictReader(f) if row.get("link_to_article"))
+
+    if seed_from_graph:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        from gradio_neo4j import get_session
+        with get_session() as session:
+            result = session.run("MATCH (s:Team_Story) WHERE s.link_to_article IS NOT NULL RETURN s.link_to_article AS url")
+            graph_urls = {record["url"] for record in result}
+        print(f"Loaded {len(graph_urls)} article URLs from Neo4j")
+        seen_urls |= graph_urls
+    return seen_urls
+
+def load_fetch_failures():
+    """url -> runs that failed to fetch or parse the article, from the seen-URL file."""
+    if not os.path.exists(SEEN_URLS_FILE):
+        return {}
+    with open(SEEN_URLS_FILE, 'r', encoding='utf-8') as f:
+        return dict(json.load(f).get("fetch_failures", {}))
+
+def save_seen_urls(seen_urls, fetch_failures=None):
+    """
+    Write the seen-URL file. Articles in `fetch_failures` that failed
+    MAX_FETCH_ATTEMPTS runs are marked seen, so a dead link is not refetched
+    forever; the others keep their count and are retried next run.
+    """
+    fetch_failures = fetch_failures or {}
+    given_up = {url for url, count in fetch_failures.items() if count >= MAX_FETCH_ATTEMPTS}
+    if given_up:
+        print(f"Giving up on {len(given_up)} articles that failed in {MAX_FETCH_ATTEMPTS} runs.")
+    seen_urls = set(seen_urls) | given_up
+    pending = {url: count for url, count in fetch_failures.items() if url not in seen_urls}
+    with open(SEEN_URLS_FILE + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({"urls": sorted(seen_urls), "fetch_failures": pending,
+                   "updated_at": datetime.now(timezone.utc).isoformat()}, f, indent=2)
+    os.replace(SEEN_URLS_FILE + ".tmp", SEEN_URLS_FILE)
+
+def append_to_csv(data, filename):
+    """Appends rows to the CSV, writing the header if the file is new."""
+    if not data:
+        print("No new rows to append.")
+        return
+    new_file = not os.path.exists(filename)
+    with open(filename, 'a', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CSV_FIELDNAMES)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(data)
+    print(f"Appended {len(data)} rows to {filename}")
+
 def write_to_csv(data, filename):
     """Writes the structured data to a CSV file."""
     if not data:
         print("No data to write to CSV.")
         return
         
-    fieldnames = [
-        "Team_name", "season", "city", "conference", "division", 
-        "logo_url", "summary", "topic", "link_to_article"
-    ]
+    fieldnames = CSV_FIELDNAMES
     
     if not all(key in data[0] for key in fieldnames):
         print(f"Error: Mismatch between defined fieldnames and data keys.")
@@ -361,10 +423,28 @@ def write_to_csv(data, filename):
 
 # --- Main Execution --- 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape and summarize Niners Nation articles")
+    parser.add_argument("--full", action="store_true",
+                        help="Re-process every article in the window and rewrite the CSV instead of crawling incrementally")
+    parser.add_argument("--seed-from-graph", action="store_true",
+                        help="Also treat Team_Story articles already in Neo4j as processed")
+    args = parser.parse_args()
+
+    seen_urls = None if args.full else load_seen_urls(args.seed_from_graph)
+    fetch_failures = load_fetch_failures()
     # Call the main orchestrator function that includes summarization
-    processed_articles = scrape_and_summarize_niners_nation()
+    processed_articles = scrape_and_summarize_niners_nation(seen_urls, fetch_failures)
     
-    if processed_articles:
-        write_to_csv(processed_articles, OUTPUT_CSV_FILE)
-    else:
-        print("No articles were processed.") 
\ No newline at end of file
+    if args.full:
+        if processed_articles:
+            write_to_csv(processed_articles, OUTPUT_CSV_FILE)
+        else:
+            print("No articles were processed.")
+        seen_urls = set()
+    # Articles whose summary failed (or was skipped) are retried next run rather than marked seen
+    summarized_articles = [row for row in processed_articles if row["summary"]]
+    if len(summarized_articles) < len(processed_articles):
+        print(f"{len(processed_articles) - len(summarized_articles)} articles have no summary; leaving them for the next run.")
+    if not args.full:
+        append_to_csv(summarized_articles, OUTPUT_CSV_FILE)
+    save_seen_urls(seen_urls | {row["link_to_article"] for row in summarized_articles}, fetch_failures)
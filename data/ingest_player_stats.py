@@ -0,0 +1,160 @@
+############################################
+# ingest_player_stats.py
+############################################
+"""
+Ingestion stage for per-game player stats.
+
+Loads the enhanced stats CSV written by game_stats.py as
+(:Player)-[:PLAYED {stats}]->(:Game) relationships with typed numeric
+properties (gradio_stats.PLAYED_STATS), in UNWIND batches. It then refreshes
+the precomputed values, but only for the players and games in this run:
+    - Player.season_* totals, summed over each touched player's PLAYED stats
+      in the latest season with stats (Player.stats_season). When a newer
+      season arrives, totals left from an older one are recomputed or
+      cleared, so they never add up several seasons
+    - Game.top_performers, from the stats rows of each touched game
+So adding a new game's rows only recomputes that game and its players.
+
+Stats rows are matched to the graph by nflverse game id (week + teams) and by
+player short name ("N.Bosa") against the roster. The nflverse player id is
+then stored as Player.gsis_id for later runs. Players who are not on the
+roster are reported and skipped, but still count for top performers.
+
+Usage:
+    python data/ingest_player_stats.py
+    python data/ingest_player_stats.py --csv path/to/stats.csv --game-id 2024_18_SF_ARI
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradio_neo4j import bump_data_version, close_driver, get_session
+from gradio_stats import (
+    SEASON_TOTAL_KEYS, STATS_CSV, match_games, match_players, played_stats, season_totals, stats_game_season,
+    top_performers,
+)
+
+load_dotenv()
+
+BATCH_SIZE = 500
+
+
+def load_stats_rows(csv_path, game_ids=None):
+    """Stats CSV rows as dicts, optionally only for some nflverse game ids."""
+    df = pd.read_csv(csv_path)
+    if game_ids:
+        df = df[df["game_id"].isin(game_ids)]
+    return [{k: None if pd.isna(v) else v for k, v in row.items()} for row in df.to_dict("records")]
+
+
+def ingest_player_stats(session, rows):
+    """Upsert PLAYED relationships and refresh the touched aggregates; returns the number of relationships."""
+    games = session.run("""
+        MATCH (g:Game)
+        RETURN g.game_id AS game_id, g.week AS week, g.home_team AS home_team,
+               g.away_team AS away_team, g.kickoff AS kickoff
+    """).data()
+    for game in games:
+        # neo4j.time.DateTime -> datetime for nfl_season()
+        if game["kickoff"] is not None and hasattr(game["kickoff"], "to_native"):
+            game["kickoff"] = game["kickoff"].to_native()
+    roster = session.run("MATCH (p:Player) RETURN p.player_id AS player_id, p.name AS name, p.gsis_id AS gsis_id").data()
+    names = {player["player_id"]: player["name"] for player in roster}
+
+    game_map = match_games({row["game_id"] for row in rows}, games)
+    player_map = match_players({row["player_id"]: row["player_name"] for row in rows}, roster)
+    for stats_game_id in sorted({row["game_id"] for row in rows} - set(game_map)):
+        print(f"Warning: no Game node for stats game {stats_game_id}")
+    unmatched = sorted({row["player_name"] for row in rows if row["player_id"] not in player_map})
+    if unmatched:
+        print(f"Skipping {len(unmatched)} players not on the roster: {', '.join(unmatched)}")
+
+    played = [
+        {
+            "player_id": player_map[row["player_id"]],
+            "gsis_id": row["player_id"],
+            "game_id": game_map[row["game_id"]],
+            "stats_game_id": row["game_id"],
+            "stats": played_stats(row),
+        }
+        for row in rows
+        if row["game_id"] in game_map and row["player_id"] in player_map
+    ]
+    for start in range(0, len(played), BATCH_SIZE):
+        session.run("""
+            UNWIND $rows AS row
+            MATCH (p:Player {player_id: row.player_id})
+            MATCH (g:Game {game_id: row.game_id})
+            SET p.gsis_id = row.gsis_id, g.stats_game_id = row.stats_game_id
+            MERGE (p)-[r:PLAYED]->(g)
+            SET r = row.stats
+        """, {"rows": played[start:start + BATCH_SIZE]})
+    print(f"Upserted {len(played)} PLAYED relationships.")
+
+    # Season totals for the latest season with stats: the touched players, plus
+    # players whose totals are from an older season (cleared if they have no games in it)
+    latest = session.run("MATCH (:Player)-[:PLAYED]->(g:Game) RETURN max(g.stats_game_id) AS stats_game_id").single()
+    season = stats_game_season(latest["stats_game_id"] if latest else None)
+    player_ids = sorted({row["player_id"] for row in played})
+    records = session.run("""
+        MATCH (p:Player)
+        WHERE p.player_id IN $player_ids
+           OR (p.season_games IS NOT NULL AND coalesce(p.stats_season, -1) <> $season)
+        OPTIONAL MATCH (p)-[r:PLAYED]->(g:Game)
+        WHERE g.stats_game_id STARTS WITH $season_prefix
+        RETURN p.player_id AS player_id, collect(properties(r)) AS played
+    """, {"player_ids": player_ids, "season": season, "season_prefix": f"{season}_"}).data()
+    cleared = dict.fromkeys(SEASON_TOTAL_KEYS)
+    totals = [
+        {"player_id": record["player_id"],
+         "totals": dict(cleared, **season_totals(record["played"], season)) if record["played"] else cleared}
+        for record in records
+    ]
+    for start in range(0, len(totals), BATCH_SIZE):
+        session.run("""
+            UNWIND $rows AS row
+            MATCH (p:Player {player_id: row.player_id})
+            SET p += row.totals
+        """, {"rows": totals[start:start + BATCH_SIZE]})
+    print(f"Updated {season} season totals on {len(totals)} players.")
+
+    # Top performers for the touched games, from every stats row of the game
+    by_game = {}
+    for row in rows:
+        if row["game_id"] in game_map:
+            name = names.get(player_map.get(row["player_id"])) or row["player_name"]
+            by_game.setdefault(game_map[row["game_id"]], []).append((name, played_stats(row)))
+    leaders = [{"game_id": game_id, "top_performers": top_performers(players)} for game_id, players in by_game.items()]
+    session.run("""
+        UNWIND $rows AS row
+        MATCH (g:Game {game_id: row.game_id})
+        SET g.top_performers = row.top_performers
+    """, {"rows": leaders})
+    print(f"Updated top performers on {len(leaders)} games.")
+    return len(played)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load per-game player stats into Neo4j as PLAYED relationships")
+    parser.add_argument("--csv", default=STATS_CSV, help="Enhanced stats CSV written by game_stats.py")
+    parser.add_argument("--game-id", action="append", help="Only load this nflverse game id (repeatable)")
+    args = parser.parse_args()
+
+    rows = load_stats_rows(args.csv, args.game_id)
+    print(f"Loaded {len(rows)} stats rows from {args.csv}")
+    with get_session() as session:
+        if ingest_player_stats(session, rows):
+            # Tell running apps to drop cached query results
+            bump_data_version(session)
+    close_driver()
+    print("Player stats ingestion complete!")
+
+
+if __name__ == "__main__":
+    main()
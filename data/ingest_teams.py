@@ -0,0 +1,82 @@
+############################################
+# ingest_teams.py
+############################################
+"""
+Ingestion stage for first-class :Team nodes.
+
+MERGEs one (:Team) node per NFL club (gradio_teams.NFL_TEAMS, logos from
+nfl_team_logos_revised.csv) and links every Game to its clubs with
+(:Team)-[:HOME_IN]->(:Game) and (:Team)-[:AWAY_IN]->(:Game), so tools can
+start from an indexed team node instead of scanning home_team/away_team
+strings on every game.
+
+neo4j_ingestion.py runs this after loading games. Run it on its own to add
+the teams and links to an existing graph; it is safe to re-run.
+
+Usage:
+    python data/ingest_teams.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_session
+from gradio_teams import team_records
+from gradio_utils import search_keys_for
+
+load_dotenv()
+
+
+def ingest_teams(session):
+    """MERGE the :Team nodes and their HOME_IN/AWAY_IN links; returns (teams, links)."""
+    session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (t:Team) REQUIRE t.name IS UNIQUE")
+
+    teams = [{**team, **search_keys_for("Team", team)} for team in team_records()]
+    session.run("""
+        UNWIND $teams AS team
+        MERGE (t:Team {name: team.name})
+        SET t += team
+    """, {"teams": teams})
+    print(f"Merged {len(teams)} :Team nodes.")
+
+    # Teams are looked up through the name uniqueness constraint
+    home = session.run("""
+        MATCH (g:Game)
+        MATCH (t:Team {name: g.home_team})
+        MERGE (t)-[:HOME_IN]->(g)
+        RETURN count(*) AS links
+    """).single()["links"]
+    away = session.run("""
+        MATCH (g:Game)
+        MATCH (t:Team {name: g.away_team})
+        MERGE (t)-[:AWAY_IN]->(g)
+        RETURN count(*) AS links
+    """).single()["links"]
+
+    unlinked = session.run("""
+        MATCH (g:Game)
+        WHERE NOT (:Team)-[:HOME_IN]->(g) OR NOT (:Team)-[:AWAY_IN]->(g)
+        RETURN g.home_team AS home_team, g.away_team AS away_team
+    """).data()
+    for game in unlinked:
+        print(f"Warning: no :Team node for {game['home_team']} vs {game['away_team']}")
+    print(f"Linked {home} HOME_IN and {away} AWAY_IN relationships.")
+    return len(teams), home + away
+
+
+def main():
+    with get_session() as session:
+        ensure_indexes(session)
+        ingest_teams(session)
+        # Tell running apps to drop cached query results
+        bump_data_version(session)
+    close_driver()
+    print("Team ingestion complete!")
+
+
+if __name__ == "__main__":
+    main()
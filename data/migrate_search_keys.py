@@ -0,0 +1,62 @@
+############################################
+# migrate_search_keys.py
+############################################
+"""
+One-off migration for an existing graph: backfills the normalized *_key
+search properties (gradio_utils.SEARCH_KEYS) on every node that has the
+source properties, creates their range/text indexes and bumps the data
+version so running apps drop cached query results.
+
+Safe to re-run: keys are recomputed from the source properties each time.
+
+Usage:
+    python data/migrate_search_keys.py
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_session
+from gradio_utils import SEARCH_KEYS, search_keys_for
+
+load_dotenv()
+
+BATCH_SIZE = 500
+
+
+def backfill_label(session, label, keys):
+    """Recompute the search keys for every node with this label, in batches."""
+    sources = sorted({source for source, _ in keys.values()})
+    returns = ", ".join(f"n.{source} AS {source}" for source in sources)
+    records = session.run(f"MATCH (n:{label}) RETURN elementId(n) AS id, {returns}").data()
+
+    rows = [{"id": record["id"], "keys": search_keys_for(label, record)} for record in records]
+    for start in range(0, len(rows), BATCH_SIZE):
+        session.run(f"""
+            UNWIND $rows AS row
+            MATCH (n:{label}) WHERE elementId(n) = row.id
+            SET n += row.keys
+        """, {"rows": rows[start:start + BATCH_SIZE]})
+    print(f"Backfilled {', '.join(keys)} on {len(rows)} :{label} nodes.")
+    return len(rows)
+
+
+def main():
+    with get_session() as session:
+        updated = 0
+        for label, keys in SEARCH_KEYS.items():
+            updated += backfill_label(session, label, keys)
+        ensure_indexes(session)
+        if updated:
+            # Tell running apps to drop cached query results
+            bump_data_version(session)
+    close_driver()
+    print("Search-key migration complete!")
+
+
+if __name__ == "__main__":
+    main()
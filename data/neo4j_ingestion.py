@@ -3,24 +3,27 @@
 ############################################
 
 import os
+import sys
 import csv
 import uuid
 import pandas as pd
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 
+# Add the project root to the path for the shared Neo4j connection manager
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradio_neo4j import bump_data_version, close_driver, ensure_indexes, get_connection_settings, get_session
+from gradio_utils import search_keys_for, typed_game_fields
+from ingest_player_stats import STATS_CSV, ingest_player_stats, load_stats_rows
+from ingest_teams import ingest_teams
+
 # Load environment variables
 load_dotenv()
 
 # ------------------------------------------------------------------------------
 # CONFIGURE THESE TO MATCH YOUR ENVIRONMENT
 # ------------------------------------------------------------------------------
-NEO4J_URI = os.getenv('AURA_CONNECTION_URI')
-NEO4J_USER = os.getenv('AURA_USERNAME')
-NEO4J_PASS = os.getenv('AURA_PASSWORD')
-
-if not all([NEO4J_URI, NEO4J_USER, NEO4J_PASS]):
-    raise ValueError("Missing required Neo4j credentials in .env file")
+# Credentials (AURA_* or NEO4J_*) and pool settings come from gradio_neo4j.py
+get_connection_settings()
 
 # Update CSV_DIR to use absolute path
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -137,11 +140,10 @@ def ingest_to_neo4j():
     Connects to Neo4j, deletes existing data, creates constraints,
     loads node CSVs, then loads relationship CSVs.
     """
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASS))
-
-    with driver.session() as session:
+    with get_session() as session:
         # (A) DELETE CURRENT CONTENTS
-        session.run("MATCH (n) DETACH DELETE n")
+        # Keep the DataVersion stamp so its counter keeps increasing across re-ingests
+        session.run("MATCH (n) WHERE NOT n:DataVersion DETACH DELETE n")
         print("Cleared existing graph data.")
 
         # (B) Create uniqueness constraints - Updated with exact column name
@@ -151,6 +153,9 @@ def ingest_to_neo4j():
         session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (f:Fan) REQUIRE f.fan_id IS UNIQUE")
         print("Created/ensured constraints.")
 
+        # Range/text indexes on the normalized *_key search properties and typed Game fields
+        ensure_indexes(session)
+
         # 1) Communities - Updated to handle duplicates
         communities_df = pd.read_csv(os.path.join(CSV_DIR, COMMUNITIES_FILE))
         
@@ -176,6 +181,7 @@ def ingest_to_neo4j():
             params["state"] = params.pop("Meeting Location Address (State)", "") or ""
             params["email_contact"] = params.pop("Email Address", "") or ""
             params["meetup_info"] = f"{params.pop('Venue', '')} - {params.pop('Venue Location', '')}"
+            params["keys"] = search_keys_for("Community", params)
 
             session.run("""
                 CREATE (c:Community {
@@ -185,6 +191,7 @@ def ingest_to_neo4j():
                     email_contact: $email_contact,
                     meetup_info: $meetup_info
                 })
+                SET c += $keys
             """, params)
         print(f"Imported {len(communities_df)} unique Communities.")
 
@@ -192,6 +199,7 @@ def ingest_to_neo4j():
         players_df = pd.read_csv(os.path.join(CSV_DIR, ROSTER_FILE))
         for _, row in players_df.iterrows():
             params = clean_row_dict(row)
+            params["keys"] = search_keys_for("Player", {"name": params.get("Player")})
             session.run("""
                 CREATE (p:Player {
                     player_id: $player_id,
@@ -203,6 +211,7 @@ def ingest_to_neo4j():
                     college: $College,
                     years_in_nfl: toInteger($Exp)
                 })
+                SET p += $keys
             """, params)
         print("Imported Players.")
 
@@ -210,6 +219,10 @@ def ingest_to_neo4j():
         games_df = pd.read_csv(os.path.join(CSV_DIR, SCHEDULE_FILE))
         for _, row in games_df.iterrows():
             params = clean_row_dict(row)
+            params["keys"] = search_keys_for("Game", {"home_team": params.get("HomeTeam"), "away_team": params.get("AwayTeam")})
+            # Native date/datetime and integer copies of the Date/Result strings
+            params["typed"] = typed_game_fields(params.get("Date"), params.get("Result"), params.get("Round Number"),
+                                                params.get("HomeTeam"), params.get("AwayTeam"))
             session.run("""
                 CREATE (g:Game {
                     game_id: $game_id,
@@ -221,9 +234,17 @@ def ingest_to_neo4j():
                     summary: $Summary,
                     embedding: $embedding
                 })
+                SET g += $keys, g += $typed
             """, params)
         print("Imported Games.")
 
+        # 3b) Teams for all 32 clubs, linked to their games with HOME_IN / AWAY_IN
+        ingest_teams(session)
+
+        # 3c) Per-game player stats as PLAYED relationships, with season totals and top performers
+        if os.path.exists(STATS_CSV):
+            ingest_player_stats(session, load_stats_rows(STATS_CSV))
+
         # 4) Fans - This one was correct, no changes needed
         fans_df = pd.read_csv(os.path.join(CSV_DIR, FANS_FILE))
         for _, row in fans_df.iterrows():
@@ -263,7 +284,10 @@ def ingest_to_neo4j():
                 """, params)
             print("Created Fan -> Community relationships.")
 
-    driver.close()
+        # Tell running apps to drop cached query results
+        bump_data_version(session)
+
+    close_driver()
     print("Neo4j ingestion complete!")
 
 # ------------------------------------------------------------------------------
@@ -3,6 +3,7 @@ Agent implementation for 49ers chatbot using LangChain and Neo4j.
 Gradio-compatible version that doesn't rely on Streamlit.
 """
 import os
+import functools
 from langchain.agents import AgentExecutor, create_react_agent
 from langchain_core.prompts import PromptTemplate
 from langchain.tools import Tool
@@ -16,15 +17,19 @@ from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain.memory import ConversationBufferMemory
 
 # Import Gradio-specific modules directly
-from gradio_llm import llm
+from gradio_llm import llm, agent_llm
 from gradio_graph import graph
 from prompts import AGENT_SYSTEM_PROMPT, CHAT_SYSTEM_PROMPT
 from gradio_utils import get_session_id
+from gradio_tracing import set_attribute, span, traced
+from gradio_metrics import BUDGET_FALLBACKS, PARSING_ERRORS
+from gradio_usage import ledger, over_budget, tool_scope, usage_scope
 
 # Import tools
 from tools.cypher import cypher_qa_wrapper
 from tools.game_recap import game_recap_qa, get_last_game_data
 from tools.player_search import player_search_qa, get_last_player_data
+from tools.player_stats import player_stats_qa, ARGUMENTS_HELP as PLAYER_STATS_ARGUMENTS
 from tools.team_story import team_story_qa, get_last_team_story_data
 
 # Create a basic chat chain for general football discussion
@@ -38,40 +43,9 @@ chat_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-# Create a non-streaming LLM for the agent
-from langchain_openai import ChatOpenAI
-
 # Import Zep client
 from zep_cloud.client import Zep
 
-# Get API key from environment only (no Streamlit)
-def get_api_key(key_name):
-    """Get API key from environment variables only (no Streamlit)"""
-    value = os.environ.get(key_name)
-    if value:
-        print(f"Found {key_name} in environment variables")
-    return value
-
-OPENAI_API_KEY = get_api_key("OPENAI_API_KEY")
-OPENAI_MODEL = get_api_key("OPENAI_MODEL") or "gpt-4-turbo"
-
-# Use a fallback key if available for development
-if not OPENAI_API_KEY:
-    fallback_key = os.environ.get("OPENAI_API_KEY_FALLBACK")
-    if fallback_key:
-        print("Using fallback API key for development")
-        OPENAI_API_KEY = fallback_key
-    else:
-        raise ValueError(f"OPENAI_API_KEY not found in environment variables")
-
-
-agent_llm = ChatOpenAI(
-    openai_api_key=OPENAI_API_KEY,
-    model=OPENAI_MODEL,
-    temperature=0.1,
-    streaming=True,  # Enable streaming for agent
-)
-
 movie_chat = chat_prompt | llm | StrOutputParser()
 
 def football_chat_wrapper(input_text):
@@ -99,6 +73,15 @@ Examples: "Tell me about Brock Purdy", "Who is player number 97?", "Show me Nick
 Returns text summary and potentially visual card data.""",
         func=player_search_qa
     ),
+    Tool.from_function(
+        name="Player Stats",
+        description="""Use for 2024 season STAT questions that rank, total or break down numbers: leaders, per-game splits, weekly bests.
+Examples: "Top 5 rushers", "Brock Purdy's EPA by game", "Who led in YAC in week 7?", "How many sacks did the defensive line have?"
+Do NOT pass the question text. """ + PLAYER_STATS_ARGUMENTS + """
+Stats include: sacks, qb_hits, tackles, solo_tackles, interceptions, pass_defenses, complete_passes, pass_attempts, air_yards, yards_after_catch, qb_epa, cpoe, rush_attempts, rush_epa, first_downs_rush, targets, receiving_epa, rec_avg_yac, rec_avg_air_yards.
+Returns exact numbers and a table that is displayed to the user.""",
+        func=player_stats_qa
+    ),
     Tool.from_function(
         name="Team News Search",
         description="""Use for questions about recent 49ers news, articles, summaries, or specific topics like 'draft' or 'roster moves'. 
@@ -123,6 +106,26 @@ Do NOT use for any 49ers-specific questions.""",
     )
 ]
 
+def handle_parsing_error(error):
+    """Count ReAct output parsing failures, then give the agent the standard retry hint"""
+    print(f"[AGENT] Output parsing error, asking the agent to retry: {str(error)[:200]}")
+    PARSING_ERRORS.inc()
+    set_attribute("parsing_error", True)
+    return "Invalid or incomplete response"
+
+def instrument_tool(tool_name, func):
+    """Give a tool call its own trace span and attribute its LLM usage to the tool"""
+    traced_func = traced("tool", tool=tool_name)(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with tool_scope(tool_name):
+            return traced_func(*args, **kwargs)
+    return wrapper
+
+for _tool in tools:
+    _tool.func = instrument_tool(_tool.name, _tool.func)
+
 # Global variables are declared before functions that use them
 # This creates clarity about shared state and follows the pattern:
 # "declare shared state first, then define functions that interact with it"
@@ -201,7 +204,7 @@ agent_executor = AgentExecutor(
     agent=agent,
     tools=tools,
     verbose=True,
-    handle_parsing_errors=True,
+    handle_parsing_errors=handle_parsing_error,
     max_iterations=5  # Limit the number of iterations to prevent infinite loops
 )
 
@@ -214,6 +217,7 @@ chat_agent = RunnableWithMessageHistory(
 )
 
 # Create a function to initialize memory with Zep history
+@traced("memory.load")
 def initialize_memory_from_zep(session_id):
     """Initialize a LangChain memory object with history from Zep"""
     try:
@@ -231,6 +235,7 @@ def initialize_memory_from_zep(session_id):
         
         if memory and memory.messages:
             print(f"[MEMORY LOAD] Loading {len(memory.messages)} messages from Zep for {current_persona} persona")
+            set_attribute("message_count", len(memory.messages))
             
             # Add messages to the conversation memory
             for msg in memory.messages:
@@ -252,6 +257,7 @@ def initialize_memory_from_zep(session_id):
             return_messages=True
         )
 
+@traced("agent.generate_response")
 def generate_response(user_input, session_id=None):
     """
     Generate a response using the agent and tools
@@ -261,16 +267,40 @@ def generate_response(user_input, session_id=None):
         session_id (str, optional): The session ID for memory
         
     Returns:
-        dict: The full response object from the agent
+        dict: The full response object from the agent, with token usage and
+        estimated cost for this request in metadata["usage"]
     """
+    if not session_id:
+        session_id = get_session_id()
+        print(f'[RESPONSE GEN] Generated new session ID: {session_id}')
+
+    with usage_scope(session_id, current_persona) as usage:
+        response = _generate_response(user_input, session_id)
+
+    request_usage = ledger.pop_request(usage["request_id"])
+    response.setdefault("metadata", {})["usage"] = request_usage
+    print(f"[USAGE] {request_usage['calls']} calls, {request_usage['total_tokens']} tokens "
+          f"(~${request_usage['cost_usd']:.4f}) for session {session_id} ({current_persona})")
+    return response
+
+def _generate_response(user_input, session_id):
+    """Run the agent for one question; see generate_response"""
     print('[RESPONSE GEN] Starting generate_response function...')
     print(f'[RESPONSE GEN] User input: {user_input}')
     print(f'[RESPONSE GEN] Session ID: {session_id}')
     print(f'[RESPONSE GEN] Current persona: {current_persona}')
+    set_attribute("question", user_input)
+    set_attribute("persona", current_persona)
 
-    if not session_id:
-        session_id = get_session_id()
-        print(f'[RESPONSE GEN] Generated new session ID: {session_id}')
+    # Past the session's token budget: fewer iterations and retries (the LLMs
+    # themselves switch to the fast model, see gradio_llm.py)
+    budget_exceeded = over_budget()
+    max_iterations = 3 if budget_exceeded else 5
+    max_retries = 1 if budget_exceeded else 3
+    if budget_exceeded:
+        print(f'[USAGE] Session {session_id} is over its token budget, using the fast path')
+        BUDGET_FALLBACKS.inc()
+        set_attribute("budget_fallback", True)
     
     # Initialize memory with Zep history
     memory = initialize_memory_from_zep(session_id)
@@ -307,19 +337,19 @@ def generate_response(user_input, session_id=None):
         tools=tools,
         verbose=True,
         memory=memory,  # Use the memory we initialized
-        handle_parsing_errors=True,
-        max_iterations=5
+        handle_parsing_errors=handle_parsing_error,
+        max_iterations=max_iterations
     )
     
     # Add retry logic
-    max_retries = 3
     for attempt in range(max_retries):
         try:
             print('Invoking session agent executor...')
             # The agent will now have access to the loaded history
             persona_prefix = f"[RESPOND AS {current_persona.upper()}]: "
             augmented_input = f"{persona_prefix}{user_input}"
-            response = session_agent_executor.invoke({"input": augmented_input})
+            with span("agent.run", attempt=attempt + 1):
+                response = session_agent_executor.invoke({"input": augmented_input})
             
             # Extract the output and format it for Streamlit
             if isinstance(response, dict):
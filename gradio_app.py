@@ -13,18 +13,22 @@ import gradio_utils
 from components.game_recap_component import create_game_recap_component
 from components.player_card_component import create_player_card_component
 from components.team_story_component import create_team_story_component
+from components.stats_table_component import create_stats_table_component
 
 # Import the Gradio-compatible agent instead of the original agent
 import gradio_agent
 from gradio_agent import generate_response, set_memory_session_id
+from gradio_tracing import span, traced
+from gradio_metrics import start_metrics_server
 
 # Import cache getter functions
 from tools.game_recap import get_last_game_data
 from tools.player_search import get_last_player_data
 from tools.team_story import get_last_team_story_data
+from tools.player_stats import get_last_stats_data
 
 # --- IMPORTANT: Need access to the lists themselves to clear them --- #
-from tools import game_recap, player_search, team_story
+from tools import game_recap, player_search, player_stats, team_story
 
 # Load persona session IDs
 def load_persona_session_ids():
@@ -372,6 +376,7 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
     persona_radio.change(on_persona_change, inputs=[persona_radio], outputs=[persona_feedback])
 
     # Define a combined function for user input and bot response
+    @traced("request")
     async def process_and_respond(message, history):
         """Process user input, get agent response, check for components, and update history."""
         
@@ -380,6 +385,7 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
         player_search.LAST_PLAYER_DATA = [] 
         game_recap.LAST_GAME_DATA = []
         team_story.LAST_TEAM_STORY_DATA = []
+        player_stats.LAST_STATS_DATA = None
         # --- End cache clearing --- #
 
         print(f"process_and_respond: Received message: {message}")
@@ -405,7 +411,8 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
         player_data = get_last_player_data()
         if player_data:
             print(f"process_and_respond: Found player data: {player_data}")
-            player_card_component = create_player_card_component(player_data)
+            with span("component.render", component="player_card"):
+                player_card_component = create_player_card_component(player_data)
             if player_card_component:
                 response_list.append((None, player_card_component))
                 print("process_and_respond: Added player card component.")
@@ -416,7 +423,8 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
         game_data = get_last_game_data()
         if game_data:
             print(f"process_and_respond: Found game data: {game_data}")
-            game_recap_comp = create_game_recap_component(game_data)
+            with span("component.render", component="game_recap"):
+                game_recap_comp = create_game_recap_component(game_data)
             if game_recap_comp:
                 response_list.append((None, game_recap_comp))
                 print("process_and_respond: Added game recap component.")
@@ -427,12 +435,22 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
         team_story_data = get_last_team_story_data()
         if team_story_data:
              print(f"process_and_respond: Found team story data: {team_story_data}")
-             team_story_comp = create_team_story_component(team_story_data)
+             with span("component.render", component="team_story"):
+                 team_story_comp = create_team_story_component(team_story_data)
              if team_story_comp:
                   response_list.append((None, team_story_comp))
                   print("process_and_respond: Added team story component.")
              else:
                   print("process_and_respond: Team story data found but component creation failed.")
+
+        # Check for Player Stats table
+        stats_data = get_last_stats_data()
+        if stats_data:
+            with span("component.render", component="stats_table"):
+                stats_table_comp = create_stats_table_component(stats_data)
+            if stats_table_comp:
+                response_list.append((None, stats_table_comp))
+                print("process_and_respond: Added stats table component.")
                  
         # Update history with all parts of the response (text + components)
         # Gradio's Chatbot handles lists of (user, assistant) tuples, 
@@ -472,4 +490,5 @@ with gr.Blocks(title="49ers FanAI Hub", css=css) as demo:
 
 # Launch the app
 if __name__ == "__main__":
+    start_metrics_server()
     demo.launch() 
@@ -1,62 +1,101 @@
 """
 This module initializes the Neo4j graph connection without Streamlit dependencies.
+
+Set IFX_GRAPH_BACKEND=fake to use the in-memory graph in backends/fake_graph.py,
+loaded from the repo CSVs, instead of connecting to Neo4j. With IFX_CASSETTE_MODE
+set, graph.query() is recorded to or replayed from backends/cassette.py.
+
+Read queries are cached in memory (backends/query_cache.py) until the graph's
+DataVersion changes; IFX_QUERY_CACHE_SIZE=0 turns the cache off.
+
+Pool size, timeouts and read routing for the Neo4j connection are configured
+in gradio_neo4j.py.
 """
 
 import os
 from dotenv import load_dotenv
 from langchain_neo4j import Neo4jGraph
 
+from gradio_neo4j import (
+    NEO4J_DATABASE,
+    QUERY_TIMEOUT,
+    ReadRoutedGraph,
+    driver_config,
+    get_connection_settings,
+    register_driver,
+)
+
 # Load environment variables
 load_dotenv()
 
-# Get Neo4j credentials from environment
-def get_credential(key_name):
-    """Get credential from environment variables"""
-    # Try different possible environment variable names
-    possible_names = [key_name]
-    
-    # Add alternative names
-    if key_name.startswith("AURA_"):
-        possible_names.append(f"NEO4J_{key_name[5:]}")
-    elif key_name.startswith("NEO4J_"):
-        possible_names.append(f"AURA_{key_name[6:]}")
-    
-    # Try each possible name
-    for name in possible_names:
-        value = os.environ.get(name)
-        if value:
-            return value
-    
-    return None
-
-# Get Neo4j credentials
-AURA_CONNECTION_URI = get_credential("AURA_CONNECTION_URI") or get_credential("NEO4J_URI")
-AURA_USERNAME = get_credential("AURA_USERNAME") or get_credential("NEO4J_USERNAME")
-AURA_PASSWORD = get_credential("AURA_PASSWORD") or get_credential("NEO4J_PASSWORD")
-
-# Check if credentials are available
-if not all([AURA_CONNECTION_URI, AURA_USERNAME, AURA_PASSWORD]):
-    missing = []
-    if not AURA_CONNECTION_URI:
-        missing.append("AURA_CONNECTION_URI/NEO4J_URI")
-    if not AURA_USERNAME:
-        missing.append("AURA_USERNAME/NEO4J_USERNAME")
-    if not AURA_PASSWORD:
-        missing.append("AURA_PASSWORD/NEO4J_PASSWORD")
-    
-    error_message = f"Missing Neo4j credentials: {', '.join(missing)}"
-    print(f"ERROR: {error_message}")
-    raise ValueError(error_message)
-
-# Connect to Neo4j
-try:
-    graph = Neo4jGraph(
-        url=AURA_CONNECTION_URI,
-        username=AURA_USERNAME,
-        password=AURA_PASSWORD,
+# Backend selection: "neo4j" (default) or "fake" for the in-memory CSV-backed graph
+GRAPH_BACKEND = os.environ.get("IFX_GRAPH_BACKEND", "neo4j").strip().lower()
+
+import gradio_metrics
+from backends.cassette import CassetteGraph, get_cassette
+from backends.query_cache import QueryCacheGraph
+from gradio_tracing import TRACING_ENABLED, TracingGraph, set_attribute
+
+QUERY_CACHE_SIZE = int(os.environ.get("IFX_QUERY_CACHE_SIZE", "256"))
+QUERY_CACHE_VERSION_TTL = float(os.environ.get("IFX_QUERY_CACHE_VERSION_TTL", "30"))
+
+cassette = get_cassette()
+
+if cassette is not None and cassette.mode == "replay":
+    # Schema and query results come from the cassette below
+    graph = None
+elif GRAPH_BACKEND == "fake":
+    from backends.fake_graph import FakeGraph
+
+    graph = FakeGraph.from_csvs()
+    print("Using in-memory fake graph backend")
+elif GRAPH_BACKEND != "neo4j":
+    raise ValueError(f"Unknown IFX_GRAPH_BACKEND '{GRAPH_BACKEND}'. Use 'neo4j' or 'fake'.")
+else:
+    # Get Neo4j credentials (raises ValueError if any are missing)
+    AURA_CONNECTION_URI, AURA_USERNAME, AURA_PASSWORD = get_connection_settings()
+
+    # Connect to Neo4j
+    try:
+        graph_kwargs = {"database": NEO4J_DATABASE} if NEO4J_DATABASE else {}
+        neo4j_graph = Neo4jGraph(
+            url=AURA_CONNECTION_URI,
+            username=AURA_USERNAME,
+            password=AURA_PASSWORD,
+            timeout=QUERY_TIMEOUT,  # per-transaction timeout so tools fail fast
+            driver_config=driver_config(),
+            **graph_kwargs,
+        )
+        # Share the pool with gradio_neo4j.get_driver() and its metrics
+        register_driver(neo4j_graph._driver)
+        # Tool queries are read-only, so route them to cluster followers
+        graph = ReadRoutedGraph(neo4j_graph)
+        print("Successfully connected to Neo4j database")
+    except Exception as e:
+        error_message = f"Failed to connect to Neo4j: {str(e)}"
+        print(f"ERROR: {error_message}")
+        raise Exception(error_message)
+
+if cassette is not None:
+    graph = CassetteGraph(cassette, inner=graph)
+    print(f"Graph queries are being {cassette.mode}ed via cassette {cassette.path}")
+
+if QUERY_CACHE_SIZE > 0:
+    graph = QueryCacheGraph(
+        graph,
+        max_size=QUERY_CACHE_SIZE,
+        version_ttl=QUERY_CACHE_VERSION_TTL,
+        on_lookup=lambda hit: set_attribute("cache_hit", hit),
     )
-    print("Successfully connected to Neo4j database")
-except Exception as e:
-    error_message = f"Failed to connect to Neo4j: {str(e)}"
-    print(f"ERROR: {error_message}")
-    raise Exception(error_message)
+    query_cache = graph
+
+    def _collect_query_cache_stats():
+        gradio_metrics.QUERY_CACHE_ENTRIES.set(query_cache.size)
+        if isinstance(query_cache.data_version, (int, float)):
+            gradio_metrics.DATA_VERSION.set(query_cache.data_version)
+
+    gradio_metrics.REGISTRY.add_collector(_collect_query_cache_stats)
+    print(f"Caching up to {QUERY_CACHE_SIZE} read queries per data version")
+
+if TRACING_ENABLED:
+    graph = TracingGraph(graph)
@@ -1,5 +1,9 @@
 """
 This module initializes the language model and embedding model without Streamlit dependencies.
+
+Set IFX_LLM_BACKEND=fake to use the scripted offline model in backends/fake_llm.py
+instead of OpenAI (no API key or network needed). Set IFX_CASSETTE_MODE=record or
+replay to record/replay every call through backends/cassette.py.
 """
 
 import os
@@ -22,36 +26,116 @@ def get_api_key(key_name):
         print(f"WARNING: {key_name} not found in environment variables")
     return value
 
-OPENAI_API_KEY = get_api_key("OPENAI_API_KEY")
+# Backend selection: "openai" (default) or "fake" for the scripted offline model
+LLM_BACKEND = os.environ.get("IFX_LLM_BACKEND", "openai").strip().lower()
+
+OPENAI_API_KEY = None
 OPENAI_MODEL = get_api_key("OPENAI_MODEL") or "gpt-4-turbo"
 
-if not OPENAI_API_KEY:
-    error_message = "OPENAI_API_KEY is not set in environment variables."
-    print(f"ERROR: {error_message}")
-    # Use a fallback API key for development testing, if available
-    fallback_key = os.environ.get("OPENAI_API_KEY_FALLBACK")
-    if fallback_key:
-        print("Using fallback API key for development")
-        OPENAI_API_KEY = fallback_key
-    else:
-        raise ValueError(error_message)
-
-# Create the LLM with better error handling
-try:
-    llm = ChatOpenAI(
-        openai_api_key=OPENAI_API_KEY,
-        model=OPENAI_MODEL,
-        temperature=0.1,
-        streaming=True  # Enable streaming for better response handling
-    )
-
-    # Create the Embedding model
-    embeddings = OpenAIEmbeddings(
-        openai_api_key=OPENAI_API_KEY
-    )
+from backends.cassette import CassetteChatModel, CassetteEmbeddings, get_cassette
+from gradio_tracing import TRACING_ENABLED, TracingCallbackHandler
+from gradio_usage import (
+    FAST_MODEL,
+    SESSION_TOKEN_BUDGET,
+    BudgetRoutedChatModel,
+    UsageCallbackHandler,
+    UsageEmbeddings,
+)
+
+cassette = get_cassette()
+
+if cassette is not None and cassette.mode == "replay":
+    # Every call is answered from the cassette, so no real backend is needed
+    llm = agent_llm = embeddings = None
+elif LLM_BACKEND == "fake":
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from backends.fake_llm import ScriptedChatModel
+
+    FAKE_LLM_LATENCY = os.environ.get("FAKE_LLM_LATENCY", "0")
+    FAKE_LLM_SEED = int(os.environ.get("FAKE_LLM_SEED", "42"))
+
+    llm = ScriptedChatModel(latency=FAKE_LLM_LATENCY, seed=FAKE_LLM_SEED)
+    # Separate instance so the agent's latency stream doesn't shift the tools' stream
+    agent_llm = ScriptedChatModel(latency=FAKE_LLM_LATENCY, seed=FAKE_LLM_SEED + 1)
+    embeddings = DeterministicFakeEmbedding(size=1536)
+    OPENAI_MODEL = llm.model_name
+    print(f"Using scripted fake LLM backend (latency={FAKE_LLM_LATENCY}, seed={FAKE_LLM_SEED})")
+elif LLM_BACKEND != "openai":
+    raise ValueError(f"Unknown IFX_LLM_BACKEND '{LLM_BACKEND}'. Use 'openai' or 'fake'.")
+else:
+    OPENAI_API_KEY = get_api_key("OPENAI_API_KEY")
+
+    if not OPENAI_API_KEY:
+        error_message = "OPENAI_API_KEY is not set in environment variables."
+        print(f"ERROR: {error_message}")
+        # Use a fallback API key for development testing, if available
+        fallback_key = os.environ.get("OPENAI_API_KEY_FALLBACK")
+        if fallback_key:
+            print("Using fallback API key for development")
+            OPENAI_API_KEY = fallback_key
+        else:
+            raise ValueError(error_message)
+
+    # Create the LLM with better error handling
+    try:
+        llm = ChatOpenAI(
+            openai_api_key=OPENAI_API_KEY,
+            model=OPENAI_MODEL,
+            temperature=0.1,
+            streaming=True,  # Enable streaming for better response handling
+            stream_usage=True,  # Report token usage on streamed responses
+        )
+
+        # LLM used by the ReAct agent in gradio_agent.py
+        agent_llm = ChatOpenAI(
+            openai_api_key=OPENAI_API_KEY,
+            model=OPENAI_MODEL,
+            temperature=0.1,
+            streaming=True,  # Enable streaming for agent
+            stream_usage=True,
+        )
+
+        # Create the Embedding model
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=OPENAI_API_KEY
+        )
     
-    print(f"Successfully initialized OpenAI models (using {OPENAI_MODEL})")
-except Exception as e:
-    error_message = f"Failed to initialize OpenAI models: {str(e)}"
-    print(f"ERROR: {error_message}")
-    raise Exception(error_message)
+        print(f"Successfully initialized OpenAI models (using {OPENAI_MODEL})")
+    except Exception as e:
+        error_message = f"Failed to initialize OpenAI models: {str(e)}"
+        print(f"ERROR: {error_message}")
+        raise Exception(error_message)
+
+# With a session token budget, calls switch to a cheaper model once it is used up
+if SESSION_TOKEN_BUDGET and llm is not None:
+    if LLM_BACKEND == "fake":
+        fast_llm = ScriptedChatModel(latency="0", seed=FAKE_LLM_SEED + 2, model_name="scripted-fake-fast")
+    else:
+        fast_llm = ChatOpenAI(
+            openai_api_key=OPENAI_API_KEY,
+            model=FAST_MODEL,
+            temperature=0.1,
+            streaming=True,
+            stream_usage=True,
+        )
+    llm = BudgetRoutedChatModel(primary=llm, fast=fast_llm)
+    agent_llm = BudgetRoutedChatModel(primary=agent_llm, fast=fast_llm)
+    print(f"Session token budget {SESSION_TOKEN_BUDGET}, falling back to {fast_llm.model_name}")
+
+EMBEDDING_MODEL = getattr(embeddings, "model", None) or "text-embedding-ada-002"
+
+if cassette is not None:
+    llm = CassetteChatModel(cassette=cassette, channel="llm", inner=llm)
+    agent_llm = CassetteChatModel(cassette=cassette, channel="agent_llm", inner=agent_llm)
+    embeddings = CassetteEmbeddings(cassette, inner=embeddings)
+    print(f"LLM calls are being {cassette.mode}ed via cassette {cassette.path}")
+
+# Token/cost accounting (gradio_usage.py) and tracing (gradio_tracing.py) hooks
+llm_callbacks = [UsageCallbackHandler("llm", OPENAI_MODEL)]
+agent_llm_callbacks = [UsageCallbackHandler("agent_llm", OPENAI_MODEL)]
+if TRACING_ENABLED:
+    llm_callbacks.append(TracingCallbackHandler("llm"))
+    agent_llm_callbacks.append(TracingCallbackHandler("agent_llm", agent=True))
+llm.callbacks = llm_callbacks
+agent_llm.callbacks = agent_llm_callbacks
+embeddings = UsageEmbeddings(embeddings, EMBEDDING_MODEL)
@@ -0,0 +1,293 @@
+"""
+Prometheus-style metrics for the chatbot without extra dependencies.
+
+Metrics are kept in an in-process registry and served in the Prometheus text
+exposition format from a small HTTP server next to the Gradio app. Most of
+them are derived from finished tracing spans (see gradio_tracing.py), so the
+same instrumentation points feed both traces and aggregates.
+
+Environment variables:
+    IFX_METRICS_PORT   port for the /metrics endpoint (unset disables metrics)
+    IFX_METRICS_HOST   bind address (default 127.0.0.1)
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = os.environ.get("IFX_METRICS_PORT", "").strip()
+METRICS_HOST = os.environ.get("IFX_METRICS_HOST", "127.0.0.1")
+METRICS_ENABLED = bool(METRICS_PORT)
+
+# Buckets bracket the Phase 2 p90 targets (simple < 1s, complex < 3s)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 500, 1000)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5, 10)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        if not self.labelnames:
+            # Unlabelled counters are exported as 0 before their first increment
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_samples(self, items):
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["counts"]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """Register a callable that refreshes gauges just before each scrape."""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "ifx_request_latency_seconds", "End-to-end latency of a fan question.", ["entrypoint"]))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "ifx_tool_latency_seconds", "Latency of agent tool calls.", ["tool", "status"]))
+LLM_CALLS = REGISTRY.register(Counter(
+    "ifx_llm_calls_total", "LLM calls by channel and purpose.", ["channel", "kind", "status"]))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "ifx_llm_latency_seconds", "Latency of LLM calls.", ["channel", "kind"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "ifx_llm_tokens_total", "LLM tokens by channel and direction.", ["channel", "type"]))
+NEO4J_LATENCY = REGISTRY.register(Histogram(
+    "ifx_neo4j_query_latency_seconds", "Latency of graph.query() calls.", ["status"]))
+NEO4J_ROWS = REGISTRY.register(Histogram(
+    "ifx_neo4j_query_rows", "Rows returned per graph.query() call.", buckets=ROW_BUCKETS))
+NEO4J_POOL_MAX = REGISTRY.register(Gauge(
+    "ifx_neo4j_pool_max_size", "Configured maximum Neo4j connections per host."))
+NEO4J_POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "ifx_neo4j_pool_connections", "Pooled Neo4j connections by state.", ["state"]))
+NEO4J_IN_FLIGHT = REGISTRY.register(Gauge(
+    "ifx_neo4j_queries_in_flight", "Tool queries currently running against Neo4j."))
+NEO4J_ERRORS = REGISTRY.register(Counter(
+    "ifx_neo4j_query_errors_total", "Neo4j queries that timed out or found the database unavailable.", ["reason"]))
+QUERY_CACHE_ENTRIES = REGISTRY.register(Gauge(
+    "ifx_query_cache_entries", "Cached graph.query() results."))
+DATA_VERSION = REGISTRY.register(Gauge(
+    "ifx_graph_data_version", "Graph DataVersion the query cache is serving."))
+CYPHER_STATEMENTS = REGISTRY.register(Counter(
+    "ifx_cypher_statements_total",
+    "Generated Cypher statements by tool, and whether the exact statement was seen before (plan cache reuse).",
+    ["tool", "result"]))
+CYPHER_VALIDATIONS = REGISTRY.register(Counter(
+    "ifx_cypher_validations_total", "Generated Cypher checks by tool and result (valid/repaired/failed).",
+    ["tool", "result"]))
+CYPHER_GUARD = REGISTRY.register(Counter(
+    "ifx_cypher_guard_total",
+    "Cypher guard interventions by tool and action (limit_injected/limit_clamped/rejected_*/rows_capped/bytes_capped).",
+    ["tool", "action"]))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "ifx_cache_requests_total", "Cache lookups by span and result (hit/miss).", ["span", "result"]))
+AGENT_ITERATIONS = REGISTRY.register(Histogram(
+    "ifx_agent_iterations", "Agent iterations per request.", buckets=ITERATION_BUCKETS))
+AGENT_RETRIES = REGISTRY.register(Counter(
+    "ifx_agent_retries_total", "generate_response attempts after the first."))
+PARSING_ERRORS = REGISTRY.register(Counter(
+    "ifx_agent_parsing_errors_total", "Agent outputs that failed ReAct parsing and were retried."))
+
+USAGE_TOKENS = REGISTRY.register(Counter(
+    "ifx_usage_tokens_total", "Tokens attributed by channel, tool and persona.",
+    ["channel", "tool", "persona", "type"]))
+USAGE_COST = REGISTRY.register(Counter(
+    "ifx_usage_cost_usd_total", "Estimated spend in USD by channel, tool and persona.",
+    ["channel", "tool", "persona"]))
+USAGE_WINDOW_TOKENS = REGISTRY.register(Gauge(
+    "ifx_usage_window_tokens", "Tokens used over a rolling window.", ["window", "persona"]))
+USAGE_WINDOW_COST = REGISTRY.register(Gauge(
+    "ifx_usage_window_cost_usd", "Estimated USD spent over a rolling window.", ["window", "persona"]))
+BUDGET_FALLBACKS = REGISTRY.register(Counter(
+    "ifx_budget_fallbacks_total", "Requests served on the fast path because the session token budget was used up."))
+
+ROOT_SPANS = ("request", "agent.generate_response")
+
+
+def observe_span(span):
+    """Update the registry from a finished tracing span."""
+    attributes = span.attributes
+    status = span.status
+    if "cache_hit" in attributes:
+        CACHE_REQUESTS.inc(span=span.name, result="hit" if attributes["cache_hit"] else "miss")
+    if span.name == "tool":
+        TOOL_LATENCY.observe(span.duration, tool=attributes.get("tool", "unknown"), status=status)
+    elif span.name.startswith("llm"):
+        channel = attributes.get("channel", "unknown")
+        kind = span.name.partition(".")[2] or "unknown"
+        LLM_CALLS.inc(channel=channel, kind=kind, status=status)
+        LLM_LATENCY.observe(span.duration, channel=channel, kind=kind)
+        for direction in ("prompt", "completion"):
+            tokens = attributes.get(f"{direction}_tokens")
+            if tokens:
+                LLM_TOKENS.inc(tokens, channel=channel, type=direction)
+    elif span.name == "neo4j.query":
+        NEO4J_LATENCY.observe(span.duration, status=status)
+        if attributes.get("row_count") is not None:
+            NEO4J_ROWS.observe(attributes["row_count"])
+    elif span.name == "agent.run" and attributes.get("attempt", 1) > 1:
+        AGENT_RETRIES.inc()
+
+
+def observe_trace(trace):
+    """Per-request aggregates that need the whole span tree."""
+    root = next((s for s in trace.finished if s.parent_id is None), None)
+    if root is None:
+        return
+    if root.name in ROOT_SPANS:
+        REQUEST_LATENCY.observe(root.duration, entrypoint=root.name)
+    AGENT_ITERATIONS.observe(sum(1 for s in trace.finished if s.name == "agent.iteration"))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would otherwise flood the console
+        pass
+
+
+_server = None
+
+
+def start_metrics_server():
+    """Serve /metrics on IFX_METRICS_PORT in a daemon thread (no-op when disabled)."""
+    global _server
+    if not METRICS_ENABLED or _server is not None:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((METRICS_HOST, int(METRICS_PORT)), _MetricsHandler)
+    except (OSError, ValueError) as e:
+        print(f"[METRICS] Could not start metrics server on {METRICS_HOST}:{METRICS_PORT}: {e}")
+        return None
+    thread = threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    print(f"[METRICS] Serving Prometheus metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return _server
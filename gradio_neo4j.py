@@ -0,0 +1,299 @@
+"""
+Shared Neo4j connection management for the app and the data scripts.
+
+One place for credentials, driver/pool configuration and timeouts:
+    - get_driver() returns a process-wide driver (used by the ingestion and
+      update scripts); gradio_graph.py builds its Neo4jGraph with the same
+      driver_config() and registers that graph's driver here.
+    - explain_plan() returns a query's EXPLAIN plan (ReadRoutedGraph.explain,
+      used by the Cypher validator and guard).
+    - ensure_indexes() creates the range/text indexes behind the normalized
+      *_key search properties (gradio_utils.SEARCH_KEYS) and the range
+      indexes on the typed Game and Team_Story fields
+      (gradio_utils.GAME_RANGE_PROPERTIES, STORY_RANGE_PROPERTIES).
+    - bump_data_version() marks the graph as changed so the app's query cache
+      (backends/query_cache.py) drops stale results.
+    - ReadRoutedGraph sends every tool query, and its EXPLAIN, through a
+      READ-access session so cluster followers can serve it, with a
+      per-transaction timeout.
+    - Pool size, in-flight queries and timeouts are exported by gradio_metrics.py.
+
+Environment variables (all optional):
+    NEO4J_DATABASE                        database name (default: server default)
+    NEO4J_MAX_POOL_SIZE                   max connections per host (default 20)
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT  seconds to wait for a pooled connection (default 5)
+    NEO4J_CONNECTION_TIMEOUT              seconds to open a new connection (default 5)
+    NEO4J_LIVENESS_CHECK_TIMEOUT          idle seconds after which a connection is pinged before reuse (default 30)
+    NEO4J_MAX_CONNECTION_LIFETIME         seconds before a connection is recycled (default 1800)
+    NEO4J_QUERY_TIMEOUT                   per-transaction timeout for tool queries, seconds (default 10)
+"""
+
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from neo4j import READ_ACCESS, GraphDatabase, Query
+from neo4j.exceptions import ClientError, ServiceUnavailable, SessionExpired
+
+import gradio_metrics
+from backends.graph_proxy import GraphProxy
+from gradio_utils import GAME_RANGE_PROPERTIES, LIST_SEARCH_KEYS, SEARCH_KEYS, STORY_RANGE_PROPERTIES
+
+load_dotenv()
+
+
+def get_credential(key_name):
+    """Get credential from environment variables"""
+    # Try different possible environment variable names
+    possible_names = [key_name]
+
+    # Add alternative names
+    if key_name.startswith("AURA_"):
+        possible_names.append(f"NEO4J_{key_name[5:]}")
+    elif key_name.startswith("NEO4J_"):
+        possible_names.append(f"AURA_{key_name[6:]}")
+
+    # Try each possible name
+    for name in possible_names:
+        value = os.environ.get(name)
+        if value:
+            return value
+
+    return None
+
+
+def _float_env(name, default):
+    return float(os.environ.get(name, default))
+
+
+NEO4J_DATABASE = os.environ.get("NEO4J_DATABASE") or None
+MAX_POOL_SIZE = int(os.environ.get("NEO4J_MAX_POOL_SIZE", "20"))
+CONNECTION_ACQUISITION_TIMEOUT = _float_env("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "5")
+CONNECTION_TIMEOUT = _float_env("NEO4J_CONNECTION_TIMEOUT", "5")
+LIVENESS_CHECK_TIMEOUT = _float_env("NEO4J_LIVENESS_CHECK_TIMEOUT", "30")
+MAX_CONNECTION_LIFETIME = _float_env("NEO4J_MAX_CONNECTION_LIFETIME", "1800")
+QUERY_TIMEOUT = _float_env("NEO4J_QUERY_TIMEOUT", "10")
+
+
+def get_connection_settings():
+    """Return (uri, username, password), raising ValueError if any are missing."""
+    uri = get_credential("AURA_CONNECTION_URI") or get_credential("NEO4J_URI")
+    username = get_credential("AURA_USERNAME") or get_credential("NEO4J_USERNAME")
+    password = get_credential("AURA_PASSWORD") or get_credential("NEO4J_PASSWORD")
+
+    if not all([uri, username, password]):
+        missing = []
+        if not uri:
+            missing.append("AURA_CONNECTION_URI/NEO4J_URI")
+        if not username:
+            missing.append("AURA_USERNAME/NEO4J_USERNAME")
+        if not password:
+            missing.append("AURA_PASSWORD/NEO4J_PASSWORD")
+        error_message = f"Missing Neo4j credentials: {', '.join(missing)}"
+        print(f"ERROR: {error_message}")
+        raise ValueError(error_message)
+    return uri, username, password
+
+
+def driver_config():
+    """Keyword arguments for GraphDatabase.driver (also passed to Neo4jGraph)."""
+    return {
+        "max_connection_pool_size": MAX_POOL_SIZE,
+        "connection_acquisition_timeout": CONNECTION_ACQUISITION_TIMEOUT,
+        "connection_timeout": CONNECTION_TIMEOUT,
+        "liveness_check_timeout": LIVENESS_CHECK_TIMEOUT,
+        "max_connection_lifetime": MAX_CONNECTION_LIFETIME,
+        # Fail fast: don't keep retrying a slow/unavailable cluster for the default 30s
+        "max_transaction_retry_time": CONNECTION_ACQUISITION_TIMEOUT,
+    }
+
+
+_driver = None
+_driver_lock = threading.Lock()
+
+
+def register_driver(driver):
+    """Adopt an existing driver (e.g. Neo4jGraph's) as the shared one."""
+    global _driver
+    with _driver_lock:
+        _driver = driver
+    gradio_metrics.NEO4J_POOL_MAX.set(MAX_POOL_SIZE)
+    return driver
+
+
+def get_driver():
+    """Shared, lazily created driver with the tuned pool settings."""
+    global _driver
+    with _driver_lock:
+        if _driver is None:
+            uri, username, password = get_connection_settings()
+            print(f"[NEO4J] Connecting to {uri} (pool size {MAX_POOL_SIZE})")
+            driver = GraphDatabase.driver(uri, auth=(username, password), **driver_config())
+            driver.verify_connectivity()
+            _driver = driver
+            gradio_metrics.NEO4J_POOL_MAX.set(MAX_POOL_SIZE)
+        return _driver
+
+
+def get_session(read=False):
+    """Session on the shared driver; read=True routes to cluster followers."""
+    kwargs = {"database": NEO4J_DATABASE} if NEO4J_DATABASE else {}
+    if read:
+        kwargs["default_access_mode"] = READ_ACCESS
+    return get_driver().session(**kwargs)
+
+
+def close_driver():
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+
+atexit.register(close_driver)
+
+
+def bump_data_version(session=None):
+    """
+    Increment the (:DataVersion {id: "graph"}) stamp so app query caches drop
+    stale results. Call after any script that changes graph data.
+    """
+    query = """
+    MERGE (v:DataVersion {id: 'graph'})
+    SET v.version = coalesce(v.version, 0) + 1, v.updated_at = datetime()
+    RETURN v.version AS version
+    """
+    if session is None:
+        with get_session() as own_session:
+            version = own_session.run(query).single()["version"]
+    else:
+        version = session.run(query).single()["version"]
+    print(f"[NEO4J] Data version bumped to {version}")
+    return version
+
+
+def index_statements():
+    """
+    DDL for the *_key search properties (gradio_utils.SEARCH_KEYS): a range
+    index for equality/STARTS WITH seeks and a text index for CONTAINS (list
+    keys such as Player.alias_keys can't be indexed and are skipped). The
+    typed Game fields and Team_Story.published_at get range indexes for date
+    ranges and ORDER BY.
+    """
+    statements = []
+    for label, keys in SEARCH_KEYS.items():
+        for key in keys:
+            if key in LIST_SEARCH_KEYS:
+                continue
+            name = f"{label.lower()}_{key}"
+            statements.append(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON (n.{key})")
+            statements.append(f"CREATE TEXT INDEX {name}_text IF NOT EXISTS FOR (n:{label}) ON (n.{key})")
+    for prop in GAME_RANGE_PROPERTIES:
+        statements.append(f"CREATE INDEX game_{prop} IF NOT EXISTS FOR (n:Game) ON (n.{prop})")
+    for prop in STORY_RANGE_PROPERTIES:
+        statements.append(f"CREATE INDEX team_story_{prop} IF NOT EXISTS FOR (n:Team_Story) ON (n.{prop})")
+    return statements
+
+
+def ensure_indexes(session=None):
+    """Create the search-key and typed-field indexes if they are missing (idempotent)."""
+    statements = index_statements()
+    if session is None:
+        with get_session() as own_session:
+            for statement in statements:
+                own_session.run(statement)
+    else:
+        for statement in statements:
+            session.run(statement)
+    print(f"[NEO4J] Ensured {len(statements)} indexes")
+
+
+def read_session_params():
+    # Neo4jGraph.query() fills in its own database name
+    return {"default_access_mode": READ_ACCESS}
+
+
+def explain_plan(query, params=None):
+    """
+    EXPLAIN plan (the driver's nested dict) for a query, or None when no Neo4j
+    driver has been registered (fake graph, cassette replay).
+    """
+    driver = _driver
+    if driver is None:
+        return None
+    kwargs = {"database": NEO4J_DATABASE} if NEO4J_DATABASE else {}
+    with driver.session(default_access_mode=READ_ACCESS, **kwargs) as session:
+        return session.run(Query(f"EXPLAIN {query}", timeout=QUERY_TIMEOUT), params or {}).consume().plan
+
+
+def _is_timeout(error):
+    code = getattr(error, "code", "") or ""
+    return "TransactionTimedOut" in code or "Timeout" in code
+
+
+class ReadRoutedGraph(GraphProxy):
+    """
+    Runs queries in READ-access sessions (unless the caller passes its own
+    session_params) and fails fast with a clear error on timeouts or an
+    unreachable cluster.
+    """
+
+    def __init__(self, inner):
+        super().__init__(inner)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def query(self, query, params={}, session_params={}):
+        with self._tracked():
+            return self.inner.query(query, params, session_params=session_params or read_session_params())
+
+    def explain(self, query, params=None):
+        with self._tracked():
+            return explain_plan(query, params)
+
+    @contextmanager
+    def _tracked(self):
+        with self._lock:
+            self._in_flight += 1
+            gradio_metrics.NEO4J_IN_FLIGHT.set(self._in_flight)
+        try:
+            yield
+        except ClientError as e:
+            if _is_timeout(e):
+                gradio_metrics.NEO4J_ERRORS.inc(reason="timeout")
+                print(f"[NEO4J] Query exceeded the {QUERY_TIMEOUT:g}s transaction timeout")
+            raise
+        except (ServiceUnavailable, SessionExpired) as e:
+            gradio_metrics.NEO4J_ERRORS.inc(reason="unavailable")
+            print(f"[NEO4J] Database unavailable: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                gradio_metrics.NEO4J_IN_FLIGHT.set(self._in_flight)
+
+
+def _collect_pool_stats():
+    """Best-effort pool utilisation from the driver internals (not a public API)."""
+    driver = _driver
+    if driver is None:
+        return
+    try:
+        connections = driver._pool.connections
+    except AttributeError:
+        return
+    in_use = idle = 0
+    for address_connections in list(connections.values()):
+        for connection in list(address_connections):
+            if getattr(connection, "in_use", False):
+                in_use += 1
+            else:
+                idle += 1
+    gradio_metrics.NEO4J_POOL_CONNECTIONS.set(in_use, state="in_use")
+    gradio_metrics.NEO4J_POOL_CONNECTIONS.set(idle, state="idle")
+
+
+gradio_metrics.REGISTRY.add_collector(_collect_pool_stats)
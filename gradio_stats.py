@@ -0,0 +1,240 @@
+"""
+Per-game player stats in the graph.
+
+data/ingest_player_stats.py loads the enhanced stats CSV written by
+game_stats.py as (:Player)-[:PLAYED {stats}]->(:Game) relationships and keeps
+two sets of precomputed values up to date, so stat questions and recaps
+read a property instead of aggregating at query time:
+    - season totals on Player nodes (season_games, season_sacks, ...) for the
+      latest season with stats in the graph, named by Player.stats_season
+    - top performers on Game nodes (top_performers, a list of display strings)
+The offline fake graph builds the same data with the helpers below.
+"""
+
+import os
+import re
+
+from gradio_teams import team_by_abbreviation
+from gradio_utils import NAME_SUFFIXES, search_key
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_CSV = os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect", "49ers_2024_enhanced_stats.csv")
+
+# PLAYED property -> (stats CSV column, type). Columns missing from a CSV are skipped.
+PLAYED_STATS = {
+    # Passing
+    "passing_yards": ("passing_yards", int),
+    "passing_tds": ("passing_tds", int),
+    "pass_attempts": ("pass_attempts", int),
+    "complete_passes": ("complete_passes", int),
+    "air_yards": ("air_yards", float),
+    "yards_after_catch": ("yards_after_catch", float),
+    "cpoe": ("cpoe", float),
+    "qb_epa": ("qb_epa", float),
+    "pass_avg_air_yards": ("avg_air_yards_x", float),
+    "pass_avg_yac": ("avg_yac_x", float),
+    "pass_location_left": ("pass_location_left", int),
+    "pass_location_middle": ("pass_location_middle", int),
+    "pass_location_right": ("pass_location_right", int),
+    "pass_length_short": ("pass_length_short", int),
+    "pass_length_medium": ("pass_length_medium", int),
+    "pass_length_deep": ("pass_length_deep", int),
+    # Rushing
+    "rushing_yards": ("rushing_yards", int),
+    "rushing_tds": ("rushing_tds", int),
+    "rush_attempts": ("rush_attempts", int),
+    "first_downs_rush": ("first_downs_rush", int),
+    "rush_epa": ("rush_epa", float),
+    "xyac_mean": ("xyac_mean", float),
+    "xyac_success_rate": ("xyac_success_rate", float),
+    # Receiving
+    "receiving_yards": ("receiving_yards", int),
+    "receiving_tds": ("receiving_tds", int),
+    "targets": ("receiving_attempts", int),
+    "first_downs_receiving": ("first_downs_receiving", int),
+    "receiving_epa": ("receiving_epa", float),
+    "rec_avg_yac": ("avg_yac_y", float),
+    "rec_avg_air_yards": ("avg_air_yards_y", float),
+    # Defense
+    "solo_tackles": ("solo_tackles", int),
+    "assisted_tackles": ("assisted_tackles", int),
+    "tackles_for_loss": ("tackles_for_loss", int),
+    "qb_hits": ("qb_hits", int),
+    "sacks": ("sacks", float),  # half sacks
+    "interceptions": ("interceptions", int),
+    "forced_fumbles": ("forced_fumbles", int),
+    "fumble_recoveries": ("fumble_recoveries", int),
+    "pass_defenses": ("pass_defenses", int),
+}
+
+# PLAYED properties summed into Player.season_<stat> (per-game averages and rates are not)
+SEASON_STATS = (
+    "passing_yards", "passing_tds", "pass_attempts", "complete_passes", "air_yards", "yards_after_catch", "qb_epa",
+    "rushing_yards", "rushing_tds", "rush_attempts", "first_downs_rush", "rush_epa",
+    "receiving_yards", "receiving_tds", "targets", "first_downs_receiving", "receiving_epa",
+    "solo_tackles", "assisted_tackles", "tackles_for_loss", "qb_hits", "sacks", "interceptions",
+    "forced_fumbles", "fumble_recoveries", "pass_defenses",
+)
+
+# Game.top_performers categories: (label, PLAYED property or "tackles", unit)
+LEADER_CATEGORIES = (
+    ("Passing", "passing_yards", "yds"),
+    ("Passing", "complete_passes", "comp"),
+    ("Rushing", "rushing_yards", "yds"),
+    ("Rushing", "rush_attempts", "car"),
+    ("Receiving", "receiving_yards", "yds"),
+    ("Receiving", "targets", "tgt"),
+    ("Tackles", "tackles", "tkl"),
+    ("Sacks", "sacks", "sk"),
+    ("Interceptions", "interceptions", "INT"),
+)
+
+_STATS_GAME_ID_RE = re.compile(r"^(\d{4})_(\d{2})_([A-Z]{2,3})_([A-Z]{2,3})$")
+
+
+def played_stats(row):
+    """Typed PLAYED properties for one stats CSV row; missing or blank cells are skipped."""
+    stats = {}
+    for prop, (column, cast) in PLAYED_STATS.items():
+        value = row.get(column)
+        if value is None or value == "" or value != value:  # NaN
+            continue
+        try:
+            stats[prop] = cast(float(value))
+        except (TypeError, ValueError):
+            continue
+    return stats
+
+
+def parse_stats_game_id(stats_game_id):
+    """
+    (season, week, home_team, away_team) for an nflverse game id such as
+    "2024_01_NYJ_SF" (season_week_away_home), or None if it doesn't parse.
+    """
+    match = _STATS_GAME_ID_RE.match(str(stats_game_id or ""))
+    if not match:
+        return None
+    season, week, away, home = match.groups()
+    home_team, away_team = team_by_abbreviation(home), team_by_abbreviation(away)
+    if not home_team or not away_team:
+        return None
+    return int(season), int(week), home_team, away_team
+
+
+def nfl_season(kickoff):
+    """Season a kickoff belongs to: January and February games count for the previous year."""
+    return kickoff.year if kickoff.month >= 3 else kickoff.year - 1
+
+
+def match_games(stats_game_ids, games):
+    """
+    stats game id -> graph game_id, matching on week and teams (and season when
+    the Game has a kickoff). games are dicts with game_id, week, home_team,
+    away_team and optionally kickoff.
+    """
+    by_key = {}
+    for game in games:
+        season = nfl_season(game["kickoff"]) if game.get("kickoff") else None
+        by_key.setdefault((game.get("week"), game.get("home_team"), game.get("away_team")), []).append((season, game))
+    matched = {}
+    for stats_game_id in stats_game_ids:
+        parsed = parse_stats_game_id(stats_game_id)
+        if not parsed:
+            continue
+        season, week, home_team, away_team = parsed
+        for game_season, game in by_key.get((week, home_team, away_team), []):
+            if game_season in (None, season):
+                matched[stats_game_id] = game["game_id"]
+                break
+    return matched
+
+
+def _name_parts(stats_name):
+    """("ka", "davis") for the nflverse "Ka.Davis" short name."""
+    first, _, last = str(stats_name or "").partition(".")
+    return search_key(first) or "", search_key(last) or ""
+
+
+def match_players(stats_players, roster):
+    """
+    nflverse player id -> graph player_id. stats_players maps nflverse ids to
+    short names ("N.Bosa"); roster is a list of dicts with player_id, name and
+    optionally gsis_id (stored on Player after the first match). A short name
+    matches when the last name is equal and the first name starts with the
+    prefix; ambiguous names (two roster players) are left unmatched.
+    """
+    by_gsis = {player["gsis_id"]: player["player_id"] for player in roster if player.get("gsis_id")}
+    candidates = []
+    for player in roster:
+        words = [w for w in (search_key(player.get("name")) or "").split() if w not in NAME_SUFFIXES]
+        if len(words) >= 2:
+            candidates.append((words[0], " ".join(words[1:]), player["player_id"]))
+
+    matched = {}
+    for gsis_id, stats_name in stats_players.items():
+        if gsis_id in by_gsis:
+            matched[gsis_id] = by_gsis[gsis_id]
+            continue
+        prefix, last = _name_parts(stats_name)
+        found = [player_id for first, rest, player_id in candidates
+                 if (rest == last or rest.endswith(" " + last)) and first.startswith(prefix)]
+        if len(found) == 1:
+            matched[gsis_id] = found[0]
+    return matched
+
+
+def stats_game_season(stats_game_id):
+    """Season of an nflverse game id ("2024_01_NYJ_SF" -> 2024), or None."""
+    match = _STATS_GAME_ID_RE.match(str(stats_game_id or ""))
+    return int(match.group(1)) if match else None
+
+
+# Every property season_totals() can set, so stale totals can be cleared
+SEASON_TOTAL_KEYS = ("stats_season", "season_games", "season_tackles") + tuple(f"season_{stat}" for stat in SEASON_STATS)
+
+
+def season_totals(played, season=None):
+    """
+    Player.season_* properties from the player's PLAYED stat dicts for one
+    season; stats_season records which season they cover.
+    """
+    totals = {"season_games": len(played)}
+    if season is not None:
+        totals["stats_season"] = season
+    for stat in SEASON_STATS:
+        values = [stats[stat] for stats in played if stats.get(stat) is not None]
+        if values:
+            total = sum(values)
+            totals[f"season_{stat}"] = round(total, 2) if isinstance(total, float) else total
+    if "season_solo_tackles" in totals or "season_assisted_tackles" in totals:
+        totals["season_tackles"] = totals.get("season_solo_tackles", 0) + totals.get("season_assisted_tackles", 0)
+    return totals
+
+
+def _format_value(value):
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+def top_performers(players):
+    """
+    Game.top_performers display strings from (player name, PLAYED stats)
+    pairs, one per category: "Sacks: Nick Bosa (2 sk)". A category falls
+    back to its next stat (e.g. completions when passing yards are missing).
+    """
+    lines = []
+    done = set()
+    for label, stat, unit in LEADER_CATEGORIES:
+        if label in done:
+            continue
+        best_name, best_value = None, 0
+        for name, stats in players:
+            if stat == "tackles":
+                value = stats.get("solo_tackles", 0) + stats.get("assisted_tackles", 0)
+            else:
+                value = stats.get(stat) or 0
+            if value > best_value:
+                best_name, best_value = name, value
+        if best_name:
+            lines.append(f"{label}: {best_name} ({_format_value(best_value)} {unit})")
+            done.add(label)
+    return lines
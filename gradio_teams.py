@@ -0,0 +1,113 @@
+"""
+Reference data for the 32 NFL clubs, shared by the ingestion stage that
+creates :Team nodes (data/ingest_teams.py) and the offline fake graph.
+
+Each club gets one (:Team) node keyed on its full name, carrying its logo,
+conference, division, abbreviation and the aliases fans use for it, and is
+linked to its games with (:Team)-[:HOME_IN]->(:Game) and
+(:Team)-[:AWAY_IN]->(:Game).
+"""
+
+import csv
+import os
+
+from gradio_utils import search_key
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAM_LOGOS_CSV = os.path.join(PROJECT_DIR, "data", "april_11_multimedia_data_collect", "nfl_team_logos_revised.csv")
+
+# name -> (abbreviation, conference, division, extra aliases)
+NFL_TEAMS = {
+    "Arizona Cardinals": ("ARI", "NFC", "West", ["cards"]),
+    "Atlanta Falcons": ("ATL", "NFC", "South", ["dirty birds"]),
+    "Baltimore Ravens": ("BAL", "AFC", "North", []),
+    "Buffalo Bills": ("BUF", "AFC", "East", []),
+    "Carolina Panthers": ("CAR", "NFC", "South", []),
+    "Chicago Bears": ("CHI", "NFC", "North", []),
+    "Cincinnati Bengals": ("CIN", "AFC", "North", ["cincy"]),
+    "Cleveland Browns": ("CLE", "AFC", "North", []),
+    "Dallas Cowboys": ("DAL", "NFC", "East", ["americas team"]),
+    "Denver Broncos": ("DEN", "AFC", "West", []),
+    "Detroit Lions": ("DET", "NFC", "North", []),
+    "Green Bay Packers": ("GB", "NFC", "North", ["pack"]),
+    "Houston Texans": ("HOU", "AFC", "South", []),
+    "Indianapolis Colts": ("IND", "AFC", "South", ["indy"]),
+    "Jacksonville Jaguars": ("JAX", "AFC", "South", ["jags"]),
+    "Kansas City Chiefs": ("KC", "AFC", "West", []),
+    "Las Vegas Raiders": ("LV", "AFC", "West", ["vegas"]),
+    "Los Angeles Chargers": ("LAC", "AFC", "West", ["bolts"]),
+    "Los Angeles Rams": ("LAR", "NFC", "West", []),
+    "Miami Dolphins": ("MIA", "AFC", "East", ["fins", "phins"]),
+    "Minnesota Vikings": ("MIN", "NFC", "North", ["vikes"]),
+    "New England Patriots": ("NE", "AFC", "East", ["pats"]),
+    "New Orleans Saints": ("NO", "NFC", "South", []),
+    "New York Giants": ("NYG", "NFC", "East", ["big blue"]),
+    "New York Jets": ("NYJ", "AFC", "East", ["gang green"]),
+    "Philadelphia Eagles": ("PHI", "NFC", "East", ["philly"]),
+    "Pittsburgh Steelers": ("PIT", "AFC", "North", []),
+    "San Francisco 49ers": ("SF", "NFC", "West", ["niners", "san fran"]),
+    "Seattle Seahawks": ("SEA", "NFC", "West", ["hawks"]),
+    "Tampa Bay Buccaneers": ("TB", "NFC", "South", ["bucs"]),
+    "Tennessee Titans": ("TEN", "AFC", "South", []),
+    "Washington Commanders": ("WAS", "NFC", "East", []),
+}
+
+# nflverse play-by-play abbreviations that differ from NFL_TEAMS
+NFLVERSE_ABBREVIATIONS = {"LA": "LAR", "WSH": "WAS", "JAC": "JAX", "LVR": "LV"}
+
+
+def team_by_abbreviation(abbreviation):
+    """Full club name for an abbreviation ("SF", or nflverse's "LA"), or None."""
+    abbreviation = NFLVERSE_ABBREVIATIONS.get(abbreviation, abbreviation)
+    return next((name for name, team in NFL_TEAMS.items() if team[0] == abbreviation), None)
+
+
+def team_city(name):
+    """City (or region) part of a club name: "New England Patriots" -> "New England"."""
+    return name.rsplit(" ", 1)[0]
+
+
+def _unique_cities():
+    cities = [team_city(name) for name in NFL_TEAMS]
+    return {city for city in cities if cities.count(city) == 1}
+
+
+def alias_keys(name):
+    """
+    Search keys a fan might use for a club: nickname, abbreviation, the city
+    when only one club plays there, and the extra aliases in NFL_TEAMS.
+    """
+    abbreviation, _, _, extra = NFL_TEAMS[name]
+    aliases = [name.rsplit(" ", 1)[-1], abbreviation, *extra]
+    if team_city(name) in _unique_cities():
+        aliases.append(team_city(name))
+    return list(dict.fromkeys(search_key(alias) for alias in aliases))
+
+
+def load_team_logos(path=TEAM_LOGOS_CSV):
+    """team_name -> logo_url from the logos CSV; empty if the file is missing."""
+    if not os.path.exists(path):
+        print(f"[TEAMS] WARNING: {path} not found, teams will have no logo_url")
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {row["team_name"].strip(): row["logo_url"].strip() for row in csv.DictReader(f) if row.get("team_name")}
+
+
+def team_records(logos_path=TEAM_LOGOS_CSV):
+    """
+    One dict of :Team properties per club (the *_key search properties from
+    gradio_utils.SEARCH_KEYS are added by the loaders).
+    """
+    logos = load_team_logos(logos_path)
+    records = []
+    for name, (abbreviation, conference, division, _) in NFL_TEAMS.items():
+        records.append({
+            "name": name,
+            "abbreviation": abbreviation,
+            "city": team_city(name),
+            "conference": conference,
+            "division": division,
+            "logo_url": logos.get(name),
+            "alias_keys": alias_keys(name),
+        })
+    return records
@@ -0,0 +1,411 @@
+"""
+Lightweight tracing for the request path without Streamlit dependencies.
+
+A trace is a tree of timed spans:
+    request -> memory.load -> agent.iteration -> tool -> llm (cypher generation)
+            -> neo4j.query -> llm (summarization) -> component.render
+
+Spans are opened with `with span("name", key=value):` (or the traced()
+decorator) and nest under whichever span is currently open. LLM calls are
+traced by TracingCallbackHandler, which gradio_llm.py attaches to the models,
+and graph.query() by TracingGraph in gradio_graph.py. Each agent LLM call
+starts a new agent.iteration span so tool spans group under the iteration
+that chose them.
+
+Finished spans also feed the Prometheus registry in gradio_metrics.py, so
+spans are recorded whenever an exporter or the metrics endpoint is enabled.
+
+Environment variables:
+    IFX_TRACE_EXPORT   comma-separated exporters: "jsonl", "otlp", "console"
+                       (tracing is a no-op when this and IFX_METRICS_PORT are unset)
+    IFX_TRACE_FILE     JSONL output path (default logs/traces.jsonl)
+
+The "otlp" exporter needs opentelemetry-sdk and
+opentelemetry-exporter-otlp-proto-http; its endpoint comes from the usual
+OTEL_EXPORTER_OTLP_ENDPOINT variables.
+"""
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import gradio_metrics
+from backends.graph_proxy import GraphProxy
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TRACE_EXPORTERS = {
+    name.strip().lower()
+    for name in os.environ.get("IFX_TRACE_EXPORT", "").split(",")
+    if name.strip()
+}
+TRACE_FILE = os.environ.get("IFX_TRACE_FILE", os.path.join(PROJECT_DIR, "logs", "traces.jsonl"))
+TRACING_ENABLED = bool(TRACE_EXPORTERS) or gradio_metrics.METRICS_ENABLED
+
+# Longest string kept in a span attribute (queries, questions)
+MAX_ATTRIBUTE_CHARS = 500
+
+_current_trace = contextvars.ContextVar("ifx_current_trace", default=None)
+_file_lock = threading.Lock()
+_otel_tracer = None
+
+
+class Span:
+    """A single timed operation within a trace."""
+
+    def __init__(self, trace, name, parent, attributes):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = {}
+        self.status = "ok"
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def set_attribute(self, key, value):
+        if isinstance(value, str) and len(value) > MAX_ATTRIBUTE_CHARS:
+            value = value[:MAX_ATTRIBUTE_CHARS] + "..."
+        self.attributes[key] = value
+
+    def add_to_attribute(self, key, amount):
+        """Accumulate a numeric attribute, e.g. tokens over several LLM calls."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def set_error(self, error):
+        self.status = "error"
+        self.set_attribute("error", f"{type(error).__name__}: {error}")
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._start
+            self.trace.finish_span(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": round(self.start_time, 6),
+            "duration_ms": round((self.duration or 0) * 1000, 2),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is disabled so call sites stay unconditional."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_to_attribute(self, key, amount):
+        pass
+
+    def set_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Spans belonging to one request. Open spans form a stack; the root is stack[0]."""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.stack = []
+        self.finished = []
+
+    def start_span(self, name, attributes, push=True):
+        parent = self.stack[-1] if self.stack else None
+        new_span = Span(self, name, parent, attributes)
+        if push:
+            self.stack.append(new_span)
+        return new_span
+
+    def close_span(self, closing):
+        """Pop `closing` off the stack, ending any children that were left open."""
+        if closing in self.stack:
+            while self.stack:
+                top = self.stack.pop()
+                top.end()
+                if top is closing:
+                    break
+        else:
+            closing.end()
+
+    def finish_span(self, finished):
+        self.finished.append(finished)
+        if gradio_metrics.METRICS_ENABLED:
+            gradio_metrics.observe_span(finished)
+        if "jsonl" in TRACE_EXPORTERS:
+            _write_jsonl(finished.to_dict())
+
+
+def current_span():
+    """The innermost open span, or a no-op span outside any trace."""
+    trace = _current_trace.get()
+    if trace is None or not trace.stack:
+        return NOOP_SPAN
+    return trace.stack[-1]
+
+
+def set_attribute(key, value):
+    current_span().set_attribute(key, value)
+
+
+def add_to_request(key, amount):
+    """Accumulate a numeric attribute on the root span of the current trace."""
+    trace = _current_trace.get()
+    if trace is not None and trace.stack:
+        trace.stack[0].add_to_attribute(key, amount)
+
+
+class span:
+    """
+    Context manager that opens a child of the current span, or a new trace
+    root when no trace is active.
+    """
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+        self._span = NOOP_SPAN
+        self._token = None
+
+    def __enter__(self):
+        if not TRACING_ENABLED:
+            return NOOP_SPAN
+        trace = _current_trace.get()
+        if trace is None:
+            trace = Trace()
+            self._token = _current_trace.set(trace)
+        self._span = trace.start_span(self.name, self.attributes)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._span is NOOP_SPAN:
+            return False
+        if exc is not None:
+            self._span.set_error(exc)
+        trace = self._span.trace
+        trace.close_span(self._span)
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            _finish_trace(trace)
+        return False
+
+
+def traced(name, **attributes):
+    """Decorator form of span(); works for plain and async functions."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _row_count(result):
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+class TracingGraph(GraphProxy):
+    """GraphStore wrapper that records a neo4j.query span for every query (neo4j.explain for EXPLAIN)."""
+
+    def query(self, query, params={}, session_params={}):
+        if not TRACING_ENABLED:
+            return super().query(query, params, session_params)
+        with span("neo4j.query", query=query, param_count=len(params or {})) as query_span:
+            result = super().query(query, params, session_params)
+            query_span.set_attribute("row_count", _row_count(result))
+            return result
+
+    def explain(self, query, params=None):
+        if not TRACING_ENABLED:
+            return super().explain(query, params)
+        with span("neo4j.explain", query=query, param_count=len(params or {})):
+            return super().explain(query, params)
+
+
+def token_usage(response):
+    """Pull token counts from an LLMResult, covering streamed and non-streamed calls."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return metadata.get("input_tokens"), metadata.get("output_tokens")
+    return None, None
+
+
+CYPHER_KEYWORDS = ("MATCH", "OPTIONAL MATCH", "WITH", "CALL", "UNWIND", "```")
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Records an llm span per model call. When `agent` is true each call also
+    starts a new agent.iteration span that subsequent tool spans nest under.
+    """
+
+    def __init__(self, channel, agent=False):
+        self.channel = channel
+        self.agent = agent
+        self._spans = {}
+
+    def _start(self, run_id, prompt_chars):
+        if not TRACING_ENABLED:
+            return
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        if self.agent:
+            # The previous iteration ends when the agent asks the model again
+            if trace.stack and trace.stack[-1].name == "agent.iteration":
+                trace.close_span(trace.stack[-1])
+            iteration = trace.start_span("agent.iteration", {})
+            iteration.set_attribute("iteration", sum(1 for s in trace.finished if s.name == "agent.iteration") + 1)
+        llm_span = trace.start_span("llm", {"channel": self.channel, "prompt_chars": prompt_chars}, push=False)
+        self._spans[run_id] = llm_span
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, sum(len(prompt) for prompt in prompts))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, sum(len(str(m.content)) for batch in messages for m in batch))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        llm_span = self._spans.pop(run_id, None)
+        if llm_span is None:
+            return
+        prompt_tokens, completion_tokens = token_usage(response)
+        llm_span.set_attribute("prompt_tokens", prompt_tokens)
+        llm_span.set_attribute("completion_tokens", completion_tokens)
+        text = ""
+        if response.generations and response.generations[0]:
+            text = response.generations[0][0].text.strip()
+        if self.agent:
+            llm_span.name = "llm.agent"
+        elif text.upper().startswith(CYPHER_KEYWORDS):
+            llm_span.name = "llm.cypher_generation"
+        else:
+            llm_span.name = "llm.summarization"
+        llm_span.set_attribute("completion_chars", len(text))
+        trace = llm_span.trace
+        for key, value in (("prompt_tokens", prompt_tokens), ("completion_tokens", completion_tokens)):
+            if value and trace.stack:
+                trace.stack[0].add_to_attribute(key, value)
+        llm_span.end()
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        llm_span = self._spans.pop(run_id, None)
+        if llm_span is not None:
+            llm_span.set_error(error)
+            llm_span.end()
+
+
+def _write_jsonl(record):
+    line = json.dumps(record, default=str)
+    with _file_lock:
+        os.makedirs(os.path.dirname(os.path.abspath(TRACE_FILE)), exist_ok=True)
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def format_trace(trace):
+    """Indented span tree with durations, for the console exporter."""
+    children = {}
+    for finished in trace.finished:
+        children.setdefault(finished.parent_id, []).append(finished)
+    lines = []
+
+    def walk(parent_id, depth):
+        for child in sorted(children.get(parent_id, []), key=lambda s: s.start_time):
+            extras = ", ".join(
+                f"{key}={value}" for key, value in child.attributes.items()
+                if key in ("tool", "row_count", "prompt_tokens", "completion_tokens", "cache_hit", "error")
+                and value is not None
+            )
+            lines.append(f"{'  ' * depth}{child.name} {child.duration * 1000:.1f}ms" + (f" ({extras})" if extras else ""))
+            walk(child.span_id, depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def _get_otel_tracer():
+    global _otel_tracer
+    if _otel_tracer is None:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": "ifx-49ers-fanai"}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        _otel_tracer = provider.get_tracer("gradio_tracing")
+    return _otel_tracer
+
+
+def _export_otlp(trace):
+    """Re-emit a finished trace through OpenTelemetry, keeping the original timings."""
+    from opentelemetry import trace as otel_trace
+
+    tracer = _get_otel_tracer()
+    otel_spans = {}
+    for finished in sorted(trace.finished, key=lambda s: s.start_time):
+        parent = otel_spans.get(finished.parent_id)
+        context = otel_trace.set_span_in_context(parent) if parent is not None else None
+        start_ns = int(finished.start_time * 1e9)
+        attributes = {
+            key: value for key, value in finished.attributes.items()
+            if isinstance(value, (str, bool, int, float))
+        }
+        otel_span = tracer.start_span(finished.name, context=context, start_time=start_ns, attributes=attributes)
+        if finished.status == "error":
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+        otel_span.end(end_time=start_ns + int(finished.duration * 1e9))
+        otel_spans[finished.span_id] = otel_span
+
+
+def _finish_trace(trace):
+    if gradio_metrics.METRICS_ENABLED:
+        gradio_metrics.observe_trace(trace)
+    if "console" in TRACE_EXPORTERS:
+        print(f"[TRACE] {trace.trace_id}\n{format_trace(trace)}")
+    if "otlp" in TRACE_EXPORTERS:
+        try:
+            _export_otlp(trace)
+        except ImportError as e:
+            print(f"[TRACE] OTLP export unavailable, install opentelemetry-sdk and "
+                  f"opentelemetry-exporter-otlp-proto-http: {e}")
+        except Exception as e:
+            print(f"[TRACE] OTLP export failed: {e}")
@@ -0,0 +1,308 @@
+"""
+Token and cost accounting for LLM and embedding calls.
+
+UsageCallbackHandler (attached to `llm` and `agent_llm` in gradio_llm.py) and
+UsageEmbeddings record prompt/completion tokens for every call. Each event is
+attributed to the current request, session, persona and tool via
+usage_scope() / tool_scope(), priced with MODEL_PRICES, and aggregated:
+    - per request, returned in generate_response()'s metadata["usage"]
+    - per session, for the optional token budget
+    - in rolling windows and counters exported by gradio_metrics.py
+    - on the current trace's root span (gradio_tracing.py)
+
+Environment variables:
+    IFX_SESSION_TOKEN_BUDGET  tokens a session may spend before switching to the
+                              fast path (unset or 0 disables the budget)
+    IFX_FAST_MODEL            cheaper OpenAI model used on the fast path (default gpt-4o-mini)
+    IFX_MODEL_PRICES          optional JSON overriding/adding prices, e.g.
+                              '{"gpt-4o": [2.5, 10.0]}' (USD per 1M input/output tokens)
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatResult
+
+import gradio_metrics
+import gradio_tracing
+
+# USD per 1M tokens: (input, output)
+MODEL_PRICES = {
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-4.1": (2.0, 8.0),
+    "gpt-4.1-mini": (0.4, 1.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+    "text-embedding-ada-002": (0.1, 0.0),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+MODEL_PRICES.update({
+    name: tuple(prices)
+    for name, prices in json.loads(os.environ.get("IFX_MODEL_PRICES", "{}") or "{}").items()
+})
+
+SESSION_TOKEN_BUDGET = int(os.environ.get("IFX_SESSION_TOKEN_BUDGET", "0") or 0)
+FAST_MODEL = os.environ.get("IFX_FAST_MODEL", "gpt-4o-mini")
+
+# Rolling windows exported as gauges, in seconds
+USAGE_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+_usage_context = contextvars.ContextVar("ifx_usage_context", default=None)
+
+
+def estimate_tokens(text):
+    """Rough token estimate (~4 characters per token) when the provider reports none."""
+    return max(1, len(text) // 4) if text else 0
+
+
+def price_for(model):
+    """Look up prices by exact name, then by the longest matching prefix (dated model names)."""
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    matches = [name for name in MODEL_PRICES if model and model.startswith(name)]
+    if matches:
+        return MODEL_PRICES[max(matches, key=len)]
+    return (0.0, 0.0)
+
+
+def cost_for(model, prompt_tokens, completion_tokens):
+    input_price, output_price = price_for(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class UsageLedger:
+    """Thread-safe store of usage events with per-request, per-session and windowed totals."""
+
+    def __init__(self, retention=max(USAGE_WINDOWS.values())):
+        self.retention = retention
+        self._events = deque()
+        self._requests = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, event):
+        with self._lock:
+            self._events.append(event)
+            for totals in (
+                self._requests.setdefault(event["request_id"], _empty_totals()),
+                self._sessions.setdefault(event["session_id"], _empty_totals()),
+            ):
+                _add(totals, event)
+            self._prune(event["time"])
+
+    def _prune(self, now):
+        while self._events and self._events[0]["time"] < now - self.retention:
+            self._events.popleft()
+
+    def request_totals(self, request_id):
+        with self._lock:
+            return dict(self._requests.get(request_id, _empty_totals()))
+
+    def pop_request(self, request_id):
+        with self._lock:
+            return self._requests.pop(request_id, _empty_totals())
+
+    def session_tokens(self, session_id):
+        with self._lock:
+            totals = self._sessions.get(session_id)
+            return totals["total_tokens"] if totals else 0
+
+    def window_totals(self, seconds, group_by="persona"):
+        """Totals over the last `seconds`, grouped by persona, tool or channel."""
+        cutoff = time.time() - seconds
+        grouped = {}
+        with self._lock:
+            for event in self._events:
+                if event["time"] >= cutoff:
+                    _add(grouped.setdefault(event[group_by], _empty_totals()), event)
+        return grouped
+
+
+def _empty_totals():
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cost_usd": 0.0}
+
+
+def _add(totals, event):
+    totals["calls"] += 1
+    totals["prompt_tokens"] += event["prompt_tokens"]
+    totals["completion_tokens"] += event["completion_tokens"]
+    totals["total_tokens"] += event["prompt_tokens"] + event["completion_tokens"]
+    totals["cost_usd"] += event["cost_usd"]
+
+
+ledger = UsageLedger()
+
+
+@contextlib.contextmanager
+def usage_scope(session_id=None, persona=None):
+    """Attribute usage inside the block to a new request id for this session and persona."""
+    context = {
+        "request_id": uuid.uuid4().hex,
+        "session_id": session_id or "unknown",
+        "persona": persona or "unknown",
+        "tool": "agent",
+    }
+    token = _usage_context.set(context)
+    try:
+        yield context
+    finally:
+        _usage_context.reset(token)
+
+
+@contextlib.contextmanager
+def tool_scope(tool_name):
+    """Attribute usage inside the block to a tool (within the current request)."""
+    context = _usage_context.get()
+    if context is None:
+        yield
+        return
+    previous = context["tool"]
+    # Mutate in place: LangChain runs tools in copied contexts, which share this dict
+    context["tool"] = tool_name
+    try:
+        yield
+    finally:
+        context["tool"] = previous
+
+
+def record_usage(channel, model, prompt_tokens, completion_tokens, estimated=False):
+    """Record one call against the current request/session/persona/tool."""
+    context = _usage_context.get() or {
+        "request_id": "none", "session_id": "none", "persona": "none", "tool": "none",
+    }
+    cost = cost_for(model, prompt_tokens, completion_tokens)
+    event = {
+        "time": time.time(),
+        "request_id": context["request_id"],
+        "session_id": context["session_id"],
+        "persona": context["persona"],
+        "tool": context["tool"],
+        "channel": channel,
+        "model": model,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": cost,
+        "estimated": estimated,
+    }
+    ledger.record(event)
+
+    labels = {"channel": channel, "tool": event["tool"], "persona": event["persona"]}
+    gradio_metrics.USAGE_TOKENS.inc(prompt_tokens, type="prompt", **labels)
+    gradio_metrics.USAGE_TOKENS.inc(completion_tokens, type="completion", **labels)
+    gradio_metrics.USAGE_COST.inc(cost, **labels)
+    gradio_tracing.add_to_request("cost_usd", cost)
+    if channel == "embeddings":
+        gradio_tracing.add_to_request("embedding_tokens", prompt_tokens)
+    return event
+
+
+def over_budget(session_id=None):
+    """True when the session has used up IFX_SESSION_TOKEN_BUDGET."""
+    if not SESSION_TOKEN_BUDGET:
+        return False
+    if session_id is None:
+        context = _usage_context.get()
+        if context is None:
+            return False
+        session_id = context["session_id"]
+    return ledger.session_tokens(session_id) >= SESSION_TOKEN_BUDGET
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Records token usage for every call made through the model it is attached to."""
+
+    def __init__(self, channel, default_model):
+        self.channel = channel
+        self.default_model = default_model
+        self._prompt_chars = {}
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._prompt_chars[run_id] = "".join(prompts)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._prompt_chars[run_id] = "".join(str(m.content) for batch in messages for m in batch)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt_text = self._prompt_chars.pop(run_id, "")
+        prompt_tokens, completion_tokens = gradio_tracing.token_usage(response)
+        estimated = prompt_tokens is None
+        if estimated:
+            completion_text = "".join(g.text for generations in response.generations for g in generations)
+            prompt_tokens, completion_tokens = estimate_tokens(prompt_text), estimate_tokens(completion_text)
+        record_usage(self.channel, self._model_name(response), prompt_tokens or 0, completion_tokens or 0, estimated)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._prompt_chars.pop(run_id, None)
+
+    def _model_name(self, response):
+        model = (response.llm_output or {}).get("model_name")
+        if not model and response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+            model = (getattr(message, "response_metadata", None) or {}).get("model_name")
+        return model or self.default_model
+
+
+class UsageEmbeddings(Embeddings):
+    """Embeddings wrapper that records (estimated) input tokens for each call."""
+
+    def __init__(self, inner, model):
+        self.inner = inner
+        self.model = model
+
+    def embed_documents(self, texts):
+        vectors = self.inner.embed_documents(texts)
+        record_usage("embeddings", self.model, sum(estimate_tokens(text) for text in texts), 0, estimated=True)
+        return vectors
+
+    def embed_query(self, text):
+        vector = self.inner.embed_query(text)
+        record_usage("embeddings", self.model, estimate_tokens(text), 0, estimated=True)
+        return vector
+
+
+class BudgetRoutedChatModel(BaseChatModel):
+    """
+    Sends calls to `primary` until the current session is over its token
+    budget, then to the cheaper `fast` model.
+    """
+
+    primary: Any
+    fast: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "budget-routed"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.primary, "model_name", "unknown")
+
+    def _generate(self, messages: List[Any], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        target = self.fast if over_budget() else self.primary
+        return target._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def _collect_windows():
+    """Refresh the rolling-window gauges right before /metrics is rendered."""
+    gradio_metrics.USAGE_WINDOW_TOKENS.clear()
+    gradio_metrics.USAGE_WINDOW_COST.clear()
+    for window, seconds in USAGE_WINDOWS.items():
+        for persona, totals in ledger.window_totals(seconds, group_by="persona").items():
+            gradio_metrics.USAGE_WINDOW_TOKENS.set(totals["total_tokens"], window=window, persona=persona)
+            gradio_metrics.USAGE_WINDOW_COST.set(round(totals["cost_usd"], 6), window=window, persona=persona)
+
+
+gradio_metrics.REGISTRY.add_collector(_collect_windows)
@@ -2,7 +2,11 @@
 Utility functions for the Gradio-based chatbot application.
 """
 
+import re
+import unicodedata
 import uuid
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 # Global state for session and user IDs
 _session_id = None
@@ -51,3 +55,190 @@ def format_source_documents(source_documents):
             formatted_docs.append(f"Source {i+1}: {source}")
     
     return "\n".join(formatted_docs) if formatted_docs else None
+
+
+# ------------------------------------------------------------------------------
+# Normalized search keys
+# ------------------------------------------------------------------------------
+# Names are also stored as lowercase, ASCII-folded "*_key" properties so Cypher
+# can match them with index seeks instead of toLower(...) CONTAINS scans.
+NAME_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+
+def search_key(text):
+    """Lowercase, ASCII-fold and strip punctuation: "Ji'Ayir Brown" -> "jiayir brown"."""
+    if text is None:
+        return None
+    folded = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode("ascii").lower()
+    folded = re.sub(r"['\u2019.]", "", folded)
+    return re.sub(r"[^a-z0-9]+", " ", folded).strip()
+
+
+def last_name_key(name):
+    """Search key of a person's last name, ignoring suffixes: "Patrick Taylor Jr." -> "taylor"."""
+    words = [w for w in (search_key(name) or "").split() if w not in NAME_SUFFIXES]
+    return words[-1] if words else None
+
+
+# Nicknames fans use for players, by roster name (extra aliases, as in gradio_teams.NFL_TEAMS)
+PLAYER_NICKNAMES = {
+    "Brock Purdy": ["mr irrelevant"],
+    "Christian McCaffrey": ["cmc"],
+    "Trent Williams": ["silverback"],
+}
+
+
+def player_alias_keys(name):
+    """
+    Other search keys for a player: the name without suffixes, the run-together
+    hashtag form ("deommodorelenoir"), nflverse's short form ("B.Purdy" ->
+    "bpurdy") and the nicknames in PLAYER_NICKNAMES.
+    """
+    words = [w for w in (search_key(name) or "").split() if w not in NAME_SUFFIXES]
+    if not words:
+        return []
+    aliases = [" ".join(words), "".join(words)]
+    if len(words) > 1:
+        aliases.append(search_key(f"{words[0][0]}.{' '.join(words[1:])}"))
+    aliases += [search_key(nickname) for nickname in PLAYER_NICKNAMES.get(name, [])]
+    return [alias for alias in dict.fromkeys(aliases) if alias != search_key(name)]
+
+
+def nickname_key(team_name):
+    """Search key of a team's nickname: "San Francisco 49ers" -> "49ers"."""
+    words = (search_key(team_name) or "").split()
+    return words[-1] if words else None
+
+
+# label -> {key property: (source property, normalizer)}
+SEARCH_KEYS = {
+    "Player": {
+        "name_key": ("name", search_key),
+        "last_name_key": ("name", last_name_key),
+        "alias_keys": ("name", player_alias_keys),
+    },
+    "Team": {
+        "name_key": ("name", search_key),
+        "nickname_key": ("name", nickname_key),
+    },
+    "Game": {
+        "home_team_key": ("home_team", search_key),
+        "home_nickname_key": ("home_team", nickname_key),
+        "away_team_key": ("away_team", search_key),
+        "away_nickname_key": ("away_team", nickname_key),
+    },
+    "Community": {
+        "name_key": ("fan_chapter_name", search_key),
+        "city_key": ("city", search_key),
+        "state_key": ("state", search_key),
+    },
+    "Team_Story": {
+        "topic_key": ("topic", search_key),
+    },
+}
+
+
+# Keys holding a list, matched with "x IN n.alias_keys". Neo4j indexes can't
+# serve list membership, so these get no index; the roster is small enough to scan.
+LIST_SEARCH_KEYS = {"alias_keys"}
+
+
+def search_keys_for(label, props):
+    """The *_key properties to store on a node with this label and these properties."""
+    return {
+        key: normalize(props.get(source))
+        for key, (source, normalize) in SEARCH_KEYS.get(label, {}).items()
+    }
+
+
+# ------------------------------------------------------------------------------
+# Typed Game fields
+# ------------------------------------------------------------------------------
+# The schedule CSVs carry kickoff as a day-first UTC string ("10/09/2024 00:15")
+# and the score as "32 - 19". Games also get native temporal/integer copies so
+# date ranges, "last game" and margins are range-index seeks, not string parsing.
+KICKOFF_FORMATS = ("%d/%m/%Y %H:%M", "%d/%m/%y %H:%M", "%d/%m/%Y", "%d/%m/%y")
+# Game dates are reported in US Eastern time, like the NFL schedule
+GAME_TIMEZONE = ZoneInfo("America/New_York")
+
+# Game properties with a range index (see gradio_neo4j.index_statements)
+GAME_RANGE_PROPERTIES = ("kickoff", "game_date", "week", "home_score", "away_score", "winner", "margin")
+
+
+def parse_kickoff(text):
+    """UTC datetime for a schedule Date cell, or None if it doesn't parse."""
+    if text is None:
+        return None
+    text = str(text).strip()
+    for fmt in KICKOFF_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_score(text):
+    """(home_score, away_score) ints for a "32 - 19" result, or (None, None)."""
+    match = re.fullmatch(r"\s*(\d+)\s*-\s*(\d+)\s*", str(text or ""))
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def typed_game_fields(date_text, result_text, week=None, home_team=None, away_team=None):
+    """
+    Native-typed Game properties from the schedule's string columns:
+    kickoff (UTC datetime), game_date (Eastern calendar date), week,
+    home_score/away_score, winner (team name, None for a tie or unplayed game)
+    and margin. Unparseable cells become None.
+    """
+    kickoff = parse_kickoff(date_text)
+    home_score, away_score = parse_score(result_text)
+    winner = margin = None
+    if home_score is not None:
+        margin = abs(home_score - away_score)
+        if home_score != away_score:
+            winner = home_team if home_score > away_score else away_team
+    try:
+        week = int(float(week)) if week is not None else None
+    except (TypeError, ValueError):
+        week = None
+    return {
+        "kickoff": kickoff,
+        "game_date": kickoff.astimezone(GAME_TIMEZONE).date() if kickoff else None,
+        "week": week,
+        "home_score": home_score,
+        "away_score": away_score,
+        "winner": winner,
+        "margin": margin,
+    }
+
+
+# ------------------------------------------------------------------------------
+# Typed Team_Story fields
+# ------------------------------------------------------------------------------
+# The scraper keeps each article's <time datetime> as an ISO string; rows from
+# before that only have the date in the article URL (/2025/4/17/...). Stories
+# store it as a native UTC datetime so "latest news" is an index-ordered top-k.
+STORY_RANGE_PROPERTIES = ("published_at",)
+ARTICLE_URL_DATE = re.compile(r"/(\d{4})/(\d{1,2})/(\d{1,2})/")
+
+
+def parse_published_at(text, url=None):
+    """UTC datetime for an article's ISO publication time, else the date in its URL, else None."""
+    if text:
+        try:
+            published = datetime.fromisoformat(str(text).strip().replace("Z", "+00:00"))
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            return published.astimezone(timezone.utc)
+        except ValueError:
+            pass
+    match = ARTICLE_URL_DATE.search(url or "")
+    if match:
+        try:
+            return datetime(*(int(part) for part in match.groups()), tzinfo=timezone.utc)
+        except ValueError:
+            return None
+    return None
@@ -4,6 +4,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gradio_llm import llm
 from gradio_graph import graph
+from tools.cypher_validation import tool_graph
 
 # Create the Cypher QA chain
 from langchain_neo4j import GraphCypherQAChain
@@ -18,7 +19,23 @@ Do not use any other relationship types or properties that are not provided.
 
 Do not return entire nodes or embedding properties.
 
-IMPORTANT: Always use case-insensitive comparisons in your Cypher queries by applying toLower() to both the property and the search string, or by using the =~ operator with (?i) for case-insensitive regex matching. This ensures that user queries match regardless of capitalization.
+IMPORTANT: Names are also stored as indexed search keys: lowercase, without accents or punctuation (e.g. "Ji'Ayir Brown" -> "jiayir brown"). Always filter names on these *_key properties with a lowercase literal so the database can use its indexes:
+- Player: name_key (full name), last_name_key, plus alias_keys, a list of nicknames and other spellings (e.g. "cmc" IN p.alias_keys)
+- Team: name_key, nickname_key (e.g. "49ers"), plus alias_keys, a list of other names and abbreviations (e.g. "niners" IN t.alias_keys)
+- Game: home_team_key, away_team_key (full team names), home_nickname_key, away_nickname_key (e.g. "seahawks")
+- Community: name_key (fan chapter name), city_key, state_key
+- Team_Story: topic_key
+Use = for a full name and STARTS WITH or CONTAINS for part of one. Never wrap a *_key property in toLower() and never use =~ regular expressions on names. For other string properties, apply toLower() to both the property and the search string.
+
+IMPORTANT: Game dates and scores are stored as indexed native values. Filter and sort games on these, never on the g.date or g.result display strings:
+- g.kickoff (datetime, UTC) for "last"/"next" game ordering
+- g.game_date (date) for days and months, e.g. g.game_date >= date("2024-10-01") AND g.game_date < date("2024-11-01")
+- g.week, g.home_score, g.away_score, g.margin (integers) and g.winner (winning team's full name, null for a tie)
+Return g.date and g.result for display; do not return g.kickoff or g.game_date.
+
+IMPORTANT: Every NFL club is a Team node (with conference, division, abbreviation and logo_url) linked to its games: (t:Team)-[:HOME_IN]->(g:Game) and (t:Team)-[:AWAY_IN]->(g:Game). For questions about a team's games or opponents, start from the Team node and traverse [:HOME_IN|AWAY_IN] instead of filtering every game on its home/away team keys.
+
+IMPORTANT: Per-game player stats are properties of (p:Player)-[r:PLAYED]->(g:Game) relationships (r.passing_yards, r.rush_attempts, r.targets, r.solo_tackles, r.sacks, r.interceptions, ...). Season totals are precomputed on the Player as p.season_<stat> (e.g. p.season_sacks, p.season_tackles, p.season_games) for the latest season in the graph, p.stats_season, and each Game has g.top_performers, a list of leader strings. Read these properties for season and leader questions instead of summing PLAYED relationships with sum() or count().
 
 Example Cypher Statements for 49ers Graph:
 
@@ -35,7 +52,7 @@ ORDER BY p.jersey_number
 MATCH (g:Game)
 RETURN g.game_id AS gameId, g.date AS date, g.location AS location, 
        g.home_team AS homeTeam, g.away_team AS awayTeam, g.result AS finalScore
-ORDER BY g.date
+ORDER BY g.kickoff
 
 4. List All Fan Communities:
 MATCH (c:Community)
@@ -60,40 +77,47 @@ RETURN c.fan_chapter_name AS chapterName, count(f) AS fanCount
 ORDER BY fanCount DESC
 LIMIT 5
 
-8. Find Fans Favoriting a Specific Player & Community (Case-Insensitive):
+8. Find Fans Favoriting a Specific Player & Community (Search Keys):
 MATCH (f:Fan)-[:FAVORITE_PLAYER]->(p:Player)
-WHERE toLower(p.name) = toLower("Nick Bosa")
+WHERE p.name_key = "nick bosa"
 MATCH (f)-[:MEMBER_OF]->(c:Community)
-WHERE toLower(c.fan_chapter_name) = toLower("Niner Empire Hawaii 808")
+WHERE c.name_key = "niner empire hawaii 808"
 RETURN f.first_name AS firstName, f.last_name AS lastName, c.fan_chapter_name AS community
 
-9. Upcoming Home Games (Case-Insensitive):
-MATCH (g:Game)
-WHERE toLower(g.home_team) = toLower("San Francisco 49ers")
+9. Upcoming Home Games (Search Keys):
+MATCH (:Team {{name_key: "san francisco 49ers"}})-[:HOME_IN]->(g:Game)
 RETURN g.date AS date, g.location AS location, g.away_team AS awayTeam
-ORDER BY date
+ORDER BY g.kickoff
 
 10. Past Game Results:
 MATCH (g:Game)
-WHERE g.result IS NOT NULL
+WHERE g.home_score IS NOT NULL
 RETURN g.date AS date, g.home_team AS home, g.away_team AS away, g.result AS finalScore
-ORDER BY date DESC
+ORDER BY g.kickoff DESC
 LIMIT 5
 
+10b. Biggest 49ers Wins in October (Typed Fields):
+MATCH (g:Game)
+WHERE g.winner = "San Francisco 49ers"
+AND g.game_date >= date("2024-10-01") AND g.game_date < date("2024-11-01")
+RETURN g.date AS date, g.home_team AS home, g.away_team AS away, g.result AS finalScore, g.margin AS margin
+ORDER BY g.margin DESC
+LIMIT 3
+
 11. Games Played at a Specific Location (Case-Insensitive):
 MATCH (g:Game)
 WHERE toLower(g.location) = toLower("Levi's Stadium")
 RETURN g.date AS date, g.home_team AS homeTeam, g.away_team AS awayTeam, g.result AS finalScore
 
-12. Find Fans in a Specific Community (Case-Insensitive):
+12. Find Fans in a Specific Community (Search Keys):
 MATCH (f:Fan)-[:MEMBER_OF]->(c:Community)
-WHERE toLower(c.fan_chapter_name) = toLower("Bay Area 49ers Fans")
+WHERE c.name_key = "bay area 49ers fans"
 RETURN f.first_name AS firstName, f.last_name AS lastName
 ORDER BY lastName
 
-12b. Find Fans in a Community (Using Regex, Case-Insensitive):
+12b. Find Fans in a Community (Partial Name):
 MATCH (f:Fan)-[:MEMBER_OF]->(c:Community)
-WHERE c.fan_chapter_name =~ '(?i).*bay area.*'
+WHERE c.name_key CONTAINS "bay area"
 RETURN f.first_name AS firstName, f.last_name AS lastName
 ORDER BY lastName
 
@@ -113,11 +137,32 @@ WHERE toLower(p.position) = toLower("QB")  // Case-insensitive position filter
 RETURN p.name AS playerName, p.position AS position, p.jersey_number AS jerseyNumber
 ORDER BY p.jersey_number
 
-16. Case-Insensitive Team Search:
-MATCH (g:Game)
-WHERE toLower(g.away_team) CONTAINS toLower("seahawks")  // Case-insensitive team search
+16. Team Search by Nickname:
+MATCH (:Team {{nickname_key: "seahawks"}})-[:AWAY_IN]->(g:Game)
 RETURN g.date AS date, g.home_team AS home, g.away_team AS away, g.result AS finalScore
-ORDER BY date DESC
+ORDER BY g.kickoff DESC
+
+17. 49ers Games Against NFC West Opponents (Team Traversal):
+MATCH (:Team {{nickname_key: "49ers"}})-[:HOME_IN|AWAY_IN]->(g:Game)<-[:HOME_IN|AWAY_IN]-(o:Team)
+WHERE o.conference = "NFC" AND o.division = "West"
+RETURN o.name AS opponent, g.date AS date, g.result AS finalScore, g.winner AS winner
+ORDER BY g.kickoff
+
+18. A Player's Season Stats (Precomputed Totals):
+MATCH (p:Player {{name_key: "nick bosa"}})
+RETURN p.name AS player, p.season_games AS games, p.season_sacks AS sacks, p.season_tackles AS tackles
+
+19. A Player's Game-by-Game Stats (PLAYED Relationships):
+MATCH (p:Player {{name_key: "brock purdy"}})-[r:PLAYED]->(g:Game)
+RETURN g.week AS week, g.home_team AS home, g.away_team AS away, r.complete_passes AS completions, r.pass_attempts AS attempts
+ORDER BY g.week
+
+20. Season Sack Leaders:
+MATCH (p:Player)
+WHERE p.season_sacks IS NOT NULL
+RETURN p.name AS player, p.season_sacks AS sacks
+ORDER BY p.season_sacks DESC
+LIMIT 5
 
 Schema:
 {schema}
@@ -131,7 +176,8 @@ cypher_prompt = PromptTemplate.from_template(CYPHER_GENERATION_TEMPLATE)
 
 cypher_qa = GraphCypherQAChain.from_llm(
     llm,
-    graph=graph,
+    # Parameterized, validated (one repair attempt) and cost-guarded; see tools/cypher_validation.py
+    graph=tool_graph(graph, llm, tool="cypher"),
     verbose=True,
     cypher_prompt=cypher_prompt,
     allow_dangerous_requests=True
@@ -186,7 +232,7 @@ def run_test_query(query_name):
             MATCH (g:Game)
             RETURN g.date AS date, g.location AS location, g.home_team AS homeTeam, 
                    g.away_team AS awayTeam, g.result AS finalScore
-            ORDER BY g.date
+            ORDER BY g.kickoff
         """,
         "communities": """
             MATCH (c:Community)
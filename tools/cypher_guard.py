@@ -0,0 +1,243 @@
+"""
+Cost guardrails for LLM-generated Cypher.
+
+GuardedGraph sits under each Cypher tool and bounds what a generated query
+can cost:
+    - LIMIT is appended to the final RETURN when missing, and clamped to the
+      tool's max_rows when larger
+    - the EXPLAIN plan (Neo4j only) is checked for AllNodesScan and
+      CartesianProduct operators whose estimated rows exceed max_scan_rows;
+      such queries are rejected with CypherGuardError, which ValidatedGraph
+      turns into its one repair attempt. The plan comes from ValidatedGraph's
+      own EXPLAIN (GuardedGraph.explain hands it to the query that follows),
+      so a validated query is compiled once. Plans are cached per graph data
+      version, since row estimates grow with the graph
+    - returned rows and their JSON size are capped before they reach the QA LLM
+Every intervention is counted in ifx_cypher_guard_total{tool, action}.
+
+Limits are set per tool in GUARD_LIMITS ("default" applies to any tool not
+listed) and can be overridden with IFX_CYPHER_GUARD_LIMITS.
+
+Environment variables:
+    IFX_CYPHER_GUARD          set to 0 to turn the guard off (default 1)
+    IFX_CYPHER_GUARD_LIMITS   optional JSON merged over GUARD_LIMITS, e.g.
+                              '{"cypher": {"max_rows": 100}, "default": {"max_bytes": 50000}}'
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Add parent directory to path to access gradio modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gradio_metrics
+from backends.graph_proxy import GraphProxy
+from backends.query_cache import DATA_VERSION_QUERY
+from gradio_tracing import set_attribute
+from tools.cypher_params import tokenize_cypher
+
+GUARD_ENABLED = os.environ.get("IFX_CYPHER_GUARD", "1").strip().lower() not in ("0", "false", "no", "off")
+
+GUARD_LIMITS = {
+    # max_rows: LIMIT ceiling and row cap; max_bytes: JSON size cap on returned rows;
+    # max_scan_rows: estimated rows above which AllNodesScan/CartesianProduct is rejected
+    "default": {"max_rows": 50, "max_bytes": 20000, "max_scan_rows": 1000},
+    "player_search": {"max_rows": 10},
+    "game_recap": {"max_rows": 10},
+    "team_story": {"max_rows": 25},
+}
+for _tool, _overrides in json.loads(os.environ.get("IFX_CYPHER_GUARD_LIMITS", "{}") or "{}").items():
+    GUARD_LIMITS.setdefault(_tool, {}).update(_overrides)
+
+RISKY_OPERATORS = ("AllNodesScan", "CartesianProduct")
+PLAN_CACHE_SIZE = 256
+# Seconds between DataVersion polls when there is no query cache in the chain to ask
+PLAN_VERSION_TTL = 30.0
+
+
+class CypherGuardError(ValueError):
+    """Generated Cypher rejected because its plan would scan too much of the graph."""
+
+
+def limits_for(tool):
+    limits = dict(GUARD_LIMITS["default"])
+    limits.update(GUARD_LIMITS.get(tool, {}))
+    return limits
+
+
+def enforce_limit(query, params, max_rows):
+    """
+    Return (query, params, action) with the final RETURN's LIMIT at most
+    max_rows. action is "limit_injected", "limit_clamped" or None.
+    """
+    tokens = tokenize_cypher(query.strip().rstrip(";"))
+    depth = 0
+    last_return = None
+    limit_at = None
+    for index, (kind, text) in enumerate(tokens):
+        if kind == "other" and text in "({[":
+            depth += 1
+        elif kind == "other" and text in ")}]":
+            depth -= 1
+        elif kind == "word" and depth == 0:
+            upper = text.upper()
+            if upper == "UNION":
+                # LIMIT would only bind the last branch; rely on the row cap
+                return query, params, None
+            if upper == "RETURN":
+                last_return, limit_at = index, None
+            elif upper == "LIMIT" and last_return is not None:
+                limit_at = index
+    if last_return is None:
+        return query, params, None
+
+    if limit_at is None:
+        body = "".join(text for _, text in tokens).rstrip()
+        return f"{body}\nLIMIT {max_rows}", params, "limit_injected"
+
+    value_index = next((i for i in range(limit_at + 1, len(tokens)) if tokens[i][0] != "space"), None)
+    if value_index is None:
+        return query, params, None
+    kind, text = tokens[value_index]
+    if kind == "number" and int(float(text)) > max_rows:
+        tokens[value_index] = (kind, str(max_rows))
+        return "".join(t for _, t in tokens), params, "limit_clamped"
+    if kind == "param":
+        name = text[1:]
+        value = (params or {}).get(name)
+        if isinstance(value, (int, float)) and value > max_rows:
+            return query, dict(params, **{name: max_rows}), "limit_clamped"
+    return query, params, None
+
+
+def risky_operators(plan, max_scan_rows):
+    """(operator, estimated rows) for AllNodesScan/CartesianProduct nodes above max_scan_rows."""
+    found = []
+    if not plan:
+        return found
+    operator = str(plan.get("operatorType", "")).split("@")[0]
+    estimated = (plan.get("args") or {}).get("EstimatedRows", 0) or 0
+    if operator in RISKY_OPERATORS and estimated > max_scan_rows:
+        found.append((operator, int(estimated)))
+    for child in plan.get("children") or []:
+        found.extend(risky_operators(child, max_scan_rows))
+    return found
+
+
+def cap_rows(rows, max_rows, max_bytes):
+    """Trim rows to max_rows and to max_bytes of JSON; returns (rows, actions)."""
+    actions = []
+    if len(rows) > max_rows:
+        rows = rows[:max_rows]
+        actions.append("rows_capped")
+    size = 0
+    for index, row in enumerate(rows):
+        size += len(json.dumps(row, default=str))
+        if size > max_bytes:
+            # Always keep at least one row so the tool has something to show
+            rows = rows[:max(index, 1)]
+            actions.append("bytes_capped")
+            break
+    return rows, actions
+
+
+class GuardedGraph(GraphProxy):
+    """GraphStore wrapper that applies the per-tool Cypher cost limits."""
+
+    # (data version, query) -> plan, shared by every tool
+    _plans = OrderedDict()
+    _plans_lock = threading.Lock()
+    _version = None
+    _version_checked_at = 0.0
+    # The plan from explain(), for the query() call that follows it on this thread
+    _pending = threading.local()
+
+    def __init__(self, inner, tool):
+        super().__init__(inner)
+        self.tool = tool
+        self.limits = limits_for(tool)
+
+    def query(self, query, params={}, session_params={}):
+        if not GUARD_ENABLED or query.lstrip().upper().startswith(("EXPLAIN", "PROFILE")):
+            return super().query(query, params, session_params)
+
+        query, params, action = enforce_limit(query, params, self.limits["max_rows"])
+        if action:
+            self._record(action)
+
+        try:
+            plan = self._plan(query, params)
+        except Exception as e:
+            # Only reached with validation off; the query itself reports the error
+            print(f"[CYPHER GUARD] EXPLAIN failed, skipping plan check: {e}")
+            plan = None
+        risky = risky_operators(plan, self.limits["max_scan_rows"])
+        if risky:
+            operator, estimated = risky[0]
+            self._record(f"rejected_{operator}")
+            raise CypherGuardError(
+                f"Query plan uses {operator} over an estimated {estimated} rows "
+                f"(limit {self.limits['max_scan_rows']}). Anchor every pattern on a label "
+                f"and a filtered property, and connect the patterns instead of matching them separately."
+            )
+
+        rows, actions = cap_rows(super().query(query, params, session_params), self.limits["max_rows"],
+                                 self.limits["max_bytes"])
+        for action in actions:
+            self._record(action)
+        return rows
+
+    def explain(self, query, params=None):
+        """
+        EXPLAIN the query as query() will run it (LIMIT enforced) and keep the
+        plan for the cost check; errors propagate to the validator.
+        """
+        if not GUARD_ENABLED:
+            return super().explain(query, params)
+        query, params, _ = enforce_limit(query, params, self.limits["max_rows"])
+        key = (self._data_version(), query)
+        plan = self._plan(query, params, key)
+        self._pending.entry = (key, plan)
+        return plan
+
+    def _plan(self, query, params, key=None):
+        key = key or (self._data_version(), query)
+        pending, self._pending.entry = getattr(self._pending, "entry", None), None
+        if pending is not None and pending[0] == key:
+            return pending[1]
+        with self._plans_lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        plan = super().explain(query, params)
+        if plan is None:
+            # No plan from this backend (fake graph, no driver): nothing worth caching
+            return None
+        with self._plans_lock:
+            self._plans[key] = plan
+            while len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    def _data_version(self):
+        # The query cache already polls the DataVersion node; reuse its view when it is in the chain
+        current = getattr(self.inner, "current_data_version", None)
+        if current is not None:
+            return current()
+        now = time.monotonic()
+        if now - GuardedGraph._version_checked_at >= PLAN_VERSION_TTL:
+            try:
+                rows = self.inner.query(DATA_VERSION_QUERY)
+                GuardedGraph._version = rows[0]["version"] if rows else None
+            except Exception as e:
+                print(f"[CYPHER GUARD] Could not read DataVersion: {e}")
+            GuardedGraph._version_checked_at = now
+        return GuardedGraph._version
+
+    def _record(self, action):
+        print(f"[CYPHER GUARD] {self.tool}: {action}")
+        gradio_metrics.CYPHER_GUARD.inc(tool=self.tool, action=action)
+        set_attribute(f"guard_{action}", True)
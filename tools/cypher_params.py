@@ -0,0 +1,200 @@
+"""
+Parameterization of LLM-generated Cypher.
+
+The Cypher chains inline literals into every query they generate
+(`toLower(p.name) CONTAINS toLower("bosa")`), so each question produces a new
+query string and Neo4j has to plan it from scratch. parameterize_cypher()
+rewrites a generated query into a canonical template plus parameters:
+    - string and number literals become $p0, $p1, ...
+    - toLower("X") / toUpper("X") around a literal are folded into the parameter value
+    - comments are dropped, whitespace is collapsed and keywords are upper-cased
+Literals in RETURN clauses, LIMIT/SKIP counts and variable-length ranges
+(`*1..3`) are left alone, because they name result columns or shape the plan.
+
+ParameterizedGraph applies this to every graph.query() a tool makes, and
+counts how often the executed statement was already seen (a client-side view
+of Neo4j's query plan cache) so the effect shows up on /metrics.
+
+Environment variables:
+    IFX_CYPHER_PARAMETERIZE   set to 0 to send generated Cypher unchanged (default 1)
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+
+# Add parent directory to path to access gradio modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gradio_metrics
+from backends.graph_proxy import GraphProxy
+from gradio_tracing import set_attribute
+
+PARAMETERIZE_ENABLED = os.environ.get("IFX_CYPHER_PARAMETERIZE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# Neo4j's default query plan cache holds 1000 statements per database
+PLAN_CACHE_SIZE = 1000
+
+_TOKEN_RE = re.compile(r"""
+    (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<backtick>`(?:[^`]|``)*`)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<param>\$\w+)
+  | (?P<number>\d+\.\d+(?:[eE][+-]?\d+)?|\d+(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_]\w*)
+  | (?P<space>\s+)
+  | (?P<range>\.\.)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+KEYWORDS = {
+    "MATCH", "OPTIONAL", "WHERE", "WITH", "RETURN", "ORDER", "BY", "ASC", "ASCENDING",
+    "DESC", "DESCENDING", "SKIP", "LIMIT", "AND", "OR", "XOR", "NOT", "IN", "CONTAINS",
+    "STARTS", "ENDS", "IS", "NULL", "AS", "DISTINCT", "UNWIND", "CASE", "WHEN", "THEN",
+    "ELSE", "END", "CALL", "YIELD", "UNION", "ALL", "EXPLAIN", "PROFILE", "TRUE", "FALSE",
+}
+_CASE_FUNCTIONS = {"tolower": str.lower, "toupper": str.upper}
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "\\": "\\", "'": "'", '"': '"'}
+
+
+def _unescape(literal):
+    """Decode a quoted Cypher string literal into its Python value."""
+    body = literal[1:-1]
+    return re.sub(
+        r"\\(u[0-9a-fA-F]{4}|.)",
+        lambda m: chr(int(m.group(1)[1:], 16)) if len(m.group(1)) == 5 else _ESCAPES.get(m.group(1), m.group(1)),
+        body,
+    )
+
+
+def _number(text):
+    return float(text) if any(c in text for c in ".eE") else int(text)
+
+
+def tokenize_cypher(query):
+    """(kind, text) tokens for a query, without comments; kinds are the _TOKEN_RE group names."""
+    return [(m.lastgroup, m.group()) for m in _TOKEN_RE.finditer(query) if m.lastgroup != "comment"]
+
+
+def _next_significant(tokens, index):
+    for kind, text in tokens[index:]:
+        if kind != "space":
+            return kind, text
+    return None, ""
+
+
+def parameterize_cypher(query, params=None):
+    """
+    Return (template, params) for a generated query. Existing parameters are
+    kept; new ones are named p0, p1, ... skipping names already in use.
+    """
+    params = dict(params or {})
+    tokens = tokenize_cypher(query.strip().rstrip(";"))
+    used = set(params) | {text[1:] for kind, text in tokens if kind == "param"}
+    counter = 0
+
+    def new_param(value):
+        nonlocal counter
+        while f"p{counter}" in used:
+            counter += 1
+        name = f"p{counter}"
+        used.add(name)
+        params[name] = value
+        return f"${name}"
+
+    out = []
+    previous = ("", "")  # last significant (kind, text) emitted
+    # Brace depth, and the depth of the RETURN we are in (None outside RETURN),
+    # so map projections and literals in RETURN don't end it
+    depth = 0
+    return_depth = None
+    index = 0
+    while index < len(tokens):
+        kind, text = tokens[index]
+        index += 1
+        if kind == "space":
+            if out and out[-1] != " ":
+                out.append(" ")
+            continue
+
+        if kind == "word":
+            upper = text.upper()
+            after_kind, after_text = _next_significant(tokens, index)
+            # toLower("X") -> $p0 with the folded value (outside RETURN only)
+            if return_depth is None and text.lower() in _CASE_FUNCTIONS and after_text == "(":
+                rest = [t for t in tokens[index:index + 6] if t[0] != "space"]
+                if len(rest) >= 3 and rest[1][0] == "string" and rest[2][1] == ")":
+                    value = _CASE_FUNCTIONS[text.lower()](_unescape(rest[1][1]))
+                    # Skip past the closing parenthesis
+                    seen = 0
+                    while seen < 3:
+                        if tokens[index][0] != "space":
+                            seen += 1
+                        index += 1
+                    out.append(new_param(value))
+                    previous = ("param", out[-1])
+                    continue
+            is_property = previous[1] in (".", ":") or after_text == ":"
+            if upper in KEYWORDS and not is_property:
+                text = upper
+                if upper == "RETURN" and return_depth is None:
+                    return_depth = depth
+                elif upper == "UNION":
+                    return_depth = None
+        elif kind == "other" and text == "{":
+            depth += 1
+        elif kind == "other" and text == "}":
+            # End of a CALL { ... RETURN ... } subquery
+            if return_depth == depth:
+                return_depth = None
+            depth -= 1
+        elif kind == "string" and return_depth is None:
+            text = new_param(_unescape(text))
+            kind = "param"
+        elif kind == "number" and return_depth is None:
+            after_kind, after_text = _next_significant(tokens, index)
+            in_range = previous[1] in ("*", "..") or after_kind == "range"
+            if not in_range and previous[1] not in ("LIMIT", "SKIP"):
+                text = new_param(_number(text))
+                kind = "param"
+
+        out.append(text)
+        previous = (kind, text)
+
+    return "".join(out).strip(), params
+
+
+class ParameterizedGraph(GraphProxy):
+    """
+    GraphStore wrapper used by the Cypher tools: parameterizes each query
+    before running it and records plan-cache reuse for the tool.
+    """
+
+    _seen = OrderedDict()
+    _seen_lock = threading.Lock()
+
+    def __init__(self, inner, tool):
+        super().__init__(inner)
+        self.tool = tool
+
+    def query(self, query, params={}, session_params={}):
+        if PARAMETERIZE_ENABLED:
+            statement, params = parameterize_cypher(query, params)
+        else:
+            statement = query
+        set_attribute("cypher_parameters", len(params or {}))
+        self._record_reuse(statement)
+        return super().query(statement, params, session_params)
+
+    def _record_reuse(self, statement):
+        with self._seen_lock:
+            repeat = statement in self._seen
+            if repeat:
+                self._seen.move_to_end(statement)
+            else:
+                self._seen[statement] = True
+                while len(self._seen) > PLAN_CACHE_SIZE:
+                    self._seen.popitem(last=False)
+        gradio_metrics.CYPHER_STATEMENTS.inc(tool=self.tool, result="repeat" if repeat else "new")
+        set_attribute("plan_reuse", repeat)
@@ -0,0 +1,196 @@
+"""
+Validation and one-shot repair of LLM-generated Cypher.
+
+Before a generated query runs, ValidatedGraph checks it in two cheap steps:
+    1. labels, relationship types and `var.property` lookups are compared
+       against the cached structured schema (Neo4j only warns about unknown
+       names, so these queries would otherwise just return nothing)
+    2. EXPLAIN compiles the query without touching any data
+On failure (or when the cost guard in tools/cypher_guard.py rejects the plan),
+the query, the error and the schema go back to the LLM once for a targeted
+fix, and the repaired query is validated again. A broken query therefore
+costs one small extra LLM call instead of a whole new agent run.
+
+Environment variables:
+    IFX_CYPHER_VALIDATE   set to 0 to run generated Cypher without validation (default 1)
+"""
+
+import os
+import re
+import sys
+
+# Add parent directory to path to access gradio modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gradio_metrics
+from backends.graph_proxy import GraphProxy
+from gradio_tracing import set_attribute, span
+from langchain_core.prompts import PromptTemplate
+from tools.cypher_guard import CypherGuardError, GuardedGraph
+from tools.cypher_params import ParameterizedGraph
+
+VALIDATE_ENABLED = os.environ.get("IFX_CYPHER_VALIDATE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+CYPHER_REPAIR_TEMPLATE = """
+You are an expert Neo4j Developer. The Cypher query below failed validation.
+Fix only what the error describes and keep the rest of the query, including any $parameters, unchanged.
+Use only the labels, relationship types and properties in the schema.
+Return only the corrected Cypher query, with no explanation.
+
+Schema:
+{schema}
+
+Query:
+{query}
+
+Error:
+{error}
+"""
+
+cypher_repair_prompt = PromptTemplate.from_template(CYPHER_REPAIR_TEMPLATE)
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|//[^\n]*")
+_NODE_RE = re.compile(r"\(\s*(\w*)\s*((?::\s*`?\w+`?\s*)+)")
+_REL_RE = re.compile(r"\[\s*\w*\s*:\s*([\w|:`\s]+?)\s*(?:\*|\{|\])")
+_PROPERTY_RE = re.compile(r"(?<![\w.$])(\w+)\.(\w+)")
+
+
+class CypherValidationError(ValueError):
+    """Generated Cypher that failed the schema check or EXPLAIN."""
+
+
+def clean_generated_cypher(text):
+    """Strip ```cypher fences and stray quotes from an LLM reply."""
+    match = re.search(r"```(?:cypher)?\s*(.*?)\s*```", text, re.DOTALL | re.IGNORECASE)
+    query = match.group(1) if match else text
+    return query.strip().strip('"\'').strip()
+
+
+def schema_errors(query, structured_schema):
+    """
+    Names in the query that the schema does not know about. Returns a list of
+    messages; empty when the query looks fine or no schema is available.
+    """
+    node_props = (structured_schema or {}).get("node_props") or {}
+    relationships = (structured_schema or {}).get("relationships") or []
+    if not node_props:
+        return []
+    rel_types = {rel["type"] for rel in relationships} | set(((structured_schema or {}).get("rel_props") or {}))
+    code = _STRING_RE.sub("''", query)
+
+    errors = []
+    bound = {}
+    for variable, label_text in _NODE_RE.findall(code):
+        labels = [label.strip("` ") for label in label_text.split(":") if label.strip("` ")]
+        for label in labels:
+            if label not in node_props:
+                errors.append(f"Label :{label} does not exist. Known labels: {', '.join(sorted(node_props))}")
+        if variable and labels:
+            bound.setdefault(variable, labels[0])
+
+    if rel_types:
+        for type_text in _REL_RE.findall(code):
+            for rel_type in re.split(r"[|:]", type_text):
+                rel_type = rel_type.strip("` ")
+                if rel_type and rel_type not in rel_types:
+                    errors.append(f"Relationship type :{rel_type} does not exist. "
+                                  f"Known types: {', '.join(sorted(rel_types))}")
+
+    for variable, prop in _PROPERTY_RE.findall(code):
+        label = bound.get(variable)
+        if label in node_props:
+            known = [p["property"] for p in node_props[label]]
+            if prop not in known:
+                errors.append(f"Property {variable}.{prop} does not exist on :{label}. "
+                              f"Known properties: {', '.join(known)}")
+    # Keep the message short for the repair prompt
+    return list(dict.fromkeys(errors))
+
+
+def explain_error(graph, query, params=None):
+    """Compile the query with EXPLAIN; return the error message or None."""
+    try:
+        if isinstance(graph, GraphProxy):
+            # The cost guard below keeps this plan, so the query is not explained twice
+            graph.explain(query, params)
+        else:
+            graph.query(f"EXPLAIN {query}", params or {})
+    except Exception as e:
+        return str(e).strip() or e.__class__.__name__
+    return None
+
+
+def validate_cypher(graph, query, params=None):
+    """Error message for an invalid query, or None if it passes both checks."""
+    try:
+        structured_schema = graph.get_structured_schema
+    except Exception:
+        structured_schema = {}
+    errors = schema_errors(query, structured_schema)
+    if errors:
+        return "\n".join(errors)
+    return explain_error(graph, query, params)
+
+
+class ValidatedGraph(GraphProxy):
+    """
+    GraphStore wrapper for the Cypher tools: validates each query and gives
+    the LLM one chance to repair it before it runs.
+    """
+
+    def __init__(self, inner, llm, tool):
+        super().__init__(inner)
+        self.llm = llm
+        self.tool = tool
+
+    def query(self, query, params={}, session_params={}):
+        if not VALIDATE_ENABLED or query.lstrip().upper().startswith(("EXPLAIN", "PROFILE")):
+            return super().query(query, params, session_params)
+
+        error = validate_cypher(self.inner, query, params)
+        if error is None:
+            try:
+                result = super().query(query, params, session_params)
+                gradio_metrics.CYPHER_VALIDATIONS.inc(tool=self.tool, result="valid")
+                return result
+            except CypherGuardError as e:
+                # A plan the cost guard rejects gets the same single repair attempt
+                error = str(e)
+
+        print(f"[CYPHER VALIDATION] {self.tool} query failed validation: {error}")
+        repaired = self.repair(query, error)
+        repair_error = validate_cypher(self.inner, repaired, params) if repaired else "empty repair"
+        if repair_error is not None:
+            self._failed()
+            raise CypherValidationError(f"Generated Cypher is invalid: {error}")
+
+        print(f"[CYPHER VALIDATION] Repaired query:\n{repaired}")
+        try:
+            result = super().query(repaired, params, session_params)
+        except CypherGuardError:
+            self._failed()
+            raise
+        gradio_metrics.CYPHER_VALIDATIONS.inc(tool=self.tool, result="repaired")
+        set_attribute("cypher_validation", "repaired")
+        return result
+
+    def _failed(self):
+        gradio_metrics.CYPHER_VALIDATIONS.inc(tool=self.tool, result="failed")
+        set_attribute("cypher_validation", "failed")
+
+    def repair(self, query, error):
+        """One LLM call that sends back only the query, the error and the schema."""
+        with span("cypher.repair", tool=self.tool):
+            response = self.llm.invoke(cypher_repair_prompt.format(
+                schema=self.inner.get_schema,
+                query=query,
+                error=error,
+            ))
+        return clean_generated_cypher(getattr(response, "content", str(response)))
+
+
+def tool_graph(graph, llm, tool):
+    """
+    The graph a Cypher tool queries: literals -> $params (plan reuse), then
+    schema/EXPLAIN validation with one repair attempt, then the cost guard.
+    """
+    return ParameterizedGraph(ValidatedGraph(GuardedGraph(graph, tool), llm, tool), tool)
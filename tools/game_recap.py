@@ -14,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gradio_llm import llm
 from gradio_graph import graph
+from tools.cypher_validation import tool_graph
 from langchain_neo4j import GraphCypherQAChain
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 
@@ -41,43 +42,62 @@ Convert the user's question based on the schema.
 
 IMPORTANT NOTES:
 1. Always return the FULL game node with ALL its properties.
-2. Always use case-insensitive comparisons in your Cypher queries by applying toLower() to both the property and the search string.
-3. If the question mentions a specific date, look for games on that date.
+2. Start from the team: every club is a `Team` node linked to its games with `(t:Team)-[:HOME_IN]->(g:Game)` and `(t:Team)-[:AWAY_IN]->(g:Game)`; use `[:HOME_IN|AWAY_IN]` when the side doesn't matter. Find a team by its indexed `nickname_key` with a lowercase literal (e.g. "jets", "49ers"), or by `name_key` for a full name (e.g. "new york jets"). For other names or abbreviations use `"niners" IN t.alias_keys`. Never wrap these keys in toLower(). For other string properties, apply toLower() to both sides.
+3. If the question mentions a specific date or month, filter on the indexed `g.game_date` (a native date) with date("YYYY-MM-DD"): `g.game_date = date(...)` for a day, `g.game_date >= date(...) AND g.game_date < date(...)` for a month. The 2024 season starts in September 2024 and ends in January 2025. Never filter or sort on the `g.date` display string.
 4. If the question mentions teams, look for games where those teams played.
-5. If the question uses phrases like "last game", "most recent game", etc., you should add an ORDER BY clause.
+5. If the question uses phrases like "last game", "most recent game", etc., add `ORDER BY g.kickoff DESC`. For "biggest win(s)" filter on `g.winner` (the winning team's full name) and add `ORDER BY g.margin DESC`.
 6. NEVER use the embedding property in your queries.
-7. ALWAYS include "g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url" in your RETURN statement.
+7. ALWAYS include "g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, g.home_score, g.away_score, g.winner, g.week, g.top_performers, g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url" in your RETURN statement. Do not return g.kickoff or g.game_date.
 
 Example Questions and Queries:
 
 1. "Tell me about the 49ers game against the Jets"
 ```
-MATCH (g:Game)
-WHERE (toLower(g.home_team) CONTAINS toLower("49ers") AND toLower(g.away_team) CONTAINS toLower("Jets"))
-OR (toLower(g.away_team) CONTAINS toLower("49ers") AND toLower(g.home_team) CONTAINS toLower("Jets"))
+MATCH (:Team {{nickname_key: "49ers"}})-[:HOME_IN|AWAY_IN]->(g:Game)<-[:HOME_IN|AWAY_IN]-(:Team {{nickname_key: "jets"}})
 RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, 
+       g.home_score, g.away_score, g.winner, g.week, g.top_performers,
        g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url
 ```
 
-2. "What happened in the 49ers game on October 9th?"
+2. "What happened in the 49ers game on October 6th?"
 ```
-MATCH (g:Game)
-WHERE (toLower(g.home_team) CONTAINS toLower("49ers") OR toLower(g.away_team) CONTAINS toLower("49ers"))
-AND toLower(g.date) CONTAINS toLower("10/09")
+MATCH (:Team {{nickname_key: "49ers"}})-[:HOME_IN|AWAY_IN]->(g:Game)
+WHERE g.game_date = date("2024-10-06")
 RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, 
+       g.home_score, g.away_score, g.winner, g.week, g.top_performers,
        g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url
 ```
 
 3. "Show me the most recent 49ers game"
 ```
+MATCH (:Team {{nickname_key: "49ers"}})-[:HOME_IN|AWAY_IN]->(g:Game)
+RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, 
+       g.home_score, g.away_score, g.winner, g.week, g.top_performers,
+       g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url
+ORDER BY g.kickoff DESC
+LIMIT 1
+```
+
+4. "What was the 49ers' biggest win in October?"
+```
 MATCH (g:Game)
-WHERE (toLower(g.home_team) CONTAINS toLower("49ers") OR toLower(g.away_team) CONTAINS toLower("49ers"))
+WHERE g.winner = "San Francisco 49ers"
+AND g.game_date >= date("2024-10-01") AND g.game_date < date("2024-11-01")
 RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, 
+       g.home_score, g.away_score, g.winner, g.week, g.top_performers,
        g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url
-ORDER BY g.date DESC
+ORDER BY g.margin DESC
 LIMIT 1
 ```
 
+5. "How did the Niners do at home against the Rams?"
+```
+MATCH (:Team {{nickname_key: "49ers"}})-[:HOME_IN]->(g:Game)<-[:AWAY_IN]-(:Team {{nickname_key: "rams"}})
+RETURN g.game_id, g.date, g.location, g.home_team, g.away_team, g.result, g.summary, 
+       g.home_score, g.away_score, g.winner, g.week, g.top_performers,
+       g.home_team_logo_url, g.away_team_logo_url, g.highlight_video_url
+```
+
 Schema:
 {schema}
 
@@ -98,10 +118,11 @@ Game Details:
 - Away Team: {away_team}
 - Final Score: {result}
 - Summary: {summary}
+- Top Performers: {top_performers}
 
 Instructions:
 1. Begin with an attention-grabbing opening that mentions both teams and the outcome.
-2. Include key moments from the summary if available.
+2. Include key moments from the summary if available, and name the top performers if they are listed.
 3. Mention the venue/location.
 4. Conclude with what this means for the teams going forward.
 5. Keep the tone professional and engaging - like an ESPN or NFL Network broadcast.
@@ -117,7 +138,8 @@ recap_prompt = PromptTemplate.from_template(GAME_RECAP_TEMPLATE)
 # Create the Cypher QA chain for game search
 game_search = GraphCypherQAChain.from_llm(
     llm,
-    graph=graph,
+    # Parameterized, validated (one repair attempt) and cost-guarded; see tools/cypher_validation.py
+    graph=tool_graph(graph, llm, tool="game_recap"),
     verbose=True,
     cypher_prompt=game_search_prompt,
     return_direct=True,  # Return the raw results instead of passing through LLM
@@ -137,28 +159,37 @@ def parse_game_data(result):
     away_team = game.get('g.away_team', '')
     result_str = game.get('g.result', 'N/A')
     
-    # Parse the score if available
-    home_score = away_score = 'N/A'
+    # Scores and winner are stored as typed properties at ingestion
+    home_score = game.get('g.home_score')
+    away_score = game.get('g.away_score')
     winner = None
     
-    if result_str and result_str != 'N/A':
-        try:
-            scores = result_str.split('-')
-            if len(scores) == 2:
-                home_score = scores[0].strip()
-                away_score = scores[1].strip()
-                
-                # Determine winner
-                home_score_int = int(home_score)
-                away_score_int = int(away_score)
-                winner = 'home' if home_score_int > away_score_int else 'away'
-        except (ValueError, IndexError):
-            pass
+    if home_score is not None and away_score is not None:
+        winner_team = game.get('g.winner')
+        if winner_team:
+            winner = 'home' if winner_team == home_team else 'away'
+    else:
+        # Graphs ingested before the typed fields only have the result string
+        home_score = away_score = 'N/A'
+        if result_str and result_str != 'N/A':
+            try:
+                scores = result_str.split('-')
+                if len(scores) == 2:
+                    home_score = scores[0].strip()
+                    away_score = scores[1].strip()
+                    
+                    # Determine winner
+                    home_score_int = int(home_score)
+                    away_score_int = int(away_score)
+                    winner = 'home' if home_score_int > away_score_int else 'away'
+            except (ValueError, IndexError):
+                pass
     
     # Build the structured game data
     game_data = {
         'game_id': game.get('g.game_id', ''),
         'date': game.get('g.date', ''),
+        'week': game.get('g.week'),
         'location': game.get('g.location', ''),
         'home_team': home_team,
         'away_team': away_team,
@@ -167,6 +198,7 @@ def parse_game_data(result):
         'result': result_str,
         'winner': winner,
         'summary': game.get('g.summary', ''),
+        'top_performers': game.get('g.top_performers') or [],
         'home_team_logo_url': game.get('g.home_team_logo_url', ''),
         'away_team_logo_url': game.get('g.away_team_logo_url', ''),
         'highlight_video_url': game.get('g.highlight_video_url', '')
@@ -187,7 +219,8 @@ def generate_game_recap(game_data):
         home_team=game_data.get('home_team', 'N/A'),
         away_team=game_data.get('away_team', 'N/A'),
         result=game_data.get('result', 'N/A'),
-        summary=game_data.get('summary', 'N/A')
+        summary=game_data.get('summary', 'N/A'),
+        top_performers='; '.join(game_data.get('top_performers') or []) or 'N/A'
     )
     
     # Generate the recap using the LLM
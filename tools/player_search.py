@@ -14,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gradio_llm import llm
 from gradio_graph import graph
+from tools.cypher_validation import tool_graph
 from langchain_neo4j import GraphCypherQAChain
 from langchain_core.prompts import PromptTemplate
 
@@ -46,8 +47,8 @@ Convert the user's question based on the schema provided.
 IMPORTANT NOTES:
 1. Always return the FULL player node with ALL its relevant properties for display.
    Specifically include: `player_id`, `Name`, `Position`, `Jersey_number`, `College`, `Height`, `Weight`, `Years_in_nfl`, `headshot_url`, `instagram_url`, `highlight_video_url`.
-2. Always use case-insensitive comparisons using `toLower()` for string properties like Name, Position, College.
-3. If searching by name, use CONTAINS for flexibility (e.g., `toLower(p.Name) CONTAINS toLower("bosa")`).
+2. Search names with the indexed `name_key` / `last_name_key` properties and a lowercase literal without accents or punctuation: `p.name_key = "nick bosa"` for a full name, `p.last_name_key = "bosa"` for a last name, `p.name_key CONTAINS "bosa"` otherwise. For nicknames and run-together names use the `alias_keys` list: `"cmc" IN p.alias_keys`. Never wrap these keys in `toLower()`.
+3. For other string properties like Position and College, use case-insensitive comparisons with `toLower()` on both sides.
 4. If searching by number, ensure the number property (`p.Jersey_number`) is matched correctly (it's likely stored as an integer or string, check schema).
 5. NEVER use the embedding property.
 6. Limit results to 1 if the user asks for a specific player, but allow multiple for general queries (e.g., "list all QBs"). Default to LIMIT 5 if multiple results are possible and no limit is specified.
@@ -57,7 +58,7 @@ Example Questions and Queries:
 1. "Who is Nick Bosa?"
 ```
 MATCH (p:Player)
-WHERE toLower(p.Name) CONTAINS toLower("Nick Bosa")
+WHERE p.name_key = "nick bosa"
 RETURN p.player_id, p.Name, p.Position, p.Jersey_number, p.College, p.Height, p.Weight, p.Years_in_nfl, p.headshot_url, p.instagram_url, p.highlight_video_url
 LIMIT 1
 ```
@@ -118,7 +119,8 @@ player_summary_prompt = PromptTemplate.from_template(PLAYER_SUMMARY_TEMPLATE)
 # Create the Cypher QA chain for player search
 player_search_chain = GraphCypherQAChain.from_llm(
     llm,
-    graph=graph,
+    # Parameterized, validated (one repair attempt) and cost-guarded; see tools/cypher_validation.py
+    graph=tool_graph(graph, llm, tool="player_search"),
     verbose=True,
     cypher_prompt=player_search_prompt,
     return_direct=True,  # Return raw results
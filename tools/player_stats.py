@@ -0,0 +1,103 @@
+"""
+Player Stats - LangChain tool for tabular stat questions
+
+"Top 5 rushers", "Purdy's EPA by game" and "who led in YAC in week 7" are
+aggregations over the per-game stats table, so this tool skips text-to-Cypher
+and the LLM entirely: the agent passes structured arguments as a JSON object
+and tools/stats_engine.py answers from its in-memory columnar frame.
+
+The result is returned as text for the agent and cached as a compact table
+(title, columns, rows) for the stats table component.
+"""
+
+import json
+import os
+import sys
+
+# Add parent directory to path to access gradio modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tools.stats_engine import MAX_LIMIT, get_stats_engine
+
+ARGUMENTS_HELP = (
+    'Pass a JSON object, e.g. {"stat": "rush_attempts", "group_by": "player", "limit": 5} or '
+    '{"stat": "qb_epa", "group_by": "week", "filters": {"player": "Purdy"}, "sort": "week"}. '
+    'Keys: stat (name or list), agg (sum|mean|max|min), group_by (player|game|week|opponent|position|none), '
+    'filters (an object: player, position, week or [first, last], opponent, home, min_<stat>), '
+    f'sort (desc|asc|week), limit (default 10 for rankings, every row up to {MAX_LIMIT} for week/game breakdowns).'
+)
+
+# Create a global variable to store the last stats table
+# Workaround for LangChain dropping structured data
+LAST_STATS_DATA = None
+
+
+def get_last_stats_data():
+    global LAST_STATS_DATA
+    print(f"GETTING STATS DATA FROM CACHE: {LAST_STATS_DATA}")
+    return LAST_STATS_DATA
+
+
+def set_last_stats_data(stats_data):
+    global LAST_STATS_DATA
+    LAST_STATS_DATA = stats_data
+
+
+def parse_arguments(input_text):
+    """Tool input -> engine keyword arguments; the ReAct agent sends the JSON object as a string."""
+    if isinstance(input_text, dict):
+        arguments = input_text
+    else:
+        text = str(input_text or "").strip().strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+        try:
+            arguments = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError(f"Player Stats needs structured arguments. {ARGUMENTS_HELP}")
+    if not isinstance(arguments, dict):
+        raise ValueError(f"Player Stats needs a JSON object. {ARGUMENTS_HELP}")
+    if arguments.get("filters") and not isinstance(arguments["filters"], dict):
+        raise ValueError(f"filters must be a JSON object, not {arguments['filters']!r}. {ARGUMENTS_HELP}")
+    allowed = {"stat", "agg", "group_by", "filters", "sort", "limit"}
+    unknown = sorted(set(arguments) - allowed)
+    if unknown:
+        raise ValueError(f"Unknown argument {', '.join(unknown)}. {ARGUMENTS_HELP}")
+    return arguments
+
+
+def format_table(table):
+    """Plain-text table for the agent's observation."""
+    lines = [table["title"], " | ".join(table["columns"])]
+    for row in table["rows"]:
+        lines.append(" | ".join("" if value is None else str(value) for value in row))
+    if table.get("total_rows", 0) > len(table["rows"]):
+        lines.append(f"(showing {len(table['rows'])} of {table['total_rows']} rows; a larger limit, "
+                     f"up to {MAX_LIMIT}, shows more)")
+    return "\n".join(lines)
+
+
+def player_stats_qa(input_text):
+    """
+    Answer a stat question from structured arguments.
+
+    Args:
+        input_text (str): JSON object with stat, agg, group_by, filters, sort and limit
+
+    Returns:
+        dict: Response containing the text table and the structured table
+    """
+    set_last_stats_data(None)
+    try:
+        arguments = parse_arguments(input_text)
+        table = get_stats_engine().query(**arguments)
+    except (ValueError, TypeError) as e:
+        print(f"[STATS] Rejected arguments {input_text!r}: {e}")
+        return {"output": str(e), "stats_data": None}
+    except Exception as e:
+        print(f"Error in player_stats_qa: {str(e)}")
+        return {"output": "I encountered an error while looking up those stats.", "stats_data": None}
+
+    if not table["rows"]:
+        return {"output": "No stats matched those filters.", "stats_data": None}
+    set_last_stats_data(table)
+    return {"output": format_table(table), "stats_data": table}
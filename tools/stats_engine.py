@@ -0,0 +1,260 @@
+"""
+Stats Engine - in-process columnar engine behind the Player Stats tool
+
+Loads the enhanced stats CSV written by game_stats.py into one pandas frame,
+once per process, typed by 49ers_2024_column_definitions.csv:
+    - identifier columns (game id, player, team, position) become categoricals
+    - averages, medians, rates and percentages are floats aggregated with mean
+    - everything else is a count or total, aggregated with sum (stored as an
+      integer column when every value is whole)
+Stat names match the PLAYED relationship properties (gradio_stats.PLAYED_STATS),
+so "targets" here is r.targets in the graph.
+
+A query is a small dict (stat, agg, group_by, filters, sort, limit) that maps
+onto vectorized filter / groupby / top-k operations, so a stat question is
+answered with exact numbers in milliseconds instead of generated Cypher.
+"""
+
+import csv
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+# Add parent directory to path to access gradio modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gradio_stats import PLAYED_STATS, STATS_CSV, match_players, parse_stats_game_id
+from gradio_teams import alias_keys, team_by_abbreviation
+from gradio_utils import search_key
+
+MEDIA_DIR = os.path.dirname(STATS_CSV)
+COLUMN_DEFINITIONS_CSV = os.path.join(MEDIA_DIR, "49ers_2024_column_definitions.csv")
+ROSTER_CSV = os.path.join(MEDIA_DIR, "new_final_april 11", "roster_april_11.csv")
+
+# Identifier columns in the definitions; every other defined column is a stat
+ID_COLUMNS = ("game_id", "player_id", "player_name", "posteam", "position", "team")
+
+# Definitions of these kinds are per-play averages, not additive totals
+_RATE_RE = re.compile(r"\b(average|mean|median|rate|percentage)\b", re.IGNORECASE)
+
+GROUP_KEYS = ("player", "game", "week", "opponent", "position", "none")
+AGGREGATIONS = ("sum", "mean", "max", "min")
+SORTS = ("desc", "asc", "week")
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def load_column_definitions(path=COLUMN_DEFINITIONS_CSV):
+    """column name -> definition text from the column definitions CSV."""
+    with open(path, "r", encoding="utf-8") as f:
+        return {row["column_name"].strip(): row["definition"].strip() for row in csv.DictReader(f)}
+
+
+def _defined_column(column, definitions):
+    """Definition key for a stats column; pandas merge suffixes (avg_yac_x) fall back to the base name."""
+    if column in definitions:
+        return column
+    base = re.sub(r"_[xy]$", "", column)
+    return base if base in definitions else None
+
+
+def _load_roster(path=ROSTER_CSV):
+    if not os.path.exists(path):
+        print(f"[STATS] WARNING: {path} not found, players keep their nflverse short names")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [{"player_id": row["player_id"], "name": row.get("Player")} for row in csv.DictReader(f)]
+
+
+class StatsEngine:
+    """Typed, column-oriented view of the per-game stats with filter/group/top-k queries."""
+
+    def __init__(self, stats_csv=STATS_CSV, definitions_csv=COLUMN_DEFINITIONS_CSV, roster_csv=ROSTER_CSV):
+        start = time.perf_counter()
+        definitions = load_column_definitions(definitions_csv)
+        raw = pd.read_csv(stats_csv)
+
+        # Stat name (PLAYED property where there is one) -> CSV column
+        played_names = {column: prop for prop, (column, _) in PLAYED_STATS.items()}
+        self.stats = {}
+        self.definitions = {}
+        self.rates = set()
+        frame = {}
+        for column in raw.columns:
+            if column in ID_COLUMNS:
+                continue
+            defined = _defined_column(column, definitions)
+            if defined is None:
+                print(f"[STATS] Skipping {column}: not in the column definitions")
+                continue
+            name = played_names.get(column, column)
+            values = pd.to_numeric(raw[column], errors="coerce")
+            if _RATE_RE.search(definitions[defined]):
+                self.rates.add(name)
+                values = values.astype("float64")
+            elif values.notna().all() and (values % 1 == 0).all():
+                values = values.astype("int64")
+            frame[name] = values
+            self.stats[name] = column
+            self.definitions[name] = definitions[defined]
+        if "solo_tackles" in frame and "assisted_tackles" in frame:
+            frame["tackles"] = frame["solo_tackles"] + frame["assisted_tackles"]
+            self.stats["tackles"] = None
+            self.definitions["tackles"] = "Solo plus assisted tackles"
+
+        # Game columns from the nflverse game id (season_week_away_home)
+        games = {}
+        for game_id in raw["game_id"].unique():
+            parsed = parse_stats_game_id(game_id)
+            games[game_id] = parsed if parsed else (None, None, None, None)
+        team_names = {abbr: team_by_abbreviation(abbr) for abbr in raw["posteam"].unique()}
+        posteam = raw["posteam"].map(team_names)
+        home_team = raw["game_id"].map(lambda g: games[g][2])
+        away_team = raw["game_id"].map(lambda g: games[g][3])
+        opponent = away_team.where(home_team == posteam, home_team)
+
+        # Full roster names where the short name matches exactly one player
+        roster = _load_roster(roster_csv)
+        names = {player["player_id"]: player["name"] for player in roster}
+        matched = match_players(dict(zip(raw["player_id"], raw["player_name"])), roster)
+        player = raw["player_id"].map(lambda pid: names.get(matched.get(pid))).fillna(raw["player_name"])
+
+        ids = pd.DataFrame({
+            "game_id": raw["game_id"].astype("category"),
+            "player_id": raw["player_id"].astype("category"),
+            "player": player.astype("category"),
+            "position": raw["position"].astype("category"),
+            "week": raw["game_id"].map(lambda g: games[g][1]).astype("Int64"),
+            "opponent": opponent.astype("category"),
+            "home": home_team == posteam,
+            # Search keys for vectorized name filters: "brock purdy b purdy"
+            "player_key": (player.map(lambda n: search_key(n) or "") + " "
+                           + raw["player_name"].map(lambda n: search_key(n) or "")).astype("category"),
+        })
+        self.frame = pd.concat([ids, pd.DataFrame(frame)], axis=1)
+        self.opponent_keys = {
+            name: {search_key(name), *alias_keys(name)}
+            for name in self.frame["opponent"].dropna().unique()
+        }
+        print(f"[STATS] Loaded {len(self.frame)} rows x {len(self.stats)} stats "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # --------------------------------------------------------------------------
+    # Query
+    # --------------------------------------------------------------------------
+    def _stat_names(self, stat):
+        names = [stat] if isinstance(stat, str) else list(stat or [])
+        unknown = [name for name in names if name not in self.stats]
+        if unknown:
+            raise ValueError(f"Unknown stat {', '.join(unknown)}. Available stats: {', '.join(sorted(self.stats))}")
+        return names
+
+    def _filter(self, frame, filters):
+        if filters and not isinstance(filters, dict):
+            raise ValueError(f"filters must be an object such as {{\"player\": \"Purdy\", \"week\": [1, 8]}}, "
+                             f"not {filters!r}")
+        mask = pd.Series(True, index=frame.index)
+        for key, value in (filters or {}).items():
+            if value is None or value == "":
+                continue
+            if key == "player":
+                mask &= frame["player_key"].str.contains(search_key(value) or "", regex=False)
+            elif key == "position":
+                positions = [value] if isinstance(value, str) else value
+                mask &= frame["position"].isin([str(p).upper() for p in positions])
+            elif key == "week":
+                if isinstance(value, (list, tuple)) and len(value) == 2:
+                    mask &= frame["week"].between(int(value[0]), int(value[1]))
+                else:
+                    mask &= frame["week"] == int(value)
+            elif key == "opponent":
+                wanted = search_key(value)
+                opponents = [name for name, keys in self.opponent_keys.items() if wanted in keys]
+                mask &= frame["opponent"].isin(opponents)
+            elif key == "home":
+                mask &= frame["home"] == bool(value)
+            elif key.startswith("min_") and key[4:] in self.stats:
+                mask &= frame[key[4:]] >= float(value)
+            else:
+                raise ValueError(f"Unknown filter {key!r}. Filters: player, position, week, opponent, home, min_<stat>")
+        return frame[mask]
+
+    def query(self, stat=None, agg=None, group_by="player", filters=None, sort="desc", limit=None):
+        """
+        Run one stats query and return {"title", "columns", "rows", "total_rows"};
+        total_rows counts the rows before `limit` cut them.
+
+        stat is a stat name or list of names (the first one ranks the rows), agg
+        one of AGGREGATIONS (default: sum for totals, mean for averages),
+        group_by one of GROUP_KEYS, filters a dict of player / position / week
+        (a number or [first, last]) / opponent / home / min_<stat>, and sort
+        one of SORTS ("week" orders per-game rows by week instead of by stat).
+        limit defaults to DEFAULT_LIMIT for rankings and to MAX_LIMIT for
+        per-week and per-game breakdowns, so a season is never cut short.
+        """
+        start = time.perf_counter()
+        stats = self._stat_names(stat)
+        if not stats:
+            raise ValueError("Pick a stat to report, e.g. \"sacks\" or \"rush_attempts\"")
+        group_by = (group_by or "none").lower()
+        if group_by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group_by {group_by!r}. Use one of: {', '.join(GROUP_KEYS)}")
+        if agg is not None and agg not in AGGREGATIONS:
+            raise ValueError(f"Unknown agg {agg!r}. Use one of: {', '.join(AGGREGATIONS)}")
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort {sort!r}. Use one of: {', '.join(SORTS)}")
+        if not limit:
+            limit = MAX_LIMIT if group_by in ("week", "game") or sort == "week" else DEFAULT_LIMIT
+        limit = max(1, min(int(limit), MAX_LIMIT))
+
+        frame = self._filter(self.frame, filters)
+        keys = {"player": ["player", "position"], "game": ["week", "opponent"], "week": ["week"],
+                "opponent": ["opponent"], "position": ["position"], "none": []}[group_by]
+        aggs = {name: agg or ("mean" if name in self.rates else "sum") for name in stats}
+
+        if keys:
+            grouped = frame.groupby(keys, observed=True, sort=False)
+            result = grouped.agg(**{name: (name, how) for name, how in aggs.items()})
+            result["games"] = grouped["game_id"].nunique()
+            result = result.reset_index()
+        else:
+            result = pd.DataFrame([{**{name: frame[name].agg(how) for name, how in aggs.items()},
+                                    "games": frame["game_id"].nunique()}])
+        # The first stat ranks the rows; "week" keeps per-game breakdowns in order
+        if sort == "week" and "week" in result:
+            result = result.sort_values("week", kind="stable")
+        else:
+            result = result.sort_values(stats[0], ascending=(sort == "asc"), kind="stable")
+        total_rows = len(result)
+        result = result.head(limit)
+
+        columns = keys + stats + ["games"]
+        rows = [[_plain(value) for value in row] for row in result[columns].itertuples(index=False)]
+        title = ", ".join(f"{aggs[name]} {name}" for name in stats)
+        title += f" by {group_by}" if keys else ""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[STATS] {title} filters={filters or {}} -> {len(rows)} rows in {elapsed_ms:.1f} ms")
+        # Timing stays out of the result: it reaches the agent prompt, which must be reproducible for cassettes
+        return {"title": title, "columns": columns, "rows": rows, "total_rows": total_rows}
+
+
+def _plain(value):
+    """numpy / pandas scalar -> JSON-friendly Python value, rounding averages."""
+    if pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    return round(value, 2) if isinstance(value, float) else value
+
+
+_ENGINE = None
+
+
+def get_stats_engine():
+    """The process-wide engine, loaded on first use."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = StatsEngine()
+    return _ENGINE
@@ -18,6 +18,7 @@ if parent_dir not in sys.path:
 try:
     from gradio_graph import graph  # Import the configured graph instance
     from gradio_llm import llm      # Import the configured LLM instance
+    from tools.cypher_validation import tool_graph
 except ImportError as e:
     print(f"Error importing graph or llm: {e}")
     print("Please ensure gradio_graph.py and gradio_llm.py exist and are configured correctly.")
@@ -37,8 +38,10 @@ Schema:
 
 Based on the schema, generate a Cypher query that retrieves relevant :Team_Story nodes based on the user's question.
 *   Focus on searching the `summary` and `topic` properties of the :Team_Story node (aliased as `s`).
-*   Always `MATCH (s:Team_Story)` and potentially relate it `MATCH (s)-[:STORY_ABOUT]->(t:Team {{name: 'San Francisco 49ers'}})` if the query implies 49ers context.
-*   Use `toLower()` for case-insensitive matching on properties like `topic` or keywords in `summary`.
+*   Always `MATCH (s:Team_Story)` and potentially relate it `MATCH (s)-[:STORY_ABOUT]->(t:Team {{nickname_key: '49ers'}})` if the query implies 49ers context.
+*   Match topics on the indexed `s.topic_key` property with a lowercase literal (e.g. `s.topic_key CONTAINS 'draft'`); never wrap it in `toLower()`.
+*   Use `toLower()` for case-insensitive matching on keywords in `summary`.
+*   `s.published_at` is an indexed datetime (UTC). For "latest", "recent" or "this week" questions add `ORDER BY s.published_at DESC`, and filter date ranges on it (e.g. `s.published_at >= datetime("2025-04-01")`).
 *   Return relevant properties like `s.summary`, `s.link_to_article`, `s.topic`.
 *   Limit the results to a reasonable number (e.g., LIMIT 10).
 
@@ -58,6 +61,28 @@ CYPHER_TEAM_STORY_GENERATION_PROMPT = PromptTemplate(
 
 # Placeholder for structured data caching
 LAST_TEAM_STORY_DATA = []
+MAX_STORIES_TO_SHOW = 3
+
+# "What's the latest news?": a recency word and nothing else to search on
+RECENCY_WORDS = {"latest", "newest", "recent", "recently", "new", "lately", "today", "current", "breaking"}
+GENERIC_NEWS_WORDS = {
+    "what", "what's", "whats", "is", "are", "the", "a", "any", "anything", "there", "some", "top", "me", "us",
+    "tell", "show", "give", "get", "can", "you", "please", "i", "news", "story", "stories", "article", "articles",
+    "headlines", "updates", "update", "about", "on", "for", "from", "with", "of", "in", "this", "week", "going",
+    "happening", "happened", "49ers", "niners", "sf", "san", "francisco", "team",
+}
+
+# Recency-ranked top-k: read newest first off the Team_Story.published_at range index
+RECENT_STORIES_QUERY = f"""
+MATCH (s:Team_Story)
+WHERE s.published_at IS NOT NULL AND (s)-[:STORY_ABOUT]->(:Team {{nickname_key: '49ers'}})
+RETURN s.summary, s.link_to_article, s.topic
+ORDER BY s.published_at DESC
+LIMIT {MAX_STORIES_TO_SHOW}
+"""
+
+# Generated Cypher is parameterized, validated (one repair attempt) and cost-guarded
+story_graph = tool_graph(graph, llm, tool="team_story")
 
 def get_last_team_story_data():
     """Returns the structured data from the last team story query."""
@@ -75,12 +100,22 @@ def clean_cypher_query(query_text):
     query = query.strip('"\'')
     return query
 
-def team_story_qa(query: str) -> dict:
+def is_recency_request(query):
+    """True for "what's the latest news"-style questions with no topic to filter on."""
+    words = re.findall(r"[a-z0-9']+", query.lower())
+    return any(word in RECENCY_WORDS for word in words) and all(
+        word in RECENCY_WORDS or word in GENERIC_NEWS_WORDS for word in words
+    )
+
+def team_story_qa(query: str, mode: str = "auto") -> dict:
     """
     Queries the Neo4j database for team news stories based on the user query.
     Manually generates Cypher, executes it, and formats the results.
     Args:
         query: The natural language query from the user.
+        mode: "recent" returns the newest stories (no LLM call), "search" has
+            the LLM write the query, "auto" picks "recent" for plain
+            "latest news" questions.
     Returns:
         A dictionary containing the 'output' text and structured 'team_story_data'.
     """
@@ -92,24 +127,27 @@ def team_story_qa(query: str) -> dict:
     print(f"--- Running Team Story QA for query: {query} ---")
 
     try:
-        # 1. Generate Cypher query using LLM
-        print("Generating Cypher query...")
-        cypher_generation_result = llm.invoke(
-            CYPHER_TEAM_STORY_GENERATION_PROMPT.format(
-                schema=graph.schema, 
-                query=query
+        if mode == "recent" or (mode == "auto" and is_recency_request(query)):
+            # 1. Recency-ranked retrieval: index-ordered top-k, no Cypher generation
+            print("Recency request: reading the newest stories by published_at...")
+            cleaned_cypher = RECENT_STORIES_QUERY.strip()
+        else:
+            # 1. Generate Cypher query using LLM
+            print("Generating Cypher query...")
+            cypher_generation_result = llm.invoke(
+                CYPHER_TEAM_STORY_GENERATION_PROMPT.format(
+                    schema=graph.schema, 
+                    query=query
+                )
             )
-        )
-        generated_cypher = cypher_generation_result.content # Extract text content
-        cleaned_cypher = clean_cypher_query(generated_cypher)
-        print(f"Generated Cypher (cleaned):\n{cleaned_cypher}")
+            generated_cypher = cypher_generation_result.content # Extract text content
+            cleaned_cypher = clean_cypher_query(generated_cypher)
+            print(f"Generated Cypher (cleaned):\n{cleaned_cypher}")
 
         # 2. Execute the generated Cypher query
         if cleaned_cypher:
             print("Executing Cypher query...")
-            # Assuming the generated query doesn't need parameters for now
-            # If parameters are needed, the prompt/parsing would need adjustment
-            neo4j_results = graph.query(cleaned_cypher)
+            neo4j_results = story_graph.query(cleaned_cypher)
             print(f"Neo4j Results: {neo4j_results}")
 
             # 3. Process results and extract structured data
@@ -132,7 +170,6 @@ def team_story_qa(query: str) -> dict:
             output_text = "I couldn't formulate a query to find the specific news you asked for."
 
         # --- Limit the number of results stored and returned --- #
-        MAX_STORIES_TO_SHOW = 3 
         LAST_TEAM_STORY_DATA = structured_results[:MAX_STORIES_TO_SHOW] 
         # --- End limiting --- #
         